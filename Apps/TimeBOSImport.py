@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# TimeBOSImport.py
+#
+# App to measure the cold-start times of the BOS.
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+A short app as part of BOS (Bible Organisational System) demos.
+This app starts a number of fresh Python processes, and times how long each one takes
+    to import BibleOrgSysGlobals, to first use the global BibleBooksCodes and USFMMarkers tables,
+    and to load a Bible Organisational System (in this case: GENERIC-KJV-66-ENG).
+
+The minimum and median times (in milliseconds) are displayed
+    and also appended to OutputFiles/BOSImportTimes.csv so that they can be tracked over time.
+
+Note that this app MUST BE RUN FROM YOUR BOS folder,
+    e.g., using the command:
+        Apps/TimeBOSImport.py
+
+You can discover the available command line parameters with
+        Apps/TimeBOSImport.py --help
+
+    e.g., to make the memory-mapped tables bundle first
+        Apps/TimeBOSImport.py --makeBundle
+    or to time twenty processes
+        Apps/TimeBOSImport.py -n 20
+
+The (Python3) BOS is developed and well-tested on Linux (Ubuntu)
+    but also runs on Windows (although not so well tested).
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "TimeBOSImport"
+ProgName = "Time BOS Import"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+# Allow the system to find the BOS even when the app is down in its own folder
+import sys
+sys.path.append( '.' ) # Append the containing folder to the path to search for the BOS
+import os, subprocess, statistics
+from datetime import datetime
+import BibleOrgSysGlobals
+
+
+DEFAULT_NUM_RUNS = 10
+OUTPUT_FOLDER = 'OutputFiles/' # Relative path
+TIMES_FILENAME = 'BOSImportTimes.csv'
+TIMING_NAMES = ( 'ImportGlobals', 'BibleBooksCodes', 'USFMMarkers', 'OrganizationalSystem', )
+
+# This is run in each fresh process -- it prints the elapsed milliseconds after each step
+CHILD_SCRIPT = """
+import sys, time
+startTime = time.perf_counter()
+sys.path.append( '.' )
+import BibleOrgSysGlobals
+times = [time.perf_counter()]
+BibleOrgSysGlobals.BibleBooksCodes.getBBB( 'Gen' )
+times.append( time.perf_counter() )
+BibleOrgSysGlobals.USFMMarkers.isNewlineMarker( 'p' )
+times.append( time.perf_counter() )
+from BibleOrganizationalSystems import BibleOrganizationalSystem
+BibleOrganizationalSystem( 'GENERIC-KJV-66-ENG' )
+times.append( time.perf_counter() )
+print( ' '.join( '{:.3f}'.format( (t-startTime)*1000 ) for t in times ) )
+"""
+
+
+def timeOneProcess():
+    """
+    Runs the child script in a fresh Python process.
+
+    Returns a list of the cumulative milliseconds for each of the TIMING_NAMES.
+    """
+    output = subprocess.check_output( [sys.executable, '-c', CHILD_SCRIPT], cwd=os.getcwd(), universal_newlines=True )
+    return [float(field) for field in output.split()[-len(TIMING_NAMES):]]
+# end of timeOneProcess
+
+
+def main():
+    """
+    Time the starting up of a number of fresh processes and display and save the results.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0:
+        print( ProgNameVersion )
+
+    derivedFolderPath = os.path.join( 'DataFiles', 'DerivedFiles' )
+    if BibleOrgSysGlobals.commandLineOptions.makeBundle:
+        BibleOrgSysGlobals.makeDerivedTablesBundle( derivedFolderPath )
+    haveBundle = os.path.exists( os.path.join( derivedFolderPath, BibleOrgSysGlobals.TABLES_BUNDLE_FILENAME ) )
+
+    numRuns = BibleOrgSysGlobals.commandLineOptions.numRuns
+    timeOneProcess() # Make sure that any derived files are already made and the OS caches are warm
+    results = [timeOneProcess() for j in range( numRuns )]
+
+    minTimes, medianTimes = [], []
+    for n,timingName in enumerate( TIMING_NAMES ):
+        stepTimes = [result[n] for result in results]
+        minTimes.append( min( stepTimes ) ); medianTimes.append( statistics.median( stepTimes ) )
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( "  {:<22} min {:7.1f}ms  median {:7.1f}ms".format( timingName, minTimes[-1], medianTimes[-1] ) )
+
+    if not os.access( OUTPUT_FOLDER, os.F_OK ): os.makedirs( OUTPUT_FOLDER )
+    timesFilepath = os.path.join( OUTPUT_FOLDER, TIMES_FILENAME )
+    newFile = not os.path.exists( timesFilepath )
+    with open( timesFilepath, 'at' ) as timesFile:
+        if newFile:
+            timesFile.write( 'Date,PythonVersion,Bundle,Runs,' + ','.join( 'min'+timingName+',median'+timingName for timingName in TIMING_NAMES ) + '\n' )
+        timesFile.write( '{},{},{},{},'.format( datetime.now().strftime( '%Y-%m-%d %H:%M:%S' ), sys.version.split()[0], haveBundle, numRuns )
+                        + ','.join( '{:.1f},{:.1f}'.format( minTime, medianTime ) for minTime,medianTime in zip( minTimes, medianTimes ) ) + '\n' )
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( _("Times appended to {}").format( timesFilepath ) )
+# end of main
+
+if __name__ == '__main__':
+    # Configure basic Bible Organisational System (BOS) set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    parser.add_option("-n", "--numRuns", type="int", action="store", dest="numRuns", default=DEFAULT_NUM_RUNS, help="number of fresh processes to time [default: %default]")
+    parser.add_option("-b", "--makeBundle", action="store_true", dest="makeBundle", default=False, help="make the derived tables bundle before timing")
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    main()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of TimeBOSImport.py
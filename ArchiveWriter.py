@@ -0,0 +1,331 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ArchiveWriter.py
+#
+# Module writing zip and gzipped tar archives in a single pass
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module writing zip and/or gzipped tar archives (used by BibleWriter).
+
+Rather than writing all the files and then reading them all back in again
+    to make each archive, the exporter passes each file to the archive writer
+    as it is produced (e.g., as each Bible book is finished).
+The same data then goes into both archives.
+
+Each member is compressed separately by a pool of threads
+    (zlib releases the GIL so several books can be compressed at once)
+    and the compressed members are then written to the archives in the original order.
+    (A gzipped tar archive made this way consists of one gzip member per file
+    which is allowed by the gzip format and read back as a single stream.)
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "ArchiveWriter"
+ProgName = "Archive writer"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, time
+import struct, zlib, gzip, tarfile
+from multiprocessing.pool import ThreadPool
+
+import BibleOrgSysGlobals
+
+
+ZIP_DEFLATED = 8 # Compression method number in the zip format
+ZIP_VERSION = 20 # Version needed to extract (2.0 for deflate)
+ZIP_UTF8_FLAG = 0x800 # General purpose flag bit for UTF-8 filenames
+ZIP_LOCAL_HEADER = struct.Struct( '<4s2B4HL2L2H' )
+ZIP_CENTRAL_HEADER = struct.Struct( '<4s4B4HL2L5H2L' )
+ZIP_END_RECORD = struct.Struct( '<4s4H2LH' )
+TAR_BLOCK_SIZE, TAR_RECORD_SIZE = tarfile.BLOCKSIZE, tarfile.RECORDSIZE
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def _compressMember( archiveName, data, mtime, wantZip, wantTar ):
+    """
+    Compresses one archive member (this is run in the worker threads).
+
+    Returns a 2-tuple containing:
+        for the zip archive: None or a 4-tuple of (deflated data, CRC, uncompressed size, mtime)
+        for the tar archive: None or a 2-tuple of (gzip member, uncompressed tar size)
+    """
+    zipResult = tarResult = None
+    if wantZip:
+        compressor = zlib.compressobj( zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15 ) # Raw deflate (as used inside zip files)
+        zipResult = compressor.compress( data ) + compressor.flush(), zlib.crc32( data ) & 0xFFFFFFFF, len(data), mtime
+    if wantTar:
+        tarInfo = tarfile.TarInfo( archiveName )
+        tarInfo.size, tarInfo.mtime, tarInfo.mode = len(data), int(mtime), 0o644
+        tarMember = tarInfo.tobuf( tarfile.DEFAULT_FORMAT, 'utf-8', 'surrogateescape' ) + data
+        remainder = len(tarMember) % TAR_BLOCK_SIZE
+        if remainder: tarMember += b'\0' * (TAR_BLOCK_SIZE - remainder)
+        tarResult = gzip.compress( tarMember, compresslevel=9 ), len(tarMember)
+    return zipResult, tarResult
+# end of _compressMember
+
+
+
+class ArchiveWriter:
+    """
+    Class for writing a zip archive and/or a gzipped tar archive in a single pass.
+
+    Usage is:
+        with ArchiveWriter( zipFilepath, tarFilepath ) as archiveWriter:
+            archiveWriter.addData( archiveName, data ) and/or archiveWriter.addFile( filepath )
+        (or call archiveWriter.close() when finished, or archiveWriter.abort() if something went wrong).
+    """
+    def __init__( self, zipFilepath=None, tarFilepath=None, maxThreads=None ):
+        """
+        Constructor: creates the (empty) archive files.
+            zipFilepath and/or tarFilepath: the archives to be written
+            maxThreads (optional): defaults to BibleOrgSysGlobals.maxProcesses
+        """
+        if BibleOrgSysGlobals.debugFlag: assert( zipFilepath or tarFilepath )
+        self.zipFilepath, self.tarFilepath = zipFilepath, tarFilepath
+        if maxThreads is None: maxThreads = BibleOrgSysGlobals.maxProcesses
+        self.__zipFile = open( zipFilepath, 'wb' ) if zipFilepath else None
+        self.__tarFile = open( tarFilepath, 'wb' ) if tarFilepath else None
+        self.__pool = ThreadPool( maxThreads ) if maxThreads > 1 else None
+        self.__pending = [] # Members (in order) that aren't written yet
+        self.__zipDirectory = [] # Central directory entries for the zip archive
+        self.__tarLength = 0 # Uncompressed length of the tar archive so far
+        self.memberCount = 0
+    # end of ArchiveWriter.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the archive writer.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "Archive Writer object"
+        if self.zipFilepath: result += ('\n' if result else '') + "  " + _("Zip file: {}").format( self.zipFilepath )
+        if self.tarFilepath: result += ('\n' if result else '') + "  " + _("Tar file: {}").format( self.tarFilepath )
+        result += ('\n' if result else '') + "  " + _("Members: {}").format( self.memberCount )
+        return result
+    # end of ArchiveWriter.__str__
+
+
+    def __enter__( self ):
+        """
+        Allows the archive writer to be used as a context manager.
+        """
+        return self
+    # end of ArchiveWriter.__enter__
+
+
+    def __exit__( self, excType, excValue, traceback ):
+        """
+        Finishes the archive(s), or removes them if an exception was raised.
+        """
+        if excType is None: self.close()
+        else: self.abort()
+        return False # Don't suppress any exception
+    # end of ArchiveWriter.__exit__
+
+
+    def addData( self, archiveName, data, mtime=None ):
+        """
+        Adds a member to the archive(s).
+            archiveName: the filename to be used inside the archive
+            data: bytes (or a string which will be UTF-8 encoded)
+            mtime (optional): the modification time (defaults to now)
+        """
+        if BibleOrgSysGlobals.debugFlag: assert( self.__zipFile or self.__tarFile ) # Not closed yet
+        if isinstance( data, str ): data = data.encode( 'utf-8' )
+        if mtime is None: mtime = time.time()
+        args = archiveName, data, mtime, self.__zipFile is not None, self.__tarFile is not None
+        if self.__pool is None: self.__pending.append( (archiveName, _compressMember( *args )) )
+        else: self.__pending.append( (archiveName, self.__pool.apply_async( _compressMember, args )) )
+        self.memberCount += 1
+        self.__writeFinished()
+    # end of ArchiveWriter.addData
+
+
+    def addFile( self, filepath, archiveName=None ):
+        """
+        Adds an existing file to the archive(s)
+            (by default, without its path).
+        """
+        with open( filepath, 'rb' ) as existingFile: data = existingFile.read()
+        self.addData( archiveName if archiveName else os.path.basename( filepath ), data, os.path.getmtime( filepath ) )
+    # end of ArchiveWriter.addFile
+
+
+    def __writeFinished( self, waitFlag=False ):
+        """
+        Writes any compressed members at the front of the pending list to the archive(s).
+
+        If waitFlag is set, waits until they're all done.
+        """
+        while self.__pending:
+            archiveName, result = self.__pending[0]
+            if self.__pool is not None:
+                if not waitFlag and not result.ready(): break
+                result = result.get()
+            del self.__pending[0]
+            zipResult, tarResult = result
+            if zipResult is not None: self.__writeZipMember( archiveName, *zipResult )
+            if tarResult is not None:
+                compressedTarMember, tarMemberLength = tarResult
+                self.__tarFile.write( compressedTarMember )
+                self.__tarLength += tarMemberLength
+    # end of ArchiveWriter.__writeFinished
+
+
+    def __writeZipMember( self, archiveName, compressedData, CRC, size, mtime ):
+        """
+        Writes the local header and the deflated data for one member of the zip archive
+            and remembers the information for the central directory.
+        """
+        if size > 0xFFFFFFFF or compressedData and len(compressedData) > 0xFFFFFFFF:
+            logging.critical( t("addData: Unable to add {} because it's too big for a zip archive (without zip64)").format( archiveName ) )
+            return
+        try: encodedName, flags = archiveName.encode( 'ascii' ), 0
+        except UnicodeEncodeError: encodedName, flags = archiveName.encode( 'utf-8' ), ZIP_UTF8_FLAG
+        year, month, day, hour, minute, second = time.localtime( mtime )[:6]
+        if year < 1980: year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        dosDate, dosTime = (year-1980)<<9 | month<<5 | day, hour<<11 | minute<<5 | second//2
+        offset = self.__zipFile.tell()
+        self.__zipFile.write( ZIP_LOCAL_HEADER.pack( b'PK\x03\x04', ZIP_VERSION, 0, flags, ZIP_DEFLATED, dosTime, dosDate,
+                                                CRC, len(compressedData), size, len(encodedName), 0 ) )
+        self.__zipFile.write( encodedName )
+        self.__zipFile.write( compressedData )
+        self.__zipDirectory.append( ZIP_CENTRAL_HEADER.pack( b'PK\x01\x02', ZIP_VERSION, 3, ZIP_VERSION, 0, flags, ZIP_DEFLATED, dosTime, dosDate,
+                                                CRC, len(compressedData), size, len(encodedName), 0, 0, 0, 0, 0o100644<<16, offset ) + encodedName )
+    # end of ArchiveWriter.__writeZipMember
+
+
+    def close( self ):
+        """
+        Waits for any members still being compressed,
+            then finishes and closes the archive(s).
+        """
+        self.__writeFinished( waitFlag=True )
+        if self.__pool is not None:
+            self.__pool.close(); self.__pool.join()
+            self.__pool = None
+        if self.__zipFile is not None:
+            directoryOffset = self.__zipFile.tell()
+            for entry in self.__zipDirectory: self.__zipFile.write( entry )
+            directorySize = self.__zipFile.tell() - directoryOffset
+            self.__zipFile.write( ZIP_END_RECORD.pack( b'PK\x05\x06', 0, 0, len(self.__zipDirectory), len(self.__zipDirectory),
+                                                directorySize, directoryOffset, 0 ) )
+            self.__zipFile.close()
+            self.__zipFile = None
+        if self.__tarFile is not None:
+            endLength = 2 * TAR_BLOCK_SIZE # The tar archive ends with two empty blocks
+            remainder = (self.__tarLength + endLength) % TAR_RECORD_SIZE
+            if remainder: endLength += TAR_RECORD_SIZE - remainder
+            self.__tarFile.write( gzip.compress( b'\0' * endLength, compresslevel=9 ) )
+            self.__tarFile.close()
+            self.__tarFile = None
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("close: Wrote {} members to {}").format( self.memberCount,
+                                        ' and '.join( filepath for filepath in (self.zipFilepath, self.tarFilepath) if filepath ) ) )
+    # end of ArchiveWriter.close
+
+
+    def abort( self ):
+        """
+        Stops compressing, closes the archive(s), and removes the partly written files.
+
+        Safe to call more than once.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("abort: Abandoning {}").format(
+                                        ' and '.join( filepath for filepath in (self.zipFilepath, self.tarFilepath) if filepath ) ) )
+        if self.__pool is not None:
+            self.__pool.terminate(); self.__pool.join()
+            self.__pool = None
+        self.__pending, self.__zipDirectory = [], []
+        for filepath, archiveFile in ( (self.zipFilepath, self.__zipFile), (self.tarFilepath, self.__tarFile), ):
+            if archiveFile is not None: archiveFile.close()
+            if filepath and os.path.exists( filepath ):
+                try: os.remove( filepath )
+                except OSError as err: logging.error( t("abort: Unable to remove {}: {}").format( filepath, err ) )
+        self.__zipFile = self.__tarFile = None
+    # end of ArchiveWriter.abort
+# end of class ArchiveWriter
+
+
+
+def demo():
+    """
+    Archive the files in a test folder and check the archives by reading them back.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile, zipfile, shutil
+    testFolder = 'Tests/DataFilesForTests/USFMTest1/'
+    if not os.access( testFolder, os.R_OK ):
+        logging.error( "Sorry, test folder {!r} is not readable on this computer.".format( testFolder ) ); return
+    folder = tempfile.mkdtemp()
+    try:
+        zipFilepath, tarFilepath = os.path.join( folder, 'Test.zip' ), os.path.join( folder, 'Test.tar.gz' )
+        startTime = time.time()
+        with ArchiveWriter( zipFilepath, tarFilepath ) as archiveWriter:
+            for filename in sorted( os.listdir( testFolder ) ):
+                filepath = os.path.join( testFolder, filename )
+                if os.path.isfile( filepath ): archiveWriter.addFile( filepath )
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( archiveWriter )
+            print( "  Took {:.2f} seconds".format( time.time() - startTime ) )
+        with zipfile.ZipFile( zipFilepath ) as zf:
+            assert( zf.testzip() is None )
+            zipNames = zf.namelist()
+        with tarfile.open( tarFilepath, 'r:gz' ) as tf: tarNames = tf.getnames()
+        if BibleOrgSysGlobals.verbosityLevel > 0: print( "  Zip has {} members and tar has {} members".format( len(zipNames), len(tarNames) ) )
+        assert( zipNames == tarNames )
+    finally: shutil.rmtree( folder )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of ArchiveWriter.py
@@ -0,0 +1,519 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# BCVBible.py
+#
+# Module handling Bibles exported in our BCV (one file per verse) format
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module reading and loading the BCV Bible files written by BibleWriter.toBOSBCV.
+
+The BCV folder contains:
+    Metadata.txt (with BCVVersion, names, and the BookList)
+    a BBB subfolder for each book containing:
+        BBB_BookMetadata.txt (with the CVList and the CVContexts)
+        BBB_C0.txt (the book introduction)
+        BBB_CnVm.txt for each verse
+            (the chapter one verse zero entries are saved in the first verse file)
+    or if it was written packed:
+        BBB_Verses.txt (all of the above verse files one after the other)
+        BBB_VerseIndex.txt (with the name, byte offset and byte length of each verse)
+
+Each line in a verse file is \\marker[<<originalMarker][=originalText].
+
+The metadata is read when the object is created (and the book metadata when the book is first used),
+    but after loadLazily, getContextVerseData only reads the verse that's asked for
+    (and keeps the most recently used verses in memory).
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-07' # by RJH
+ShortProgName = "BCVBible"
+ProgName = "BCV Bible format handler"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import logging, os, ast
+from collections import OrderedDict
+
+import BibleOrgSysGlobals
+from Bible import Bible, BibleBook
+from InternalBibleInternals import BOS_ALL_ADDED_NESTING_MARKERS, \
+                        InternalBibleEntry, InternalBibleEntryList, InternalBibleIndex
+
+
+METADATA_FILENAME = 'Metadata.txt'
+LITERAL_METADATA_FIELDS = ( 'BookList', 'CVList', 'CVContexts', 'Packed', ) # The others are just strings
+DEFAULT_MAX_CACHED_VERSES = 1000
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def BCVBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoLoadBooks=False ):
+    """
+    Given a folder, search for BCV Bible folders in the folder and in the next level down.
+
+    Returns False if an error is found.
+
+    if autoLoad is false (default)
+        returns None, or the number of Bibles found.
+
+    if autoLoad is true and exactly one BCV Bible is found,
+        returns the BCVBible object (with all the books loaded if autoLoadBooks is also set).
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 2: print( "BCVBibleFileCheck( {}, {}, {} )".format( givenFolderName, strictCheck, autoLoad ) )
+    if BibleOrgSysGlobals.debugFlag: assert( givenFolderName and isinstance( givenFolderName, str ) )
+    if BibleOrgSysGlobals.debugFlag: assert( autoLoad in (True,False,) and autoLoadBooks in (True,False,) )
+
+    # Check that the given folder is readable
+    if not os.access( givenFolderName, os.R_OK ):
+        logging.critical( _("BCVBibleFileCheck: Given {!r} folder is unreadable").format( givenFolderName ) )
+        return False
+    if not os.path.isdir( givenFolderName ):
+        logging.critical( _("BCVBibleFileCheck: Given {!r} path is not a folder").format( givenFolderName ) )
+        return False
+
+    def isBCVFolder( folderName, filenames ):
+        """
+        Returns True if the metadata file is there (and looks right if we're being strict).
+        """
+        if METADATA_FILENAME not in filenames: return False
+        if strictCheck or BibleOrgSysGlobals.strictCheckingFlag:
+            firstLine = BibleOrgSysGlobals.peekIntoFile( METADATA_FILENAME, folderName )
+            if firstLine is None or not firstLine.startswith( 'BCVVersion' ):
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "BCVBibleFileCheck: (unexpected) first line was {!r} in {}".format( firstLine, folderName ) )
+                return False
+        return True
+    # end of isBCVFolder
+
+    # Find all the files and folders in this folder
+    if BibleOrgSysGlobals.verbosityLevel > 3: print( " BCVBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
+    foundFolders, foundFiles = [], []
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile: foundFiles.append( something )
+    if '__MACOSX' in foundFolders:
+        foundFolders.remove( '__MACOSX' )  # don't visit these directories
+
+    # See if there's a BCV Bible here in this given folder
+    if isBCVFolder( givenFolderName, foundFiles ):
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "BCVBibleFileCheck got", givenFolderName )
+        if autoLoad or autoLoadBooks:
+            uB = BCVBible( givenFolderName )
+            if autoLoadBooks: uB.load() # Load and process the files
+            return uB
+        return 1
+
+    # Look one level down
+    numFound = 0
+    foundProjects = []
+    for thisFolderName in sorted( foundFolders ):
+        tryFolderName = os.path.join( givenFolderName, thisFolderName+'/' )
+        if not os.access( tryFolderName, os.R_OK ): # The subfolder is not readable
+            logging.warning( _("BCVBibleFileCheck: {!r} subfolder is unreadable").format( tryFolderName ) )
+            continue
+        if BibleOrgSysGlobals.verbosityLevel > 3: print( "    BCVBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
+        foundSubfiles = []
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFile: foundSubfiles.append( something )
+
+        # See if there's a BCV Bible here in this folder
+        if isBCVFolder( tryFolderName, foundSubfiles ):
+            foundProjects.append( tryFolderName )
+            numFound += 1
+    if numFound:
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "BCVBibleFileCheck foundProjects", numFound, foundProjects )
+        if numFound == 1 and (autoLoad or autoLoadBooks):
+            uB = BCVBible( foundProjects[0] )
+            if autoLoadBooks: uB.load() # Load and process the files
+            return uB
+        return numFound
+# end of BCVBibleFileCheck
+
+
+
+def readMetadataFile( filepath ):
+    """
+    Reads a BCV metadata file consisting of "Name = value" lines.
+
+    The lists and dictionaries (e.g., BookList, CVList, CVContexts) are converted back to Python objects.
+
+    Returns a dictionary.
+    """
+    metadataDict = {}
+    with open( filepath, 'rt', encoding='utf-8' ) as metadataFile:
+        for line in metadataFile:
+            line = line.rstrip( '\n' )
+            if not line: continue
+            try: fieldName, fieldValue = line.split( ' = ', 1 )
+            except ValueError:
+                logging.error( t("readMetadataFile: Unexpected {!r} line in {}").format( line, filepath ) )
+                continue
+            if fieldName in LITERAL_METADATA_FIELDS: fieldValue = ast.literal_eval( fieldValue )
+            metadataDict[fieldName] = fieldValue
+    return metadataDict
+# end of readMetadataFile
+
+
+
+class BCVBible( Bible ):
+    """
+    Class for reading BCV Bible folders (as written by BibleWriter.toBOSBCV).
+
+    Usage is:
+        bcvB = BCVBible( sourceFolder ) # Only reads the metadata
+        bcvB.load() # Loads and indexes all the books
+    or
+        bcvB.loadLazily( maxLoadedBooks=None, maxCachedVerses=None )
+        result = bcvB.getContextVerseData( ('GEN','1','1') ) # Only reads this verse
+    """
+    def __init__( self, sourceFolder, givenName=None, encoding='utf-8' ):
+        """
+        Constructor: sets up the Bible object and reads the Bible metadata.
+        """
+         # Setup and initialise the base class first
+        Bible.__init__( self )
+        self.objectNameString = "BCV Bible object"
+        self.objectTypeString = "BCV"
+
+        # Now we can set our object variables
+        self.sourceFolder, self.givenName, self.encoding = sourceFolder, givenName, encoding
+        self.sourceFilepath = os.path.join( self.sourceFolder, METADATA_FILENAME )
+
+        self.bookMetadataDict = {} # Contains the book metadata dictionaries by BBB (read as needed)
+        self.bookObjectsForParsing = {} # Books (not saved in self.books) used for processing individual verses
+        self.maxCachedVerses, self.recentlyUsedVerses = DEFAULT_MAX_CACHED_VERSES, OrderedDict()
+        self.preload()
+    # end of BCVBible.__init__
+
+
+    def preload( self ):
+        """
+        Read the Bible metadata file (but none of the book files).
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("preload: Loading metadata from {}...").format( self.sourceFilepath ) )
+        self.metadataDict = readMetadataFile( self.sourceFilepath )
+        self.BCVVersion = self.metadataDict.get( 'BCVVersion' )
+        self.packedFlag = self.metadataDict.get( 'Packed' ) is True
+        self.availableBookList = self.metadataDict.get( 'BookList', [] )
+        self.projectName = self.metadataDict.get( 'ProjectName' )
+        self.abbreviation = self.metadataDict.get( 'Abbreviation' )
+        self.sourceType = self.metadataDict.get( 'SourceType' ) # The books are processed the same way as the original was
+        self.name = self.metadataDict.get( 'Name', self.givenName )
+        if not self.name: self.name = self.givenName if self.givenName else self.projectName
+    # end of BCVBible.preload
+
+
+    def getBookMetadata( self, BBB ):
+        """
+        Returns the metadata dictionary for the book
+            (reading the metadata file and the verse index (if packed) the first time).
+
+        Returns None if we don't have that book.
+        """
+        try: return self.bookMetadataDict[BBB]
+        except KeyError: pass
+        if BBB not in self.availableBookList: return None
+        bookFolderPath = os.path.join( self.sourceFolder, BBB+'/' )
+        bookMetadata = readMetadataFile( os.path.join( bookFolderPath, BBB+'_BookMetadata.txt' ) )
+        bookMetadata['CVSet'] = set( bookMetadata.get( 'CVList', [] ) )
+        if self.packedFlag:
+            verseIndex = {}
+            with open( os.path.join( bookFolderPath, BBB+'_VerseIndex.txt' ), 'rt', encoding='utf-8' ) as indexFile:
+                for line in indexFile:
+                    unitName, offset, length = line.rstrip( '\n' ).split( '\t' )
+                    verseIndex[unitName] = int( offset ), int( length )
+            bookMetadata['VerseIndex'] = verseIndex
+        self.bookMetadataDict[BBB] = bookMetadata
+        return bookMetadata
+    # end of BCVBible.getBookMetadata
+
+
+    def __readUnit( self, BBB, unitName ):
+        """
+        Returns the text for the unit (e.g., 'C0' for the introduction or 'C1V1' for a verse).
+
+        Raises a KeyError or FileNotFoundError if the unit doesn't exist.
+        """
+        bookFolderPath = os.path.join( self.sourceFolder, BBB+'/' )
+        if self.packedFlag:
+            offset, length = self.getBookMetadata( BBB )['VerseIndex'][unitName]
+            with open( os.path.join( bookFolderPath, BBB+'_Verses.txt' ), 'rb' ) as versesFile:
+                versesFile.seek( offset )
+                return versesFile.read( length ).decode( 'utf-8' )
+        with open( os.path.join( bookFolderPath, BBB+'_'+unitName+'.txt' ), 'rt', encoding=self.encoding ) as unitFile:
+            return unitFile.read()
+    # end of BCVBible.__readUnit
+
+
+    def __getUnitNames( self, BBB ):
+        """
+        Returns a list of all the unit names for the book in order.
+        """
+        bookMetadata = self.getBookMetadata( BBB )
+        if self.packedFlag: return list( bookMetadata['VerseIndex'] )
+        unitNames = ['C'+C+'V'+V for C,V in bookMetadata['CVList']]
+        if os.path.isfile( os.path.join( self.sourceFolder, BBB+'/', BBB+'_C0.txt' ) ): unitNames.insert( 0, 'C0' )
+        return unitNames
+    # end of BCVBible.__getUnitNames
+
+
+    def __makeBookObject( self, BBB ):
+        """
+        Returns a new (empty) book object.
+        """
+        bookObject = BibleBook( self, BBB )
+        bookObject.objectNameString = "BCV Bible Book object"
+        bookObject.objectTypeString = self.sourceType if self.sourceType else "BCV" # Affects processLineFix
+        bookObject.sourceFilepath = os.path.join( self.sourceFolder, BBB+'/' )
+        return bookObject
+    # end of BCVBible.__makeBookObject
+
+
+    def __makeEntries( self, bookObject, C, V, unitText ):
+        """
+        Converts the lines from a BCV verse file back into InternalBibleEntries
+            (using the book's processLineFix to separate out the notes again)
+            and appends them to a new InternalBibleEntryList.
+
+        Returns the InternalBibleEntryList.
+        """
+        entryList, fixErrors = InternalBibleEntryList(), []
+        bookObject._processedLines = entryList # processLineFix inserts the vp~ entries in here
+        for line in unitText.split( '\n' ):
+            if not line: continue
+            if line[0] != '\\':
+                logging.error( t("makeEntries: Unexpected {!r} line in {} {}:{}").format( line, bookObject.BBB, C, V ) )
+                continue
+            markers, hasText, text = line[1:].partition( '=' )
+            marker, hasOriginalMarker, originalMarker = markers.partition( '<<' )
+            if not hasOriginalMarker: originalMarker = { 'c#':'c', 'v~':'v' }.get( marker, marker )
+            if marker == 'c': C, V = text, '0' # Only used for error messages
+            elif marker == 'v': V = text
+            if marker == 'vp~': continue # processLineFix makes these again from the v~ text
+            if not hasOriginalMarker and (marker[0]=='¬' or (marker in BOS_ALL_ADDED_NESTING_MARKERS and not text)):
+                # It's one of the nesting markers that we add (see InternalBibleBook.addNestingMarkers)
+                entryList.append( InternalBibleEntry( marker, None, None, text, None, None ) )
+            elif text:
+                fixText = text
+                if marker == 'c~' and originalMarker == 'c': # The chapter number is still at the start of the original text
+                    fixText = text[len(text)-len(text.lstrip( '0123456789' )):]
+                adjText, cleanText, extras = bookObject.processLineFix( C, V, marker, fixText, fixErrors )
+                entryList.append( InternalBibleEntry( marker, originalMarker, adjText, cleanText, extras, text ) )
+            else: entryList.append( InternalBibleEntry( marker, originalMarker, '', '', None, '' ) )
+        return entryList
+    # end of BCVBible.__makeEntries
+
+
+    def loadBook( self, BBB ):
+        """
+        Load the requested book into self.books if it's not already loaded.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "BCVBible.loadBook( {} )".format( BBB ) )
+        if BBB in self.books: return # Already loaded
+        if BBB in self.triedLoadingBook:
+            logging.warning( "We had already tried loading BCV {} for {}".format( BBB, self.name ) )
+            return # We've already attempted to load this book
+        self.triedLoadingBook[BBB] = True
+        if BibleOrgSysGlobals.verbosityLevel > 2 or BibleOrgSysGlobals.debugFlag: print( _("  BCVBible: Loading {} from {} from {}...").format( BBB, self.name, self.sourceFolder ) )
+        if self.getBookMetadata( BBB ) is None: raise FileNotFoundError( "BCVBible.loadBook: No {} book in {}".format( BBB, self.sourceFolder ) )
+        thisBook = self.__makeBookObject( BBB )
+        processedLines = InternalBibleEntryList()
+        for unitName in self.__getUnitNames( BBB ):
+            C, V = unitName[1:].split( 'V' ) if 'V' in unitName else ('0','0')
+            for entry in self.__makeEntries( thisBook, C, V, self.__readUnit( BBB, unitName ) ):
+                processedLines.append( entry )
+        thisBook._processedLines = processedLines
+        del thisBook._rawLines # We never had any
+        thisBook._processedFlag = True
+        thisBook.makeIndex()
+        self.saveBook( thisBook )
+    # end of BCVBible.loadBook
+
+
+    def load( self ):
+        """
+        Load all the books.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( t("Loading {} from {}...").format( self.name, self.sourceFolder ) )
+        for BBB in self.availableBookList:
+            self.loadBook( BBB )
+        self.doPostLoadProcessing()
+    # end of BCVBible.load
+
+
+    def loadLazily( self, maxLoadedBooks=None, maxCachedVerses=None ):
+        """
+        Instead of loading all the books now,
+            each book is loaded (and indexed) when it's first needed,
+            i.e., by indexing this object with a BBB, or by iterating through the books.
+
+        But getContextVerseData only reads the requested verse (unless the book is already loaded)
+            and keeps up to maxCachedVerses of the most recently used verses in memory.
+
+        If maxLoadedBooks is given, the least recently used books are unloaded
+            so that no more than that number of books are kept in memory.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1:
+            print( t("Lazily loading {} books of {} from {}...").format( len(self.availableBookList), self.name, self.sourceFolder ) )
+        if BibleOrgSysGlobals.debugFlag:
+            assert( maxLoadedBooks is None or maxLoadedBooks > 0 )
+            assert( maxCachedVerses is None or maxCachedVerses > 0 )
+        self.maxLoadedBooks = maxLoadedBooks
+        if maxCachedVerses: self.maxCachedVerses = maxCachedVerses
+        self.lazyLoadingFlag = True
+    # end of BCVBible.loadLazily
+
+
+    def getContextVerseData( self, BCVReference ):
+        """
+        Search for a Bible reference
+            and return a 2-tuple containing
+                the Bible text (in a InternalBibleEntryList)
+                along with the context.
+
+        If we're loading lazily and the book isn't loaded,
+            only the file (or packed part) containing the verse is read.
+        Older (version 1.0) BCV exports don't have the contexts saved
+            so the whole book gets loaded for those.
+
+        Expects a SimpleVerseKey for the parameter
+            but also copes with a (B,C,V,S) tuple.
+
+        Returns None if there is no information for this book.
+        Raises a KeyError if there is no such CV reference.
+        """
+        if isinstance( BCVReference, tuple ): BBB, C, V = BCVReference[0], BCVReference[1], BCVReference[2]
+        else: # Assume it's a SimpleVerseKeyObject
+            BBB = BCVReference.getBBB()
+            C, V = BCVReference.getCV()
+        if not self.lazyLoadingFlag or BBB in self.books:
+            return Bible.getContextVerseData( self, BCVReference )
+
+        BCVKey = (BBB,C,V)
+        try:
+            result = self.recentlyUsedVerses[BCVKey]
+            self.recentlyUsedVerses.move_to_end( BCVKey )
+            return result
+        except KeyError: pass
+
+        bookMetadata = self.getBookMetadata( BBB )
+        if bookMetadata is None: return None # We don't have that book
+        if 'CVContexts' not in bookMetadata: # it's an old export so we have to process the whole book
+            return Bible.getContextVerseData( self, BCVReference )
+        CVContexts = bookMetadata['CVContexts']
+        context = CVContexts[(C,V)] # Gives a KeyError if there's no such verse
+
+        # Find which unit the verse is in
+        if C == '0': unitName = 'C0'
+        elif (C,V) in bookMetadata['CVSet']: unitName = 'C'+C+'V'+V
+        else: # The chapter one verse zero entries are saved with the following verse
+            for unitC,unitV in bookMetadata['CVList']:
+                if unitC == C: unitName = 'C'+C+'V'+unitV; break
+            else: raise KeyError( "BCVBible.getContextVerseData: Can't find {} {}:{}".format( BBB, C, V ) )
+
+        try: bookObject = self.bookObjectsForParsing[BBB]
+        except KeyError:
+            bookObject = self.bookObjectsForParsing[BBB] = self.__makeBookObject( BBB )
+        unitC, unitV = unitName[1:].split( 'V' ) if 'V' in unitName else ('0','0')
+        entries = self.__makeEntries( bookObject, unitC, unitV, self.__readUnit( BBB, unitName ) )
+
+        # The introduction and the first verse file can contain several index entries
+        if unitName == 'C0' or (entries and entries[0].getMarker() == 'c'):
+            unitIndex = InternalBibleIndex( self.name, BBB )
+            unitIndex.makeIndex( entries )
+            for CVKey in unitIndex:
+                if CVKey in CVContexts:
+                    self.__cacheVerse( (BBB,)+CVKey, (unitIndex.getEntries( CVKey ), CVContexts[CVKey]) )
+            result = unitIndex.getEntries( (C,V) ), context
+        else: result = entries, context
+        self.__cacheVerse( BCVKey, result )
+        return result
+    # end of BCVBible.getContextVerseData
+
+
+    def __cacheVerse( self, BCVKey, result ):
+        """
+        Saves the verse result, unloading the least recently used ones if there are too many.
+        """
+        self.recentlyUsedVerses[BCVKey] = result
+        self.recentlyUsedVerses.move_to_end( BCVKey )
+        while len(self.recentlyUsedVerses) > self.maxCachedVerses:
+            self.recentlyUsedVerses.popitem( last=False )
+    # end of BCVBible.__cacheVerse
+# end of class BCVBible
+
+
+
+def demo():
+    """
+    Export a test Bible as BCV (both loose and packed) and read some verses back.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    from USFMBible import USFMBible
+    testFolder = "Tests/DataFilesForTests/USFMAllMarkersProject/"
+    if os.access( testFolder, os.R_OK ):
+        UsfmB = USFMBible( testFolder, "WEB+" )
+        UsfmB.load()
+        for packedFlag in ( False, True ):
+            outputFolder = "OutputFiles/BOS_BCV_{}Export/".format( 'Packed' if packedFlag else '' )
+            UsfmB.toBOSBCV( outputFolder, packedFlag=packedFlag )
+
+            bcvB = BCVBible( outputFolder )
+            bcvB.loadLazily()
+            if BibleOrgSysGlobals.verbosityLevel > 0: print( bcvB )
+            for reference in ( ('MAT','0','3'), ('MAT','1','0'), ('MAT','1','1'), ('MAT','2','1'), ('PSA','3','0'), ('XYZ','1','1'), ):
+                result = bcvB.getContextVerseData( reference )
+                if BibleOrgSysGlobals.verbosityLevel > 0:
+                    print( reference, "(not there)" if result is None else "{} entries {}".format( len(result[0]), result[1] ) )
+                    if result is not None and BibleOrgSysGlobals.verbosityLevel > 1: print( result[0] )
+            if BibleOrgSysGlobals.verbosityLevel > 0: print( "  Loaded books: {}".format( list( bcvB.books ) ) )
+    elif BibleOrgSysGlobals.verbosityLevel > 0: print( "Sorry, test folder {!r} is not readable on this computer.".format( testFolder ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of BCVBible.py
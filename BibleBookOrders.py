@@ -28,7 +28,7 @@ Module handling BibleBookOrder systems.
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleBookOrders"
 ProgName = "Bible Book Order Systems handler"
 ProgVersion = '0.89'
@@ -101,7 +101,7 @@ class BibleBookOrderSystems:
             if picklesGood:
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     self.__DataDicts = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
                     self.__DataLists = pickle.load( pickleFile )
             else: # We have to load the XML (much slower)
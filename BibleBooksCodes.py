@@ -28,7 +28,7 @@ Module handling BibleBooksCodes functions.
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-20' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleBooksCodes"
 ProgName = "Bible Books Codes handler"
 ProgVersion = '0.78'
@@ -74,6 +74,7 @@ class BibleBooksCodes:
         Constructor:
         """
         self.__DataDicts = None # We'll import into this in loadData
+        self.__BBBPrefixDict = None # Made when first needed by getBBB
     # end of BibleBooksCodes.__init__
 
 
@@ -90,7 +91,7 @@ class BibleBooksCodes:
             and os.stat(standardPickleFilepath)[9] > os.stat(standardXMLFilepath)[9]: # There's a newer pickle file
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     self.__DataDicts = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
             else: # We have to load the XML (much slower)
                 from BibleBooksCodesConverter import BibleBooksCodesConverter
@@ -298,16 +299,14 @@ class BibleBooksCodes:
         if SomeUppercaseText in self.__DataDicts['allAbbreviationsDict']:
             return self.__DataDicts['allAbbreviationsDict'][SomeUppercaseText]
 
-        # Ok, let's try guessing
-        matchCount, foundBBB = 0, None
-        for BBB in self.__DataDicts['referenceAbbreviationDict']:
-            if BBB.startswith( SomeUppercaseText ):
-                #print( BBB, UCSomeText )
-                matchCount += 1
-                foundBBB = BBB
-        #print( matchCount, foundBBB )
-        if matchCount == 1: return foundBBB # it's non-ambiguous
-        #print( sorted(self.__DataDicts['allAbbreviationsDict']) )
+        # Ok, let's try guessing from the start of a BBB code
+        if self.__BBBPrefixDict is None: # Make a dictionary of every shortened BBB (with None if it's ambiguous)
+            self.__BBBPrefixDict = {}
+            for BBB in self.__DataDicts['referenceAbbreviationDict']:
+                for length in range( 1, len(BBB) ):
+                    prefix = BBB[:length]
+                    self.__BBBPrefixDict[prefix] = None if prefix in self.__BBBPrefixDict else BBB
+        return self.__BBBPrefixDict.get( SomeUppercaseText ) # Only returns a BBB if it's non-ambiguous
     # end of BibleBooksCodes.getBBB
 
 
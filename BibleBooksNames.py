@@ -28,7 +28,7 @@ Module handling BibleBooksNames.
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-05-03' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleBooksNames"
 ProgName = "Bible Books Names Systems handler"
 ProgVersion = '0.36'
@@ -199,6 +199,123 @@ def expandBibleNamesInputs ( systemName, divisionsNamesDict, booknameLeadersDict
 
 
 
+NAMES_INDEX_VERSION = 2 # Increment this if the contents of BibleBooksNamesIndex objects change
+
+
+class BibleBooksNamesIndex:
+    """
+    Class for finding the book code (BBB) for a book name or abbreviation from any of the books names systems.
+
+    Every UPPER CASE input field (also with the bookname leaders replaced, e.g., 1 with I or First,
+        and with the internal spaces removed) is put into one dictionary,
+        and every shortened form of those names is put into another,
+        so each lookup is just a dictionary access (taking time proportional to the length of the text).
+
+    Each entry holds the tuple of possible book codes (the ambiguity set)
+        and a tuple of (systemIndex, BBB) pairs in system order with the BBB that each system would give
+        (if the name or shortened name fits more than one book in a system, e.g., Phil for Philippians and Philemon,
+        that system gives the one which comes first in the standard BibleBooksCodes order,
+        but a book name as it was given beats one with the leader replaced or the spaces removed).
+
+    Usually you'll use this via BibleBooksNamesSystems().loadData().getBBB( bookNameOrAbbreviation )
+        which saves the index in the DerivedFiles folder the first time.
+    """
+    def __init__( self, dataDicts ):
+        """
+        Constructor: makes the index from the books names systems dictionaries.
+        """
+        self.indexVersion = NAMES_INDEX_VERSION
+        self.systemNames = list( dataDicts.keys() )
+        exactSets, prefixSets = {}, {}
+        for systemIndex, systemName in enumerate( self.systemNames ):
+            divisionsNamesDict, booknameLeadersDict, bookNamesDict = dataDicts[systemName]
+            UCLeaders = [(leader.upper(), [replacement.upper() for replacement in booknameLeadersDict[leader]]) for leader in booknameLeadersDict]
+            for BBB in bookNamesDict:
+                for field in bookNamesDict[BBB]['inputFields']:
+                    UCField = field.upper()
+                    UCFields = { UCField }
+                    for leader, replacements in UCLeaders: # Note that the leader here includes a trailing space
+                        if UCField.startswith( leader ):
+                            UCFields.update( replacement + UCField[len(leader):] for replacement in replacements )
+                    UCFields.update( [name.replace( ' ', '' ) for name in UCFields] )
+                    for name in UCFields:
+                        variantFlag = name != UCField # These lose to a name as it was given, e.g., ISAMUEL for Is
+                        for setsDict, key in [(exactSets,name)] + [(prefixSets,name[:length]) for length in range( 1, len(name) )]:
+                            if setsDict is prefixSets and (key.isdigit() or key[-1]==' '): continue # Same rules as expandAbbrevs (above)
+                            systemBBBs = setsDict.setdefault( key, {} ).setdefault( systemIndex, {} )
+                            systemBBBs[BBB] = min( systemBBBs.get( BBB, True ), variantFlag )
+        getReferenceNumber = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber
+        self.exactDict, self.prefixDict = {}, {}
+        for indexDict, setsDict in ( (self.exactDict,exactSets), (self.prefixDict,prefixSets) ):
+            for name, systemSets in setsDict.items():
+                BBBs = set().union( *systemSets.values() )
+                if name in exactSets and indexDict is self.prefixDict: continue # Only need the exact entry
+                indexDict[name] = tuple( sorted( BBBs ) ), \
+                        tuple( (systemIndex, min( BBBDict, key=lambda BBB: (BBBDict[BBB], getReferenceNumber( BBB )) ))
+                                                                    for systemIndex, BBBDict in sorted( systemSets.items() ) )
+    # end of BibleBooksNamesIndex.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the index object.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "BibleBooksNamesIndex object"
+        result += ('\n' if result else '') + "  " + _("{} names and {} shortened names from {} books names systems").format( len(self.exactDict), len(self.prefixDict), len(self.systemNames) )
+        result += ('\n' if result else '') + "  " + _("{} names are ambiguous").format( sum( 1 for BBBs, systemBBBs in self.exactDict.values() if len(BBBs)>1 ) )
+        return result
+    # end of BibleBooksNamesIndex.__str__
+
+
+    def __len__( self ):
+        """ Returns the number of names (not counting shortened names) in the index. """
+        return len( self.exactDict )
+    # end of BibleBooksNamesIndex.__len__
+
+
+    def getPossibleBBBs( self, bookNameOrAbbreviation ):
+        """
+        Returns a tuple of all the book codes that the given book name or abbreviation could refer to
+            (in any books names system) -- this is empty if nothing matches.
+        """
+        UCName = bookNameOrAbbreviation.upper()
+        entry = self.exactDict.get( UCName ) or self.prefixDict.get( UCName )
+        return entry[0] if entry else ()
+    # end of BibleBooksNamesIndex.getPossibleBBBs
+
+
+    def getBBB( self, bookNameOrAbbreviation, languagePriority=None ):
+        """
+        Returns the BBB for the given book name or abbreviation (or the unique start of one) or None.
+
+        Each books names system resolves the name by itself first
+            (taking the book which comes first in the standard order if it fits more than one of its books,
+            but preferring the names as given to those with the leaders replaced or the spaces removed).
+        If the books names systems still don't agree, the first system (in languagePriority order if it's given,
+            i.e., a list of ISO 639-3 language codes, otherwise in the order they were loaded)
+            that knows the name decides.
+        """
+        UCName = bookNameOrAbbreviation.upper()
+        entry = self.exactDict.get( UCName ) or self.prefixDict.get( UCName )
+        if entry is None: return None
+        BBBs, systemBBBs = entry
+        if len(BBBs) == 1: return BBBs[0]
+        if languagePriority:
+            def getRank( systemBBB ):
+                """ Returns a sort key to put the systems in the preferred language order. """
+                languageCode = self.systemNames[systemBBB[0]].split( '_', 1 )[0]
+                return languagePriority.index( languageCode ) if languageCode in languagePriority else len(languagePriority), systemBBB[0]
+            # end of getRank
+            return min( systemBBBs, key=getRank )[1]
+        return systemBBBs[0][1]
+    # end of BibleBooksNamesIndex.getBBB
+# end of BibleBooksNamesIndex class
+
+
+
 @singleton # Can only ever have one instance
 class BibleBooksNamesSystems:
     """
@@ -214,6 +331,7 @@ class BibleBooksNamesSystems:
         Constructor:
         """
         self.__DataDicts, self.__ExpandedDicts = None, None # We'll import into this in loadData
+        self.__NamesIndex = None # Made (or loaded) when first needed by getBBB
     # end of BibleBooksNamesSystems.__init__
 
     def loadData( self, XMLFolder=None ):
@@ -239,7 +357,7 @@ class BibleBooksNamesSystems:
             if picklesGood:
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     self.__DataDicts = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
                     #self.__ExpandedDicts = pickle.load( pickleFile )
             else: # We have to load the XML (much slower)
@@ -308,36 +426,61 @@ class BibleBooksNamesSystems:
     # end of BibleBooksNamesSystems.getAvailableLanguageCodes
 
 
-    def getBBB( self, bookNameOrAbbreviation ):
+    def getNamesIndex( self ):
         """
-        Get the referenceAbbreviation from the given book name or abbreviation.
+        Returns a BibleBooksNamesIndex object for looking up book names and abbreviations from all of the systems.
+
+        The index is only made once:
+            it's saved as a pickle file in the DerivedFiles folder and loaded from there next time
+            (unless the books names data has been changed since).
+        """
+        if self.__NamesIndex is None:
+            import pickle
+            dataFilepath = os.path.join( os.path.dirname(__file__), "DataFiles/" )
+            indexPickleFilepath = os.path.join( dataFilepath, "DerivedFiles", "BibleBooksNames_Index.pickle" )
+            if os.access( indexPickleFilepath, os.R_OK ):
+                pickle8, pickle9 = os.stat(indexPickleFilepath)[8:10]
+                picklesGood = True
+                standardXMLFolder = os.path.join( dataFilepath, "BookNames/" )
+                for filename in os.listdir( standardXMLFolder ):
+                    filepart, extension = os.path.splitext( filename )
+                    XMLfilepath = os.path.join( standardXMLFolder, filename )
+                    if extension.upper() == '.XML' and filepart.upper().startswith("BIBLEBOOKSNAMES_"):
+                      if pickle8 <= os.stat( XMLfilepath )[8] \
+                      or pickle9 <= os.stat( XMLfilepath )[9]: # The pickle file is older
+                        picklesGood = False; break
+                if picklesGood:
+                    if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( indexPickleFilepath ) )
+                    try:
+                        with open( indexPickleFilepath, 'rb') as pickleFile:
+                            self.__NamesIndex = pickle.load( pickleFile )
+                        if self.__NamesIndex.indexVersion != NAMES_INDEX_VERSION \
+                        or self.__NamesIndex.systemNames != list( self.__DataDicts.keys() ):
+                            self.__NamesIndex = None
+                    except (OSError, pickle.UnpicklingError, EOFError, AttributeError): self.__NamesIndex = None
+            if self.__NamesIndex is None: # We have to make the index from the books names data
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( _("Making books names index...") )
+                self.__NamesIndex = BibleBooksNamesIndex( self.__DataDicts )
+                try:
+                    with open( indexPickleFilepath, 'wb' ) as pickleFile:
+                        pickle.dump( self.__NamesIndex, pickleFile )
+                except OSError: logging.warning( _("Unable to save books names index to {}").format( indexPickleFilepath ) )
+        return self.__NamesIndex
+    # end of BibleBooksNamesSystems.getNamesIndex
+
+
+    def getBBB( self, bookNameOrAbbreviation, languagePriority=None ):
+        """
+        Get the referenceAbbreviation from the given book name or abbreviation
+            (or the unambiguous start of one).
                 (Automatically converts to upper case before comparing strings.)
 
-        Tries all the known Bible Books Names systems.
+        Tries all the known Bible Books Names systems (using the combined index).
+            If they don't agree, the first system that knows the name decides:
+                languagePriority is an optional list of ISO 639-3 language codes to try first.
         """
         if BibleOrgSysGlobals.debugFlag: assert( bookNameOrAbbreviation )
-        upperCaseBookNameOrAbbreviation = bookNameOrAbbreviation.upper()
-
-        for systemName in self.__DataDicts:
-            #print( '\n'+repr(systemName) )
-            #print( self.__DataDicts[systemName] )
-            #for j in range( 0, len(self.__DataDicts[systemName]) ):
-                #print( '\nHere1', j, self.__DataDicts[systemName][j] )
-            #for BBB in self.__DataDicts[systemName][2]:
-                #print( 'Here2', BBB, self.__DataDicts[systemName][2][BBB] )
-            divisionsNamesDict, booknameLeadersDict, bookNamesDict, sortedDivisionNamesDict, sortedBookNamesDict = self.getBooksNamesSystem( systemName )
-            #print( '\nHere3 '+systemName, sortedBookNamesDict )
-            if sortedBookNamesDict:
-                if upperCaseBookNameOrAbbreviation in sortedBookNamesDict:
-                    return sortedBookNamesDict[upperCaseBookNameOrAbbreviation]
-            else:
-                for BBB in self.__DataDicts[systemName][2]:
-                    for possibility in self.__DataDicts[systemName][2][BBB]['inputFields']:
-                        #print( possibility )
-                        if possibility.upper().startswith( upperCaseBookNameOrAbbreviation ):
-                            return BBB
-
-            if self.__ExpandedDicts: print( self.__ExpandedDicts[systemName] ); halt # nothing written here yet
+        return self.getNamesIndex().getBBB( bookNameOrAbbreviation, languagePriority )
     # end of BibleBooksNamesSystems.getBBB
 
 
@@ -496,6 +639,15 @@ class BibleBooksNamesSystem:
     # end of BibleBooksNamesSystem.getBBB
 
 
+    def getExpandedBookNamesDict( self ):
+        """
+        Returns the dictionary used by getBBB,
+            i.e., UPPER CASE book names and (including deduced) abbreviations with their referenceAbbreviations.
+        """
+        return self.__sortedBookNamesDict
+    # end of BibleBooksNamesSystem.getExpandedBookNamesDict
+
+
     def getDivisionAbbreviation( self, divisionNameOrAbbreviation ):
         """
         Get the division standardAbbreviation from the given division name or abbreviation.
@@ -550,8 +702,10 @@ def demo():
     print( "Available eng system names are:", bbnss.getAvailableBooksNamesSystemNames( 'eng' ) ) # Just get the ones for this language code
     print( "Available mbt system names are:", bbnss.getAvailableBooksNamesSystemNames( languageCode='mbt' ) )
     print( "Available language codes are:", bbnss.getAvailableLanguageCodes() )
-    for bookName in ( 'Genesis', 'Genèse', 'Gênesis', '1 John' ):
-        print( "From {!r} got {}".format( bookName, bbnss.getBBB( bookName ) ) )
+    for bookName in ( 'Genesis', 'Genèse', 'Gênesis', '1 John', 'II Sam', 'Jud', 'Ju' ):
+        print( "From {!r} got {} (possibilities are {})".format( bookName, bbnss.getBBB( bookName ), bbnss.getNamesIndex().getPossibleBBBs( bookName ) ) )
+    print( "From 'Iks' got {} but with English first got {}".format( bbnss.getBBB( 'Iks' ), bbnss.getBBB( 'Iks', languagePriority=['eng'] ) ) )
+    print( bbnss.getNamesIndex() ) # Just print a summary
 
     # Demo the BibleBooksNamesSystem object
     bbns1 = BibleBooksNamesSystem("eng_traditional") # Doesn't reload the XML unnecessarily :)
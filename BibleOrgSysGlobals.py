@@ -57,6 +57,8 @@ Contains functions:
 
     pickleObject( theObject, filename, folderName=None )
     unpickleObject( filename, folderName=None )
+    makeDerivedTablesBundle( folderPath=None )
+    openDerivedTablesFile( pickleFilepath )
 
     setup( ProgName, ProgVersion, loggingFolder=None )
 
@@ -70,11 +72,15 @@ Contains functions:
     closedown( ProgName, ProgVersion )
 
     demo()
+
+The global Bible data sets (BibleBooksCodes, USFMMarkers, USFMParagraphMarkers)
+    are only loaded the first time that they're used (see __getattr__ at the end of this module)
+    so that importing this module is quick.
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-30' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BOSGlobals"
 ProgName = "BibleOrgSys Globals"
 ProgVersion = '0.59'
@@ -84,8 +90,7 @@ ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), La
 debuggingThisModule = False
 
 
-import logging, os.path, pickle
-from optparse import OptionParser
+import logging, os.path, threading
 
 
 # Global variables
@@ -334,6 +339,33 @@ def removeAccents( someString ):
 # end of BibleOrgSysGlobals.makeSafeString
 
 
+##########################################################################################################
+#
+# List the contents of a folder
+
+folderListingCache = threading.local() # Its listings attribute can be set to a dict (by UnknownBible.search)
+                                        #   so that all the FileCheck functions running in that thread share one listing
+
+
+def scanFolder( folderPath ):
+    """
+    Returns a list of (name, isFolder, isFile) 3-tuples for the contents of the given folder.
+
+    Uses os.scandir so that the file types can usually be found without extra stat calls.
+    If folderListingCache.listings is set for this thread, previous listings of the same folder are reused.
+    """
+    folderListings = getattr( folderListingCache, 'listings', None )
+    if folderListings is not None and folderPath in folderListings:
+        return folderListings[folderPath]
+    folderEntries = []
+    with os.scandir( folderPath ) as scanner:
+        for dirEntry in scanner:
+            folderEntries.append( (dirEntry.name, dirEntry.is_dir(), dirEntry.is_file()) )
+    if folderListings is not None: folderListings[folderPath] = folderEntries
+    return folderEntries
+# end of BibleOrgSysGlobals.scanFolder
+
+
 ##########################################################################################################
 #
 # Peek at the first line(s) of a file
@@ -880,6 +912,7 @@ def pickleObject( theObject, filename, folderName=None, disassembleObjectFlag=Fa
                     pickleObject( a, f, folderName, disassembleObjectFlag=True )
             else: print( '  skip' )
 
+    import pickle
     with open( filepath, 'wb' ) as pickleOutputFile:
         pickle.dump( theObject, pickleOutputFile, pickle.HIGHEST_PROTOCOL )
 # end of BibleOrgSysGlobals.pickleObject
@@ -895,11 +928,100 @@ def unpickleObject( filename, folderName=None ):
     if folderName is None: folderName = DEFAULT_CACHE_FOLDER
     filepath = os.path.join( folderName, filename )
     if verbosityLevel > 2: print( _("Loading object from pickle file {}...").format( filepath ) )
+    import pickle
     with open( filepath, 'rb') as pickleInputFile:
         return pickle.load( pickleInputFile ) # The protocol version used is detected automatically, so we do not have to specify it
 # end of BibleOrgSysGlobals.unpickleObject
 
 
+
+##########################################################################################################
+#
+# Bundling the derived data tables into one file
+#
+
+TABLES_BUNDLE_FILENAME = 'BibleOrgSys_Tables.bundle'
+TABLES_BUNDLE_MAGIC = b'BOSTBLS\n'
+TABLES_BUNDLE_VERSION = 1 # Increment this if the layout of the bundle file changes
+derivedTablesBundles = {} # folderPath: (memory-mapped bundle file, dataStart, contentsDict) or None if there's no valid bundle
+derivedTablesBundlesLock = threading.Lock() # Held while opening a bundle (so that each one is only opened once)
+
+
+def makeDerivedTablesBundle( folderPath=None ):
+    """
+    Copies all of the *_Tables.pickle files in the folder (default is DataFiles/DerivedFiles)
+        into one bundle file which openDerivedTablesFile can memory-map
+        (rather than opening each pickle file separately).
+
+    The bundle file contains the magic bytes, the version number, and the length of the pickled contents dictionary,
+        then the contents dictionary (which gives the offset, length, and original size and modification time
+        of each pickle file), and then the pickle files themselves.
+
+    Returns the bundle filepath.
+    """
+    import pickle, struct
+    if folderPath is None: folderPath = os.path.join( os.path.dirname(__file__), "DataFiles", "DerivedFiles" )
+    contentsDict, dataList, offset = {}, [], 0
+    for filename in sorted( os.listdir( folderPath ) ):
+        if filename.endswith( '_Tables.pickle' ):
+            filepath = os.path.join( folderPath, filename )
+            with open( filepath, 'rb' ) as pickleFile: data = pickleFile.read()
+            fileStat = os.stat( filepath )
+            contentsDict[filename] = (offset, len(data), fileStat.st_size, fileStat.st_mtime_ns)
+            dataList.append( data ); offset += len(data)
+    contentsBytes = pickle.dumps( contentsDict, pickle.HIGHEST_PROTOCOL )
+    bundleFilepath = os.path.join( folderPath, TABLES_BUNDLE_FILENAME )
+    if verbosityLevel > 2: print( _("Saving {} tables to {}...").format( len(contentsDict), bundleFilepath ) )
+    with open( bundleFilepath, 'wb' ) as bundleFile:
+        bundleFile.write( TABLES_BUNDLE_MAGIC + struct.pack( '<II', TABLES_BUNDLE_VERSION, len(contentsBytes) ) + contentsBytes )
+        for data in dataList: bundleFile.write( data )
+    with derivedTablesBundlesLock:
+        derivedTablesBundles.pop( os.path.abspath( folderPath ), None ) # So we'll reopen it next time
+    return bundleFilepath
+# end of BibleOrgSysGlobals.makeDerivedTablesBundle
+
+
+def openDerivedTablesFile( pickleFilepath ):
+    """
+    Returns a binary file object for reading the given *_Tables.pickle file (e.g., with pickle.load).
+
+    If there's a bundle file (made by makeDerivedTablesBundle) in the same folder
+        which contains an up-to-date copy of the pickle file, the data comes from the memory-mapped bundle
+        otherwise the pickle file itself is opened.
+    So the bundle is only used after it's been made (e.g., with Apps/TimeBOSImport.py --makeBundle).
+    """
+    folderPath, filename = os.path.split( os.path.abspath( pickleFilepath ) )
+    with derivedTablesBundlesLock:
+        if folderPath not in derivedTablesBundles: # Try to open the bundle file once
+            derivedTablesBundles[folderPath] = None
+            bundleFilepath = os.path.join( folderPath, TABLES_BUNDLE_FILENAME )
+            if os.access( bundleFilepath, os.R_OK ):
+                import mmap, pickle, struct
+                try:
+                    with open( bundleFilepath, 'rb' ) as bundleFile:
+                        mappedFile = mmap.mmap( bundleFile.fileno(), 0, access=mmap.ACCESS_READ )
+                    headerLength = len(TABLES_BUNDLE_MAGIC) + 8
+                    magic, (version, contentsLength) = mappedFile[:len(TABLES_BUNDLE_MAGIC)], struct.unpack( '<II', mappedFile[len(TABLES_BUNDLE_MAGIC):headerLength] )
+                    if magic == TABLES_BUNDLE_MAGIC and version == TABLES_BUNDLE_VERSION:
+                        contentsDict = pickle.loads( mappedFile[headerLength:headerLength+contentsLength] )
+                        derivedTablesBundles[folderPath] = mappedFile, headerLength+contentsLength, contentsDict
+                    else: logging.warning( _("Ignoring out-of-date tables bundle {}").format( bundleFilepath ) )
+                except (OSError, ValueError, struct.error, pickle.UnpicklingError, EOFError):
+                    logging.warning( _("Unable to read tables bundle {}").format( bundleFilepath ) )
+        bundle = derivedTablesBundles[folderPath]
+
+    if bundle is not None:
+        mappedFile, dataStart, contentsDict = bundle
+        if filename in contentsDict:
+            offset, length, fileSize, fileModifiedTime = contentsDict[filename]
+            fileStat = os.stat( pickleFilepath )
+            if fileStat.st_size == fileSize and fileStat.st_mtime_ns == fileModifiedTime: # The bundled copy is still current
+                import io
+                return io.BytesIO( mappedFile[dataStart+offset:dataStart+offset+length] )
+    return open( pickleFilepath, 'rb' )
+# end of BibleOrgSysGlobals.openDerivedTablesFile
+
+
 ##########################################################################################################
 #
 # Default program setup routine
@@ -925,6 +1047,7 @@ def setup( ProgName, ProgVersion, loggingFolderPath=None ):
         print( "  See the license in file 'gpl-3.0.txt' for more details.\n" )
 
     # Handle command line parameters
+    from optparse import OptionParser
     parser = OptionParser( version="v{}".format( ProgVersion ) )
     return parser
 # end of BibleOrgSysGlobals.setup
@@ -1092,24 +1215,45 @@ def demo():
 # end of BibleOrgSysGlobals.demo
 
 
+globalDataSetsLock = threading.RLock() # Reentrant because loading one data set can use another one
+
+def __getattr__( name ):
+    """
+    Loads the global Bible data sets the first time that they're used
+        (then they become normal module variables so this isn't called again).
+
+    The lock stops two threads from both loading the same data set at the same time.
+    """
+    global BibleBooksCodes, USFMMarkers, USFMParagraphMarkers
+    if name not in ( 'BibleBooksCodes', 'USFMMarkers', 'USFMParagraphMarkers', ):
+        raise AttributeError( "module {!r} has no attribute {!r}".format( __name__, name ) )
+    with globalDataSetsLock:
+        if name in globals(): return globals()[name] # Another thread loaded it while we were waiting
+        if name == 'BibleBooksCodes':
+            from BibleBooksCodes import BibleBooksCodes as BibleBooksCodesClass
+            BibleBooksCodes = BibleBooksCodesClass().loadData()
+            return BibleBooksCodes
+        if name == 'USFMMarkers':
+            from USFMMarkers import USFMMarkers as USFMMarkersClass
+            USFMMarkers = USFMMarkersClass().loadData()
+            return USFMMarkers
+        # else must be USFMParagraphMarkers
+        USFMParagraphMarkers = __getattr__( 'USFMMarkers' ).getNewlineMarkersList( 'CanonicalText' )
+        #print( len(USFMParagraphMarkers), sorted(USFMParagraphMarkers) )
+        #for marker in ( ):
+            #print( marker )
+            #USFMParagraphMarkers.remove( marker )
+        # was 30 ['cls', 'li1', 'li2', 'li3', 'li4', 'm', 'mi', 'p', 'pc', 'ph1', 'ph2', 'ph3', 'ph4',
+        #    'pi1', 'pi2', 'pi3', 'pi4', 'pm', 'pmc', 'pmo', 'pmr', 'pr', 'q1', 'q2', 'q3', 'q4',
+        #    'qm1', 'qm2', 'qm3', 'qm4']
+        # now 34 ['cls', 'li1', 'li2', 'li3', 'li4', 'm', 'mi', 'nb', 'p', 'pc', 'ph1', 'ph2', 'ph3', 'ph4',
+        #    'pi1', 'pi2', 'pi3', 'pi4', 'pm', 'pmc', 'pmo', 'pmr', 'pr', 'q1', 'q2', 'q3', 'q4', 'qa', 'qc',
+        #    'qm1', 'qm2', 'qm3', 'qm4', 'qr']
+        return USFMParagraphMarkers
+# end of BibleOrgSysGlobals.__getattr__
+
+
 setVerbosity( verbosityString )
-if __name__ != '__main__': # Load global Bible data sets
-    from BibleBooksCodes import BibleBooksCodes
-    BibleBooksCodes = BibleBooksCodes().loadData()
-    from USFMMarkers import USFMMarkers
-    USFMMarkers = USFMMarkers().loadData()
-    USFMParagraphMarkers = USFMMarkers.getNewlineMarkersList( 'CanonicalText' )
-    #print( len(USFMParagraphMarkers), sorted(USFMParagraphMarkers) )
-    #for marker in ( ):
-        #print( marker )
-        #USFMParagraphMarkers.remove( marker )
-    # was 30 ['cls', 'li1', 'li2', 'li3', 'li4', 'm', 'mi', 'p', 'pc', 'ph1', 'ph2', 'ph3', 'ph4',
-    #    'pi1', 'pi2', 'pi3', 'pi4', 'pm', 'pmc', 'pmo', 'pmr', 'pr', 'q1', 'q2', 'q3', 'q4',
-    #    'qm1', 'qm2', 'qm3', 'qm4']
-    # now 34 ['cls', 'li1', 'li2', 'li3', 'li4', 'm', 'mi', 'nb', 'p', 'pc', 'ph1', 'ph2', 'ph3', 'ph4',
-    #    'pi1', 'pi2', 'pi3', 'pi4', 'pm', 'pmc', 'pmo', 'pmr', 'pr', 'q1', 'q2', 'q3', 'q4', 'qa', 'qc',
-    #    'qm1', 'qm2', 'qm3', 'qm4', 'qr']
-    #print( len(USFMParagraphMarkers), sorted(USFMParagraphMarkers) ); halt
 
 if __name__ == '__main__':
     import multiprocessing
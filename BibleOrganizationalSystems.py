@@ -28,7 +28,7 @@ Module handling BibleOrganizationalSystems.
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleOrganizationalSystems"
 ProgName = "Bible Organization Systems handler"
 ProgVersion = '0.31'
@@ -39,7 +39,8 @@ debuggingThisModule = False
 
 
 import logging, os
-from collections import OrderedDict
+from array import array
+from bisect import bisect_right
 #from singleton import singleton
 
 import BibleOrgSysGlobals
@@ -96,7 +97,7 @@ class BibleOrganizationalSystems:
             and os.stat(standardPickleFilepath)[9] > os.stat(standardXMLFilepath)[9]: # There's a newer pickle file
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     result = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
             else: # We have to load the XML (much slower)
                 from BibleOrganizationalSystemsConverter import BibleOrganizationalSystemsConverter
@@ -276,6 +277,7 @@ class BibleOrganizationalSystem( BibleBookOrderSystem, BibleVersificationSystem,
 
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading {!r} system".format( systemName ) )
         assert( systemName and isinstance( systemName, str ) )
+        self.__absoluteChapterStarts = None # Absolute verse number tables are only made if needed
         self.__boss = BibleOrganizationalSystems().loadData() # Doesn't reload the XML unnecessarily :)
         result = self.__boss.getOrganizationalSystem( systemName )
         if result is None:
@@ -465,21 +467,32 @@ class BibleOrganizationalSystem( BibleBookOrderSystem, BibleVersificationSystem,
     # end of BibleOrganizationalSystem.isValidBCVRef
 
 
-    __absoluteVerseDict = OrderedDict()
-    def __makeAbsoluteVerseList( self ):
+    def __makeAbsoluteVerseTables( self ):
         """
-        Make up a list of four-tuples containing
-            BBB, chapterNumber, firstVerseNumber, lastVerseNumber
+        Make up the tables (for this versification system) used to convert
+            to and from absolute verse numbers:
+                a sorted array of the absolute verse number of the first verse of each chapter
+                    (plus one extra entry for the verse after the last one),
+                lists of the BBB and the chapter number string for each of those chapters,
+                and a dictionary pointing each BBB to a 2-tuple
+                    containing the array index of its first chapter and its number of chapters.
         """
+        chapterStarts, chapterBBBs, chapterStrings = array( 'L' ), [], []
+        bookIndexDict = {}
         accumulatedCount = 0
         for BBB in self.getBookList():
-            #print( BBB, BibleVersificationSystem.getNumVersesList( self, BBB ) )
-            for j,numVerses in enumerate( BibleVersificationSystem.getNumVersesList( self, BBB ) ):
-                #print( BBB, j, numVerses )
-                BibleOrganizationalSystem.__absoluteVerseDict[(BBB,j+1)] = (accumulatedCount+1,accumulatedCount+numVerses)
+            numVersesList = BibleVersificationSystem.getNumVersesList( self, BBB )
+            bookIndexDict[BBB] = ( len(chapterStarts), len(numVersesList) )
+            for j,numVerses in enumerate( numVersesList ):
+                chapterStarts.append( accumulatedCount + 1 )
+                chapterBBBs.append( BBB )
+                chapterStrings.append( str(j+1) )
                 accumulatedCount += numVerses
-        #print( BibleOrganizationalSystem.__absoluteVerseDict )
-    # end of BibleOrganizationalSystem.__makeAbsoluteVerseList
+        chapterStarts.append( accumulatedCount + 1 ) # So that we can always find the end of a chapter
+        self.__absoluteChapterBBBs, self.__absoluteChapterStrings = chapterBBBs, chapterStrings
+        self.__absoluteBookIndexDict, self.__absoluteVerseCount = bookIndexDict, accumulatedCount
+        self.__absoluteChapterStarts = chapterStarts
+    # end of BibleOrganizationalSystem.__makeAbsoluteVerseTables
 
 
     def getAbsoluteVerseNumber( self, BBB, C, V ):
@@ -489,12 +502,15 @@ class BibleOrganizationalSystem( BibleBookOrderSystem, BibleVersificationSystem,
 
         Returns an integer in the range 1..31,102 (for KJV).
 
-        Returns None for invalid or missing values.
+        Returns None for invalid or missing verse numbers.
+        Raises a KeyError for an invalid book or chapter number.
         """
         C, V = int(C), int(V)
-        if not BibleOrganizationalSystem.__absoluteVerseDict: self.__makeAbsoluteVerseList()
-        rangeStart, rangeEnd = BibleOrganizationalSystem.__absoluteVerseDict[ (BBB,C) ]
-        if 1 <= V <= rangeEnd-rangeStart+1:
+        if self.__absoluteChapterStarts is None: self.__makeAbsoluteVerseTables()
+        firstIndex, numChapters = self.__absoluteBookIndexDict[BBB]
+        if not 1 <= C <= numChapters: raise KeyError( (BBB,C) )
+        rangeStart = self.__absoluteChapterStarts[firstIndex+C-1]
+        if 1 <= V < self.__absoluteChapterStarts[firstIndex+C] - rangeStart + 1:
             return rangeStart + V - 1
     # end of BibleOrganizationalSystem.getAbsoluteVerseNumber
 
@@ -509,12 +525,53 @@ class BibleOrganizationalSystem( BibleBookOrderSystem, BibleVersificationSystem,
         Returns None for invalid or missing values.
         """
         if BibleOrgSysGlobals.debugFlag: assert( 1 <= avNumber <= 99999 )
-        if not BibleOrganizationalSystem.__absoluteVerseDict: self.__makeAbsoluteVerseList()
-        for (BBB,C),(rangeStart, rangeEnd) in BibleOrganizationalSystem.__absoluteVerseDict.items():
-            #print( BBB, C, rangeStart, rangeEnd )
-            if rangeStart <= avNumber <= rangeEnd:
-                return BBB, str(C), str(avNumber - rangeStart + 1)
+        if self.__absoluteChapterStarts is None: self.__makeAbsoluteVerseTables()
+        if 1 <= avNumber <= self.__absoluteVerseCount:
+            ix = bisect_right( self.__absoluteChapterStarts, avNumber ) - 1
+            return self.__absoluteChapterBBBs[ix], self.__absoluteChapterStrings[ix], str(avNumber - self.__absoluteChapterStarts[ix] + 1)
     # end of BibleOrganizationalSystem.convertAbsoluteVerseNumber
+
+
+    def getAbsoluteVerseNumbers( self, BCVList ):
+        """
+        Convert a list (or other iterable) of (BBB,C,V) references (in this versification system)
+            to a list of absolute verse numbers.
+
+        The individual results are the same as for getAbsoluteVerseNumber,
+            i.e., None for an invalid verse number, and a KeyError for an invalid book or chapter.
+        """
+        if self.__absoluteChapterStarts is None: self.__makeAbsoluteVerseTables()
+        chapterStarts, bookIndexDict = self.__absoluteChapterStarts, self.__absoluteBookIndexDict
+        results = []
+        for BBB, C, V in BCVList:
+            C, V = int(C), int(V)
+            firstIndex, numChapters = bookIndexDict[BBB]
+            if not 1 <= C <= numChapters: raise KeyError( (BBB,C) )
+            ix = firstIndex + C - 1
+            rangeStart = chapterStarts[ix]
+            results.append( rangeStart + V - 1 if 1 <= V < chapterStarts[ix+1] - rangeStart + 1 else None )
+        return results
+    # end of BibleOrganizationalSystem.getAbsoluteVerseNumbers
+
+
+    def convertAbsoluteVerseNumbers( self, avNumbers ):
+        """
+        Convert a list (or array or other iterable) of absolute verse numbers (in this versification system)
+            to a list of (BBB,C,V) 3-tuples.
+
+        Invalid absolute verse numbers give None in the results list.
+        """
+        if self.__absoluteChapterStarts is None: self.__makeAbsoluteVerseTables()
+        chapterStarts, chapterBBBs, chapterStrings = self.__absoluteChapterStarts, self.__absoluteChapterBBBs, self.__absoluteChapterStrings
+        lastVerseNumber = self.__absoluteVerseCount
+        results = []
+        for avNumber in avNumbers:
+            if 1 <= avNumber <= lastVerseNumber:
+                ix = bisect_right( chapterStarts, avNumber ) - 1
+                results.append( (chapterBBBs[ix], chapterStrings[ix], str(avNumber - chapterStarts[ix] + 1)) )
+            else: results.append( None )
+        return results
+    # end of BibleOrganizationalSystem.convertAbsoluteVerseNumbers
 # end of BibleOrganizationalSystem class
 
 
@@ -555,6 +612,7 @@ def demo():
         print()
         for myNum in ( 0, 1, 2, 3, 123, 23145, 23146, 31101, 31102, 31103 ):
             print( ' ', myNum, '->', bos.convertAbsoluteVerseNumber( myNum ) )
+        print( "  Batch:", bos.convertAbsoluteVerseNumbers( range( 1, 32 ) )[-2:], bos.getAbsoluteVerseNumbers( [('GEN','1','31'), ('GEN','2','1')] ) )
 # end of demo
 
 if __name__ == '__main__':
@@ -76,7 +76,7 @@ class BiblePunctuationSystems:
             if picklesGood:
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     self.__DataDict = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
             else: # We have to load the XML (much slower)
                 from BiblePunctuationSystemsConverter import BiblePunctuationSystemsConverter
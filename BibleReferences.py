@@ -78,11 +78,14 @@ Technical note: Our Bible reference parsers use state machines rather than regul
     Although this is longer and harder to debug, I believe it's able to give more informative error messages.
     Also, I think it's easier to make it more generic/international this way.
     If I'm wrong, please show me.
+    (BibleReferenceList.parseReferenceString does try a regular expression first
+        but only accepts the result if the string is so well-formed that the state machine
+        wouldn't have anything to say about it. It also remembers recent results without any errors or warnings.)
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleReferences"
 ProgName = "Bible References handler"
 ProgVersion = '0.32'
@@ -92,15 +95,52 @@ ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), La
 debuggingThisModule = False
 
 
-import os, logging
+import os, logging, re, threading
+from collections import OrderedDict
 
 import BibleOrgSysGlobals
 from BibleOrganizationalSystems import BibleOrganizationalSystem
+from BibleBookOrders import BibleBookOrderSystem
 
 
 # This is a hack because it's language dependant :-(
 ignoredSuffixes = (' (LXX)',) # A hack to cope with these suffixes in cross-references and footnotes :(
 
+MAX_CACHED_REFERENCE_STRINGS = 10000 # The number of BibleReferenceList.parseReferenceString results to remember
+parsedReferenceStringsCache = OrderedDict() # (referenceString, organisational system name): referenceTuple (only for clean parses)
+parsedReferenceStringsCacheLock = threading.Lock() # Held while using parsedReferenceStringsCache
+fastParsePatterns = {} # organisational system name: compiled regular expression (or None)
+
+
+
+def makeFastParsePattern( punctuationDict ):
+    """
+    Makes a regular expression which splits a well-formed reference string into tokens:
+        a book name or abbreviation (with any punctuation and the following space), C:VS, VS,
+        a verse separator, a chapter/book separator (with an optional space), or a bridge character.
+
+    Returns None if the punctuation system isn't one that
+        BibleReferenceList.parseReferenceString knows how to handle without the state machine.
+    """
+    try:
+        PABA, suffixes = punctuationDict.get( 'punctuationAfterBookAbbreviation', '' ), punctuationDict['allowedVerseSuffixes']
+        if ' ' not in punctuationDict['bookChapterSeparator'] or punctuationDict['spaceAllowedAfterBCS'] != 'E' \
+        or len(punctuationDict['chapterSeparator']) != 1 or punctuationDict['chapterSeparator'] != punctuationDict['bookSeparator'] \
+        or set( PABA ) & set( punctuationDict['chapterVerseSeparator'] ):
+            return None
+        suffixPattern = '[{}]?'.format( re.escape( suffixes ) ) if suffixes else ''
+        pattern = r'(?P<book>(?:[0-9] ?)?[^\W\d_]+(?: [^\W\d_]+)*){} ' \
+                    r'|(?P<C>[0-9]+)[{}](?P<V>[0-9]+)(?P<S>{})' \
+                    r'|(?P<V2>[0-9]+)(?P<S2>{})' \
+                    r'|(?P<verseSeparator>[{}])|(?P<chapterSeparator>{} ?)|(?P<bridge>[{}])' \
+            .format( '(?P<punct>[{}])?'.format( re.escape( PABA ) ) if PABA else '(?P<punct>)',
+                    re.escape( punctuationDict['chapterVerseSeparator'] ), suffixPattern, suffixPattern,
+                    re.escape( punctuationDict['verseSeparator'] ), re.escape( punctuationDict['chapterSeparator'] ),
+                    re.escape( punctuationDict['verseBridgeCharacter'] + punctuationDict['chapterBridgeCharacter'] ) )
+    except (KeyError, TypeError): return None
+    return re.compile( pattern )
+# end of makeFastParsePattern
+
 
 
 class BibleReferenceBase:
@@ -659,6 +699,14 @@ class BibleReferenceList( BibleReferenceBase ):
         self.objectNameString = "Bible reference list object"
         self.objectTypeString = "BibleReferenceList"
         self.referenceList = []
+
+        # Set up the fast path and cache for parseReferenceString (only if we're not using a Bible object for book names)
+        self.__cacheName = self.__fastParsePattern = None
+        if self.getBBB == BOSObject.getBBB:
+            self.__cacheName = BOSObject.getOrganizationalSystemName()
+            if self.__cacheName not in fastParsePatterns:
+                fastParsePatterns[self.__cacheName] = makeFastParsePattern( self.punctuationDict )
+            self.__fastParsePattern = fastParsePatterns[self.__cacheName]
     # end of BibleReferenceList.__init__
 
     def __str__( self ):
@@ -703,6 +751,170 @@ class BibleReferenceList( BibleReferenceBase ):
     # end of BibleReferenceList.makeReferenceString
 
     def parseReferenceString( self, referenceString, location=None ):
+        """
+        Returns a tuple with True/False result, haveWarnings, list of (BBB, C, V, S) tuples.
+            A range is expressed as a tuple containing a pair of (BBB, C, V, S) tuples.
+
+        Well-formed strings are parsed with a precompiled regular expression (see __parseQuickly)
+            and anything else is handled by parseReferenceStringWithStateMachine
+            (which gives precise error and warning messages).
+        Recent results without any errors or warnings are remembered
+            (strings with problems are always parsed again so the messages are given with the new location).
+        """
+        if self.__cacheName is None: # We're using a Bible object for the book names so can't share results
+            return self.parseReferenceStringWithStateMachine( referenceString, location )
+        cacheKey = (referenceString, self.__cacheName)
+        with parsedReferenceStringsCacheLock:
+            referenceTuple = parsedReferenceStringsCache.get( cacheKey )
+            if referenceTuple is not None: parsedReferenceStringsCache.move_to_end( cacheKey )
+        if referenceTuple is not None:
+            self.referenceList = list( referenceTuple )
+            return True, False, self.referenceList
+
+        referenceList = self.__parseQuickly( referenceString )
+        if referenceList is not None:
+            self.referenceList = referenceList
+            result = True, False, self.referenceList
+        else: result = self.parseReferenceStringWithStateMachine( referenceString, location )
+        if result[0] and not result[1]: # Only remember clean results (because the others log messages)
+            with parsedReferenceStringsCacheLock:
+                parsedReferenceStringsCache[cacheKey] = tuple( result[2] )
+                while len(parsedReferenceStringsCache) > MAX_CACHED_REFERENCE_STRINGS:
+                    parsedReferenceStringsCache.popitem( last=False )
+        return result
+    # end of BibleReferenceList.parseReferenceString
+
+
+    def parseReferenceStrings( self, referenceStrings, location=None ):
+        """
+        Parses a list of reference strings.
+
+        Returns a list of the results from parseReferenceString.
+        """
+        return [self.parseReferenceString( referenceString, location ) for referenceString in referenceStrings]
+    # end of BibleReferenceList.parseReferenceStrings
+
+
+    def __parseQuickly( self, referenceString ):
+        """
+        Tries to parse a well-formed reference string using the precompiled regular expression.
+
+        Only handles book names (from the book names system) followed by lists of C:VS references,
+            verse ranges and chapter ranges, e.g., 'Mat. 7:3-5,7b; 8:1-9:2; Jude 7'.
+
+        Returns the reference list if the state machine would parse the string
+            without any errors or warnings (so the results are exactly the same)
+            or None if the state machine needs to do it.
+        """
+        if self.__fastParsePattern is None: return None
+        if referenceString != referenceString.strip() or any( value in referenceString for value in ignoredSuffixes ):
+            return None
+        BOS, punctuationDict = self._BibleOrganizationalSystem, self.punctuationDict
+        bookNamesDict = BOS.getExpandedBookNamesDict()
+
+        def getBookCode( name, punctuation, firstBook ):
+            """
+            Returns the BBB for the book name (as the state machine would find it without complaining) or None.
+
+            The state machine tries each part of a name as it gets to each space,
+                and after the first book, it also drops the spaces.
+            """
+            joiner = ' ' if firstBook else ''
+            nameParts = name.split( ' ' )
+            for j in range( 1, len(nameParts) ):
+                if joiner.join( nameParts[:j] ).upper() in bookNamesDict: return None
+            name = joiner.join( nameParts )
+            BBB = bookNamesDict.get( name.upper() )
+            if BBB is None or not BibleBookOrderSystem.containsBook( BOS, BBB ): return None
+            if punctuation and punctuation not in punctuationDict['bookChapterSeparator'] \
+            and self.getBookNameFunction( BBB ) == name: return None # They used punctuation after the full book name
+            return BBB
+        # end of getBookCode
+
+        def isValid( referenceTuple ):
+            """ Same as BOS.isValidBCVRef but without any error messages. """
+            BBB, C, V, S = referenceTuple
+            try: return 0 < int(V) <= BOS.getNumVerses( BBB, C ) and not BOS.isOmittedVerse( referenceTuple )
+            except (KeyError, ValueError, AttributeError): return False # AttributeError if there's no versification data
+        # end of isValid
+
+        def getRangeKind( bridgeCharacter, afterSingleChapterVerse ):
+            """ Returns which kind of range end the state machine would expect after this bridge character. """
+            if afterSingleChapterVerse:
+                return 'V' if bridgeCharacter in punctuationDict['verseBridgeCharacter'] else None
+            if bridgeCharacter in punctuationDict['bookBridgeCharacter']:
+                if bridgeCharacter in punctuationDict['chapterBridgeCharacter'] or bridgeCharacter in punctuationDict['verseBridgeCharacter']:
+                    return 'CV'
+                return None
+            if bridgeCharacter in punctuationDict['chapterBridgeCharacter']:
+                return 'CV' if bridgeCharacter in punctuationDict['verseBridgeCharacter'] else 'C'
+            return 'V'
+        # end of getRangeKind
+
+        referenceList, totalVerseList = [], []
+        status, firstBook, BBB, C, pendingReference = 'book', True, None, None, None
+        position, length = 0, len( referenceString )
+        while position < length:
+            match = self.__fastParsePattern.match( referenceString, position )
+            if not match: return None
+            position = match.end()
+            name, punctuation, newC, V, S, V2, S2, verseSeparator, chapterSeparator, bridge = \
+                match.group( 'book', 'punct', 'C', 'V', 'S', 'V2', 'S2', 'verseSeparator', 'chapterSeparator', 'bridge' )
+
+            if status=='book' or (status=='bookOrChapter' and name): # Getting a book name
+                if not name: return None
+                BBB = getBookCode( name, punctuation, firstBook )
+                if BBB is None: return None
+                status, firstBook = 'chapter', False
+            elif status in ('chapter','bookOrChapter'): # Getting C:VS (or just V for a single chapter book)
+                if newC: C, pendingReference, status = newC, (BBB, newC, V, S), 'afterVerse'
+                elif V2 and not S2 and status=='chapter' and BOS.isSingleChapterBook( BBB ): # e.g., Jude 7
+                    C, pendingReference, status = '1', (BBB, '1', V2, ''), 'afterSingleChapterVerse'
+                else: return None
+            elif status == 'verse': # Getting VS after a verse separator
+                if not V2: return None
+                pendingReference, status = (BBB, C, V2, S2), 'afterVerse'
+            elif status in ('afterVerse','afterSingleChapterVerse','afterRange'):
+                if bridge: # The pending reference is actually the start of a range
+                    if status=='afterRange' or pendingReference[3]: return None
+                    rangeKind = getRangeKind( bridge, status=='afterSingleChapterVerse' )
+                    if rangeKind is None: return None
+                    startReference, pendingReference, status = pendingReference, None, 'rangeEnd'
+                    continue
+                if pendingReference is not None:
+                    if not isValid( pendingReference ) or pendingReference in referenceList: return None
+                    referenceList.append( pendingReference ); totalVerseList.append( pendingReference )
+                    if chapterSeparator and pendingReference[3]: return None # The state machine would carry the suffix on
+                    pendingReference = None
+                if verseSeparator: status = 'verse'
+                elif chapterSeparator and status!='afterSingleChapterVerse': status = 'bookOrChapter'
+                else: return None
+            elif status == 'rangeEnd': # Getting the end of a chapter or verse range
+                if V2 and not S2 and rangeKind in ('V','CV'): finishReference = (BBB, C, V2, '')
+                elif newC and not S and rangeKind in ('C','CV'):
+                    C = newC
+                    finishReference = (BBB, C, V, '')
+                else: return None
+                if not isValid( startReference ) or not isValid( finishReference ) \
+                or (int(startReference[1]),int(startReference[2])) >= (int(C),int(finishReference[2])):
+                    return None
+                rangeTuple = (startReference, finishReference)
+                if rangeTuple in referenceList: return None
+                verseList = BOS.expandCVRange( startReference, finishReference, referenceString, BOS )
+                if verseList is None: return None
+                referenceList.append( rangeTuple ); totalVerseList.extend( verseList )
+                status = 'afterRange'
+
+        if status not in ('afterVerse','afterSingleChapterVerse','afterRange'): return None
+        if pendingReference is not None: # Save the final single verse
+            if not isValid( pendingReference ) or pendingReference in referenceList: return None
+            referenceList.append( pendingReference ); totalVerseList.append( pendingReference )
+        if len( set( totalVerseList ) ) < len( totalVerseList ): return None # Let the state machine warn about the overlap
+        return referenceList
+    # end of BibleReferenceList.__parseQuickly
+
+
+    def parseReferenceStringWithStateMachine( self, referenceString, location=None ):
         """
         A complex state machine that
         returns a tuple with True/False result, haveWarnings, list of (BBB, C, V, S) tuples.
@@ -1225,7 +1437,7 @@ class BibleReferenceList( BibleReferenceBase ):
                     logging.warning( _("Have duplicate or overlapping range at {} in Bible references {!r}").format( self.makeReferenceString(entry), referenceString ) )
             haveWarnings = True
         return status==9 and not haveErrors, haveWarnings, self.referenceList
-    # end of BibleReferenceList.parseReferenceString
+    # end of BibleReferenceList.parseReferenceStringWithStateMachine
 
 
     def getFirstReference( self, referenceString, location=None ):
@@ -1259,7 +1471,7 @@ class BibleReferenceList( BibleReferenceBase ):
         self.getBBB = lambda s: BibleOrgSysGlobals.BibleBooksCodes.getBBBFromOSIS(s)
 
         # Now do the actual parsing using the standard routine
-        sucessFlag, haveWarnings, resultList = self.parseReferenceString( referenceString )
+        sucessFlag, haveWarnings, resultList = self.parseReferenceStringWithStateMachine( referenceString )
 
         # Set things up again how they were
         self.punctuationDict = self._BibleOrganizationalSystem.getPunctuationDict()
@@ -1988,6 +2200,11 @@ def demo():
                 l1, l2 = BRL.getReferenceList(), BRL.getReferenceList( expanded=True )
                 print( "List is: ", l1 )
                 if l2!=l1: print( "Expanded:", l2 )
+        if 1:
+            refs = ( "Mat. 7:3", "Mat. 7:3-8:2", "Jde 7-9", "Gen. 1:1-2:3; Exo. 4:5", "Mat.7:3", "Mat. 7:3", )
+            print( "\nParsing a list of reference strings (repeated ones come from the cache)..." )
+            for ref, result in zip( refs, BRL.parseReferenceStrings( refs ) ):
+                print( "  From {!r} BRL got {}".format( ref, result ) )
 
     if 1: # test BibleAnchorReference
         print()
@@ -27,13 +27,16 @@ Module to load, use, determine, and compare various Bible versification systems.
     Note that this doesn't just find the maximum verse number in each chapter --
         it also checks for combined, omitted, and reordered verses.
 
-NOTE: We still lack a REFERENCE Bible versification system
-        with back-and-forth mappings. This is a MAJOR outstanding deficiency.
+Also makes (and saves) tables for converting verse references between any two systems,
+    including to and from the REFERENCE (original Hebrew and Greek) versification.
+    NOTE: The versification data doesn't include explicit mappings between systems,
+        so these tables are worked out from the numbers of verses in each chapter
+        (see _alignBook below).
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "ChapterVerseSystems"
 ProgName = "Bible Chapter-Verse Systems handler"
 ProgVersion = '0.54'
@@ -44,11 +47,29 @@ debuggingThisModule = False
 
 
 import os, logging
+from array import array
 #from singleton import singleton
 
 import BibleOrgSysGlobals
 
 
+# This is the versification system which convertToReferenceVersification and convertFromReferenceVersification use
+#   (the original Hebrew and Greek chapter and verse numbering)
+REFERENCE_VERSIFICATION_SYSTEM = 'Original'
+
+MAPPING_VERSION = 2 # Increment this if the way that the mapping tables are made changes (so old pickles get rebuilt)
+MAX_BLOCK_CHAPTERS = 3 # The most chapters on each side that we try to realign as a single block
+MAX_TITLE_VERSES = 2 # The most psalm title verses that one system might number but the other not
+MIN_TITLED_PSALMS = 20 # How many psalms need an extra verse or two before we decide that a system numbers the titles
+BLOCK_COST, MISMATCH_COST = 1, 2 # Added to the number of verses which can't be mapped when lining up the chapters
+STEP_SIZES = [(di, dj) for di in range( MAX_BLOCK_CHAPTERS+1 ) for dj in range( MAX_BLOCK_CHAPTERS+1 )
+                                if (di and dj) or di+dj==1] # Can only skip one chapter at a time
+
+MAPPING_CACHE_FOLDER = os.path.join( BibleOrgSysGlobals.DEFAULT_CACHE_FOLDER, 'VersificationMappings/' )
+
+loadedMappings = {} # Shared by all BibleVersificationSystems objects
+
+
 
 #@singleton # Can only ever have one instance (but doesn't work for multiprocessing)
 class BibleVersificationSystems:
@@ -89,7 +110,7 @@ class BibleVersificationSystems:
             if picklesGood:
                 import pickle
                 if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( standardPickleFilepath ) )
-                with open( standardPickleFilepath, 'rb') as pickleFile:
+                with BibleOrgSysGlobals.openDerivedTablesFile( standardPickleFilepath ) as pickleFile:
                     self.__DataDict = pickle.load( pickleFile ) # The protocol version used is detected automatically, so we do not have to specify it
             else: # We have to load the XML (much slower)
                 from BibleVersificationSystemsConverter import BibleVersificationSystemsConverter
@@ -166,6 +187,61 @@ class BibleVersificationSystems:
     # end of BibleVersificationSystems.getVersificationSystem
 
 
+    def getVersificationMapping( self, fromSystemName, toSystemName ):
+        """
+        Returns a BibleVersificationMapping object for converting references between the two systems
+            or None if either system name is invalid.
+
+        If neither system is the reference versification, the references are mapped via that system.
+
+        The mapping tables are only made once:
+            they're saved as a pickle file in the cache folder and loaded from there next time
+            (unless the versification data has been changed since).
+        """
+        if (fromSystemName,toSystemName) in loadedMappings: return loadedMappings[(fromSystemName,toSystemName)]
+        if fromSystemName not in self.__DataDict or toSystemName not in self.__DataDict:
+            logging.error( _("No {!r} to {!r} mapping in Bible Versification Systems").format( fromSystemName, toSystemName ) )
+            return None
+
+        import pickle
+        dataFilepath = os.path.join( os.path.dirname(__file__), "DataFiles/" )
+        mappingPickleFilepath = os.path.join( MAPPING_CACHE_FOLDER, "BibleVersificationMapping_{}_{}.pickle".format( fromSystemName, toSystemName ) )
+        mapping = None
+        if os.access( mappingPickleFilepath, os.R_OK ):
+            pickle8, pickle9 = os.stat(mappingPickleFilepath)[8:10]
+            picklesGood = True
+            standardXMLFolder = os.path.join( dataFilepath, "VersificationSystems/" )
+            for filename in os.listdir( standardXMLFolder ):
+                filepart, extension = os.path.splitext( filename )
+                XMLfilepath = os.path.join( standardXMLFolder, filename )
+                if extension.upper() == '.XML' and filepart.upper().startswith("BIBLEVERSIFICATIONSYSTEM_"):
+                  if pickle8 <= os.stat( XMLfilepath )[8] \
+                  or pickle9 <= os.stat( XMLfilepath )[9]: # The pickle file is older
+                    picklesGood = False; break
+            if picklesGood:
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "Loading pickle file {}...".format( mappingPickleFilepath ) )
+                try:
+                    with open( mappingPickleFilepath, 'rb') as pickleFile:
+                        mapping = pickle.load( pickleFile )
+                    if mapping.mappingVersion != MAPPING_VERSION: mapping = None
+                except (OSError, pickle.UnpicklingError, EOFError, AttributeError): mapping = None
+        if mapping is None: # We have to make the tables from the versification data
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( _("Making {} to {} versification mapping...").format( fromSystemName, toSystemName ) )
+            referenceCVData = None if REFERENCE_VERSIFICATION_SYSTEM in (fromSystemName, toSystemName) \
+                                    else self.__DataDict[REFERENCE_VERSIFICATION_SYSTEM]['CV']
+            mapping = BibleVersificationMapping( fromSystemName, toSystemName, self.__DataDict[fromSystemName]['CV'], self.__DataDict[toSystemName]['CV'], referenceCVData )
+            try:
+                if not os.access( MAPPING_CACHE_FOLDER, os.W_OK ): os.makedirs( MAPPING_CACHE_FOLDER, exist_ok=True )
+                temporaryFilepath = '{}.{}.tmp'.format( mappingPickleFilepath, os.getpid() )
+                with open( temporaryFilepath, 'wb' ) as pickleFile:
+                    pickle.dump( mapping, pickleFile )
+                os.replace( temporaryFilepath, mappingPickleFilepath )
+            except OSError as err: logging.warning( _("Unable to save versification mapping to {}: {}").format( mappingPickleFilepath, err ) )
+        loadedMappings[(fromSystemName,toSystemName)] = mapping
+        return mapping
+    # end of BibleVersificationSystems.getVersificationMapping
+
+
     def compareVersificationSystems( self, system1Name, system2Name=None ):
         """ Compares a given versification system against one, some, or all versification systems.
             system2Name can be a string or a list of strings.
@@ -809,11 +885,10 @@ class BibleVersificationSystem:
         Convert the given reference (in this versification system)
             to the reference versification.
 
-        Returns a new BBB, C, V, S.
+        Returns a new BBB, C, V, S
+            or None if the verse doesn't exist or can't be mapped.
         """
-        logging.debug( "convertToReferenceVersification does nothing yet!" )
-        refBBB, refC, refV, refS = BBB, C, V, S
-        return refBBB, refC, refV, refS
+        return self._bvss.getVersificationMapping( self._systemName, REFERENCE_VERSIFICATION_SYSTEM ).convertReference( BBB, C, V, S )
     # end of BibleVersificationSystem.convertToReferenceVersification
 
 
@@ -822,16 +897,313 @@ class BibleVersificationSystem:
         Convert the given reference in the reference versification system
             to this versification.
 
-        Returns a new BBB, C, V, S.
+        Returns a new BBB, C, V, S
+            or None if the verse doesn't exist or can't be mapped.
         """
-        logging.debug( "convertFromReferenceVersification does nothing yet!" )
-        BBB, C, V, S = refBBB, refC, refV, refS
-        return BBB, C, V, S
+        return self._bvss.getVersificationMapping( REFERENCE_VERSIFICATION_SYSTEM, self._systemName ).convertReference( refBBB, refC, refV, refS )
     # end of BibleVersificationSystem.convertFromReferenceVersification
 # end of BibleVersificationSystem class
 
 
 
+def _alignChapters( BBB, fromVerseCounts, toVerseCounts, fromNumbersTitles=False, toNumbersTitles=False ):
+    """
+    Lines up the chapters of a book by finding the cheapest way to step through both lists of verse counts
+        (see _alignBook below) where the cost of each step is the number of verses which can't be mapped
+        plus BLOCK_COST for each extra chapter in a block or MISMATCH_COST for a guess.
+
+    Returns a list of (fromPosition, toPosition, count) runs
+        and the number of chapters where each system had one or two more verses than the other.
+    """
+    numFrom, numTo = len(fromVerseCounts), len(toVerseCounts)
+    fromStarts, toStarts = [0], [0]
+    for count in fromVerseCounts: fromStarts.append( fromStarts[-1] + count )
+    for count in toVerseCounts: toStarts.append( toStarts[-1] + count )
+
+    def getStep( i, j, di, dj ):
+        """ Returns the cost and a list of (fromPosition, toPosition, count) runs for the step from chapters i, j. """
+        fromTotal, toTotal = fromStarts[i+di] - fromStarts[i], toStarts[j+dj] - toStarts[j]
+        if di==0 or dj==0: return fromTotal+toTotal+MISMATCH_COST, [] # A chapter which can't be mapped
+        if fromTotal == toTotal:
+            return BLOCK_COST*(di+dj-2), [(fromStarts[i], toStarts[j], fromTotal)]
+        if di==dj==1:
+            difference = toTotal - fromTotal
+            if toNumbersTitles and 0 < difference <= MAX_TITLE_VERSES: # The extra title verse(s) are at the start of the target psalm
+                return difference, [(fromStarts[i], toStarts[j]+difference, fromTotal)]
+            if fromNumbersTitles and 0 < -difference <= MAX_TITLE_VERSES: # The extra title verse(s) are at the start of the source psalm
+                return -difference, [(fromStarts[i]-difference, toStarts[j], toTotal)]
+        # A psalm which is split in two where the second part carries on with the same verse numbers
+        #   (e.g., Psalm 147:12-20 in the Stuttgart Vulgate)
+        if BBB == 'PSA' and di==1 and dj==2 and toVerseCounts[j] < toVerseCounts[j+1] == fromTotal:
+            return BLOCK_COST, [(fromStarts[i], toStarts[j], toVerseCounts[j]),
+                    (fromStarts[i]+toVerseCounts[j], toStarts[j+1]+toVerseCounts[j], fromTotal-toVerseCounts[j])]
+        if BBB == 'PSA' and di==2 and dj==1 and fromVerseCounts[i] < fromVerseCounts[i+1] == toTotal:
+            return BLOCK_COST, [(fromStarts[i], toStarts[j], fromVerseCounts[i]),
+                    (fromStarts[i+1]+fromVerseCounts[i], toStarts[j]+fromVerseCounts[i], toTotal-fromVerseCounts[i])]
+        return abs(fromTotal-toTotal)+MISMATCH_COST+BLOCK_COST*(di+dj-2), [(fromStarts[i], toStarts[j], min( fromTotal, toTotal ))]
+    # end of getStep
+
+    # Work backwards so that bestSteps[i][j] is the cheapest way to get from chapters i, j to the end of the book
+    bestSteps = [[None]*(numTo+1) for i in range( numFrom+1 )]
+    bestSteps[numFrom][numTo] = 0, None, None
+    for i in range( numFrom, -1, -1 ):
+        for j in range( numTo, -1, -1 ):
+            if i==numFrom and j==numTo: continue
+            best = None
+            for di, dj in STEP_SIZES:
+                if i+di > numFrom or j+dj > numTo: continue
+                step = getStep( i, j, di, dj )
+                cost = step[0] + bestSteps[i+di][j+dj][0]
+                if best is None or cost < best[0]: best = cost, (di, dj), step[1]
+            bestSteps[i][j] = best
+
+    runs, extraVerseCounts = [], [0, 0]
+    i = j = 0
+    while i < numFrom or j < numTo:
+        cost, (di, dj), stepRuns = bestSteps[i][j]
+        runs.extend( run for run in stepRuns if run[2] > 0 )
+        if di==dj==1 and 0 < abs( fromVerseCounts[i] - toVerseCounts[j] ) <= MAX_TITLE_VERSES:
+            extraVerseCounts[fromVerseCounts[i] < toVerseCounts[j]] += 1
+        i += di; j += dj
+    return runs, extraVerseCounts
+# end of _alignChapters
+
+
+def _alignBook( BBB, fromVerseCounts, toVerseCounts ):
+    """
+    Works out how the verses of one book correspond between two versification systems
+        given only the number of verses in each chapter in the two systems.
+
+    This is a heuristic because the versification data doesn't include explicit mappings.
+    The chapters are lined up by finding the cheapest way to step through both books
+        (so that, e.g., Psalm 147 in the Hebrew still lines up with Psalms 146-147 in the Vulgate
+        even though the psalm numbers differ by one for most of the book) where each step is one of:
+        1/ Chapters with the same number of verses are mapped verse by verse.
+        2/ A small block of chapters (e.g., Malachi 3-4 in the KJV vs Malachi 3 in Hebrew)
+            which has the same total number of verses in both systems
+            has those verses mapped in order (which handles chapter breaks in different places).
+        3/ In the Psalms, a psalm which is split in two where the second part keeps on with the same verse numbers
+            (e.g., Psalms 146 and 147:12-20 in the Stuttgart Vulgate) is mapped to the whole psalm.
+            Also, if one system has one or two more verses than the other in lots of psalms (MIN_TITLED_PSALMS),
+            we take it to number the psalm titles as verses (and the other system not to),
+            so in those psalms its first verse(s) can't be mapped.
+        4/ Failing all that, the verses of a chapter (or small block of chapters) are mapped in order
+            as far as the shorter one goes (and the rest can't be mapped), or a chapter in only one system can't be mapped at all.
+
+    Returns a list of (fromPosition, toPosition, count) runs
+        where the positions are the zero-based verse positions within the book.
+    """
+    runs, extraVerseCounts = _alignChapters( BBB, fromVerseCounts, toVerseCounts )
+    if BBB == 'PSA':
+        fromExtraCount, toExtraCount = extraVerseCounts
+        fromNumbersTitles = fromExtraCount >= MIN_TITLED_PSALMS and fromExtraCount > toExtraCount
+        toNumbersTitles = toExtraCount >= MIN_TITLED_PSALMS and toExtraCount > fromExtraCount
+        if fromNumbersTitles or toNumbersTitles:
+            runs = _alignChapters( BBB, fromVerseCounts, toVerseCounts, fromNumbersTitles, toNumbersTitles )[0]
+    return runs
+# end of _alignBook
+
+
+
+class BibleVerseIndex:
+    """
+    Class which numbers all the verses in a versification system consecutively (starting at zero)
+        so that verse references can be used to index dense arrays.
+
+    Usage is:
+        verseIndex = BibleVerseIndex( CVData ) # from BibleVersificationSystems.getVersificationSystem( systemName )['CV']
+        index = verseIndex.getIndex( 'MAL', '4', '1' ) # Returns None if there's no such verse
+        BBB, C, V = verseIndex.getReference( index )
+    """
+    def __init__( self, CVData ):
+        """
+        Constructor: numbers the verses in the order of the books, chapters and verses.
+        """
+        self.BBBList = [] # The index into this list is the book number used below
+        self.chapterStartsDict = {} # The index of the first verse of each chapter (plus one past the end of the book)
+        self.indexBookNumbers, self.indexChapters, self.indexVerses = array( 'H' ), array( 'H' ), array( 'H' )
+        index = 0
+        for BBB,bookData in CVData.items():
+            bookNumber = len( self.BBBList )
+            self.BBBList.append( BBB )
+            chapterStarts = array( 'l' )
+            for C in range( 1, int(bookData['numChapters'])+1 ):
+                chapterStarts.append( index )
+                numVerses = int( bookData.get( str(C), 0 ) )
+                self.indexBookNumbers.extend( [bookNumber] * numVerses )
+                self.indexChapters.extend( [C] * numVerses )
+                self.indexVerses.extend( range( 1, numVerses+1 ) )
+                index += numVerses
+            chapterStarts.append( index )
+            self.chapterStartsDict[BBB] = chapterStarts
+    # end of BibleVerseIndex.__init__
+
+
+    def __len__( self ):
+        """ Returns the total number of verses. """
+        return len( self.indexVerses )
+    # end of BibleVerseIndex.__len__
+
+
+    def getVerseCounts( self, BBB ):
+        """
+        Returns a list of the number of verses in each chapter of the book.
+        """
+        chapterStarts = self.chapterStartsDict[BBB]
+        return [chapterStarts[j+1]-chapterStarts[j] for j in range( len(chapterStarts)-1 )]
+    # end of BibleVerseIndex.getVerseCounts
+
+
+    def getIndex( self, BBB, C, V ):
+        """
+        Returns the absolute verse index (an integer) for the given reference
+            or None if there's no such verse.
+        """
+        try: chapterStarts, Cint, Vint = self.chapterStartsDict[BBB], int(C), int(V)
+        except (KeyError, ValueError, TypeError): return None
+        if 0 < Cint < len(chapterStarts) and Vint > 0:
+            index = chapterStarts[Cint-1] + Vint - 1
+            if index < chapterStarts[Cint]: return index
+    # end of BibleVerseIndex.getIndex
+
+
+    def getReference( self, index ):
+        """
+        Returns a BBB, C, V tuple (with C and V as strings) for the given absolute verse index.
+        """
+        return self.BBBList[self.indexBookNumbers[index]], str(self.indexChapters[index]), str(self.indexVerses[index])
+    # end of BibleVerseIndex.getReference
+# end of class BibleVerseIndex
+
+
+
+class BibleVersificationMapping:
+    """
+    Class for converting verse references from one versification system to another.
+
+    The mapping is held as a dense array indexed by the absolute verse number in the first system
+        (containing the absolute verse number in the second system, or -1 if the verse can't be mapped)
+        so each conversion takes constant time.
+
+    Usually you'll get one of these with BibleVersificationSystems().loadData().getVersificationMapping( fromSystemName, toSystemName )
+        which saves the tables in the cache folder the first time.
+
+    Usage is:
+        mapping.convertReference( 'MAL', '4', '1' ) # Returns ('MAL','3','19',None) or None if the verse can't be mapped
+        mapping.convertReferences( referenceList ) # Returns a list of the above
+        mapping.convertIndexes( fromIndexList ) # Fastest of all: works with the absolute verse numbers from mapping.fromIndex
+    """
+    def __init__( self, fromSystemName, toSystemName, fromCVData, toCVData, referenceCVData=None ):
+        """
+        Constructor: makes the mapping table from the chapter/verse data of the two systems.
+
+        If the chapter/verse data of the reference versification is given,
+            the verses are mapped to that and then from there to the second system
+            (so that two systems which both differ from it in the same way, e.g., by numbering the psalm titles,
+            still line up with each other).
+        """
+        self.fromSystemName, self.toSystemName = fromSystemName, toSystemName
+        self.fromIndex, self.toIndex = BibleVerseIndex( fromCVData ), BibleVerseIndex( toCVData )
+        self.mappingVersion = MAPPING_VERSION
+        if referenceCVData is None:
+            self.table = self.__makeTable( self.fromIndex, self.toIndex )
+        else:
+            referenceIndex = BibleVerseIndex( referenceCVData )
+            toReferenceTable, fromReferenceTable = self.__makeTable( self.fromIndex, referenceIndex ), self.__makeTable( referenceIndex, self.toIndex )
+            self.table = array( 'l', [fromReferenceTable[index] if index >= 0 else -1 for index in toReferenceTable] )
+    # end of BibleVersificationMapping.__init__
+
+
+    def __makeTable( self, fromIndex, toIndex ):
+        """
+        Returns an array of the absolute verse index in the second system (or -1) for each verse in the first system.
+        """
+        table = array( 'l', [-1] ) * len(fromIndex)
+        for BBB in fromIndex.BBBList:
+            if BBB not in toIndex.chapterStartsDict: continue # Nothing to map to
+            fromBookStart, toBookStart = fromIndex.chapterStartsDict[BBB][0], toIndex.chapterStartsDict[BBB][0]
+            for fromPosition, toPosition, count in _alignBook( BBB, fromIndex.getVerseCounts( BBB ), toIndex.getVerseCounts( BBB ) ):
+                if count > 0:
+                    start = fromBookStart + fromPosition
+                    table[start:start+count] = array( 'l', range( toBookStart+toPosition, toBookStart+toPosition+count ) )
+        return table
+    # end of BibleVersificationMapping.__makeTable
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the mapping object.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "BibleVersificationMapping object"
+        result += ('\n' if result else '') + "  " + _("From {} ({} verses) to {} ({} verses)").format( self.fromSystemName, len(self.fromIndex), self.toSystemName, len(self.toIndex) )
+        result += ('\n' if result else '') + "  " + _("{} verses can't be mapped").format( self.table.count( -1 ) )
+        return result
+    # end of BibleVersificationMapping.__str__
+
+
+    def __len__( self ):
+        """ Returns the number of verses in the system that we map from. """
+        return len( self.table )
+    # end of BibleVersificationMapping.__len__
+
+
+    def convertIndex( self, fromIndex ):
+        """
+        Returns the absolute verse index in the second system for the given index in the first system
+            or None if the verse can't be mapped.
+        """
+        toIndex = self.table[fromIndex]
+        if toIndex >= 0: return toIndex
+    # end of BibleVersificationMapping.convertIndex
+
+
+    def convertIndexes( self, fromIndexes ):
+        """
+        Returns a list of the absolute verse indexes in the second system for the given list of indexes in the first system.
+            Verses which can't be mapped give -1.
+        """
+        table = self.table
+        return [table[fromIndex] for fromIndex in fromIndexes]
+    # end of BibleVersificationMapping.convertIndexes
+
+
+    def convertReference( self, BBB, C, V, S=None ):
+        """
+        Convert the given reference (in the first versification system)
+            to the second versification system.
+
+        Returns a new BBB, C, V, S (with the suffix unchanged)
+            or None if the verse doesn't exist or can't be mapped.
+        """
+        fromIndex = self.fromIndex.getIndex( BBB, C, V )
+        if fromIndex is not None:
+            toIndex = self.table[fromIndex]
+            if toIndex >= 0:
+                return self.toIndex.getReference( toIndex ) + (S,)
+    # end of BibleVersificationMapping.convertReference
+
+
+    def convertReferences( self, referenceList ):
+        """
+        Convert a list of (BBB, C, V) or (BBB, C, V, S) references.
+
+        Returns a list of the results from convertReference.
+        """
+        getIndex, getReference, table = self.fromIndex.getIndex, self.toIndex.getReference, self.table
+        resultList = []
+        for reference in referenceList:
+            fromIndex = getIndex( reference[0], reference[1], reference[2] )
+            toIndex = -1 if fromIndex is None else table[fromIndex]
+            resultList.append( getReference( toIndex ) + (reference[3] if len(reference)>3 else None,) if toIndex >= 0 else None )
+        return resultList
+    # end of BibleVersificationMapping.convertReferences
+# end of class BibleVersificationMapping
+
+
+
 def demo():
     """
     Main program to handle command line parameters and then run what they want.
@@ -877,6 +1249,11 @@ def demo():
         print( "Omitted verses in {} are: {}".format(BBB,bvs.getOmittedVerseList(BBB)) )
         for myRange in ((('MAT','2','1',''),('MAT','2','5','')), (('MAT','3','2','b'),('MAT','3','6','a')), (('MAT','3','15',''),('MAT','4','2','')), (('MAT','3','16','b'),('MAT','4','3','a')), (('MAT','3','2',''),('MAT','2','6',''))):
             print( "Expanding {} gives {}".format( myRange, bvs.expandCVRange( myRange[0],myRange[1]) ) )
+        for refTuple in (('MAL','4','1',''), ('JOL','2','28',''), ('PSA','3','1',''), ('EXO','8','1','b'), ('MAT','28','20','')):
+            print( "{} {} is {} in the reference versification".format( bvs.getVersificationSystemName(), refTuple, bvs.convertToReferenceVersification( *refTuple ) ) )
+        mapping = bvss.getVersificationMapping( 'KJV', 'Vulgate' )
+        print( mapping )
+        print( "KJV {} are {} in the Vulgate".format( [('PSA','10','1'),('PSA','11','1'),('PSA','147','12')], mapping.convertReferences( [('PSA','10','1'),('PSA','11','1'),('PSA','147','12')] ) ) )
 # end of demo
 
 
@@ -34,8 +34,9 @@ This is intended to be a virtual class, i.e., to be extended further
 
 Contains functions:
     toPickle( self, outputFolder=None )
+    toBinaryCache( self, outputFolder=None ) -- memory-mappable cache for fast verse lookups
     makeLists( outputFolder=None )
-    toBOSBCV( self, outputFolder=None ) -- one file per verse using our internal Bible format
+    toBOSBCV( self, outputFolder=None, packedFlag=False ) -- one file per verse (or per book plus an index) using our internal Bible format
     toPseudoUSFM( outputFolder=None ) -- this is our internal Bible format -- exportable for debugging purposes
             For more details see InternalBible.py, InternalBibleBook.py, InternalBibleInternals.py
     toUSFM( outputFolder=None. removeVerseBridges=False )
@@ -59,6 +60,7 @@ Contains functions:
     toDrupalBible( outputFolder=None )
     toPhotoBible( outputFolder=None )
     toODF( outputFolder=None ) for LibreOffice/OpenOffice exports
+    toODT( outputFolder=None ) for LibreOffice/OpenOffice exports written directly (without needing LibreOffice)
     toTeX( outputFolder=None ) and thence to PDF
     doAllExports( givenOutputFolderName=None, wantPhotoBible=False, wantODFs=False, wantPDFs=False )
 
@@ -68,7 +70,7 @@ Note that not all exports export all books.
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "BibleWriter"
 ProgName = "Bible writer"
 ProgVersion = '0.90'
@@ -82,12 +84,13 @@ OSISNameSpace = "http://www.bibletechnologies.net/2003/OSIS/namespace"
 OSISSchemaLocation = "http://www.bibletechnologies.net/osisCore.2.1.1.xsd"
 
 
-import sys, os, shutil, logging
+import sys, os, shutil, logging, time, queue
 from datetime import datetime
 from collections import OrderedDict
-import re, sqlite3, json
+import re, json, hashlib
 import zipfile, tarfile
 import subprocess, multiprocessing
+from multiprocessing.pool import ThreadPool
 
 import BibleOrgSysGlobals, ControlFiles
 from InternalBibleInternals import BOS_ADDED_NESTING_MARKERS, BOS_ALL_ADDED_NESTING_MARKERS, BOS_NESTING_MARKERS
@@ -96,10 +99,107 @@ from BibleOrganizationalSystems import BibleOrganizationalSystem
 from BibleReferences import BibleReferenceList
 from USFMMarkers import OFTEN_IGNORED_USFM_HEADER_MARKERS, USFM_INTRODUCTION_MARKERS, USFM_BIBLE_PARAGRAPH_MARKERS, removeUSFMCharacterField, replaceUSFMCharacterFields
 from MLWriter import MLWriter
+from SQLiteBulkWriter import SQLiteBulkWriter
+from ArchiveWriter import ArchiveWriter
+from LibreOfficePool import LibreOfficePool
+from ODTWriter import ODTWriter
+from ExportManifest import ExportManifest, getSettingsHash, getSourceHash, getBookHash
+from InternalBibleCache import writeBinaryCache, BINARY_CACHE_FILENAME_EXTENSION
 
 
 ALL_CHAR_MARKERS = BibleOrgSysGlobals.USFMMarkers.getCharacterMarkersList( expandNumberableMarkers=True )
 
+# The kinds of segments in the records made by BibleWriter.__getVerseStream
+VERSE_STREAM_SEGMENT_KINDS = ( 'header', 'heading', 'introduction', 'paragraph', 'blank', 'text', 'other', )
+VERSE_STREAM_FORMATTING_KINDS = ( 'header', 'heading', 'introduction', 'paragraph', 'blank', ) # Left out by the simplest exports
+
+
+# The paragraph and character style names used for the ODF exports (toODF and toODT) for each USFM marker
+ODF_TITLE_STYLE_DICT = {'imt1':'Introduction Major Title 1', 'imt2':'Introduction Major Title 2', 'imt3':'Introduction Major Title 3', 'imt4':'Introduction Major Title 4',
+                  'imte1':'Introduction Major Title at Ending 1','imte2':'Introduction Major Title at Ending 2', 'imte3':'Introduction Major Title at Ending 3', 'imte4':'Introduction Major Title at Ending 4',
+                  'mt1':'Major Title 1','mt2':'Major Title 2', 'mt3':'Major Title 3', 'mt4':'Major Title 4',
+                  'mte1':'Major Title at Ending 1','mte2':'Major Title at Ending 2', 'mte3':'Major Title at Ending 3', 'mte4':'Major Title at Ending 4', }
+ODF_IP_STYLE_DICT = {'ip':'Introduction Paragraph', 'ipi':'Introduction Paragraph Indented', 'ipr':'Introduction Right Aligned Paragraph',
+                'im':'Introduction Flush Left Paragraph', 'imi':'Introduction Indented Flush Left Paragraph',
+                'iex':'Introduction Explanation', 'iot':'Introduction Outline Title',
+                'io1':'Introduction Outline Entry 1', 'io2':'Introduction Outline Entry 2', 'io3':'Introduction Outline Entry 3', 'io4':'Introduction Outline Entry 4',
+                'iq1':'Introduction Poetry Paragraph 1','iq2':'Introduction Poetry Paragraph 2','iq3':'Introduction Poetry Paragraph 3','iq4':'Introduction Poetry Paragraph 4',
+                'ipq':'Introduction Quote Paragraph', 'imq':'Introduction Flush Left Quote Paragraph', }
+
+ODF_PQ_STYLE_DICT = {'p':'Prose Paragraph', 'm':'Flush Left Paragraph',
+                'pmo':'Embedded Opening Paragraph', 'pm':'Embedded Paragraph', 'pmc':'Embedded Closing Paragraph',
+                'pmr':'Embedded Refrain Paragraph',
+                'pi1':'Indented Prose Paragraph 1','pi2':'Indented Prose Paragraph 2','pi3':'Indented Prose Paragraph 3','pi4':'Indented Prose Paragraph 4',
+                'mi':'Indented Flush Left Paragraph', 'cls':'Closure Paragraph',
+                'pc':'Centered Prose Paragraph', 'pr':'Right Aligned Prose Paragraph',
+                'ph1':'Hanging Prose Paragraph 1','ph2':'Hanging Prose Paragraph 2','ph3':'Hanging Prose Paragraph 3','ph4':'Hanging Prose Paragraph 4',
+
+                'q1':'Poetry Paragraph 1','q2':'Poetry Paragraph 2','q3':'Poetry Paragraph 3','q4':'Poetry Paragraph 4',
+                'qr':'Right Aligned Poetry Paragraph', 'qc':'Centered Poetry Paragraph',
+                'qm1':'Embedded Poetry Paragraph 1','qm2':'Embedded Poetry Paragraph 2','qm3':'Embedded Poetry Paragraph 3','qm4':'Embedded Poetry Paragraph 4'}
+
+ODF_MISC_STYLE_DICT = {'d':'Descriptive Title', 'sp':'Speaker Identification', 'cl':'Chapter Label', }
+
+ODF_CHAR_STYLE_DICT = {'bk':'Book Name', 'ior':'Introduction Outline Reference',
+                    'add':'Added Words', 'nd':'Divine Name', 'wj':'Words of Jesus', 'sig':'Author Signature',
+                    'rq':'Inline Quotation Reference', 'qs':'Selah Text',
+                    'w':'Wordlist Entry', 'iqt':'Introduction Quoted Text',
+                    'em':'Emphasis Text', 'bd':'Bold Text', 'it':'Italic Text', 'bdit':'Bold Italic Text', 'sc':'Small Caps Text', }
+
+ODF_NOTE_STYLE_DICT = { 'fr':'Footnote Origin', 'fk':'Footnote Keyword', 'fq':'Footnote Quotation',
+                'fqa':'Footnote Alternate Translation', 'fl':'Footnote Label',
+                'fp':'Footnote Paragraph', 'fv':'Footnote Verse Number',
+                'ft':'Footnote Text', 'fdc':'Footnote Deuterocanonical',
+                'fm':'Footnote Mark' }
+ODF_XREF_STYLE_DICT = { 'xo':'Cross Reference Origin', 'xk':'Cross Reference Keyword',
+                 'xq':'Cross Reference Quotation', 'xt':'Cross Reference Target',
+                 'xot':'Cross Reference OT Target', 'xnt':'Cross Reference NT Target',
+                 'xdc':'Cross Reference Deuterocanon Target' }
+
+
+# The exports done by doAllExports
+#   Each entry is a 7-tuple containing:
+#       resultKey (for doAllExports results dictionary), BibleWriter method name, output subfolder name,
+#       objectTypeString (for which 'Export' in the folder name is replaced by 'Reexport') or None,
+#       prerequisites (set-up steps done once before any export is started),
+#       dependsOn (resultKeys of other exports that must finish first),
+#       defaultCost (relative run time used until we have a timing history).
+EXPORT_TASKS = (
+    ('listOutput', 'makeLists', "BOS_Lists/", None, ('setupWriter','discover',), (), 1 ),
+    ('BCVOutput', 'toBOSBCV', "BOS_BCV_Export/", None, ('setupWriter',), (), 2 ),
+    ('pseudoUSFMExport', 'toPseudoUSFM', "BOS_PseudoUSFM_Export/", None, ('setupWriter',), (), 1 ),
+    ('USFMExport', 'toUSFM', "BOS_USFM_Export/", 'USFM', ('setupWriter',), (), 1 ),
+    ('ESFMExport', 'toESFM', "BOS_ESFM_Export/", 'ESFM', ('setupWriter',), (), 1 ),
+    ('textExport', 'toText', "BOS_PlainText_Export/", 'Text', ('setupWriter','verseStream',), (), 1 ),
+    ('markdownExport', 'toMarkdown', "BOS_Markdown_Export/", None, ('setupWriter','verseStream',), (), 1 ),
+    ('D43Export', 'toDoor43', "BOS_Door43_Export/", 'Door43', ('setupWriter',), (), 2 ),
+    ('htmlExport', 'toHTML5', "BOS_HTML5_Export/", None, ('setupWriter',), (), 3 ),
+    ('CustomBibleExport', 'toCustomBible', "BOS_CustomBible_Export/", None, ('setupWriter','discover',), (), 3 ),
+    ('USXExport', 'toUSXXML', "BOS_USX_Export/", 'USX', ('setupWriter',), (), 2 ),
+    ('USFXExport', 'toUSFXXML', "BOS_USFX_Export/", 'USFX', ('setupWriter',), (), 2 ),
+    ('OSISExport', 'toOSISXML', "BOS_OSIS_Export/", 'OSIS', ('setupWriter',), (), 3 ),
+    ('ZefExport', 'toZefaniaXML', "BOS_Zefania_Export/", 'Zefania', ('setupWriter','verseStream',), (), 1 ),
+    ('HagExport', 'toHaggaiXML', "BOS_Haggai_Export/", 'Haggai', ('setupWriter','verseStream',), (), 1 ),
+    ('OSExport', 'toOpenSongXML', "BOS_OpenSong_Export/", 'OpenSong', ('setupWriter','verseStream',), (), 1 ),
+    ('swExport', 'toSwordModule', "BOS_Sword_Export/", 'Sword', ('setupWriter',), (), 3 ),
+    ('TWExport', 'totheWord', "BOS_theWord_Export/", 'theWord', ('setupWriter',), (), 2 ),
+    ('MySwExport', 'toMySword', "BOS_MySword_Export/", 'MySword', ('setupWriter',), (), 2 ),
+    ('ESwExport', 'toESword', "BOS_e-Sword_Export/", 'e-Sword', ('setupWriter',), (), 2 ),
+    ('SwSExport', 'toSwordSearcher', "BOS_SwordSearcher_Export/", None, ('setupWriter','verseStream',), (), 1 ),
+    ('DrExport', 'toDrupalBible', "BOS_DrupalBible_Export/", 'DrupalBible', ('setupWriter','verseStream',), (), 1 ),
+    ('ODTExport', 'toODT', "BOS_ODT_Export/", None, ('setupWriter',), (), 3 ),
+    # The three very processor intensive exports (which doAllExports only does if specifically requested)
+    ('PhotoBibleExport', 'toPhotoBible', "BOS_PhotoBible_Export/", None, ('setupWriter',), (), 1000 ),
+    ('ODFExport', 'toODF', "BOS_ODF_Export/", None, ('setupWriter',), (), 500 ),
+    ('TeXExport', 'toTeX', "BOS_TeX_Export/", None, ('setupWriter',), (), 800 ), # Put this last since it's slowest
+    )
+EXPORT_TIMINGS_FILENAME = 'BOS_Export_Timings.json' # Saved in the doAllExports output folder
+PHOTOBIBLE_RENDER_INFO_FILENAME = 'BOS_PhotoBible_Renders.json' # Saved in the toPhotoBible output folder
+TEX_BUILD_INFO_FILENAME = 'BOS_TeX_Builds.json' # Saved in the toTeX output folder
+BOOKS_MANIFEST_FILENAME = 'BOS_Books_Manifest.json' # Saved in the output folder of exports which write one file per book
+EXPORTS_MANIFEST_FILENAME = 'BOS_Exports_Manifest.json' # Saved in the doAllExports output folder
+TEX_WORK_FOLDERNAME = 'TeXWork/' # Subfolder of the toTeX output folder where each xelatex job has its own working folder (removed afterwards)
+
 
 
 def t( messageString ):
@@ -126,6 +226,41 @@ def setDefaultControlFolder( newFolderName ):
 # end of BibleWriter.setDefaultControlFolder
 
 
+_exportWorkerBible = None # The Bible object being exported by this worker process
+def _initExportWorker( BibleObject ):
+    """
+    Only used in doAllExports for multiprocessing.
+
+    Called once when each worker process is started
+        so that the Bible object only needs to be passed to each worker once.
+    """
+    global _exportWorkerBible
+    _exportWorkerBible = BibleObject
+# end of BibleWriter._initExportWorker
+
+
+def _doExportTask( task, BibleObject=None ):
+    """
+    Used in doAllExports to run one export.
+
+    Parameter task is a 3-tuple containing the resultKey, the BibleWriter method name, and the folder parameter to pass.
+    The Bible object defaults to the one given to this worker process by _initExportWorker.
+
+    Returns a 3-tuple containing the resultKey, the export result, and the elapsed time in seconds.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter._doExportTask( {} )".format( task ) )
+    resultKey, methodName, outputFolder = task
+    if BibleObject is None: BibleObject = _exportWorkerBible
+    startTime = time.time()
+    try: result = getattr( BibleObject, methodName )( outputFolder )
+    except Exception as err: # Got to catch and report the exceptions here
+        print( "BibleWriter.doAllExports.{} Unexpected error:".format( methodName ), sys.exc_info()[0], err )
+        logging.error( "BibleWriter.doAllExports.{}: Oops, failed!".format( methodName ) )
+        result = False
+    return resultKey, result, time.time() - startTime
+# end of BibleWriter._doExportTask
+
+
 
 class BibleWriter( InternalBible ):
     """
@@ -139,6 +274,8 @@ class BibleWriter( InternalBible ):
         #    """
         InternalBible.__init__( self  ) # Initialise the base class
         self.doneSetupGeneric = False
+        self.__verseStreams = {} # Cached by __getVerseStream
+        self.__bookHashes = {} # Cached by __getBookHash
         #self.genericBOS = BibleOrganizationalSystem( "GENERIC-KJV-81" )
         #self.genericBRL = BibleReferenceList( self.genericBOS, BibleObject=self ) # self isn't actualised yet!!!
     # end of BibleWriter.__init_
@@ -169,6 +306,24 @@ class BibleWriter( InternalBible ):
     # end of BibleWriter.toPickle
 
 
+    def toBinaryCache( self, outputFolder=None ):
+        """
+        Saves the processed Bible text as a binary cache file
+            which can be memory-mapped and read verse-by-verse by InternalBibleCache.loadBinaryCache.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toBinaryCache..." )
+        if not outputFolder: outputFolder = "OutputFiles/BOS_Bible_Binary_Cache/"
+        if not os.access( outputFolder, os.F_OK ): os.makedirs( outputFolder ) # Make the empty folder if there wasn't already one there
+
+        filename = BibleOrgSysGlobals.makeSafeFilename( (self.abbreviation if self.abbreviation else self.name) + BINARY_CACHE_FILENAME_EXTENSION )
+        writeBinaryCache( self, os.path.join( outputFolder, filename ) )
+
+        if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
+            print( "  BibleWriter.toBinaryCache finished successfully." )
+        return True
+    # end of BibleWriter.toBinaryCache
+
+
 
     def __setupWriter( self ):
         """
@@ -200,6 +355,112 @@ class BibleWriter( InternalBible ):
     # end of BibleWriter.__adjustControlDict
 
 
+    def __getVerseStream( self, BBB, bookObject ):
+        """
+        Returns a stream of verse records for the book (made from its _processedLines)
+            which is shared by the simpler verse-based exports
+            (toText, toMarkdown, toZefaniaXML, toHaggaiXML, toOpenSongXML, toSwordSearcher, toDrupalBible).
+        The stream is only built once for each book object and then cached.
+
+        Returns a list of records, each a 6-tuple containing:
+            C, V (a new record starts at each c field with V=None, and at each v field with V as a string
+                -- so that a verse zero isn't mistaken for the start of a chapter),
+            the verse number to be published (from a preceding vp~ field, else V, or None for a chapter),
+            plainText (the clean text of the v~ and p~ fields in the record joined with spaces),
+            segments (a tuple of (kind, InternalBibleEntry) 2-tuples for the other fields in the record
+                where kind is one of VERSE_STREAM_SEGMENT_KINDS),
+            notes (a tuple of the extras from the v~ and p~ fields in the record)
+            (there's also a first record with C='0' and V=None if anything is left before the first c field).
+        """
+        if bookObject is None: return []
+        try:
+            cachedBookObject, records = self.__verseStreams[BBB]
+            if cachedBookObject is bookObject: return records # It's still the same book
+        except KeyError: pass
+
+        records = []
+        C, V = '0', None
+        published, plainText, segments, notes = None, None, [], []
+        def saveRecord():
+            if V is not None or segments or C!='0': # Don't need an empty record for before the first chapter
+                records.append( (C, V, published, plainText, tuple(segments), tuple(notes)) )
+        # end of __getVerseStream.saveRecord
+
+        gotVP = None
+        for entry in bookObject._processedLines:
+            marker = entry.getMarker()
+            if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
+            if marker == 'vp~': # This precedes a v field and has the verse number to be published
+                gotVP = entry.getCleanText() # Just remember it for now
+            elif marker in ('c','v',):
+                saveRecord()
+                if marker == 'c': C, V, published = entry.getCleanText(), None, None
+                else: # it's a verse
+                    V = entry.getCleanText()
+                    published = gotVP if gotVP else V
+                    gotVP = None
+                plainText, segments, notes = None, [], []
+            else:
+                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie','c#',): kind = 'header'
+                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4',
+                                's1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ): kind = 'heading'
+                elif marker in USFM_INTRODUCTION_MARKERS: kind = 'introduction'
+                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS: kind = 'paragraph'
+                elif marker in ('b','nb','ib',): kind = 'blank'
+                elif marker in ('v~','p~',): kind = 'text'
+                else: kind = 'other'
+                if BibleOrgSysGlobals.debugFlag and kind in ('paragraph','blank',):
+                    assert( not entry.getFullText() and not entry.getExtras() )
+                segments.append( (kind, entry) )
+                if kind == 'text':
+                    text = entry.getCleanText()
+                    plainText = text if plainText is None else plainText + (' ' if plainText else '') + text
+                    extras = entry.getExtras()
+                    if extras: notes.extend( extras )
+        saveRecord()
+
+        self.__verseStreams[BBB] = bookObject, records
+        return records
+    # end of BibleWriter.__getVerseStream
+
+
+    def __getBookHash( self, BBB, bookObject ):
+        """
+        Returns a hash string of the contents of the book
+            so that exports can tell if it has changed since last time.
+        The hash is only calculated once for each book object and then cached.
+        """
+        try:
+            cachedBookObject, bookHash = self.__bookHashes[BBB]
+            if cachedBookObject is bookObject: return bookHash # It's still the same book
+        except KeyError: pass
+        bookHash = getBookHash( bookObject )
+        self.__bookHashes[BBB] = bookObject, bookHash
+        return bookHash
+    # end of BibleWriter.__getBookHash
+
+
+    def __getExportsHash( self ):
+        """
+        Returns a hash string of everything that the exports are made from,
+            i.e., the Bible settings, the export control files, and the contents of all the books,
+            so that doAllExports can tell if the exports from last time are still up-to-date.
+        """
+        exportsHash = hashlib.md5( repr( (self.name, self.abbreviation, self.shortName, getattr( self, 'projectName', None ),
+                                    self.objectTypeString, sorted( self.settingsDict.items() ),) ).encode( 'utf-8' ) )
+        try: controlFilenames = sorted( os.listdir( defaultControlFolder ) )
+        except OSError: controlFilenames = []
+        for filename in controlFilenames:
+            filepath = os.path.join( defaultControlFolder, filename )
+            if os.path.isfile( filepath ):
+                exportsHash.update( filename.encode( 'utf-8' ) )
+                with open( filepath, 'rb' ) as controlFile: exportsHash.update( controlFile.read() )
+        for BBB,bookObject in self.books.items():
+            exportsHash.update( '{}={}'.format( BBB, self.__getBookHash( BBB, bookObject ) ).encode( 'utf-8' ) )
+        return exportsHash.hexdigest()
+    # end of BibleWriter.__getExportsHash
+
+
 
     def makeLists( self, outputFolder=None ):
         """
@@ -365,9 +626,11 @@ class BibleWriter( InternalBible ):
     # end of BibleWriter.makeLists
 
 
-    def toBOSBCV( self, outputFolder=None ):
+    def toBOSBCV( self, outputFolder=None, packedFlag=False ):
         """
         Write the internal pseudoUSFM out directly with one file per verse.
+
+        If packedFlag is set, each book is written as one verses file plus an offset index instead.
         """
         if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toBOSBCV..." )
         if BibleOrgSysGlobals.debugFlag: assert( self.books )
@@ -378,7 +641,7 @@ class BibleWriter( InternalBible ):
             shutil.rmtree( outputFolder, ignore_errors=True )
         os.makedirs( outputFolder ) # Make the empty folder
 
-        self.writeBOSBCVFiles( outputFolder )
+        self.writeBOSBCVFiles( outputFolder, packedFlag )
 
         # Now create a zipped collection
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping BCV files..." )
@@ -484,9 +747,14 @@ class BibleWriter( InternalBible ):
         #assert( controlDict and isinstance( controlDict, dict ) )
 
         ignoredMarkers = set()
+        manifest = ExportManifest( os.path.join( outputFolder, BOOKS_MANIFEST_FILENAME ), getSettingsHash( ProgVersion, getSourceHash( BibleWriter ), removeVerseBridges ) )
 
         # Adjust the extracted outputs
         for BBB,bookObject in self.books.items():
+            bookHash = self.__getBookHash( BBB, bookObject )
+            if manifest.isUnchanged( BBB, bookHash ):
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Skipping unchanged {}").format( BBB ) )
+                continue
             pseudoUSFMData = bookObject._processedLines
             #print( "\pseudoUSFMData", pseudoUSFMData[:50] ); halt
             USFMAbbreviation = BibleOrgSysGlobals.BibleBooksCodes.getUSFMAbbreviation( BBB )
@@ -563,20 +831,25 @@ class BibleWriter( InternalBible ):
             filepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
             if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( filepath ) )
             with open( filepath, 'wt' ) as myFile: myFile.write( USFM )
+            manifest.setEntry( BBB, bookHash, [filepath] )
+        manifest.removeOtherEntries( self.books ) # Delete the files of any books which have been removed
 
         if ignoredMarkers:
             logging.info( "toUSFM: Ignored markers were {}".format( ignoredMarkers ) )
             if BibleOrgSysGlobals.verbosityLevel > 2:
                 print( "  " + _("WARNING: Ignored toUSFM markers were {}").format( ignoredMarkers ) )
 
-        # Now create a zipped collection
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping USFM files..." )
-        zf = zipfile.ZipFile( os.path.join( outputFolder, 'AllUSFMFiles.zip' ), 'w', compression=zipfile.ZIP_DEFLATED )
-        for filename in os.listdir( outputFolder ):
-            if not filename.endswith( '.zip' ):
-                filepath = os.path.join( outputFolder, filename )
-                zf.write( filepath, filename ) # Save in the archive without the path
-        zf.close()
+        # Now create a zipped collection (if anything has changed)
+        zipFilepath = os.path.join( outputFolder, 'AllUSFMFiles.zip' )
+        if manifest.hasChanged() or not os.path.isfile( zipFilepath ):
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping USFM files..." )
+            zf = zipfile.ZipFile( zipFilepath, 'w', compression=zipfile.ZIP_DEFLATED )
+            for filename in os.listdir( outputFolder ):
+                if not filename.endswith( '.zip' ) and filename != BOOKS_MANIFEST_FILENAME:
+                    filepath = os.path.join( outputFolder, filename )
+                    zf.write( filepath, filename ) # Save in the archive without the path
+            zf.close()
+        manifest.save()
 
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
             print( "  BibleWriter.toUSFM finished successfully." )
@@ -599,9 +872,15 @@ class BibleWriter( InternalBible ):
         #assert( controlDict and isinstance( controlDict, dict ) )
 
         ignoredMarkers = set()
+        manifest = ExportManifest( os.path.join( outputFolder, BOOKS_MANIFEST_FILENAME ), getSettingsHash( ProgVersion, getSourceHash( BibleWriter ) ) )
 
         # Adjust the extracted outputs
+        indentLevel = 0
         for BBB,bookObject in self.books.items():
+            bookHash = self.__getBookHash( BBB, bookObject )
+            if manifest.isUnchanged( BBB, bookHash ):
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Skipping unchanged {}").format( BBB ) )
+                continue
             pseudoUSFMData = bookObject._processedLines
             #print( "\pseudoESFMData", pseudoESFMData[:50] ); halt
             USFMAbbreviation = BibleOrgSysGlobals.BibleBooksCodes.getUSFMAbbreviation( BBB )
@@ -711,6 +990,8 @@ class BibleWriter( InternalBible ):
                     if pseudoMarker in BOS_NESTING_MARKERS:
                         indentLevel += 1
                         #print( pseudoMarker, indentLevel )
+            manifest.setEntry( BBB, bookHash, [filepath] )
+        manifest.removeOtherEntries( self.books ) # Delete the files of any books which have been removed
 
         if indentLevel !=  0:
             logging.error( "toESFM: Ended with wrong indent level of {}".format( indentLevel ) );  halt
@@ -720,14 +1001,17 @@ class BibleWriter( InternalBible ):
             if BibleOrgSysGlobals.verbosityLevel > 2:
                 print( "  " + _("WARNING: Ignored toESFM markers were {}").format( ignoredMarkers ) )
 
-        # Now create a zipped collection
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping ESFM files..." )
-        zf = zipfile.ZipFile( os.path.join( outputFolder, 'AllESFMFiles.zip' ), 'w', compression=zipfile.ZIP_DEFLATED )
-        for filename in os.listdir( outputFolder ):
-            if not filename.endswith( '.zip' ):
-                filepath = os.path.join( outputFolder, filename )
-                zf.write( filepath, filename ) # Save in the archive without the path
-        zf.close()
+        # Now create a zipped collection (if anything has changed)
+        zipFilepath = os.path.join( outputFolder, 'AllESFMFiles.zip' )
+        if manifest.hasChanged() or not os.path.isfile( zipFilepath ):
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping ESFM files..." )
+            zf = zipfile.ZipFile( zipFilepath, 'w', compression=zipfile.ZIP_DEFLATED )
+            for filename in os.listdir( outputFolder ):
+                if not filename.endswith( '.zip' ) and filename != BOOKS_MANIFEST_FILENAME:
+                    filepath = os.path.join( outputFolder, filename )
+                    zf.write( filepath, filename ) # Save in the archive without the path
+            zf.close()
+        manifest.save()
 
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
             print( "  BibleWriter.toESFM finished successfully." )
@@ -755,66 +1039,61 @@ class BibleWriter( InternalBible ):
         verseByVerse = True
 
         # Write the plain text files
+        manifest = ExportManifest( os.path.join( outputFolder, BOOKS_MANIFEST_FILENAME ), getSettingsHash( ProgVersion, getSourceHash( BibleWriter ), columnWidth, verseByVerse ) )
         for BBB,bookObject in self.books.items():
-            pseudoUSFMData = bookObject._processedLines
-
+            bookHash = self.__getBookHash( BBB, bookObject )
+            if manifest.isUnchanged( BBB, bookHash ):
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Skipping unchanged {}").format( BBB ) )
+                continue
             filename = "BOS-BibleWriter-{}.txt".format( BBB )
             filepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
             if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( filepath ) )
             textBuffer = ""
             with open( filepath, 'wt' ) as myFile:
-                gotVP = None
-                for entry in pseudoUSFMData:
-                    marker, text = entry.getMarker(), entry.getCleanText()
-                    if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                        ignoredMarkers.add( marker )
-                    elif marker == 'h':
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "{}\n\n".format( text ) )
-                    elif marker in USFM_INTRODUCTION_MARKERS: # Drop the introduction
-                        ignoredMarkers.add( marker )
-                    elif marker in ('mt1','mt2','mt3','mt4', 'imt1','imt2','imt3','imt4',):
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n{}{}\n".format( ' '*((columnWidth-len(text))//2), text ) )
-                    elif marker in ('mte1','mte2','mte3','mte4', 'imte1','imte2','imte3','imte4',):
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n{}{}\n\n".format( ' '*((columnWidth-len(text))//2), text ) )
-                    elif marker == 'c':
-                        C = text
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n\nChapter {}".format( text ) )
-                    elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                        gotVP = text # Just remember it for now
-                    elif marker == 'v':
-                        V = text
-                        if gotVP: # this is the verse number to be published
-                            text = gotVP
-                            gotVP = None
+                for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bookObject ):
+                    if V is not None or C != '0': # Start of a chapter or verse
                         if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n{} ".format( text ) )
-                    elif marker in ('p','pi1','pi2','pi3','pi4', 's1','s2','s3','s4', 'ms1','ms2','ms3','ms4',): # Drop out these fields
-                        ignoredMarkers.add( marker )
-                    elif text:
-                        textBuffer += (' ' if textBuffer else '') + text
+                        if V is None: myFile.write( "\n\nChapter {}".format( C ) )
+                        else: myFile.write( "\n{} ".format( publishedV ) )
+
+                    for kind, entry in segments:
+                        marker, text = entry.getMarker(), entry.getCleanText()
+                        if kind in ('header','introduction',): # Just ignore these lines (and drop the introduction)
+                            ignoredMarkers.add( marker )
+                        elif marker in ('mt1','mt2','mt3','mt4',):
+                            if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
+                            myFile.write( "\n{}{}\n".format( ' '*((columnWidth-len(text))//2), text ) )
+                        elif marker in ('mte1','mte2','mte3','mte4',):
+                            if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
+                            myFile.write( "\n{}{}\n\n".format( ' '*((columnWidth-len(text))//2), text ) )
+                        elif marker in ('p','pi1','pi2','pi3','pi4', 's1','s2','s3','s4', 'ms1','ms2','ms3','ms4',): # Drop out these fields
+                            ignoredMarkers.add( marker )
+                        elif text:
+                            textBuffer += (' ' if textBuffer else '') + text
                 if textBuffer: myFile.write( "{}\n".format( textBuffer ) ) # Write the last bit
 
                     #if verseByVerse:
                         #myFile.write( "{} ({}): {!r} {!r} {}\n" \
                             #.format( entry.getMarker(), entry.getOriginalMarker(), entry.getAdjustedText(), entry.getCleanText(), entry.getExtras() ) )
+            manifest.setEntry( BBB, bookHash, [filepath] )
+        manifest.removeOtherEntries( self.books ) # Delete the files of any books which have been removed
 
         if ignoredMarkers:
             logging.info( "toText: Ignored markers were {}".format( ignoredMarkers ) )
             if BibleOrgSysGlobals.verbosityLevel > 2:
                 print( "  " + _("WARNING: Ignored toText markers were {}").format( ignoredMarkers ) )
 
-        # Now create a zipped collection
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping text files..." )
-        zf = zipfile.ZipFile( os.path.join( outputFolder, 'AllTextFiles.zip' ), 'w', compression=zipfile.ZIP_DEFLATED )
-        for filename in os.listdir( outputFolder ):
-            if not filename.endswith( '.zip' ):
-                filepath = os.path.join( outputFolder, filename )
-                zf.write( filepath, filename ) # Save in the archive without the path
-        zf.close()
+        # Now create a zipped collection (if anything has changed)
+        zipFilepath = os.path.join( outputFolder, 'AllTextFiles.zip' )
+        if manifest.hasChanged() or not os.path.isfile( zipFilepath ):
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping text files..." )
+            zf = zipfile.ZipFile( zipFilepath, 'w', compression=zipfile.ZIP_DEFLATED )
+            for filename in os.listdir( outputFolder ):
+                if not filename.endswith( '.zip' ) and filename != BOOKS_MANIFEST_FILENAME:
+                    filepath = os.path.join( outputFolder, filename )
+                    zf.write( filepath, filename ) # Save in the archive without the path
+            zf.close()
+        manifest.save()
 
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
             print( "  BibleWriter.toText finished successfully." )
@@ -1138,51 +1417,40 @@ class BibleWriter( InternalBible ):
 
         # Write the formatted text files
         for BBB,bookObject in self.books.items():
-            pseudoUSFMData = bookObject._processedLines
-
             filename = "BOS-BibleWriter-{}.md".format( BBB )
             filepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
             if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( filepath ) )
             ourGlobals = {}
             ourGlobals['nextFootnoteIndex'] = ourGlobals['nextEndnoteIndex'] = ourGlobals['nextXRefIndex'] = 0
             ourGlobals['footnoteMD'], ourGlobals['endnoteMD'], ourGlobals['xrefMD'] = [], [], []
-            C = V = '0'
             textBuffer = ""
             with open( filepath, 'wt' ) as myFile:
-                gotVP = None
-                for entry in pseudoUSFMData:
-                    marker, adjText, extras = entry.getMarker(), entry.getAdjustedText(), entry.getExtras()
-                    if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                        ignoredMarkers.add( marker )
-                    elif marker in ('mt1','mt2','mt3','mt4', 'imt1','imt2','imt3','imt4',):
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        level = int( marker[-1] )
-                        myFile.write( "\n{} {}\n".format( '#'*level, adjText ) )
-                    elif marker in ('mte1','mte2','mte3','mte4', 'imte1','imte2','imte3','imte4',):
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        level = int( marker[-1] )
-                        myFile.write( "\n{} {}\n\n".format( '#'*level, adjText ) )
-                    elif marker in ('s1','s2','s3','s4', 'is1','is2','is3','is4', 'ms1','ms2','ms3','ms4', ):
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        level = int( marker[-1] ) + 2 # so s1 becomes header #3
-                        myFile.write( "\n{} {}\n".format( '#'*level, adjText ) )
-                    elif marker == 'c':
-                        C, V = adjText, '0'
-                        if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n\nChapter {}".format( adjText ) )
-                    elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                        gotVP = adjText # Just remember it for now
-                    elif marker == 'v':
-                        V = adjText
-                        if gotVP: # this is the verse number to be published
-                            adjText = gotVP
-                            gotVP = None
+                for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bookObject ):
+                    if V is not None or C != '0': # Start of a chapter or verse
                         if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
-                        myFile.write( "\n{} ".format( adjText ) )
-                    elif marker in ('p',): # Drop out these fields
-                        ignoredMarkers.add( marker )
-                    elif adjText:
-                        textBuffer += (' ' if textBuffer else '') + __formatMarkdownVerseText( BBB, C, V, adjText, extras )
+                        if V is None: myFile.write( "\n\nChapter {}".format( C ) )
+                        else: myFile.write( "\n{} ".format( publishedV ) )
+
+                    for kind, entry in segments:
+                        marker, adjText, extras = entry.getMarker(), entry.getAdjustedText(), entry.getExtras()
+                        if kind == 'header': # Just ignore these lines
+                            ignoredMarkers.add( marker )
+                        elif marker in ('mt1','mt2','mt3','mt4', 'imt1','imt2','imt3','imt4',):
+                            if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
+                            level = int( marker[-1] )
+                            myFile.write( "\n{} {}\n".format( '#'*level, adjText ) )
+                        elif marker in ('mte1','mte2','mte3','mte4', 'imte1','imte2','imte3','imte4',):
+                            if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
+                            level = int( marker[-1] )
+                            myFile.write( "\n{} {}\n\n".format( '#'*level, adjText ) )
+                        elif marker in ('s1','s2','s3','s4', 'is1','is2','is3','is4', 'ms1','ms2','ms3','ms4', ):
+                            if textBuffer: myFile.write( "{}".format( textBuffer ) ); textBuffer = ""
+                            level = int( marker[-1] ) + 2 # so s1 becomes header #3
+                            myFile.write( "\n{} {}\n".format( '#'*level, adjText ) )
+                        elif marker in ('p',): # Drop out these fields
+                            ignoredMarkers.add( marker )
+                        elif adjText:
+                            textBuffer += (' ' if textBuffer else '') + __formatMarkdownVerseText( BBB, C, V if V is not None else '0', adjText, extras )
                 if textBuffer: myFile.write( "{}\n".format( textBuffer ) ) # Write the last bit
 
                     #if verseByVerse:
@@ -3072,9 +3340,13 @@ class BibleWriter( InternalBible ):
         self.__adjustControlDict( controlDict )
 
         ignoredMarkers, unhandledMarkers, unhandledBooks = set(), set(), []
+        manifest = ExportManifest( os.path.join( outputFolder, BOOKS_MANIFEST_FILENAME ), getSettingsHash( ProgVersion, getSourceHash( BibleWriter, MLWriter, ArchiveWriter ), sorted( controlDict.items() ) ) )
 
-        def writeUSXBook( BBB, bkData ):
-            """ Writes a book to the filesFolder. """
+        def writeUSXBook( BBB, bkData, archiveWriter=None ):
+            """
+            Writes a book to the filesFolder
+                (and also passes it to the archiveWriter if one is given).
+            """
 
             def handleInternalTextMarkersForUSX( originalText ):
                 """
@@ -3348,9 +3620,12 @@ class BibleWriter( InternalBible ):
             version = 2
             xtra = ' ' if version<2 else ''
             C = V = '0'
-            xw = MLWriter( BibleOrgSysGlobals.makeSafeFilename( USXNumber+USXAbbrev+".usx" ), filesFolder )
+            USXFilename = BibleOrgSysGlobals.makeSafeFilename( USXNumber+USXAbbrev+".usx" )
+            xw = MLWriter( USXFilename, filesFolder )
             xw.setHumanReadable()
+            xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
             xw.spaceBeforeSelfcloseTag = True
+            if archiveWriter is not None: xw.setArchiveWriter( archiveWriter )
             xw.start( lineEndings='w', writeBOM=True ) # Try to imitate Paratext output as closely as possible
             xw.writeLineOpen( 'usx', ('version','2.0') ) if version>=2 else xw.writeLineOpen( 'usx' )
             haveOpenPara = paraJustOpened = False
@@ -3447,6 +3722,7 @@ class BibleWriter( InternalBible ):
                 xw.writeLineClose( 'para' )
             xw.writeLineClose( 'usx' )
             xw.close( writeFinalNL=True ) # Try to imitate Paratext output as closely as possible
+            manifest.setEntry( BBB, self.__getBookHash( BBB, bkData ), [os.path.join( filesFolder, USXFilename )] )
             if validationSchema: return xw.validate( validationSchema )
         # end of toUSXXML.writeUSXBook
 
@@ -3462,13 +3738,32 @@ class BibleWriter( InternalBible ):
         #USXOutputFolder = os.path.join( "OutputFiles/", "USX output/" )
         #if not os.access( USXOutputFolder, os.F_OK ): os.mkdir( USXOutputFolder ) # Make the empty folder if there wasn't already one there
 
+        # The zip and gzipped tar archives are built as we go (if anything has changed)
+        bookHashes = OrderedDict( (BBB, self.__getBookHash( BBB, bookData )) for BBB,bookData in self.books.items() )
+        zipFilepath, tarFilepath = os.path.join( outputFolder, 'AllUSXFiles.zip' ), os.path.join( outputFolder, 'AllUSXFiles.qz' )
+        if validationSchema or not manifest.isAllUnchanged( bookHashes ) \
+        or not os.path.isfile( zipFilepath ) or not os.path.isfile( tarFilepath ):
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping and GZipping USX files..." )
+            archiveWriter = ArchiveWriter( zipFilepath, tarFilepath )
+        else: archiveWriter = None
+
         validationResults = ( 0, '', '', ) # xmllint result code, program output, error output
-        for BBB,bookData in self.books.items():
-            bookResults = writeUSXBook( BBB, bookData )
-            if validationSchema:
-                if bookResults[0] > validationResults[0]: validationResults = ( bookResults[0], validationResults[1], validationResults[2], )
-                if bookResults[1]: validationResults = ( validationResults[0], validationResults[1] + bookResults[1], validationResults[2], )
-                if bookResults[2]: validationResults = ( validationResults[0], validationResults[1], validationResults[2] + bookResults[2], )
+        try:
+            for BBB,bookData in self.books.items():
+                if not validationSchema and manifest.isUnchanged( BBB, bookHashes[BBB] ):
+                    if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Skipping unchanged {}").format( BBB ) )
+                    if archiveWriter is not None:
+                        for filepath in manifest.getFilepaths( BBB ): archiveWriter.addFile( filepath )
+                    continue
+                bookResults = writeUSXBook( BBB, bookData, archiveWriter )
+                if validationSchema:
+                    if bookResults[0] > validationResults[0]: validationResults = ( bookResults[0], validationResults[1], validationResults[2], )
+                    if bookResults[1]: validationResults = ( validationResults[0], validationResults[1] + bookResults[1], validationResults[2], )
+                    if bookResults[2]: validationResults = ( validationResults[0], validationResults[1], validationResults[2] + bookResults[2], )
+            if archiveWriter is not None: archiveWriter.close()
+        except Exception:
+            if archiveWriter is not None: archiveWriter.abort() # Don't leave partial archives behind
+            raise
 
         if ignoredMarkers:
             logging.info( "toUSXXML: Ignored markers were {}".format( ignoredMarkers ) )
@@ -3482,22 +3777,8 @@ class BibleWriter( InternalBible ):
             logging.warning( "toUSXXML: Unhandled books were {}".format( unhandledBooks ) )
             if BibleOrgSysGlobals.verbosityLevel > 1:
                 print( "  " + _("WARNING: Unhandled toUSXXML books were {}").format( unhandledBooks ) )
-
-        # Now create a zipped collection
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping USX files..." )
-        zf = zipfile.ZipFile( os.path.join( outputFolder, 'AllUSXFiles.zip' ), 'w', compression=zipfile.ZIP_DEFLATED )
-        for filename in os.listdir( filesFolder ):
-            #if not filename.endswith( '.zip' ):
-            filepath = os.path.join( filesFolder, filename )
-            zf.write( filepath, filename ) # Save in the archive without the path
-        zf.close()
-        # Now create the gzipped file
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  GZipping USX files..." )
-        tar = tarfile.open( os.path.join( outputFolder, 'AllUSXFiles.qz' ), 'w:gz' )
-        for filename in os.listdir( filesFolder ):
-            filepath = os.path.join( filesFolder, filename )
-            tar.add( filepath, filename )
-        tar.close()
+        manifest.removeOtherEntries( self.books ) # Delete the files of any books which have been removed
+        manifest.save()
 
         if validationSchema: return validationResults
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
@@ -3911,21 +4192,25 @@ class BibleWriter( InternalBible ):
         xw = MLWriter( filename, outputFolder )
         #xw = MLWriter( BibleOrgSysGlobals.makeSafeFilename( USFXNumber+USFXAbbrev+"_usfx.xml" ), outputFolder )
         xw.setHumanReadable( 'All' ) # Can be set to 'All', 'Header', or 'None' -- one output file went from None/Header=4.7MB to All=5.7MB
+        xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
         xw.spaceBeforeSelfcloseTag = True # Try to imitate Haiola output as closely as possible
-        #xw.start( lineEndings='w', writeBOM=True ) # Try to imitate Haiola output as closely as possible
-        xw.start()
-        xw.writeLineOpen( 'usfx', [('xmlns:xsi',"http://eBible.org/usfx.xsd"), ('xsi:noNamespaceSchemaLocation',"usfx-2013-08-05.xsd")] )
-        #print( self.ssfDict, self.settingsDict )
-        languageCode = None
-        if languageCode is None and 'Language' in self.settingsDict and len(self.settingsDict['Language'])==3:
-            languageCode = self.settingsDict['Language']
-        #if languageCode is None and 'Language' in self.ssfDict and len(self.ssfDict['Language'])==3:
-            #languageCode = self.ssfDict['Language']
-        if languageCode: xw.writeLineOpenClose( 'languageCode', languageCode )
-        for BBB,bookData in self.books.items(): # Process each Bible book
-            writeUSFXBook( xw, BBB, bookData )
-        xw.writeLineClose( 'usfx' )
-        xw.close()
+        with ArchiveWriter( os.path.join( outputFolder, filename+'.zip' ) ) as archiveWriter: # Zipped as it's written (and removed again if anything fails)
+            xw.setArchiveWriter( archiveWriter )
+            #xw.start( lineEndings='w', writeBOM=True ) # Try to imitate Haiola output as closely as possible
+            xw.start()
+            xw.writeLineOpen( 'usfx', [('xmlns:xsi',"http://eBible.org/usfx.xsd"), ('xsi:noNamespaceSchemaLocation',"usfx-2013-08-05.xsd")] )
+            #print( self.ssfDict, self.settingsDict )
+            languageCode = None
+            if languageCode is None and 'Language' in self.settingsDict and len(self.settingsDict['Language'])==3:
+                languageCode = self.settingsDict['Language']
+            #if languageCode is None and 'Language' in self.ssfDict and len(self.ssfDict['Language'])==3:
+                #languageCode = self.ssfDict['Language']
+            if languageCode: xw.writeLineOpenClose( 'languageCode', languageCode )
+            for BBB,bookData in self.books.items(): # Process each Bible book
+                writeUSFXBook( xw, BBB, bookData )
+            xw.writeLineClose( 'usfx' )
+            xw.close()
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping {} USFX file...".format( filename ) )
         if validationSchema: validationResults = xw.validate( validationSchema )
 
         if ignoredMarkers:
@@ -3941,13 +4226,6 @@ class BibleWriter( InternalBible ):
             if BibleOrgSysGlobals.verbosityLevel > 1:
                 print( "  " + _("WARNING: Unhandled toUSFXXML books were {}").format( unhandledBooks ) )
 
-        # Now create a zipped version
-        filepath = os.path.join( outputFolder, filename )
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping {} USFX file...".format( filename ) )
-        zf = zipfile.ZipFile( filepath+'.zip', 'w', compression=zipfile.ZIP_DEFLATED )
-        zf.write( filepath, filename )
-        zf.close()
-
         if validationSchema: return validationResults
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
             print( "  BibleWriter.toUSFXXML finished successfully." )
@@ -4691,6 +4969,7 @@ class BibleWriter( InternalBible ):
                 except KeyError: fn = 'Book-{}.osis'.format( BBB )
                 xw = MLWriter( BibleOrgSysGlobals.makeSafeFilename( fn ), outputFolder )
                 xw.setHumanReadable( 'All' ) # Can be set to 'All', 'Header', or 'None' -- one output file went from None/Header=4.7MB to All=5.7MB
+                xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
                 xw.start()
                 xw.writeLineOpen( 'osis', [('xmlns',OSISNameSpace), ('xmlns:xsi',"http://www.w3.org/2001/XMLSchema-instance"), ('xsi:schemaLocation',OSISNameSpace+' '+OSISSchemaLocation)] )
                 try: xlg = controlDict["xmlLanguage"]
@@ -4715,23 +4994,21 @@ class BibleWriter( InternalBible ):
             filename = BibleOrgSysGlobals.makeSafeFilename( controlDict["osisOutputFilename"] )
             xw = MLWriter( filename, outputFolder )
             xw.setHumanReadable( 'All' ) # Can be set to 'All', 'Header', or 'None' -- one output file went from None/Header=4.7MB to All=5.7MB
-            xw.start()
-            xw.writeLineOpen( 'osis', [('xmlns',OSISNameSpace), ('xmlns:xsi',"http://www.w3.org/2001/XMLSchema-instance"), ('xsi:schemaLocation',OSISNameSpace+' '+OSISSchemaLocation)] )
-            xw.writeLineOpen( 'osisText', [('osisRefWork',"Bible" ), ('xml:lang',controlDict["xmlLanguage"]), ('osisIDWork',controlDict["osisIDWork"])] )
-            xw.setSectionName( 'Header' )
-            writeHeader( xw )
-            xw.setSectionName( 'Main' )
-            for BBB,bookData in self.books.items(): # Process each Bible book
-                writeOSISBook( xw, BBB, bookData )
-            xw.writeLineClose( 'osisText' )
-            xw.writeLineClose( 'osis' )
-            xw.close()
-            # Now create a zipped version
-            filepath = os.path.join( outputFolder, filename )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping {} OSIS file...".format( filename ) )
-            zf = zipfile.ZipFile( filepath+'.zip', 'w', compression=zipfile.ZIP_DEFLATED )
-            zf.write( filepath, filename )
-            zf.close()
+            xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
+            with ArchiveWriter( os.path.join( outputFolder, filename+'.zip' ) ) as archiveWriter: # Zipped as it's written (and removed again if anything fails)
+                xw.setArchiveWriter( archiveWriter )
+                xw.start()
+                xw.writeLineOpen( 'osis', [('xmlns',OSISNameSpace), ('xmlns:xsi',"http://www.w3.org/2001/XMLSchema-instance"), ('xsi:schemaLocation',OSISNameSpace+' '+OSISSchemaLocation)] )
+                xw.writeLineOpen( 'osisText', [('osisRefWork',"Bible" ), ('xml:lang',controlDict["xmlLanguage"]), ('osisIDWork',controlDict["osisIDWork"])] )
+                xw.setSectionName( 'Header' )
+                writeHeader( xw )
+                xw.setSectionName( 'Main' )
+                for BBB,bookData in self.books.items(): # Process each Bible book
+                    writeOSISBook( xw, BBB, bookData )
+                xw.writeLineClose( 'osisText' )
+                xw.writeLineClose( 'osis' )
+                xw.close()
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Zipping {} OSIS file...".format( filename ) )
             if validationSchema: validationResults = xw.validate( validationSchema )
         else:
             logging.critical( "Unrecognized toOSIS control \"osisFiles\" = {!r}".format( controlDict['osisFiles'] ) )
@@ -4810,67 +5087,45 @@ class BibleWriter( InternalBible ):
                 unhandledBooks.append( BBB )
                 return
             writerObject.writeLineOpen( 'BIBLEBOOK', [('bnumber',BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber(BBB)), ('bname',BibleOrgSysGlobals.BibleBooksCodes.getEnglishName_NR(BBB)), ('bsname',OSISAbbrev)] )
-            haveOpenChapter, gotVP = False, None
-            C = V = '0'
-            for verseDataEntry in bkData._processedLines: # Process internal Bible data lines
-                marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getFullText(), verseDataEntry.getExtras()
-                #if marker in ('id', 'ide', 'h', 'toc1','toc2','toc3', ): pass # Just ignore these metadata markers
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c':
-                    C, V = text, '0'
-                    if haveOpenChapter:
-                        writerObject.writeLineClose ( 'CHAPTER' )
-                    writerObject.writeLineOpen ( 'CHAPTER', ('cnumber',text) )
-                    haveOpenChapter = True
-                elif marker == 'c#': # These are the markers that we can safely ignore for this export
-                    ignoredMarkers.add( marker )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = text # Just remember it for now
-                elif marker == 'v':
-                    V = text
-                    if gotVP: # this is the verse number to be published
-                        text = gotVP
-                        gotVP = None
-                    #print( "Text {!r}".format( text ) )
-                    if not text: logging.warning( "toZefaniaXML: Missing text for v" ); continue
-                    verseNumberString = text.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
+            haveOpenChapter = False
+            for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bkData ):
+                if V is None: # Start of a chapter (or else stuff before the first chapter)
+                    if C != '0':
+                        if haveOpenChapter:
+                            writerObject.writeLineClose ( 'CHAPTER' )
+                        writerObject.writeLineOpen ( 'CHAPTER', ('cnumber',C) )
+                        haveOpenChapter = True
+                elif not publishedV: logging.warning( "toZefaniaXML: Missing text for v" )
+                else:
+                    verseNumberString = publishedV.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
                     #writerObject.writeLineOpenClose ( 'VERS', verseText, ('vnumber',verseNumberString) )
 
-                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4',) \
-                or marker in USFM_INTRODUCTION_MARKERS \
-                or marker in ('s1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ):
-                    ignoredMarkers.add( marker )
-                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS:
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker in ('b', 'nb', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker == 'v~':
-                    if BibleOrgSysGlobals.debugFlag: assert( text or extras )
-                    #print( "Text {!r}".format( text ) )
-                    if not text: logging.warning( "toZefaniaXML: Missing text for v~" ); continue
-                    # TODO: We haven't stripped out character fields from within the verse -- not sure how Zefania handles them yet
-                    if not text: # this is an empty (untranslated) verse
-                        text = '- - -' # but we'll put in a filler
-                    writerObject.writeLineOpenClose ( 'VERS', text, ('vnumber',verseNumberString) )
-                elif marker == 'p~':
-                    if BibleOrgSysGlobals.debugFlag: assert( text or extras )
-                    # TODO: We haven't stripped out character fields from within the verse -- not sure how Zefania handles them yet
-                    if text: writerObject.writeLineOpenClose ( 'VERS', text )
-                else:
-                    if text:
-                        logging.error( "toZefania: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    if extras:
-                        logging.error( "toZefania: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
-                if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
-                    logging.critical( "toZefania: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
+                for kind, verseDataEntry in segments:
+                    marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getFullText(), verseDataEntry.getExtras()
+                    if kind in VERSE_STREAM_FORMATTING_KINDS:
+                        ignoredMarkers.add( marker )
+                    elif marker == 'v~':
+                        if BibleOrgSysGlobals.debugFlag: assert( text or extras )
+                        #print( "Text {!r}".format( text ) )
+                        if not text: logging.warning( "toZefaniaXML: Missing text for v~" ); continue
+                        # TODO: We haven't stripped out character fields from within the verse -- not sure how Zefania handles them yet
+                        if not text: # this is an empty (untranslated) verse
+                            text = '- - -' # but we'll put in a filler
+                        writerObject.writeLineOpenClose ( 'VERS', text, ('vnumber',verseNumberString) )
+                    elif marker == 'p~':
+                        if BibleOrgSysGlobals.debugFlag: assert( text or extras )
+                        # TODO: We haven't stripped out character fields from within the verse -- not sure how Zefania handles them yet
+                        if text: writerObject.writeLineOpenClose ( 'VERS', text )
+                    else:
+                        if text:
+                            logging.error( "toZefania: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        if extras:
+                            logging.error( "toZefania: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        unhandledMarkers.add( marker )
+                    if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
+                        logging.critical( "toZefania: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
             if haveOpenChapter:
                 writerObject.writeLineClose( 'CHAPTER' )
             writerObject.writeLineClose( 'BIBLEBOOK' )
@@ -4890,6 +5145,7 @@ class BibleWriter( InternalBible ):
         filename = BibleOrgSysGlobals.makeSafeFilename( zOFn )
         xw = MLWriter( filename, outputFolder )
         xw.setHumanReadable()
+        xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
         xw.start()
 # TODO: Some modules have <XMLBIBLE xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="zef2005.xsd" version="2.0.1.18" status='v' revision="1" type="x-bible" biblename="KJV+">
         try: zBN = controlDict['ZefaniaBibleName']
@@ -4983,74 +5239,51 @@ class BibleWriter( InternalBible ):
                 return
             writerObject.writeLineOpen( 'BIBLEBOOK', [('bnumber',BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber(BBB)), ('bname',BibleOrgSysGlobals.BibleBooksCodes.getEnglishName_NR(BBB)), ('bsname',OSISAbbrev)] )
             haveOpenChapter = haveOpenParagraph = False
-            gotVP = None
-            C = V = '0'
-            for verseDataEntry in bkData._processedLines: # Process internal Bible data lines
-                marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getFullText(), verseDataEntry.getExtras()
-                #if marker in ('id', 'ide', 'h', 'toc1','toc2','toc3', ): pass # Just ignore these metadata markers
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c':
-                    C, V = text, '0'
-                    if haveOpenParagraph:
-                        writerObject.writeLineClose ( 'PARAGRAPH' ); haveOpenParagraph = False
-                    if haveOpenChapter:
-                        writerObject.writeLineClose ( 'CHAPTER' )
-                    writerObject.writeLineOpen ( 'CHAPTER', ('cnumber',text) )
-                    haveOpenChapter = True
-                elif marker in ('c#',): # These are the markers that we can safely ignore for this export
-                    ignoredMarkers.add( marker )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = text # Just remember it for now
-                elif marker == 'v':
-                    V = text
-                    if gotVP: # this is the verse number to be published
-                        text = gotVP
-                        gotVP = None
-                    #print( "Text {!r}".format( text ) )
-                    if not text: logging.warning( "toHaggaiXML: Missing text for v" ); continue
-                    verseNumberString = text.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
+            for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bkData ):
+                if V is None: # Start of a chapter (or else stuff before the first chapter)
+                    if C != '0':
+                        if haveOpenParagraph:
+                            writerObject.writeLineClose ( 'PARAGRAPH' ); haveOpenParagraph = False
+                        if haveOpenChapter:
+                            writerObject.writeLineClose ( 'CHAPTER' )
+                        writerObject.writeLineOpen ( 'CHAPTER', ('cnumber',C) )
+                        haveOpenChapter = True
+                elif not publishedV: logging.warning( "toHaggaiXML: Missing text for v" )
+                else:
+                    verseNumberString = publishedV.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
                     #writerObject.writeLineOpenClose ( 'VERS', verseText, ('vnumber',verseNumberString) )
 
-                elif marker in ('p', 'pi1','pi2','pi3','pi4', ):
-                    if haveOpenParagraph:
-                        writerObject.writeLineClose ( 'PARAGRAPH' )
-                    writerObject.writeLineOpen ( 'PARAGRAPH' )
-                    haveOpenParagraph = True
-                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4', ) \
-                or marker in USFM_INTRODUCTION_MARKERS \
-                or marker in ('s1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ):
-                    ignoredMarkers.add( marker )
-                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS:
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker in ('b', 'nb', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker == 'v~':
-                    if BibleOrgSysGlobals.debugFlag: assert( text or extras )
-                    #print( "Text {!r}".format( text ) )
-                    if not text: logging.warning( "toHaggaiXML: Missing text for v~" ); continue
-                    # TODO: We haven't stripped out character fields from within the verse -- not sure how Haggai handles them yet
-                    if not text: # this is an empty (untranslated) verse
-                        text = '- - -' # but we'll put in a filler
-                    writerObject.writeLineOpenClose ( 'VERSE', text, ('vnumber',verseNumberString) )
-                elif marker == 'p~':
-                    if BibleOrgSysGlobals.debugFlag: assert( text or extras )
-                    # TODO: We haven't stripped out character fields from within the verse -- not sure how Haggai handles them yet
-                    if text: writerObject.writeLineOpenClose ( 'VERSE', text )
-                else:
-                    if text:
-                        logging.error( "toHaggai: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    if extras:
-                        logging.error( "toHaggai: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
-                if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
-                    logging.critical( "toHaggai: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
+                for kind, verseDataEntry in segments:
+                    marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getFullText(), verseDataEntry.getExtras()
+                    if marker in ('p', 'pi1','pi2','pi3','pi4', ):
+                        if haveOpenParagraph:
+                            writerObject.writeLineClose ( 'PARAGRAPH' )
+                        writerObject.writeLineOpen ( 'PARAGRAPH' )
+                        haveOpenParagraph = True
+                    elif kind in VERSE_STREAM_FORMATTING_KINDS:
+                        ignoredMarkers.add( marker )
+                    elif marker == 'v~':
+                        if BibleOrgSysGlobals.debugFlag: assert( text or extras )
+                        #print( "Text {!r}".format( text ) )
+                        if not text: logging.warning( "toHaggaiXML: Missing text for v~" ); continue
+                        # TODO: We haven't stripped out character fields from within the verse -- not sure how Haggai handles them yet
+                        if not text: # this is an empty (untranslated) verse
+                            text = '- - -' # but we'll put in a filler
+                        writerObject.writeLineOpenClose ( 'VERSE', text, ('vnumber',verseNumberString) )
+                    elif marker == 'p~':
+                        if BibleOrgSysGlobals.debugFlag: assert( text or extras )
+                        # TODO: We haven't stripped out character fields from within the verse -- not sure how Haggai handles them yet
+                        if text: writerObject.writeLineOpenClose ( 'VERSE', text )
+                    else:
+                        if text:
+                            logging.error( "toHaggai: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        if extras:
+                            logging.error( "toHaggai: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        unhandledMarkers.add( marker )
+                    if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
+                        logging.critical( "toHaggai: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
             if haveOpenParagraph:
                 writerObject.writeLineClose ( 'PARAGRAPH' )
             if haveOpenChapter:
@@ -5072,6 +5305,7 @@ class BibleWriter( InternalBible ):
         filename = BibleOrgSysGlobals.makeSafeFilename( hOFn )
         xw = MLWriter( filename, outputFolder )
         xw.setHumanReadable()
+        xw.setFastMode( not BibleOrgSysGlobals.debugFlag ) # Only check the tags and text when debugging
         xw.start()
 # TODO: Some modules have <XMLBIBLE xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:noNamespaceSchemaLocation="zef2005.xsd" version="2.0.1.18" status='v' revision="1" type="x-bible" biblename="KJV+">
         try: hBN = controlDict['HaggaiBibleName']
@@ -5144,67 +5378,44 @@ class BibleWriter( InternalBible ):
                 unhandledBooks.append( BBB )
                 return
             writerObject.writeLineOpen( 'b', ('n',bkData.getAssumedBookNames()[0]) )
-            haveOpenChapter, startedFlag, gotVP, accumulator = False, False, None, ""
-            C = V = '0'
-            for verseDataEntry in bkData._processedLines: # Process internal Bible data lines
-                marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getCleanText(), verseDataEntry.getExtras()
-                #print( marker, repr(text) )
-                #if text: assert( text[0] != ' ' )
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c':
-                    if accumulator:
-                        writerObject.writeLineOpenClose ( 'v', accumulator, ('n',verseNumberString) )
-                        accumulator = ""
-                    if haveOpenChapter:
-                        writerObject.writeLineClose ( 'c' )
-                    C, V = text, '0'
-                    writerObject.writeLineOpen ( 'c', ('n',text) )
-                    haveOpenChapter = True
-                elif marker in ('c#',): # These are the markers that we can safely ignore for this export
-                    ignoredMarkers.add( marker )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = text # Just remember it for now
-                elif marker == 'v':
-                    V = text
-                    if gotVP: # this is the verse number to be published
-                        text = gotVP
-                        gotVP = None
+            haveOpenChapter, startedFlag, accumulator = False, False, ""
+            for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bkData ):
+                if V is None: # Start of a chapter (or else stuff before the first chapter)
+                    if C != '0':
+                        if accumulator:
+                            writerObject.writeLineOpenClose ( 'v', accumulator, ('n',verseNumberString) )
+                            accumulator = ""
+                        if haveOpenChapter:
+                            writerObject.writeLineClose ( 'c' )
+                        writerObject.writeLineOpen ( 'c', ('n',C) )
+                        haveOpenChapter = True
+                else:
                     startedFlag = True
                     if accumulator:
                         writerObject.writeLineOpenClose ( 'v', accumulator, ('n',verseNumberString) )
                         accumulator = ""
-                    #print( "Text {!r}".format( text ) )
-                    if not text: logging.warning( "toOpenSongXML: Missing text for v" ); continue
-                    verseNumberString = text.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
+                    if not publishedV: logging.warning( "toOpenSongXML: Missing text for v" )
+                    else: verseNumberString = publishedV.replace('<','').replace('>','').replace('"','') # Used below but remove anything that'll cause a big XML problem later
 
-                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4', ) \
-                or marker in USFM_INTRODUCTION_MARKERS \
-                or marker in ('s1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ):
-                    ignoredMarkers.add( marker )
-                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS:
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker in ('b', 'nb', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not text and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker in ('v~', 'p~',):
-                    if BibleOrgSysGlobals.debugFlag: assert( text or extras )
-                    if not text: # this is an empty (untranslated) verse
-                        text = '- - -' # but we'll put in a filler
-                    if startedFlag: accumulator += (' ' if accumulator else '') + BibleOrgSysGlobals.makeSafeXML( text )
-                else:
-                    if text:
-                        logging.warning( "toOpenSong: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    if extras:
-                        logging.warning( "toOpenSong: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
-                if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
-                    logging.critical( "toOpenSong: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
+                for kind, verseDataEntry in segments:
+                    marker, text, extras = verseDataEntry.getMarker(), verseDataEntry.getCleanText(), verseDataEntry.getExtras()
+                    if kind in VERSE_STREAM_FORMATTING_KINDS:
+                        ignoredMarkers.add( marker )
+                    elif kind == 'text':
+                        if BibleOrgSysGlobals.debugFlag: assert( text or extras )
+                        if not text: # this is an empty (untranslated) verse
+                            text = '- - -' # but we'll put in a filler
+                        if startedFlag: accumulator += (' ' if accumulator else '') + BibleOrgSysGlobals.makeSafeXML( text )
+                    else:
+                        if text:
+                            logging.warning( "toOpenSong: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        if extras:
+                            logging.warning( "toOpenSong: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        unhandledMarkers.add( marker )
+                    if extras and marker not in ('v~','p~',) and marker not in ignoredMarkers:
+                        logging.critical( "toOpenSong: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
             if accumulator:
                 writerObject.writeLineOpenClose ( 'v', accumulator, ('n',verseNumberString) )
             if haveOpenChapter:
@@ -6159,7 +6370,7 @@ class BibleWriter( InternalBible ):
 
 
 
-    def toMySword( self, outputFolder=None, controlDict=None ):
+    def toMySword( self, outputFolder=None, controlDict=None, inMemoryFlag=False ):
         """
         Using settings from the given control file,
             converts the USFM information to a UTF-8 MySword file.
@@ -6229,7 +6440,7 @@ class BibleWriter( InternalBible ):
                         # Stay one line behind (because paragraph indicators get appended to the previous line)
                         if ourGlobals['lastBCV'] is not None \
                         and ourGlobals['lastLine']: # don't bother writing blank (unfinished?) verses
-                            sqlObject.execute( 'INSERT INTO "Bible" VALUES(?,?,?,?)', \
+                            sqlObject.addRow( 'Bible', \
                                 (ourGlobals['lastBCV'][0],ourGlobals['lastBCV'][1],ourGlobals['lastBCV'][2],ourGlobals['lastLine']) )
                             lineCount += 1
                         ourGlobals['lastLine'] = composedLine
@@ -6246,7 +6457,7 @@ class BibleWriter( InternalBible ):
 
             # Write the last line of the file
             if ourGlobals['lastLine']: # don't bother writing blank (unfinished?) verses
-                sqlObject.execute( 'INSERT INTO "Bible" VALUES(?,?,?,?)', \
+                sqlObject.addRow( 'Bible', \
                     (ourGlobals['lastBCV'][0],ourGlobals['lastBCV'][1],ourGlobals['lastBCV'][2],ourGlobals['lastLine']) )
                 lineCount += 1
         # end of toMySword.writeMSBook
@@ -6281,59 +6492,52 @@ class BibleWriter( InternalBible ):
         else: filename = "export"
         if not filename.endswith( extension ): filename += extension # Make sure that we have the right file extension
         filepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
-        if os.path.exists( filepath ): os.remove( filepath )
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( filepath ) )
-        conn = sqlite3.connect( filepath )
-        cursor = conn.cursor()
-
-        # First write the settings Details table
-        exeStr = 'CREATE TABLE Details (Description NVARCHAR(255), Abbreviation NVARCHAR(50), Comments TEXT, Version TEXT, VersionDate DATETIME, PublishDate DATETIME, RightToLeft BOOL, OT BOOL, NT BOOL, Strong BOOL'
-        if 'CustomCSS' in self.settingsDict: exeStr += ', CustomCSS TEXT'
-        exeStr += ')'
-        cursor.execute( exeStr )
-        values = []
-        value = ''
-        if 'Description' in self.settingsDict: value = self.settingsDict['Description']
-        elif 'description' in self.settingsDict: value = self.settingsDict['description']
-        elif self.name: value = self.name
-        values.append( value); value = ''
-        if self.abbreviation: value = self.abbreviation
-        elif 'WorkAbbreviation' in self.settingsDict: value = self.settingsDict['WorkAbbreviation']
-        else: value = self.name[:3].upper()
-        values.append( value ); value = ''
-        if 'Comments' in self.settingsDict: value = self.settingsDict['Comments']
-        values.append( value ); value = ''
-        if 'Version' in self.settingsDict: value = self.settingsDict['Version']
-        values.append( value ); value = ''
-        if 'VersionDate' in self.settingsDict: value = self.settingsDict['VersionDate']
-        values.append( value ); value = ''
-        if 'PublishDate' in self.settingsDict: value = self.settingsDict['PublishDate']
-        values.append( value ); value = False
-        if 'RightToLeft' in self.settingsDict: value = self.settingsDict['RightToLeft']
-        values.append( value ); value = False
-        if testament=='OT' or testament=='BOTH': value = True
-        values.append( value ); value = False
-        if testament=='NT' or testament=='BOTH': value = True
-        values.append( value ); value = False
-        if 'Strong' in self.settingsDict: value = self.settingsDict['Strong']
-        values.append( value ); value = ''
-        if 'CustomCSS' in self.settingsDict: value = self.settingsDict['CustomCSS']
-        exeStr = 'INSERT INTO "Details" VALUES(' + '?,'*(len(values)-1) + '?)'
-        #print( exeStr, values )
-        cursor.execute( exeStr, values )
-
-        # Now create and fill the Bible table
-        cursor.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT, Primary Key(Book,Chapter,Verse))' )
-        conn.commit() # save (commit) the changes
-        BBB, lineCount = startBBB, 0
-        while True: # Write each Bible book in the KJV order
-            writeMSBook( cursor, BBB, mySettings )
-            conn.commit() # save (commit) the changes
-            handledBooks.append( BBB )
-            if BBB == endBBB: break
-            BBB = BOS.getNextBookCode( BBB )
-        conn.commit() # save (commit) the changes
-        cursor.close()
+        with SQLiteBulkWriter( filepath, inMemoryFlag=inMemoryFlag ) as sqlWriter: # Replaces any existing file (and removes it again if anything fails)
+            # First write the settings Details table
+            exeStr = 'CREATE TABLE Details (Description NVARCHAR(255), Abbreviation NVARCHAR(50), Comments TEXT, Version TEXT, VersionDate DATETIME, PublishDate DATETIME, RightToLeft BOOL, OT BOOL, NT BOOL, Strong BOOL'
+            if 'CustomCSS' in self.settingsDict: exeStr += ', CustomCSS TEXT'
+            exeStr += ')'
+            sqlWriter.execute( exeStr )
+            values = []
+            value = ''
+            if 'Description' in self.settingsDict: value = self.settingsDict['Description']
+            elif 'description' in self.settingsDict: value = self.settingsDict['description']
+            elif self.name: value = self.name
+            values.append( value); value = ''
+            if self.abbreviation: value = self.abbreviation
+            elif 'WorkAbbreviation' in self.settingsDict: value = self.settingsDict['WorkAbbreviation']
+            else: value = self.name[:3].upper()
+            values.append( value ); value = ''
+            if 'Comments' in self.settingsDict: value = self.settingsDict['Comments']
+            values.append( value ); value = ''
+            if 'Version' in self.settingsDict: value = self.settingsDict['Version']
+            values.append( value ); value = ''
+            if 'VersionDate' in self.settingsDict: value = self.settingsDict['VersionDate']
+            values.append( value ); value = ''
+            if 'PublishDate' in self.settingsDict: value = self.settingsDict['PublishDate']
+            values.append( value ); value = False
+            if 'RightToLeft' in self.settingsDict: value = self.settingsDict['RightToLeft']
+            values.append( value ); value = False
+            if testament=='OT' or testament=='BOTH': value = True
+            values.append( value ); value = False
+            if testament=='NT' or testament=='BOTH': value = True
+            values.append( value ); value = False
+            if 'Strong' in self.settingsDict: value = self.settingsDict['Strong']
+            values.append( value ); value = ''
+            if 'CustomCSS' in self.settingsDict: value = self.settingsDict['CustomCSS']
+            exeStr = 'INSERT INTO "Details" VALUES(' + '?,'*(len(values)-1) + '?)'
+            #print( exeStr, values )
+            sqlWriter.execute( exeStr, values )
+
+            # Now create and fill the Bible table
+            sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT, Primary Key(Book,Chapter,Verse))' )
+            BBB, lineCount = startBBB, 0
+            while True: # Write each Bible book in the KJV order
+                writeMSBook( sqlWriter, BBB, mySettings )
+                handledBooks.append( BBB )
+                if BBB == endBBB: break
+                BBB = BOS.getNextBookCode( BBB )
 
         if mySettings['unhandledMarkers']:
             logging.warning( "BibleWriter.toMySword: Unhandled markers were {}".format( mySettings['unhandledMarkers'] ) )
@@ -6360,7 +6564,7 @@ class BibleWriter( InternalBible ):
 
 
 
-    def toESword( self, outputFolder=None, controlDict=None ):
+    def toESword( self, outputFolder=None, controlDict=None, inMemoryFlag=False ):
         """
         Using settings from the given control file,
             converts the USFM information to a UTF-8 e-Sword file.
@@ -6720,7 +6924,7 @@ class BibleWriter( InternalBible ):
                             # Stay one line behind (because paragraph indicators get appended to the previous line)
                             if ourGlobals['lastBCV'] is not None \
                             and ourGlobals['lastLine']: # don't bother writing blank (unfinished?) verses
-                                sqlObject.execute( 'INSERT INTO "Bible" VALUES(?,?,?,?)', \
+                                sqlObject.addRow( 'Bible', \
                                     (ourGlobals['lastBCV'][0],ourGlobals['lastBCV'][1],ourGlobals['lastBCV'][2],ourGlobals['lastLine']) )
                                 lineCount += 1
                         ourGlobals['lastLine'] = composedLine
@@ -6737,7 +6941,7 @@ class BibleWriter( InternalBible ):
 
             # Write the last line of the file
             if ourGlobals['lastLine']: # don't bother writing blank (unfinished?) verses
-                sqlObject.execute( 'INSERT INTO "Bible" VALUES(?,?,?,?)', \
+                sqlObject.addRow( 'Bible', \
                     (ourGlobals['lastBCV'][0],ourGlobals['lastBCV'][1],ourGlobals['lastBCV'][2],ourGlobals['lastLine']) )
                 lineCount += 1
         # end of toESword.writeESwordBook
@@ -6772,62 +6976,55 @@ class BibleWriter( InternalBible ):
         else: filename = "export"
         if not filename.endswith( extension ): filename += extension # Make sure that we have the right file extension
         filepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
-        if os.path.exists( filepath ): os.remove( filepath )
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( filepath ) )
-        conn = sqlite3.connect( filepath )
-        cursor = conn.cursor()
-
-        # First write the settings Details table
-        exeStr = 'CREATE TABLE Details (Description NVARCHAR(255), Abbreviation NVARCHAR(50), Comments TEXT, Version TEXT, VersionDate DATETIME, PublishDate DATETIME, RightToLeft BOOL, OT BOOL, NT BOOL, Strong BOOL'
-        if 'CustomCSS' in self.settingsDict: exeStr += ', CustomCSS TEXT'
-        exeStr += ')'
-        cursor.execute( exeStr )
-        values = []
-        value = ''
-        if 'Description' in self.settingsDict: value = self.settingsDict['Description']
-        elif 'description' in self.settingsDict: value = self.settingsDict['description']
-        elif self.name: value = self.name
-        values.append( value); value = ''
-        if self.abbreviation: value = self.abbreviation
-        elif 'WorkAbbreviation' in self.settingsDict: value = self.settingsDict['WorkAbbreviation']
-        else: value = self.name[:3].upper()
-        values.append( value ); value = ''
-        if 'Comments' in self.settingsDict: value = self.settingsDict['Comments']
-        values.append( value ); value = ''
-        if 'Version' in self.settingsDict: value = self.settingsDict['Version']
-        values.append( value ); value = ''
-        if 'VersionDate' in self.settingsDict: value = self.settingsDict['VersionDate']
-        values.append( value ); value = ''
-        if 'PublishDate' in self.settingsDict: value = self.settingsDict['PublishDate']
-        values.append( value ); value = False
-        if 'RightToLeft' in self.settingsDict: value = self.settingsDict['RightToLeft']
-        values.append( value ); value = False
-        if testament=='OT' or testament=='BOTH': value = True
-        values.append( value ); value = False
-        if testament=='NT' or testament=='BOTH': value = True
-        values.append( value ); value = False
-        if 'Strong' in self.settingsDict: value = self.settingsDict['Strong']
-        values.append( value ); value = ''
-        if 'CustomCSS' in self.settingsDict: value = self.settingsDict['CustomCSS']
-        exeStr = 'INSERT INTO "Details" VALUES(' + '?,'*(len(values)-1) + '?)'
-        #print( exeStr, values )
-        cursor.execute( exeStr, values )
-
-        # Now create and fill the Bible table
-        cursor.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
-        conn.commit() # save (commit) the changes
-        BBB, lineCount = startBBB, 0
-        while True: # Write each Bible book in the KJV order
-            writeESwordBook( cursor, BBB, mySettings )
-            conn.commit() # save (commit) the changes
-            handledBooks.append( BBB )
-            if BBB == endBBB: break
-            BBB = BOS.getNextBookCode( BBB )
-
-        # Now create the index
-        cursor.execute( 'CREATE INDEX BookChapterVerseIndex ON Bible (Book, Chapter, Verse)' )
-        conn.commit() # save (commit) the changes
-        cursor.close()
+        with SQLiteBulkWriter( filepath, inMemoryFlag=inMemoryFlag ) as sqlWriter: # Replaces any existing file (and removes it again if anything fails)
+            # First write the settings Details table
+            exeStr = 'CREATE TABLE Details (Description NVARCHAR(255), Abbreviation NVARCHAR(50), Comments TEXT, Version TEXT, VersionDate DATETIME, PublishDate DATETIME, RightToLeft BOOL, OT BOOL, NT BOOL, Strong BOOL'
+            if 'CustomCSS' in self.settingsDict: exeStr += ', CustomCSS TEXT'
+            exeStr += ')'
+            sqlWriter.execute( exeStr )
+            values = []
+            value = ''
+            if 'Description' in self.settingsDict: value = self.settingsDict['Description']
+            elif 'description' in self.settingsDict: value = self.settingsDict['description']
+            elif self.name: value = self.name
+            values.append( value); value = ''
+            if self.abbreviation: value = self.abbreviation
+            elif 'WorkAbbreviation' in self.settingsDict: value = self.settingsDict['WorkAbbreviation']
+            else: value = self.name[:3].upper()
+            values.append( value ); value = ''
+            if 'Comments' in self.settingsDict: value = self.settingsDict['Comments']
+            values.append( value ); value = ''
+            if 'Version' in self.settingsDict: value = self.settingsDict['Version']
+            values.append( value ); value = ''
+            if 'VersionDate' in self.settingsDict: value = self.settingsDict['VersionDate']
+            values.append( value ); value = ''
+            if 'PublishDate' in self.settingsDict: value = self.settingsDict['PublishDate']
+            values.append( value ); value = False
+            if 'RightToLeft' in self.settingsDict: value = self.settingsDict['RightToLeft']
+            values.append( value ); value = False
+            if testament=='OT' or testament=='BOTH': value = True
+            values.append( value ); value = False
+            if testament=='NT' or testament=='BOTH': value = True
+            values.append( value ); value = False
+            if 'Strong' in self.settingsDict: value = self.settingsDict['Strong']
+            values.append( value ); value = ''
+            if 'CustomCSS' in self.settingsDict: value = self.settingsDict['CustomCSS']
+            exeStr = 'INSERT INTO "Details" VALUES(' + '?,'*(len(values)-1) + '?)'
+            #print( exeStr, values )
+            sqlWriter.execute( exeStr, values )
+
+            # Now create and fill the Bible table
+            sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+            BBB, lineCount = startBBB, 0
+            while True: # Write each Bible book in the KJV order
+                writeESwordBook( sqlWriter, BBB, mySettings )
+                handledBooks.append( BBB )
+                if BBB == endBBB: break
+                BBB = BOS.getNextBookCode( BBB )
+
+            # Now create the index
+            sqlWriter.addIndex( 'CREATE INDEX BookChapterVerseIndex ON Bible (Book, Chapter, Verse)' ) # Created after all the rows are loaded
 
         if mySettings['unhandledMarkers']:
             logging.warning( "BibleWriter.toESword: Unhandled markers were {}".format( mySettings['unhandledMarkers'] ) )
@@ -6898,46 +7095,25 @@ class BibleWriter( InternalBible ):
                 unhandledBooks.append( BBB )
                 return
 
-            pseudoUSFMData = bookObject._processedLines
-            started, gotVP, accumulator = False, None, "" # Started flag ignores fields in the book introduction
-            C = V = '0'
-            for entry in pseudoUSFMData:
-                marker, text = entry.getMarker(), entry.getCleanText()
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c': C, V = text, '0'
-                elif marker in ('c#',):
-                    ignoredMarkers.add( marker )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = text # Just remember it for now
-                elif marker == 'v':
-                    V = text
-                    if gotVP: # this is the verse number to be published
-                        text = gotVP
-                        gotVP = None
+            started, accumulator = False, "" # Started flag ignores fields in the book introduction
+            for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bookObject ):
+                if V is not None: # Start of a verse
                     started = True
-                    if accumulator: writer.write( "{}\n".format( accumulator ) ); accumulator = ""
-                    writer.write( "$$ {} {}:{}\n".format( bookCode, C, text ) )
+                    if accumulator: writer.write( "{}\n".format( accumulator ) )
+                    writer.write( "$$ {} {}:{}\n".format( bookCode, C, publishedV ) )
+                    accumulator = plainText if plainText else ""
 
-                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4', ) \
-                or marker in USFM_INTRODUCTION_MARKERS \
-                or marker in ('s1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ):
-                    ignoredMarkers.add( marker )
-                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS:
-                    if BibleOrgSysGlobals.debugFlag: assert( not text )
-                    ignoredMarkers.add( marker )
-                elif marker in ('b', 'nb', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not text )
-                    ignoredMarkers.add( marker )
-                elif marker in ('v~', 'p~',):
-                    if started: accumulator += (' ' if accumulator else '') + text
-                else:
-                    if text:
-                        logging.error( "toSwordSearcher: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
+                for kind, entry in segments:
+                    marker, text = entry.getMarker(), entry.getCleanText()
+                    if kind in VERSE_STREAM_FORMATTING_KINDS:
+                        ignoredMarkers.add( marker )
+                    elif kind == 'text': # The verse text is already in plainText
+                        if started and V is None: accumulator += (' ' if accumulator else '') + text # after a chapter marker
+                    else:
+                        if text:
+                            logging.error( "toSwordSearcher: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        unhandledMarkers.add( marker )
                 #if extras and marker not in ('v~','p~',): logging.critical( "toSwordSearcher: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
             if accumulator: writer.write( "{}\n".format( accumulator ) )
         # end of toSwordSearcher:writeSSBook
@@ -7025,9 +7201,8 @@ class BibleWriter( InternalBible ):
                 except AttributeError: # Don't know how to encode this book
                     logging.warning( "toDrupalBible: ignoring book: {}".format( BBB ) )
                     continue
-                for entry in bookObject._processedLines:
-                    marker = entry.getMarker()
-                    if marker == 'c': numChapters = entry.getCleanText()
+                for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bookObject ):
+                    if V is None and C != '0': numChapters = C
                 if numChapters:
                     writer.write( "{}|{}|{}|{}\n".format( bookCode, bookObject.assumedBookName, bookCode, numChapters ) )
             writer.write( '\n*Context\n#Book,Chapter,Verse,LineMark,Context\n' )
@@ -7064,60 +7239,39 @@ class BibleWriter( InternalBible ):
                 logging.error( "writeDrupalBibleBook: don't know how to encode {}".format( BBB ) )
                 unhandledBooks.append( BBB )
                 return
-            started, gotVP, accumulator = False, None, "" # Started flag ignores fields in the book introduction
+            started, accumulator = False, "" # Started flag ignores fields in the book introduction
             linemark = ''
-            C = V = '0'
-            for entry in bookObject._processedLines:
-                marker, text = entry.getMarker(), entry.getAdjustedText()
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c':
+            outputC = outputV = '0' # The last chapter and (published) verse numbers
+            for C, V, publishedV, plainText, segments, notes in self.__getVerseStream( BBB, bookObject ):
+                if V is not None or C != '0': # Start of a chapter or verse
                     if accumulator:
-                        writer.write( "{}|{}|{}|{}|{}\n".format( bookCode, C, V, linemark, doDrupalTextFormat( accumulator ) ) )
+                        writer.write( "{}|{}|{}|{}|{}\n".format( bookCode, outputC, outputV, linemark, doDrupalTextFormat( accumulator ) ) )
                         accumulator, linemark = "", ''
-                    C, V = text, '0'
-                elif marker in ( 'c#', ): # Just ignore these unneeded fields
-                    ignoredMarkers.add( marker )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = text # Just remember it for now
-                elif marker == 'v':
-                    started = True
-                    if accumulator:
-                        writer.write( "{}|{}|{}|{}|{}\n".format( bookCode, C, V, linemark, doDrupalTextFormat( accumulator ) ) )
-                        accumulator, linemark = "", ''
-                    V = text
-                    if gotVP: # this is the verse number to be published
-                        V = gotVP
-                        gotVP = None
-                    if not V.isdigit(): # Remove verse bridges
-                        #print( "toDrupalBible V was", repr(V) )
-                        Vcopy, V = V, ''
-                        for char in Vcopy:
-                            if not char.isdigit(): break
-                            V += char
-                        #print( "toDrupalBible V is now", repr(V) )
-
-                elif marker in ('mt1','mt2','mt3','mt4', 'mte1','mte2','mte3','mte4', 'ms1','ms2','ms3','ms4', ) \
-                or marker in USFM_INTRODUCTION_MARKERS \
-                or marker in ('s1','s2','s3','s4', 'r','sr','mr', 'd','sp','cd', 'cl','lit', ):
-                    ignoredMarkers.add( marker )
-                elif marker in USFM_BIBLE_PARAGRAPH_MARKERS:
-                    if BibleOrgSysGlobals.debugFlag: assert( not text )
-                    ignoredMarkers.add( marker )
-                elif marker in ('b', 'nb', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not text )
-                    ignoredMarkers.add( marker )
-                elif marker in ('v~', 'p~', 'tr',):
-                    if started: accumulator += (' ' if accumulator else '') + text
-                else:
-                    if text:
-                        logging.warning( "toDrupalBible: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
-                #if extras and marker not in ('v~','p~',): logging.critical( "toDrupalBible: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
-            if accumulator: writer.write( "{}|{}|{}|{}|{}\n".format( bookCode, C, V, linemark, doDrupalTextFormat( accumulator ) ) )
+                    if V is None: outputC, outputV = C, '0'
+                    else: # it's a verse
+                        started = True
+                        outputV = publishedV
+                        if not outputV.isdigit(): # Remove verse bridges
+                            #print( "toDrupalBible V was", repr(outputV) )
+                            Vcopy, outputV = outputV, ''
+                            for char in Vcopy:
+                                if not char.isdigit(): break
+                                outputV += char
+                            #print( "toDrupalBible V is now", repr(outputV) )
+
+                for kind, entry in segments:
+                    marker, text = entry.getMarker(), entry.getAdjustedText()
+                    if kind in VERSE_STREAM_FORMATTING_KINDS:
+                        ignoredMarkers.add( marker )
+                    elif kind == 'text' or marker == 'tr':
+                        if started: accumulator += (' ' if accumulator else '') + text
+                    else:
+                        if text:
+                            logging.warning( "toDrupalBible: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(text) ) )
+                            #if BibleOrgSysGlobals.debugFlag: halt
+                        unhandledMarkers.add( marker )
+                    #if extras and marker not in ('v~','p~',): logging.critical( "toDrupalBible: extras not handled for {} at {} {}:{}".format( marker, BBB, C, V ) )
+            if accumulator: writer.write( "{}|{}|{}|{}|{}\n".format( bookCode, outputC, outputV, linemark, doDrupalTextFormat( accumulator ) ) )
         # end of toDrupalBible:writeDrupalBibleBook
 
 
@@ -7171,6 +7325,11 @@ class BibleWriter( InternalBible ):
 
         Although this code could be made to handle different fonts,
             ImageMagick convert is unable to handle complex scripts.  :(
+
+        The page layouts (lists of ImageMagick commands) are all worked out first
+            and then the pages are rendered by a pool of worker threads (each running convert).
+        A hash of each rendered page is saved in the output folder
+            so that pages which haven't changed since the last run aren't rendered again.
         """
         import unicodedata
         if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toPhotoBible..." )
@@ -7229,9 +7388,10 @@ class BibleWriter( InternalBible ):
         verseDigitSubstitutions = { '0':'⁰', '1':'¹', '2':'²', '3':'³', '4':'⁴', '5':'⁵', '6':'⁶', '7':'⁷', '8':'⁸', '9':'⁹', }
 
 
-        def renderCommands( commandList, jpegFilepath ):
+        def renderCommands( commandList, jpegFilepath, sourceFilepath=None ):
             """
-            Given a list of commands, apply them to the existing JPEG file.
+            Given a list of commands, apply them to the existing JPEG file
+                (or to the source file if one is given, writing the result to the JPEG file).
 
             Returns an errorcode.
             """
@@ -7241,7 +7401,7 @@ class BibleWriter( InternalBible ):
             if sys.platform.startswith( 'win' ): parameters = [ 'imconvert.exe' ]
             else: parameters = ['/usr/bin/timeout', '10s', '/usr/bin/convert' ]
             parameters.extend( commandList )
-            parameters.append( jpegFilepath ) # input file
+            parameters.append( sourceFilepath if sourceFilepath else jpegFilepath ) # input file
             parameters.append( jpegFilepath ) # output file
             #print( "Parameters", repr(parameters) )
             myProcess = subprocess.Popen( parameters, stdout=subprocess.PIPE, stderr=subprocess.PIPE )
@@ -7313,8 +7473,8 @@ class BibleWriter( InternalBible ):
 
         def renderPage( BBB, C, bookName, text, jpegFilepath, fontsize=None ):
             """
-            Creates a "blank" JPEG file
-                and then writes lines across the top of the background image.
+            Works out the commands to write lines across the top of the "blank" background image
+                and adds them to the list of pages to be rendered.
 
             Returns any left-over text.
 
@@ -7325,9 +7485,6 @@ class BibleWriter( InternalBible ):
 
             #print( "\nrenderPage( {}, {}, {}, {}, {}, {} )".format( BBB, C, repr(bookName), repr(text), jpegFilepath, fontsize ) )
 
-            # Create the blank file
-            shutil.copy( blankFilepath, jpegFilepath ) # Copy it under its own name
-
             if fontsize is None: fontsize = defaultFontSize
             leading = int( defaultLeadingRatio * fontsize )
             #print( "Leading is {} for {}".format( leading, fontsize ) )
@@ -7485,8 +7642,8 @@ class BibleWriter( InternalBible ):
                 #print( outputLineCount, maxLines, outputLineCount>=maxLines )
                 if outputLineCount >= maxLines: break
 
-            # Now render all those commands at once
-            renderCommands( totalCommands, jpegFilepath ) # Do all the rendering at once
+            # Save all those commands so the page can be rendered (in one go) later
+            pendingPages.append( (BBB, totalCommands, jpegFilepath) )
 
             # Find the left-over text
             leftoverText = ''
@@ -7554,9 +7711,31 @@ class BibleWriter( InternalBible ):
         # end of toPhotoBible.renderChapterText
 
 
+        def renderPendingPage( pendingPage ):
+            """
+            Renders one page onto a copy of the blank image (called by the worker threads).
+
+            Returns a 5-tuple with BBB, the page key and hash, the errorcode, and the elapsed time in seconds.
+            """
+            BBB, commandList, jpegFilepath, pageKey, pageHash = pendingPage
+            startTime = time.time()
+            returnCode = renderCommands( commandList, jpegFilepath, blankFilepath )
+            return BBB, pageKey, pageHash, returnCode, time.time() - startTime
+        # end of toPhotoBible.renderPendingPage
+
+
         # This is the main code of toPhotoBible
-        # Write the JPG files in the appropriate folders
+        renderInfoFilepath = os.path.join( outputFolder, PHOTOBIBLE_RENDER_INFO_FILENAME )
+        try:
+            with open( renderInfoFilepath, 'rt', encoding='utf-8' ) as renderInfoFile:
+                previousPageHashes = json.load( renderInfoFile )['pageHashes']
+        except (OSError, ValueError, KeyError, TypeError): previousPageHashes = {}
+        pendingPages = [] # Filled by renderPage with (BBB, commandList, jpegFilepath) 3-tuples
+        bookStats = OrderedDict() # Keys are BBB, entries are dictionaries
+
+        # Work out the layouts of all the JPG files in the appropriate folders
         for BBB,bookObject in self.books.items(): # BBB is our three-character book code
+            bookStartTime, numPendingPagesBefore = time.time(), len(pendingPages)
             pseudoUSFMData = bookObject._processedLines
 
             # Find a suitable bookname
@@ -7671,6 +7850,53 @@ class BibleWriter( InternalBible ):
                     #if verseByVerse:
                         #myFile.write( "{} ({}): {!r} {!r} {}\n" \
                             #.format( entry.getMarker(), entry.getOriginalMarker(), entry.getAdjustedText(), entry.getCleanText(), entry.getExtras() ) )
+            bookStats[BBB] = { 'pages':len(pendingPages)-numPendingPagesBefore, 'unchanged':0, 'failed':0,
+                                'layoutSeconds':round( time.time()-bookStartTime, 3 ), 'renderSeconds':0, 'finishedAfterSeconds':0 }
+
+        # Now decide which pages actually need rendering
+        pageHashes, renderJobs = {}, []
+        for BBB,commandList,jpegFilepath in pendingPages:
+            pageKey = os.path.relpath( jpegFilepath, outputFolder )
+            pageHash = hashlib.md5( repr( (blankFilepath,commandList) ).encode( 'utf-8' ) ).hexdigest()
+            if previousPageHashes.get( pageKey ) == pageHash and os.path.isfile( jpegFilepath ):
+                pageHashes[pageKey] = pageHash
+                bookStats[BBB]['unchanged'] += 1
+            else: renderJobs.append( (BBB, commandList, jpegFilepath, pageKey, pageHash) )
+        currentPageKeys = set( pageHashes ) | set( job[3] for job in renderJobs )
+        for pageKey in previousPageHashes: # Remove any pages left over from last time (e.g., if a chapter now needs fewer pages)
+            if pageKey not in currentPageKeys:
+                try: os.remove( os.path.join( outputFolder, pageKey ) )
+                except OSError: pass
+        pendingPages.clear() # The render jobs have everything that they need now
+
+        # Render the pages using all of our CPUs
+        numWorkers = max( 1, min( BibleOrgSysGlobals.maxProcesses, len(renderJobs) ) )
+        if BibleOrgSysGlobals.verbosityLevel > 1:
+            print( "  " + _("Rendering {} PhotoBible pages ({} unchanged) with {} worker(s)...").format( len(renderJobs), len(pageHashes), numWorkers ) )
+        pagesLeft = OrderedDict( (BBB,bookStats[BBB]['pages']-bookStats[BBB]['unchanged']) for BBB in bookStats )
+        renderStartTime = time.time()
+        # Threads are enough because the actual work is done by the convert processes
+        #   (and doAllExports might be running us in a daemon process which isn't allowed to have child processes)
+        pool = ThreadPool( numWorkers ) if numWorkers > 1 else None
+        try:
+            for BBB, pageKey, pageHash, returnCode, renderSeconds in ( pool.imap_unordered( renderPendingPage, renderJobs ) \
+                                                                            if pool else map( renderPendingPage, renderJobs ) ):
+                bookStats[BBB]['renderSeconds'] += renderSeconds
+                if returnCode: bookStats[BBB]['failed'] += 1 # So it will be rendered again next time
+                else: pageHashes[pageKey] = pageHash
+                pagesLeft[BBB] -= 1
+                if not pagesLeft[BBB]:
+                    bookStats[BBB]['renderSeconds'] = round( bookStats[BBB]['renderSeconds'], 3 )
+                    bookStats[BBB]['finishedAfterSeconds'] = round( time.time()-renderStartTime, 3 )
+                    if BibleOrgSysGlobals.verbosityLevel > 2:
+                        print( "    " + _("Finished rendering {} ({} pages) after {:.1f} seconds").format( BBB, bookStats[BBB]['pages'], time.time()-renderStartTime ) )
+        finally:
+            if pool: pool.close(); pool.join()
+            with open( renderInfoFilepath, 'wt', encoding='utf-8' ) as renderInfoFile:
+                json.dump( { 'pageHashes':pageHashes, 'bookStats':bookStats }, renderInfoFile, indent=1 )
+        for BBB,stats in bookStats.items():
+            logging.info( "toPhotoBible: {} {}".format( BBB, stats ) )
+            if stats['failed']: logging.error( "toPhotoBible: Failed to render {} of {} pages for {}".format( stats['failed'], stats['pages'], BBB ) )
 
         if ignoredMarkers:
             logging.info( "toPhotoBible: Ignored markers were {}".format( ignoredMarkers ) )
@@ -7690,7 +7916,7 @@ class BibleWriter( InternalBible ):
                 zf = zipfile.ZipFile( os.path.join( outputFolder, subset+'PhotoBible.zip' ), 'w', compression=zipfile.ZIP_DEFLATED )
                 for root, dirs, files in os.walk( loadFolder ):
                     for filename in files:
-                        if not filename.endswith( '.zip' ):
+                        if not filename.endswith( '.zip' ) and filename != PHOTOBIBLE_RENDER_INFO_FILENAME:
                             #print( repr(loadFolder), repr(root), repr(dirs), repr(files) )
                             #print( repr(os.path.relpath(os.path.join(root, filename))), repr(os.path.join(loadFolder, '..')) )
                             #print( os.path.join(root,filename), os.path.relpath(os.path.join(root, filename), os.path.join(loadFolder, '..')) ) # Save in the archive without the path
@@ -7717,14 +7943,257 @@ class BibleWriter( InternalBible ):
 
 
 
-    def toODF( self, outputFolder=None ):
+    def __writeODFBook( self, BBB, bookObject, writer, exportName, ignoredMarkers, unhandledMarkers ):
+        """
+        Walks through the book and puts the text into the writer
+            using the paragraph and character styles (from the ODF_..._STYLE_DICTs) for each USFM marker.
+
+        This is shared by toODF and toODT so the writer can be either an ODTWriter object
+            or a LibreOffice document (through UNO) which has the same methods, i.e.,
+            setUserField, startColumns, startParagraph, addText, addLineBreak, addNote and paragraphCount.
+        A character style name of None means the default character style.
+
+        Any ignored or unhandled markers are added to the given sets.
+        """
+        characterStyleName = None # The current character style for any unformatted text (like a LibreOffice text cursor)
+
+        def insertFormattedText( givenText, extras, defaultCharacterStyleName ):
+            """
+            Format character codes within the text into ODF.
+            """
+            #print( "insertFormattedText( {}, {}, {} )".format( repr(givenText), len(extras), defaultCharacterStyleName ) )
+            if BibleOrgSysGlobals.debugFlag: assert( givenText or extras )
+
+            def processNote( noteType, rawFootnoteContents ):
+                """
+                Inserts the footnote or endnote into the ODF document.
+
+                NOTE: The first parameter here already has the /f or (/fe) and /f* (or /fe*) removed.
+
+                \\f + \\fr 1:20 \\ft Su ka kaluwasan te Nawumi ‘keupianan,’ piru ka kaluwasan te Mara ‘masakit se geyinawa.’\\f* (Backslashes are shown doubled here)
+                """
+                assert( noteType in ('fn','en',) )
+                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( rawFootnoteContents, includeInitialText=True )
+                segments = []
+                if markerList: # We found some internal footnote markers
+                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
+                        if marker is None: pass # just a caller
+                        elif marker in ODF_NOTE_STYLE_DICT: segments.append( (ODF_NOTE_STYLE_DICT[marker], txt) )
+                        else:
+                            logging.error( "{}.processNote didn't handle {} {}:{} {} marker: {}".format( exportName, BBB, C, V, noteType, marker ) )
+                else: # no internal markers found
+                    bits = rawFootnoteContents.split( ' ', 1 )
+                    if len(bits)==2: # assume the caller is the first bit
+                        if BibleOrgSysGlobals.debugFlag: assert( len(bits[0]) == 1 ) # Normally a +
+                        segments.append( ('Footnote Text', bits[1]) )
+                    else: # no idea really what the format was
+                        segments.append( ('Footnote Text', rawFootnoteContents) )
+                writer.addNote( 'footnote' if noteType=='fn' else 'endnote', "Bible Footnote" if noteType=='fn' else "Bible Endnote", segments )
+            # end of __writeODFBook.processNote
+
+            def processCrossReference( rawXRef ):
+                """
+                Inserts the cross-reference into the ODF document as a footnote.
+
+                NOTE: The parameter here already has the /x and /x* removed.
+
+                \\x - \\xo 2:2: \\xt Lib 19:9-10; Diy 24:19.\\xt*\\x* (Backslashes are shown doubled here)
+                """
+                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( rawXRef, includeInitialText=True )
+                segments = []
+                if markerList:
+                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
+                        if marker is None: pass # just a caller
+                        elif marker in ODF_XREF_STYLE_DICT: segments.append( (ODF_XREF_STYLE_DICT[marker], txt) )
+                        else:
+                            logging.error( "{}.processCrossReference didn't handle {} {}:{} xref marker: {}".format( exportName, BBB, C, V, marker ) )
+                else: # there's no USFM markers at all in the xref --  presumably a caller and then straight text
+                    if rawXRef.startswith('+ ') or rawXRef.startswith('- '): xrefText = rawXRef[2:].strip()
+                    else: xrefText = rawXRef.strip() # don't really know what it is -- assume it's all just text
+                    segments.append( ('Footnote Text', xrefText) )
+                writer.addNote( 'footnote', "Verse Cross Reference", segments )
+            # end of __writeODFBook.processCrossReference
+
+            def insertText( text, styleName ):
+                """
+                Inserts the text and remembers the character style (like a LibreOffice text cursor).
+                """
+                nonlocal characterStyleName
+                characterStyleName = styleName
+                writer.addText( text, styleName )
+            # end of __writeODFBook.insertText
+
+            def handleTextSubsegment( textSegment ):
+                """
+                Insert a text segment, complete with the correct character styles if any.
+                """
+                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( textSegment, includeInitialText=True )
+                if markerList: # we found character formatting within the text
+                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
+                        if marker in ODF_CHAR_STYLE_DICT and nextSignificantChar in (' ','+'): # it's an opening marker
+                            insertText( txt, ODF_CHAR_STYLE_DICT[marker] )
+                        elif marker == 'k' and nextSignificantChar in (' ','+'):
+                            insertText( txt, 'Main Entry Keyword' if BBB in ('GLS',) else 'Keyword Text' )
+                        elif marker in ODF_CHAR_STYLE_DICT and nextSignificantChar=='-': # it's a closing nesting marker
+                            assert(context )
+                            insertText( txt, ODF_CHAR_STYLE_DICT[context[0]] )
+                        elif marker is None or (marker=='no' and nextSignificantChar==' ') or not context:
+                            insertText( txt, defaultCharacterStyleName ) # Normal text
+                        elif marker in ('ca','va',) and nextSignificantChar in (' ','+'): # it's an opening marker
+                            insertText( '('+txt+')', 'Alternative Chapter Number' if marker=='ca' else 'Alternative Verse Number' )
+                        elif marker in ODF_CHAR_STYLE_DICT and not nextSignificantChar: # it's at the end of a line
+                            assert( not txt )
+                            logging.warning( "{}: ignored blank {} field at end of line in {} {}:{}".format( exportName, marker, BBB, C, V ) )
+                        else:
+                            logging.critical( "{}: lost text in {} field in {} {}:{} {}".format( exportName, marker, BBB, C, V, repr(textSegment) ) )
+                            unhandledMarkers.add( "{} (char)".format( marker ) )
+                elif textSegment: # No character formatting here
+                    writer.addText( textSegment, characterStyleName )
+            # end of __writeODFBook.handleTextSubsegment
+
+            def handleTextSegment( textSegment ):
+                """
+                Insert a text segment, handling any manual new line markers.
+                """
+                subsegments = textSegment.split( '//' )
+                for j, subsegment in enumerate( subsegments ):
+                    if j: writer.addLineBreak()
+                    handleTextSubsegment( subsegment )
+            # end of __writeODFBook.handleTextSegment
+
+            # insertFormattedText main code
+            if extras and any( extra[0] in ('fn','en','xr','fig',) for extra in extras ): # find any footnotes and cross-references
+                lastIndex = 0
+                for extraType, extraIndex, extraText, cleanExtraText in extras:
+                    handleTextSegment( givenText[lastIndex:extraIndex] )
+                    if extraType in ('fn','en',): processNote( extraType, extraText )
+                    elif extraType == 'xr': processCrossReference( extraText )
+                    elif extraType == 'fig': logging.critical( "{}: figure not handled yet at {} {}:{} {}".format( exportName, BBB, C, V, repr(extraText) ) )
+                    elif extraType in ('str','sem','vp',): pass # don't know how to encode these yet (and vp is already converted to a newline field)
+                    else:
+                        logging.error( "{}: lost {} extra in {} {}:{} {}".format( exportName, extraType, BBB, C, V, repr(extraText) ) )
+                        unhandledMarkers.add( "{} (extra)".format( extraType ) )
+                    lastIndex = extraIndex
+                handleTextSegment( givenText[lastIndex:] )
+            else: # no useful extras like footnotes, etc.
+                handleTextSegment( givenText )
+        # end of __writeODFBook.insertFormattedText
+
+        def insertParagraph( paragraphStyleName, text, extras ):
+            """
+            Given some text and the paragraph stylename
+                start a new paragraph and insert the text.
+            """
+            writer.startParagraph( paragraphStyleName )
+            if text or extras: insertFormattedText( text, extras, None )
+        # end of __writeODFBook.insertParagraph
+
+        try: headerField = bookObject.longTOCName
+        except AttributeError: headerField = bookObject.assumedBookName
+        startingNewParagraphFlag = True
+        inTextParagraph = False
+        gotVP = None
+        C = V = '0'
+        for entry in bookObject._processedLines:
+            marker, adjText, extras = entry.getMarker(), entry.getAdjustedText(), entry.getExtras()
+            #print( exportName, BBB, C, V, marker, repr(adjText) )
+            if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
+            if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
+                ignoredMarkers.add( marker )
+
+            elif marker == 'c':
+                if C == '0' and headerField: writer.setUserField( 'BookHeader', headerField ) # For the running header
+                C, V = adjText, '0'
+                if C == '1': # It's the beginning of the actual Bible text -- make a new double-column section
+                    if writer.paragraphCount: # leave a space between the introduction and the chapter text
+                        writer.startParagraph( 'Blank Line Paragraph' )
+                    writer.startColumns( 2 )
+                    startingNewParagraphFlag = True
+                    inTextParagraph = False
+            elif marker == 'c#':
+                if not inTextParagraph: # Not all translations have paragraph markers
+                    writer.startParagraph( 'Prose Paragraph' )
+                    inTextParagraph = startingNewParagraphFlag = True
+                writer.addText( C, 'Chapter Number' )
+                writer.addText( ' ', 'Chapter Number Postspace' )
+                characterStyleName = 'Verse Text'
+            elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
+                gotVP = adjText # Just remember it for now
+            elif marker == 'v':
+                V = adjText
+                if gotVP: # this is the verse number to be published
+                    adjText = gotVP
+                    gotVP = None
+                if not inTextParagraph: # Not all translations have paragraph markers
+                    writer.startParagraph( 'Prose Paragraph' )
+                    inTextParagraph = startingNewParagraphFlag = True
+                if V != '1':
+                    if not startingNewParagraphFlag: writer.addText( ' ', 'Verse Number Prespace' )
+                    writer.addText( adjText, 'Verse Number' )
+                    writer.addText( ' ', 'Verse Number Postspace' )
+                    characterStyleName = 'Verse Text'
+                    startingNewParagraphFlag = False
+
+            elif marker in ODF_TITLE_STYLE_DICT:
+                insertParagraph( ODF_TITLE_STYLE_DICT[marker], adjText, extras )
+            elif marker in ('ms1','ms2','ms3','ms4',):
+                insertParagraph( "Major Section Heading {}".format( marker[-1] ), adjText, extras )
+                inTextParagraph = False
+            elif marker in ODF_IP_STYLE_DICT:
+                insertParagraph( ODF_IP_STYLE_DICT[marker], adjText, extras )
+            elif marker in ('s1','s2','s3','s4', 'is1','is2','is3','is4',):
+                if adjText or extras: #OEB has blank s fields
+                    styleName = "Introduction " if marker[0]=='i' else ""
+                    styleName += "Section Heading {}".format( marker[-1] )
+                    insertParagraph( styleName, adjText, extras )
+                inTextParagraph = False
+            elif marker in ('r','sr','mr',):
+                styleName = {'r':'Section CrossReference', 'sr':'Section Reference Range', 'mr':'Major Section Reference Range'}[marker]
+                insertParagraph( styleName, adjText, extras )
+                inTextParagraph = False
+            elif marker in ODF_MISC_STYLE_DICT: # things like d, sp, cl that have text
+                insertParagraph( ODF_MISC_STYLE_DICT[marker], adjText, extras )
+                inTextParagraph = False
+            elif marker in ODF_PQ_STYLE_DICT: # things like p, q1 that don't have text
+                startingNewParagraphFlag = True
+                insertParagraph( ODF_PQ_STYLE_DICT[marker], adjText, extras )
+                inTextParagraph = True
+            elif marker in ('li1','li2','li3','li4', 'ili1','ili2','ili3','ili4',):
+                styleName = "Introduction " if marker[0]=='i' else ""
+                styleName += "List Item {}".format( marker[-1] )
+                insertParagraph( styleName, adjText, extras )
+            elif marker in ('v~','p~',):
+                if BibleOrgSysGlobals.debugFlag: assert( inTextParagraph )
+                if adjText or extras: insertFormattedText( adjText, extras, None )
+                startingNewParagraphFlag = False
+            elif marker in ( 'b', 'ib', ):
+                if BibleOrgSysGlobals.debugFlag: assert( not adjText and not extras )
+                writer.startParagraph( 'Blank Line Paragraph' if marker=='b' else 'Introduction Blank Line Paragraph' )
+            elif marker in ('nb','cp',): # We can safely ignore these markers for the ODF exports
+                ignoredMarkers.add( marker )
+            else:
+                if adjText:
+                    logging.error( "{}: lost text in {} field in {} {}:{} {}".format( exportName, marker, BBB, C, V, repr(adjText) ) )
+                if extras:
+                    logging.error( "{}: lost extras in {} field in {} {}:{}".format( exportName, marker, BBB, C, V ) )
+                unhandledMarkers.add( marker )
+    # end of BibleWriter.__writeODFBook
+
+
+
+    def toODF( self, outputFolder=None, libreOfficePool=None, bookTimeout=300 ):
         """
         Write the internal Bible format out into Open Document Format (ODF)
             suitable for opening in LibreOffice or OpenOffice.
+
+        The books are made by a pool of headless LibreOffice workers (see LibreOfficePool.py)
+            each with a timeout (in seconds).
+        A libreOfficePool can be given (so that it can be used for many Bibles)
+            otherwise one is started (with maxProcesses workers) and closed again at the end.
         """
         import uno
         from com.sun.star.lang import IllegalArgumentException
-        from time import sleep
+        from com.sun.star.container import NoSuchElementException
 
         if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toODF..." )
         if BibleOrgSysGlobals.debugFlag: assert( self.books )
@@ -7743,77 +8212,13 @@ class BibleWriter( InternalBible ):
         #ODF_HARD_SPACE = uno.getConstantByName( "com.sun.star.text.ControlCharacter.HARD_SPACE" )
         #ODF_APPEND_PARAGRAPH = uno.getConstantByName( "com.sun.star.text.ControlCharacter.APPEND_PARAGRAPH" )
 
-        weStartedLibreOffice = False
-        DEFAULT_OPENOFFICE_PORT = 2002
-        if 0: # Seems to work better is this is started manually (as a special user) and left running
-            # Start LibreOffice
-            #       Either: /usr/bin/libreoffice --accept="socket,host=localhost,port=2002;urp;StarOffice.ServiceManager"
-            #       Or: /usr/bin/libreoffice --accept="socket,host=localhost,port=2002;urp;StarOffice.ServiceManager" --norestore --nologo --headless
-            if BibleOrgSysGlobals.debugFlag and debuggingThisModule:
-                os.system( '/usr/bin/libreoffice --accept="socket,host=localhost,port={};urp;StarOffice.ServiceManager" &'.format( DEFAULT_OPENOFFICE_PORT ) )
-            else: # run LibreOffice headless
-                os.system( '/usr/bin/libreoffice --accept="socket,host=localhost,port={};urp;StarOffice.ServiceManager" --norestore --nologo --headless &'.format( DEFAULT_OPENOFFICE_PORT ) )
-            weStartedLibreOffice = True
-            if 0:
-                parameters = ['/usr/bin/libreoffice', '--accept="socket,host=localhost,port={};urp;StarOffice.ServiceManager"'.format( DEFAULT_OPENOFFICE_PORT ),'--norestore','--nologo','--headless']
-                print( "Parameters", repr(parameters) )
-                myProcess = subprocess.Popen( parameters, stdout=subprocess.PIPE, stderr=subprocess.PIPE )
-                sleep( 5 ) # Wait 50msec
-                #programOutputBytes, programErrorOutputBytes = myProcess.communicate()
-                #returnCode = myProcess.returncode
-                #print( "returnCode", returnCode )
-                # Why does this give:
-                #   context = resolver.resolve("uno:socket,host=localhost,port=2002;urp;StarOffice.ComponentContext")
-                #   BibleWriter.NoConnectException: Connector : couldn't connect to socket (Success)
-            sleep( 1 ) # Wait a second to get sure that LibreOffice has time to start up
-
-        # Set-up LibreOffice
-        localContext = uno.getComponentContext()
-        urlResolver = localContext.ServiceManager.createInstanceWithContext( "com.sun.star.bridge.UnoUrlResolver", localContext )
-        componentContext = urlResolver.resolve( "uno:socket,host=localhost,port={};urp;StarOffice.ComponentContext".format( DEFAULT_OPENOFFICE_PORT ) )
-        serviceManager = componentContext.ServiceManager
-        frameDesktop = serviceManager.createInstanceWithContext( "com.sun.star.frame.Desktop", componentContext )
-        #model = frameDesktop.getCurrentComponent()
-
         # Locate our empty template file (with all the styles there already) that we'll start from
         templateFilepath = os.path.join( os.getcwd(), defaultControlFolder, "BibleBook.ott" )
         sourceURL = "file://{}".format( templateFilepath ) if startWithTemplate else "private:factory/swriter"
 
         ignoredMarkers, unhandledMarkers = set(), set()
 
-        titleODFStyleDict = {'imt1':'Introduction Major Title 1', 'imt2':'Introduction Major Title 2', 'imt3':'Introduction Major Title 3', 'imt4':'Introduction Major Title 4',
-                          'imte1':'Introduction Major Title at Ending 1','imte2':'Introduction Major Title at Ending 2', 'imte3':'Introduction Major Title at Ending 3', 'imte4':'Introduction Major Title at Ending 4',
-                          'mt1':'Major Title 1','mt2':'Major Title 2', 'mt3':'Major Title 3', 'mt4':'Major Title 4',
-                          'mte1':'Major Title at Ending 1','mte2':'Major Title at Ending 2', 'mte3':'Major Title at Ending 3', 'mte4':'Major Title at Ending 4', }
-        ipODFStyleDict = {'ip':'Introduction Paragraph', 'ipi':'Introduction Paragraph Indented', 'ipr':'Introduction Right Aligned Paragraph',
-                        'im':'Introduction Flush Left Paragraph', 'imi':'Introduction Indented Flush Left Paragraph',
-                        'iex':'Introduction Explanation', 'iot':'Introduction Outline Title',
-                        'io1':'Introduction Outline Entry 1', 'io2':'Introduction Outline Entry 2', 'io3':'Introduction Outline Entry 3', 'io4':'Introduction Outline Entry 4',
-                        'iq1':'Introduction Poetry Paragraph 1','iq2':'Introduction Poetry Paragraph 2','iq3':'Introduction Poetry Paragraph 3','iq4':'Introduction Poetry Paragraph 4',
-                        'ipq':'Introduction Quote Paragraph', 'imq':'Introduction Flush Left Quote Paragraph', }
-
-        pqODFStyleDict = {'p':'Prose Paragraph', 'm':'Flush Left Paragraph',
-                        'pmo':'Embedded Opening Paragraph', 'pm':'Embedded Paragraph', 'pmc':'Embedded Closing Paragraph',
-                        'pmr':'Embedded Refrain Paragraph',
-                        'pi1':'Indented Prose Paragraph 1','pi2':'Indented Prose Paragraph 2','pi3':'Indented Prose Paragraph 3','pi4':'Indented Prose Paragraph 4',
-                        'mi':'Indented Flush Left Paragraph', 'cls':'Closure Paragraph',
-                        'pc':'Centered Prose Paragraph', 'pr':'Right Aligned Prose Paragraph',
-                        'ph1':'Hanging Prose Paragraph 1','ph2':'Hanging Prose Paragraph 2','ph3':'Hanging Prose Paragraph 3','ph4':'Hanging Prose Paragraph 4',
-
-                        'q1':'Poetry Paragraph 1','q2':'Poetry Paragraph 2','q3':'Poetry Paragraph 3','q4':'Poetry Paragraph 4',
-                        'qr':'Right Aligned Poetry Paragraph', 'qc':'Centered Poetry Paragraph',
-                        'qm1':'Embedded Poetry Paragraph 1','qm2':'Embedded Poetry Paragraph 2','qm3':'Embedded Poetry Paragraph 3','qm4':'Embedded Poetry Paragraph 4'}
-
-        miscODFStyleDict = {'d':'Descriptive Title', 'sp':'Speaker Identification', 'cl':'Chapter Label', }
-
-        charODFStyleDict = {'bk':'Book Name', 'ior':'Introduction Outline Reference',
-                            'add':'Added Words', 'nd':'Divine Name', 'wj':'Words of Jesus', 'sig':'Author Signature',
-                            'rq':'Inline Quotation Reference', 'qs':'Selah Text',
-                            'w':'Wordlist Entry', 'iqt':'Introduction Quoted Text',
-                            'em':'Emphasis Text', 'bd':'Bold Text', 'it':'Italic Text', 'bdit':'Bold Italic Text', 'sc':'Small Caps Text', }
-
-
-        def setupStyles( styleFamilies ):
+        def setupStyles( document, styleFamilies ):
             """
             Defines new styles that are not in the template (yet).
 
@@ -8475,446 +8880,106 @@ class BibleWriter( InternalBible ):
         # end of toODF.setupStyles
 
 
-        def insertFormattedODFText( BBB, C, V, givenText, extras, documentText, textCursor, defaultCharacterStyleName ):
+        class UNODocumentWriter:
             """
-            Format character codes within the text into ODF
+            Puts the text into a LibreOffice document (through UNO)
+                with the same methods as an ODTWriter object (as used by BibleWriter.__writeODFBook).
             """
-            #print( "insertFormattedODFText( {}, {}, {} )".format( repr(givenText), len(extras), ourGlobals.keys() ) )
-            if BibleOrgSysGlobals.debugFlag: assert( givenText or extras )
-
-            def handleExtras( text, extras ):
-                """
-                Returns the MD text with footnotes and xrefs processed.
-                It also accumulates MD in ourGlobals for the end notes.
-                """
-                def liveCV( CV ):
-                    """
-                    Given a CV text (in the same book), make it live
-                        e.g., given 1:3 return #C1V3
-                            given 17:4-9 return #C17V4
-                            given 1:1-3:19 return #C1V1
-                    """
-                    #print( "formatODFVerseText.liveCV( {} )".format( repr(CV) ) )
-                    if len(CV) < 3: return ''
-                    if CV and CV[-1]==':': CV = CV[:-1]
-
-                    result = 'C' + CV.strip().replace( ':', 'V')
-                    for bridgeChar in ('-', '–', '—'): # hyphen, endash, emdash
-                        ix = result.find( bridgeChar )
-                        if ix != -1: result = result[:ix] # Remove verse bridges
-                    #print( " returns", result )
-                    if BibleOrgSysGlobals.debugFlag and (result.count('C')>1 or result.count('V')>1): halt
-                    return '#' + result
-                # end of insertFormattedODFText.liveCV
-
+            def __init__( self, document ):
+                self.document, self.documentText = document, document.Text
+                self.initialTextCursor = self.textCursor = self.documentText.createTextCursor()
+                self.firstParagraphFlag = True # Don't want a blank paragraph at the start of the document (or section)
+                self.paragraphCount = 0
+
+            def setCharacterStyle( self, cursor, characterStyleName ):
+                try: cursor.setPropertyValue( "CharStyleName", characterStyleName if characterStyleName else "Default Style" )
+                except IllegalArgumentException:
+                    logging.critical( "toODF: {!r} character style doesn't seem to exist".format( characterStyleName ) )
+
+            def setUserField( self, fieldName, value ):
+                if not startWithTemplate:
+                    logging.critical( "toODF: Don't know how to set up running header user text field programmatically yet" ); return
+                try: self.document.TextFieldMasters.getByName( "com.sun.star.text.FieldMaster.User." + fieldName ).setPropertyValue( "Content", value )
+                except (IllegalArgumentException, NoSuchElementException):
+                    logging.critical( "toODF: Can't set up {} user text field".format( fieldName ) )
+
+            def startColumns( self, columnCount ):
+                # Create a new text section and insert it into the document
+                section = self.document.createInstance( "com.sun.star.text.TextSection" )
+                self.documentText.insertTextContent( self.initialTextCursor, section, False )
+                columns = self.document.createInstance( "com.sun.star.text.TextColumns" )
+                columns.setColumnCount( columnCount )
+                columns.setPropertyValue( "AutomaticDistance", 300 ) # Not sure of the unit here
+                section.setPropertyValue( "TextColumns", columns )
+                self.textCursor = self.documentText.createTextCursorByRange( section.getAnchor() ) # So that future inserts go in here
+                self.firstParagraphFlag = True
+
+            def startParagraph( self, paragraphStyleName ):
+                if not self.firstParagraphFlag:
+                    self.documentText.insertControlCharacter( self.textCursor, ODF_PARAGRAPH_BREAK, False )
+                try: self.textCursor.setPropertyValue( "ParaStyleName", paragraphStyleName )
+                except IllegalArgumentException:
+                    logging.critical( "toODF: {!r} paragraph style doesn't seem to exist".format( paragraphStyleName ) )
+                self.firstParagraphFlag = False
+                self.paragraphCount += 1
 
-            def processNote( noteType, rawFootnoteContents, documentText, textCursor ):
-                """
-                Inserts the footnote or endnote into the ODF document.
+            def addText( self, text, characterStyleName=None ):
+                if not text: return
+                self.setCharacterStyle( self.textCursor, characterStyleName )
+                self.documentText.insertString( self.textCursor, text, False )
 
-                NOTE: The first parameter here already has the /f or (/fe) and /f* (or /fe*) removed.
+            def addLineBreak( self ):
+                self.documentText.insertControlCharacter( self.textCursor, ODF_LINE_BREAK, False )
 
-                \\f + \\fr 1:20 \\ft Su ka kaluwasan te Nawumi ‘keupianan,’ piru ka kaluwasan te Mara ‘masakit se geyinawa.’\\f* (Backslashes are shown doubled here)
-                """
-                assert( noteType in ('fn','en',) )
-                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( rawFootnoteContents, includeInitialText=True )
-                #print( "formatODFVerseText.processFootnote( {}, {} ) found {}".format( repr(rawFootnoteContents), ourGlobals, markerList ) )
-                note = document.createInstance( "com.sun.star.text.Footnote" if noteType=='fn' else "com.sun.star.text.Endnote" )
-                documentText.insertTextContent( textCursor, note, False )
+            def addNote( self, noteClass, paragraphStyleName, segments ):
+                note = self.document.createInstance( "com.sun.star.text.Footnote" if noteClass=='footnote' else "com.sun.star.text.Endnote" )
+                self.documentText.insertTextContent( self.textCursor, note, False )
                 noteCursor = note.Text.createTextCursor()
-                noteCursor.setPropertyValue( "ParaStyleName", "Bible Footnote" if noteType=='fn' else "Bible Endnote" )
-
-                noteStyleDict = { 'fr':'Footnote Origin', 'fk':'Footnote Keyword', 'fq':'Footnote Quotation',
-                                'fqa':'Footnote Alternate Translation', 'fl':'Footnote Label',
-                                'fp':'Footnote Paragraph', 'fv':'Footnote Verse Number',
-                                'ft':'Footnote Text', 'fdc':'Footnote Deuterocanonical',
-                                'fm':'Footnote Mark' }
-
-                caller = origin = originCV = fnText = fnTitle = '' # Probably no longer needed
-                if markerList: # We found some internal footnote markers
-                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
-                        if marker is None:
-                            #if txt not in '-+': # just a caller
-                            caller = txt
-                        elif marker in noteStyleDict:
-                            noteCursor.setPropertyValue( "CharStyleName", noteStyleDict[marker] )
-                            note.insertString( noteCursor, txt,  False )
-                        else:
-                            logging.error( "formatODFVerseText.processNote didn't handle {} {}:{} {} marker: {}".format( BBB, C, V, noteType, marker ) )
-                else: # no internal markers found
-                    noteCursor.setPropertyValue( "CharStyleName", "Footnote Text" )
-                    bits = rawFootnoteContents.split( ' ', 1 )
-                    if len(bits)==2: # assume the caller is the first bit
-                        caller = bits[0]
-                        if BibleOrgSysGlobals.debugFlag: assert( len(caller) == 1 ) # Normally a +
-                        note.insertString( noteCursor, bits[1],  False )
-                    else: # no idea really what the format was
-                        note.insertString( noteCursor, rawFootnoteContents,  False )
-            # end of insertFormattedODFText.processNote
-
-
-            def processCrossReference( rawXRef, documentText, textCursor ):
-                """
-                Inserts the cross-reference into the ODF document as a footnote.
-
-                NOTE: The parameter here already has the /x and /x* removed.
-
-                \\x - \\xo 2:2: \\xt Lib 19:9-10; Diy 24:19.\\xt*\\x* (Backslashes are shown doubled here)
-                """
-                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( rawXRef, includeInitialText=True )
-                #print( "\nformatODFVerseText.processCrossReference( {}, {} ) gives {}".format( repr(rawXRef), "...", markerList ) )
-
-                xrefNote = document.createInstance( "com.sun.star.text.Footnote" )
-                documentText.insertTextContent( textCursor, xrefNote, False )
-                noteCursor = xrefNote.Text.createTextCursor()
-                noteCursor.setPropertyValue( "ParaStyleName", "Verse Cross Reference" )
-
-                xrefStyleDict = { 'xo':'Cross Reference Origin', 'xk':'Cross Reference Keyword',
-                                 'xq':'Cross Reference Quotation', 'xt':'Cross Reference Target',
-                                 'xot':'Cross Reference OT Target', 'xnt':'Cross Reference NT Target',
-                                 'xdc':'Cross Reference Deuterocanon Target' }
-
-                caller = origin = originCV = xrefText = '' # Probably no longer needed
-                if markerList:
-                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
-                        if marker is None:
-                            #if txt not in '-+': # just a caller
-                            caller = txt
-                        elif marker in xrefStyleDict:
-                            noteCursor.setPropertyValue( "CharStyleName", xrefStyleDict[marker] )
-                            xrefNote.insertString( noteCursor, txt,  False )
-                        else:
-                            logging.error( "formatODFVerseText.processCrossReference didn't handle {} {}:{} xref marker: {}".format( BBB, C, V, marker ) )
-                else: # there's no USFM markers at all in the xref --  presumably a caller and then straight text
-                    if rawXRef.startswith('+ ') or rawXRef.startswith('- '):
-                        caller = rawXRef[0]
-                        xrefText = rawXRef[2:].strip()
-                    else: # don't really know what it is -- assume it's all just text
-                        xrefText = rawXRef.strip()
-                    noteCursor.setPropertyValue( "CharStyleName", "Footnote Text" )
-                    xrefNote.insertString( noteCursor, xrefText,  False )
-            # end of insertFormattedODFText.processCrossReference
+                noteCursor.setPropertyValue( "ParaStyleName", paragraphStyleName )
+                for characterStyleName, text in segments:
+                    if not text: continue
+                    self.setCharacterStyle( noteCursor, characterStyleName )
+                    note.insertString( noteCursor, text, False )
+        # end of toODF.UNODocumentWriter class
 
 
-            def processFigure( extraText, documentText, textCursor ):
-                """
-                Inserts the figure into the ODF document.
-
-                NOTE: The parameter here already has the /fig and /fig* removed.
-                """
-                logging.critical( "toODF: figure not handled yet at {} {}:{} {}".format( BBB, C, V, repr(extraText) ) )
-                figureMD = ''
-                #footnoteMD = '<a class="footnoteLinkSymbol" title="{}" href="#FNote{}">[fn]</a>' \
-                                #.format( fnTitle, fnIndex )
-
-                #endMD = '<p id="FNote{}" class="footnote">'.format( fnIndex )
-                #if originCV: # This only handles CV separator of : so far
-                    #endMD += '<a class="footnoteOrigin" title="Go back up to {} in the text" href="{}">{}</a> ' \
-                                                        #.format( originCV, liveCV(originCV), origin )
-                #endMD += '<span class="footnoteEntry">{}</span>'.format( fnText )
-                #endMD += '</p>'
-
-                ##print( "footnoteMD", BBB, footnoteMD )
-                ##print( "endMD", endMD )
-                #ourGlobals['footnoteMD'].append( endMD )
-                ##if fnIndex > 2: halt
-            # end of insertFormattedODFText.processFigure
-
-
-            def handleTextSubsegment( textSegment ):
-                """
-                Insert a text segment, complete with the correct character styles if any.
-                """
-                #print( "BibleWriter.toODF.handleTextSubsegment( {} ) for {} {}:{}".format( repr(textSegment), BBB, C, V ) )
-                markerList = BibleOrgSysGlobals.USFMMarkers.getMarkerListFromText( textSegment, includeInitialText=True )
-                if markerList: # we found character formatting within the text
-                    #print( BBB, C, V, "toODF.insertFormattedODFText: {} found {}".format( repr(textSegment), markerList ) )
-                    for marker, ixBS, nextSignificantChar, fullMarkerText, context, ixEnd, txt in markerList:
-                        #print( "loop", marker, ixBS, repr(nextSignificantChar), repr(fullMarkerText), context, ixEnd, repr(txt) )
-                        if marker in charODFStyleDict and nextSignificantChar in (' ','+'): # it's an opening marker
-                            #print( "  BibleWriter.toODF: 3dc1", BBB, C, V, charODFStyleDict[marker], repr(txt) )
-                            textCursor.setPropertyValue( "CharStyleName", charODFStyleDict[marker] )
-                            documentText.insertString( textCursor, txt, 0 )
-                        elif marker == 'k' and nextSignificantChar in (' ','+'):
-                            #print( "  BibleWriter.toODF: 3dc2", BBB, C, V, repr(txt) )
-                            textCursor.setPropertyValue( "CharStyleName", 'Main Entry Keyword' if BBB in ('GLS',) else 'Keyword Text' )
-                            documentText.insertString( textCursor, txt, 0 )
-                        elif marker in charODFStyleDict and nextSignificantChar=='-': # it's a closing nesting marker
-                            assert(context )
-                            #print( "  BibleWriter.toODF: 3dc3", BBB, C, V, charODFStyleDict[marker], repr(txt) )
-                            textCursor.setPropertyValue( "CharStyleName", charODFStyleDict[context[0]] )
-                            documentText.insertString( textCursor, txt, 0 )
-                        elif marker is None or (marker=='no' and nextSignificantChar==' ') or not context:
-                            # Normal text
-                            #print( "  BibleWriter.toODF: 3dc4", BBB, C, V, defaultCharacterStyleName, repr(txt) )
-                            textCursor.setPropertyValue( "CharStyleName", defaultCharacterStyleName )
-                            documentText.insertString( textCursor, txt, 0 )
-                        elif marker in ('ca','va',) and nextSignificantChar in (' ','+'): # it's an opening marker
-                            csn = 'Alternative Chapter Number' if marker=='ca' else 'Alternative Verse Number'
-                            try: textCursor.setPropertyValue( "CharStyleName", csn )
-                            except IllegalArgumentException:
-                                logging.critical( "toODF: {} character style doesn't seem to exist".format( repr(csn) ) )
-                            documentText.insertString( textCursor, '('+txt+')', 0 )
-                        elif marker in charODFStyleDict and not nextSignificantChar: # it's at the end of a line
-                            assert( not txt )
-                            logging.warning( "toODF: ignored blank {} field at end of line in {} {}:{}".format( marker, BBB, C, V ) )
-                        else:
-                            logging.critical( "toODF: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(textSegment) ) )
-                            unhandledMarkers.add( "{} (char)".format( marker ) )
-                            if BibleOrgSysGlobals.debugFlag and debuggingThisModule: halt
-                elif textSegment: # No character formatting here
-                    #print( "BibleWriter.toODF: 3dc5", BBB, C, V, repr(textSegment) )
-                    documentText.insertString( textCursor, textSegment, 0 )
-            # end of handleTextSubsegment
-
-            def handleTextSegment( textSegment ):
-                """
-                Insert a text segment, complete with the correct character styles if any.
-                """
-                #print( "BibleWriter.toODF.handleTextSegment( {} ) for {} {}:{}".format( repr(textSegment), BBB, C, V ) )
-                if '//' in textSegment: # indicates a manual new line marker
-                    sx = 0
-                    ix = textSegment.find( '//' )
-                    while ix != -1:
-                        handleTextSubsegment( textSegment[sx:ix] )
-                        documentText.insertControlCharacter( textCursor, ODF_LINE_BREAK, False );
-                        lx = ix + 2
-                        ix = textSegment.find( '//', lx )
-                    handleTextSubsegment( textSegment[lx:] )
-                else: # no manual line breaks
-                    handleTextSubsegment( textSegment )
-            # end of handleTextSegment
-
-            # insertFormattedODFText main code
-            if extras:
-                haveUsefulExtras = False
-                for extra in extras: # find any footnotes and cross-references
-                    extraType, extraIndex, extraText, cleanExtraText = extra
-                    # We don't care about str and vp fields here
-                    if extraType in ('fn','en','xr','fig',): haveUsefulExtras = True; break
-                if haveUsefulExtras:
-                    lastIndex = 0
-                    for extra in extras: # find any footnotes and cross-references
-                        extraType, extraIndex, extraText, cleanExtraText = extra
-                        handleTextSegment( givenText[lastIndex:extraIndex] )
-                        if extraType in ('fn','en',): processNote( extraType, extraText, documentText, textCursor )
-                        elif extraType == 'xr': processCrossReference( extraText, documentText, textCursor )
-                        elif extraType == 'fig': processFigure( extraText, documentText, textCursor )
-                        elif extraType == 'str': pass # don't know how to encode this yet
-                        elif extraType == 'sem': pass # don't know how to encode this yet
-                        elif extraType == 'vp': pass # it's already been converted to a newline field
-                        else: halt
-                        lastIndex = extraIndex
-                    handleTextSegment( givenText[lastIndex:] )
-                else: # no useful extras like footnotes, etc.
-                    handleTextSegment( givenText )
-            else: # no extras at all like footnotes, etc.
-                handleTextSegment( givenText )
-        # end of toODF.insertFormattedODFText
-
-
-        # First determine our format
-        #verseByVerse = True
-
+        def writeODFBook( frameDesktop, job ):
+            """
+            Creates and saves the ODF file for one book
+                using the given LibreOffice desktop (this is run by the LibreOfficePool).
 
-        # Create and save the ODF files
-        for j, (BBB,bookObject) in enumerate( self.books.items() ):
+            Returns the filepath.
+            """
+            j, BBB, bookObject = job
             if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Creating ODF file for {}...".format( BBB ) )
-            pseudoUSFMData = bookObject._processedLines
 
             # Create the blank document
             filename = "{:02}-{}_BOS-BibleWriter.odt".format( j, BBB )
             filepath = os.path.join( os.getcwd(), outputFolder, BibleOrgSysGlobals.makeSafeFilename( filename ) )
             if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Creating {!r}...").format( filename ) )
             document = frameDesktop.loadComponentFromURL( sourceURL, "_blank", 0, () )
-            documentText = document.Text
-            initialTextCursor = documentText.createTextCursor()
-            textCursor = initialTextCursor
-
-            styleFamilies = document.StyleFamilies
-            setupStyles( styleFamilies )
+            setupStyles( document, document.StyleFamilies )
 
-            #pageStyles = styleFamilies.getByName( "PageStyles" )
-            #defaultPageStyle = pageStyles.getByName( "Default Style" )
-            #headerText = defaultPageStyle.getPropertyValue( "HeaderText" )
-            #headerCursor = headerText.createTextCursor()
-            runningHeaderField = None
-            if startWithTemplate:
-                try: runningHeaderField = document.TextFieldMasters.getByName( "com.sun.star.text.FieldMaster.User.BookHeader" )
-                except IllegalArgumentException: logging.critical( "toODF: Can't set up running header user text field" )
-            else: logging.critical( "toODF: Don't know how to set up running header user text field programmatically yet" )
-
-            firstEverParagraphFlag = True
-            def insertODFParagraph( BBB, C, V, paragraphStyleName, text, extras, documentText, textCursor, defaultCharacterStyleName ):
-                """
-                Given some text and the paragraph stylename (and the default character stylename)
-                    start a new paragraph and insert the text.
-                """
-                nonlocal firstEverParagraphFlag
-                #print( "toODF.insertODFParagraph( {} {}:{}, {}, {} ...)".format( BBB, C, V, repr(paragraphStyleName), repr(text) ) )
-                if not firstEverParagraphFlag: # Don't want a blank paragraph at the start of the document
-                    documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-                try: textCursor.setPropertyValue( "ParaStyleName", paragraphStyleName )
-                except IllegalArgumentException:
-                    logging.critical( "toODF: {} paragraph style doesn't seem to exist".format( repr(paragraphStyleName) ) )
-                if adjText or extras:
-                    insertFormattedODFText( BBB, C, V, text, extras, documentText, textCursor, defaultCharacterStyleName )
-                firstEverParagraphFlag = False
-            # end of insertODFParagraph
-
-
-            try: headerField = bookObject.longTOCName
-            except AttributeError: headerField = bookObject.assumedBookName
-            startingNewParagraphFlag = True
-            inTextParagraph = False
-            lastMarker = gotVP = None
-            C = V = '0'
-            for entry in pseudoUSFMData:
-                marker, adjText, extras = entry.getMarker(), entry.getAdjustedText(), entry.getExtras()
-                #print( "toODF:", j, BBB, C, V, marker, repr(adjText) )
-############################################################################## XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX
-                if self.abbreviation=='MBTV' and BBB=='MAT' and C=='23': break  #  Don't know why this currently crashes
-                if '¬' in marker or marker in BOS_ADDED_NESTING_MARKERS: continue # Just ignore added markers -- not needed here
-                if marker in OFTEN_IGNORED_USFM_HEADER_MARKERS or marker in ('ie',): # Just ignore these lines
-                    ignoredMarkers.add( marker )
-
-                elif marker == 'c':
-                    if C == '0' and runningHeaderField: runningHeaderField.setPropertyValue( "Content", headerField )
-                    C, V = adjText, '0'
-                    if C == '1': # It's the beginning of the actual Bible text -- make a new double-column section
-                        if not firstEverParagraphFlag: # leave a space between the introduction and the chapter text
-                            documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-                            textCursor.setPropertyValue( "ParaStyleName", "Blank Line Paragraph" )
-                            documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-
-                        # Create a new text section and insert it into the document
-                        chapterSection = document.createInstance( "com.sun.star.text.TextSection" )
-                        documentText.insertTextContent( initialTextCursor, chapterSection, False )
-
-                        # Create a column object with two columns
-                        columns = document.createInstance( "com.sun.star.text.TextColumns" )
-                        columns.setColumnCount( 2 )
-                        columns.setPropertyValue( "AutomaticDistance", 300 ) # Not sure of the unit here
-
-                        # Insert columns into the text section
-                        chapterSection.setPropertyValue( "TextColumns", columns )
-                        #chapterSection.setPropertyValue( "DontBalanceTextColumns", True )
-
-                        anchor = chapterSection.getAnchor()
-                        columnCursor = documentText.createTextCursorByRange( anchor )
-
-                        textCursor = columnCursor # So that future inserts go in here
-                        startingNewParagraphFlag = firstEverParagraphFlag = True
-                    # Put in our running header -- WHY DOESN'T THIS WORK PROPERLY IN LIBREOFFICE???
-                    #runningHeaderField.setPropertyValue( "Content", "{} {}".format( headerField, C ) )
-                elif marker == 'c#':
-                    if not inTextParagraph: # Not all translations have paragraph markers
-                        documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-                        textCursor.setPropertyValue( "ParaStyleName", "Prose Paragraph" )
-                        inTextParagraph = startingNewParagraphFlag = True
-                    textCursor.setPropertyValue( "CharStyleName", "Chapter Number" )
-                    documentText.insertString( textCursor, C, False )
-                    textCursor.setPropertyValue( "CharStyleName", "Chapter Number Postspace" )
-                    documentText.insertString( textCursor, " ", False )
-                    textCursor.setPropertyValue( "CharStyleName", "Verse Text" )
-                elif marker == 'vp~': # This precedes a v field and has the verse number to be printed
-                    gotVP = adjText # Just remember it for now
-                elif marker == 'v':
-                    V = adjText
-                    if gotVP: # this is the verse number to be published
-                        adjText = gotVP
-                        gotVP = None
-                    if not inTextParagraph: # Not all translations have paragraph markers
-                    #if lastMarker == 's1': # hack for OEB which has some empty s fields immediately followed by v fields
-                        documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-                        textCursor.setPropertyValue( "ParaStyleName", "Prose Paragraph" )
-                        inTextParagraph = startingNewParagraphFlag = True
-                    if V != '1':
-                        if not startingNewParagraphFlag:
-                            textCursor.setPropertyValue( "CharStyleName", "Verse Number Prespace" )
-                            documentText.insertString( textCursor, " ", False )
-                        textCursor.setPropertyValue( "CharStyleName", "Verse Number" )
-                        documentText.insertString( textCursor, adjText, False )
-                        textCursor.setPropertyValue( "CharStyleName", "Verse Number Postspace" )
-                        documentText.insertString( textCursor, " ", False )
-                        textCursor.setPropertyValue( "CharStyleName", "Verse Text" )
-                        startingNewParagraphFlag = False
-
-                elif marker in titleODFStyleDict:
-                    styleName = titleODFStyleDict[marker]
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                elif marker in ('ms1','ms2','ms3','ms4',):
-                    styleName = "Major Section Heading {}".format( marker[-1] )
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                    inTextParagraph = False
-                elif marker in ipODFStyleDict:
-                    styleName = ipODFStyleDict[marker]
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                elif marker in ('s1','s2','s3','s4', 'is1','is2','is3','is4',):
-                    if adjText or extras: #OEB has blank s fields
-                        styleName = "Introduction " if marker[0]=='i' else ""
-                        styleName += "Section Heading {}".format( marker[-1] )
-                        insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                    inTextParagraph = False
-                elif marker in ('r','sr','mr',):
-                    if marker == 'r': styleName = 'Section CrossReference'
-                    elif marker == 'sr': styleName = 'Section Reference Range'
-                    elif marker == 'mr': styleName = 'Major Section Reference Range'
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                    inTextParagraph = False
-                elif marker in miscODFStyleDict: # things like d, sp, cl that have text
-                    styleName = miscODFStyleDict[marker]
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                    inTextParagraph = False
-                elif marker in pqODFStyleDict: # things like p, q1 that don't have text
-                    startingNewParagraphFlag = True
-                    styleName = pqODFStyleDict[marker]
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                    inTextParagraph = True
-                elif marker in ('li1','li2','li3','li4', 'ili1','ili2','ili3','ili4',):
-                    styleName = "Introduction " if marker[0]=='i' else ""
-                    styleName += "List Item {}".format( marker[-1] )
-                    insertODFParagraph( BBB, C, V, styleName, adjText, extras, documentText, textCursor, "Default Style" )
-                elif marker in ('v~','p~',):
-                    if BibleOrgSysGlobals.debugFlag: assert( inTextParagraph )
-                    if adjText or extras:
-                        insertFormattedODFText( BBB, C, V, adjText, extras, documentText, textCursor, "Default Style" )
-                    startingNewParagraphFlag = False
-                elif marker in ( 'b', 'ib', ):
-                    if BibleOrgSysGlobals.debugFlag: assert( not adjText and not extras )
-                    documentText.insertControlCharacter( textCursor, ODF_PARAGRAPH_BREAK, False );
-                    textCursor.setPropertyValue( "ParaStyleName", 'Blank Line Paragraph' if marker=='b' else 'Introduction Blank Line Paragraph' )
-                elif marker == 'nb': # no-break with previous paragraph -- I don't think we have to do anything here
-                    if BibleOrgSysGlobals.debugFlag: assert( not adjText and not extras )
-                    ignoredMarkers.add( marker )
-                elif marker in ('cp',): # We can safely ignore these markers for the ODF export
-                    ignoredMarkers.add( marker )
-                else:
-                    if adjText:
-                        logging.error( "toODF: lost text in {} field in {} {}:{} {}".format( marker, BBB, C, V, repr(adjText) ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    if extras:
-                        logging.error( "toODF: lost extras in {} field in {} {}:{}".format( marker, BBB, C, V ) )
-                        #if BibleOrgSysGlobals.debugFlag: halt
-                    unhandledMarkers.add( marker )
-                lastMarker = marker
+            self.__writeODFBook( BBB, bookObject, UNODocumentWriter( document ), 'toODF', ignoredMarkers, unhandledMarkers )
 
             # Save the created document
             document.storeAsURL( "file://{}".format( filepath ), () )
             document.dispose() # Close the document (even though it might be a headless server anyway)
-
-        if weStartedLibreOffice and not BibleOrgSysGlobals.debugFlag: # Now kill our LibreOffice server
-            import signal
-            p = subprocess.Popen(['ps', 'xa'], stdout=subprocess.PIPE) # NOTE: Linux-only code!!!
-            out, err = p.communicate()
-            for lineBytes in out.splitlines():
-                line = bytes.decode( lineBytes )
-                #print( "line", repr(line) )
-                if 'libreoffice' in line and "ServiceManager" in line:
-                    pid = int( line.split(None, 1)[0] )
-                    #print( "pid", pid )
-                    if BibleOrgSysGlobals.verbosityLevel > 1: logging.info( "Killing {}".format( repr(line) ) )
-                    os.kill( pid, signal.SIGKILL )
+            return filepath
+        # end of toODF.writeODFBook
+
+        # Create and save the ODF files (on whichever LibreOffice workers are free)
+        ODFJobs = [(j, BBB, bookObject) for j, (BBB,bookObject) in enumerate( self.books.items() )]
+        ownPool = libreOfficePool is None
+        if ownPool: libreOfficePool = LibreOfficePool()
+        failedBooks = []
+        try:
+            for (j, BBB, bookObject), filepath, successFlag in libreOfficePool.run( writeODFBook, ODFJobs, bookTimeout ):
+                if not successFlag: failedBooks.append( BBB )
+        finally:
+            if ownPool: libreOfficePool.close() # Stops our LibreOffice processes
+        if failedBooks:
+            logging.error( "toODF: Unable to make ODF files for {}".format( failedBooks ) )
 
         if ignoredMarkers:
             logging.info( "toODF: Ignored markers were {}".format( ignoredMarkers ) )
@@ -8934,6 +8999,7 @@ class BibleWriter( InternalBible ):
                 zf.write( filepath, filename ) # Save in the archive without the path
         zf.close()
 
+        if failedBooks: return False
         if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
             print( "  BibleWriter.toODF finished successfully." )
         return True
@@ -8941,12 +9007,117 @@ class BibleWriter( InternalBible ):
 
 
 
-    def toTeX( self, outputFolder=None ):
+    def toODT( self, outputFolder=None, useTemplate=True ):
+        """
+        Write the internal Bible format out into OpenDocument text (.odt) files
+            suitable for opening in LibreOffice or OpenOffice.
+
+        Unlike toODF, this writes the ODF XML directly (see ODTWriter.py)
+            so it doesn't need LibreOffice at all (and is very much faster).
+        The paragraph and character styles are the same ones that toODF uses
+            and are taken from the BibleBook.ott template if useTemplate is set.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toODT..." )
+        if BibleOrgSysGlobals.debugFlag: assert( self.books )
+
+        if not self.doneSetupGeneric: self.__setupWriter()
+        if not outputFolder: outputFolder = "OutputFiles/BOS_ODT_Export/"
+        if not os.access( outputFolder, os.F_OK ): os.makedirs( outputFolder ) # Make the empty folder if there wasn't already one there
+
+        templateFilepath = os.path.join( defaultControlFolder, "BibleBook.ott" ) if useTemplate else None
+        if templateFilepath and not os.access( templateFilepath, os.R_OK ):
+            logging.warning( "toODT: Unable to find template {!r} so making our own styles".format( templateFilepath ) )
+            templateFilepath = None
+
+        # Define our styles (only used if they're not already in the template)
+        styleDefinitions = {}
+        def defineStyle( styleName, parentName, family='paragraph', paragraphProperties=None, textProperties=None ):
+            styleDefinitions[styleName] = (family, parentName, paragraphProperties, textProperties)
+        BOLD, ITALIC = {'fo:font-weight':'bold'}, {'fo:font-style':'italic'}
+        defineStyle( 'Bible Paragraph', 'Standard' )
+        defineStyle( 'Bible Heading', 'Standard', paragraphProperties={'fo:text-align':'center', 'fo:keep-together':'always', 'fo:keep-with-next':'always',
+                                                    'fo:margin-top':'0.2cm', 'fo:margin-bottom':'0.1cm'}, textProperties={'fo:font-weight':'bold', 'fo:font-size':'14pt'} )
+        for styleName in ('Prose Paragraph', 'Poetry Paragraph', 'Introduction Paragraph', 'Introduction Poetry Paragraph',):
+            defineStyle( styleName, 'Bible Paragraph' )
+        for styleName in ('Major Title', 'Introduction Major Title',):
+            defineStyle( styleName, 'Bible Heading', textProperties={'fo:font-size':'20pt'} )
+        for styleName in ('Major Section Heading', 'Section Heading', 'Introduction Section Heading',):
+            defineStyle( styleName, 'Bible Heading' )
+        for styleName in ('Bible Footnote', 'Bible Endnote', 'Verse Cross Reference',):
+            defineStyle( styleName, 'Standard', textProperties={'fo:font-size':'10pt'} )
+        defineStyle( 'Chapter Label', 'Section Heading' )
+        defineStyle( 'Introduction Outline Title', 'Introduction Paragraph', paragraphProperties={'fo:keep-together':'always'}, textProperties=BOLD )
+        def getParentStyleName( styleName ):
+            if styleName.endswith( ' at Ending' ): return styleName[:-10] # e.g., "Major Title at Ending" is based on "Major Title"
+            if 'Poetry Paragraph' in styleName: return 'Introduction Poetry Paragraph' if styleName.startswith( 'Introduction' ) else 'Poetry Paragraph'
+            return 'Introduction Paragraph' if styleName.startswith( 'Introduction' ) else 'Prose Paragraph'
+        # The other paragraph styles all come from the same marker dictionaries as toODF uses
+        #   with numbered styles (e.g., "Poetry Paragraph 2") based on an unnumbered one (e.g., "Poetry Paragraph")
+        for styleName in [styleName for styleDict in (ODF_TITLE_STYLE_DICT, ODF_IP_STYLE_DICT, ODF_PQ_STYLE_DICT, ODF_MISC_STYLE_DICT) for styleName in styleDict.values()] \
+                        + ['{}{} {}'.format( prefix, baseName, n ) for prefix in ('','Introduction ') for baseName in ('Section Heading','List Item') for n in range(1,5)] \
+                        + ['Major Section Heading {}'.format( n ) for n in range(1,5)] \
+                        + ['Blank Line Paragraph', 'Introduction Blank Line Paragraph', 'Section CrossReference', 'Section Reference Range', 'Major Section Reference Range']:
+            if styleName in styleDefinitions: continue
+            if styleName[-1].isdigit(): # Numbered styles are based on an unnumbered one
+                parentName = styleName[:-2]
+                if parentName not in styleDefinitions: defineStyle( parentName, getParentStyleName( parentName ) )
+            else: parentName = getParentStyleName( styleName )
+            defineStyle( styleName, parentName, paragraphProperties={'fo:text-align':'center'} if 'Centered' in styleName or 'Reference' in styleName
+                                                        else {'fo:text-align':'end'} if 'Right Aligned' in styleName else None )
+        # Character styles (any that aren't defined here just get the default formatting)
+        for styleName, parentName, textProperties in (
+                    ('Chapter Number', None, {'fo:font-size':'16pt', 'fo:font-weight':'bold', 'fo:color':'#000080'}),
+                    ('Verse Number', None, {'fo:color':'#808000', 'style:text-position':'super 58%'}),
+                    ('Book Name', None, ITALIC), ('Introduction Quoted Text', None, ITALIC),
+                    ('Divine Name', None, {'fo:font-variant':'small-caps'}), ('Wordlist Entry', None, {'fo:background-color':'#e0e0e0'}),
+                    ('Alternative Chapter Number', None, ITALIC), ('Alternative Verse Number', None, ITALIC),
+                    ('Footnote Origin', None, {'fo:font-weight':'bold', 'fo:background-color':'#ffff00'}),
+                    ('Footnote Keyword', None, ITALIC), ('Footnote Quotation', None, ITALIC), ('Footnote Alternate Translation', None, ITALIC),
+                    ('Footnote Label', None, ITALIC), ('Footnote Mark', None, ITALIC),
+                    ('Cross Reference Origin', None, {'fo:font-weight':'bold', 'fo:background-color':'#00ff00'}),
+                    ('Cross Reference Keyword', None, ITALIC), ('Cross Reference Quotation', None, ITALIC),
+                    ('Cross Reference OT Target', 'Cross Reference Target', None), ('Cross Reference NT Target', 'Cross Reference Target', None),
+                    ('Cross Reference Deuterocanon Target', 'Cross Reference Target', None),
+                    ('Emphasis Text', None, ITALIC), ('Bold Text', None, BOLD), ('Italic Text', None, ITALIC),
+                    ('Bold Italic Text', None, {'fo:font-weight':'bold', 'fo:font-style':'italic'}), ('Small Caps Text', None, {'fo:font-variant':'small-caps'}), ):
+            defineStyle( styleName, parentName, family='text', textProperties=textProperties )
+
+        ignoredMarkers, unhandledMarkers = set(), set()
+
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Writing ODT files and zipping them..." )
+        archiveWriter = ArchiveWriter( os.path.join( outputFolder, 'AllODTFiles.zip' ) )
+        for j, (BBB,bookObject) in enumerate( self.books.items() ):
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  Creating ODT file for {}...".format( BBB ) )
+            writer = ODTWriter( templateFilepath, styleDefinitions )
+            self.__writeODFBook( BBB, bookObject, writer, 'toODT', ignoredMarkers, unhandledMarkers )
+            filename = BibleOrgSysGlobals.makeSafeFilename( "{:02}-{}_BOS-BibleWriter.odt".format( j, BBB ) )
+            archiveWriter.addData( filename, writer.save( os.path.join( outputFolder, filename ) ) )
+        archiveWriter.close()
+
+        if ignoredMarkers:
+            logging.info( "toODT: Ignored markers were {}".format( ignoredMarkers ) )
+            if BibleOrgSysGlobals.verbosityLevel > 2:
+                print( "  " + _("WARNING: Ignored toODT markers were {}").format( ignoredMarkers ) )
+        if unhandledMarkers:
+            logging.warning( "toODT: Unhandled markers were {}".format( unhandledMarkers ) )
+            if BibleOrgSysGlobals.verbosityLevel > 1:
+                print( "  " + _("WARNING: Unhandled toODT markers were {}").format( unhandledMarkers ) )
+        if BibleOrgSysGlobals.verbosityLevel > 0 and BibleOrgSysGlobals.maxProcesses > 1:
+            print( "  BibleWriter.toODT finished successfully." )
+        return True
+    # end of BibleWriter.toODT
+
+
+
+    def toTeX( self, outputFolder=None, maxJobs=None, bookTimeout=30, allTimeout=180 ):
         """
         Write the pseudo USFM out into a TeX (typeset) format.
             The format varies, depending on whether or not there are paragraph markers in the text.
+
+        The PDFs are then made by running up to maxJobs (default is maxProcesses) xelatex jobs at once,
+            each in its own working folder and killed if it takes longer than the given timeout (in seconds).
+        PDFs whose .tex and class files haven't changed since the last run aren't made again.
         """
-        import subprocess
         if BibleOrgSysGlobals.verbosityLevel > 1: print( "Running BibleWriter:toTeX..." )
         if BibleOrgSysGlobals.debugFlag: assert( self.books )
 
@@ -9068,51 +9239,57 @@ class BibleWriter( InternalBible ):
         # end of toTeX:texText
 
 
-        def makePDFs( BBB, texFilepath, timeout ):
+        def makePDF( job ):
             """
-            Call xelatex to make the Bible PDF file(s) from the .tex file.
+            Call xelatex to make a Bible PDF file from the .tex file
+                using one of the class files for different styles of Bible layouts.
+
+            Each job runs in its own working folder (so they can run at the same time).
+
+            Returns a 3-tuple with the PDF filename, the build hash, and a success flag.
             """
+            BBB, texFilepath, filenamePart, timeout, buildHash = job
             assert( texFilepath.endswith( '.tex' ) )
             mainFilepath = texFilepath[:-4] # Remove the .tex bit
-
-            # Work through the various class files for different styles of Bible layouts
-            for filenamePart in ( 'Bible1','Bible2', ):
-                filepath = os.path.join( defaultControlFolder, filenamePart+'.cls' )
-                try:
-                    shutil.copy( filepath, outputFolder ) # Copy it under its own name
-                    shutil.copy( filepath, os.path.join( outputFolder, "Bible.cls" ) ) # Copy it also under the generic name
-                except FileNotFoundError: logging.warning( "Unable to find TeX control file: {}".format( filepath ) )
-
-                # Now run xelatex (TeX -> PDF)
-                parameters = ['/usr/bin/timeout', timeout, '/usr/bin/xelatex', '-interaction=batchmode', os.path.abspath(texFilepath) ]
-                #print( "makeIndividualPDF (xelatex) parameters", parameters )
-                os.chdir( outputFolder ) # So the paths for the Bible.cls file are correct
-                myProcess = subprocess.Popen( parameters, stdout=subprocess.PIPE, stderr=subprocess.PIPE )
+            jobName = os.path.basename( mainFilepath )
+            pdfFilename = jobName + '.' + filenamePart + '.pdf'
+            workFolder = os.path.join( outputFolder, TEX_WORK_FOLDERNAME, jobName+'.'+filenamePart )
+            if not os.access( workFolder, os.F_OK ): os.makedirs( workFolder )
+            for sourceFilepath,filename in styleFiles[filenamePart]: # So the paths for the Bible.cls file are correct
+                shutil.copy( sourceFilepath, os.path.join( workFolder, filename ) )
+
+            # Now run xelatex (TeX -> PDF)
+            parameters = [ '/usr/bin/xelatex', '-interaction=batchmode', os.path.abspath(texFilepath) ]
+            #print( "makePDF (xelatex) parameters", parameters )
+            try: myProcess = subprocess.Popen( parameters, cwd=workFolder, stdout=subprocess.PIPE, stderr=subprocess.PIPE )
+            except OSError as err:
+                logging.error( "toTeX: Unable to run xelatex for {} {}: {}".format( BBB, filenamePart, err ) )
+                return pdfFilename, buildHash, False
+            try: programOutputBytes, programErrorOutputBytes = myProcess.communicate( timeout=timeout )
+            except subprocess.TimeoutExpired:
+                myProcess.kill()
                 programOutputBytes, programErrorOutputBytes = myProcess.communicate()
-                os.chdir( cwdSave ) # Restore the path again
-                if myProcess.returncode == 124: # it timed out
-                    programErrorOutputBytes += "xelatex {}: Timed out after {}".format( BBB, timeout ).encode( 'utf-8' )
-                # Process the output
-                if programOutputBytes:
-                    programOutputString = programOutputBytes.decode( encoding='utf-8', errors="replace" )
-                    #programOutputString = programOutputString.replace( baseFolder + ('' if baseFolder[-1]=='/' else '/'), '' ) # Remove long file paths to make it easier for the user to read
-                    #with open( os.path.join( outputFolder, "ScriptOutput.txt" ), 'wt' ) as myFile: myFile.write( programOutputString )
-                    #print( "pOS", programOutputString )
-                if programErrorOutputBytes:
-                    programErrorOutputString = programErrorOutputBytes.decode( encoding='utf-8', errors="replace" )
-                    #with open( os.path.join( outputFolder, "ScriptErrorOutput.txt" ), 'wt' ) as myFile: myFile.write( programErrorOutputString )
-                    if BibleOrgSysGlobals.debugFlag: print( "pEOS", programErrorOutputString )
-
-                # Rename our PDF (and the log file) according to the style
-                try: os.replace( mainFilepath+'.log', mainFilepath+'.'+filenamePart+'.log' )
-                except FileNotFoundError: pass # That's fine
-                try: os.replace( mainFilepath+'.pdf', mainFilepath+'.'+filenamePart+'.pdf' )
+                programErrorOutputBytes += "xelatex {}: Timed out after {} seconds".format( BBB, timeout ).encode( 'utf-8' )
+                logging.error( "toTeX: xelatex {} {} timed out after {} seconds".format( BBB, filenamePart, timeout ) )
+            # Process the output
+            if programOutputBytes:
+                programOutputString = programOutputBytes.decode( encoding='utf-8', errors="replace" )
+                #print( "pOS", programOutputString )
+            if programErrorOutputBytes:
+                programErrorOutputString = programErrorOutputBytes.decode( encoding='utf-8', errors="replace" )
+                if BibleOrgSysGlobals.debugFlag: print( "pEOS", programErrorOutputString )
+
+            # Move our PDF (and the log file) into the output folder and rename them according to the style
+            for extension in ( '.log', '.pdf', ):
+                try: os.replace( os.path.join( workFolder, jobName+extension ), mainFilepath+'.'+filenamePart+extension )
                 except FileNotFoundError: pass # That's fine
-        # end of toTeX.makePDFs
+            shutil.rmtree( workFolder, ignore_errors=True ) # Nothing else in there is needed now
+            return pdfFilename, buildHash, myProcess.returncode==0 and os.path.isfile( mainFilepath+'.'+filenamePart+'.pdf' )
+        # end of toTeX.makePDF
 
 
         # Write the plain text XeTeX file
-        cwdSave = os.getcwd() # Save the current working directory before changing (below) to the output directory
+        texFilepaths = [] # (BBB,filepath) 2-tuples of the .tex files to be made into PDFs
         allFilename = "All-BOS-BibleWriter.tex"
         allFilepath = os.path.join( outputFolder, BibleOrgSysGlobals.makeSafeFilename( allFilename ) )
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r}...").format( allFilepath ) )
@@ -9214,9 +9391,55 @@ class BibleWriter( InternalBible ):
                     allFile.write( "\\BibleBookEnd\n" )
                     bookFile.write( "\\BibleBookEnd\n" )
                     bookFile.write( "\\end{document}\n" )
-                makePDFs( BBB, filepath, '30s' )
+                texFilepaths.append( (BBB,filepath) )
             allFile.write( "\\end{document}\n" )
-        makePDFs( 'All', allFilepath, '3m' )
+        texFilepaths.insert( 0, ('All',allFilepath) ) # Start the slowest job first
+
+        # Find the class files for the different styles of Bible layouts
+        styleFiles, styleHashes = OrderedDict(), {}
+        for filenamePart in ( 'Bible1','Bible2', ):
+            styleFiles[filenamePart] = []
+            styleHash = hashlib.md5()
+            for filepath,filename in ( (os.path.join( defaultControlFolder, filenamePart+'.cls' ), 'Bible.cls'),
+                                       (os.path.join( defaultControlFolder, 'lettrine.sty' ), 'lettrine.sty'), ):
+                try:
+                    with open( filepath, 'rb' ) as styleFile: styleHash.update( styleFile.read() )
+                except FileNotFoundError:
+                    logging.warning( "Unable to find TeX control file: {}".format( filepath ) ); continue
+                styleFiles[filenamePart].append( (filepath,filename) )
+                if filename == 'Bible.cls': shutil.copy( filepath, outputFolder ) # Copy it under its own name (for the user)
+            styleHashes[filenamePart] = styleHash.hexdigest()
+
+        # Make the PDFs that are out of date
+        buildInfoFilepath = os.path.join( outputFolder, TEX_BUILD_INFO_FILENAME )
+        try:
+            with open( buildInfoFilepath, 'rt', encoding='utf-8' ) as buildInfoFile:
+                previousPDFHashes = json.load( buildInfoFile )['pdfHashes']
+        except (OSError, ValueError, KeyError, TypeError): previousPDFHashes = {}
+        PDFHashes, PDFJobs = {}, []
+        for BBB,texFilepath in texFilepaths:
+            with open( texFilepath, 'rb' ) as texFile: texHash = hashlib.md5( texFile.read() ).hexdigest()
+            for filenamePart in styleFiles:
+                pdfFilename = os.path.basename( texFilepath )[:-4] + '.' + filenamePart + '.pdf'
+                buildHash = texHash + styleHashes[filenamePart]
+                if previousPDFHashes.get( pdfFilename ) == buildHash and os.path.isfile( os.path.join( outputFolder, pdfFilename ) ):
+                    PDFHashes[pdfFilename] = buildHash
+                else: PDFJobs.append( (BBB, texFilepath, filenamePart, allTimeout if BBB=='All' else bookTimeout, buildHash) )
+        if maxJobs is None: maxJobs = BibleOrgSysGlobals.maxProcesses
+        numWorkers = max( 1, min( maxJobs, len(PDFJobs) ) )
+        if BibleOrgSysGlobals.verbosityLevel > 1:
+            print( "  " + _("Making {} PDFs ({} unchanged) with {} xelatex job(s) at once...").format( len(PDFJobs), len(PDFHashes), numWorkers ) )
+        # Threads are enough because the actual work is done by the xelatex processes
+        pool = ThreadPool( numWorkers ) if numWorkers > 1 else None
+        try:
+            for pdfFilename, buildHash, successFlag in ( pool.imap_unordered( makePDF, PDFJobs ) if pool else map( makePDF, PDFJobs ) ):
+                if successFlag: PDFHashes[pdfFilename] = buildHash # Otherwise it will be made again next time
+        finally:
+            if pool: pool.close(); pool.join()
+            with open( buildInfoFilepath, 'wt', encoding='utf-8' ) as buildInfoFile:
+                json.dump( { 'pdfHashes':PDFHashes }, buildInfoFile, indent=1 )
+        try: os.rmdir( os.path.join( outputFolder, TEX_WORK_FOLDERNAME ) ) # Should be empty now
+        except OSError: pass # e.g., there were no jobs to run
 
         if ignoredMarkers:
             logging.info( "toTeX: Ignored markers were {}".format( ignoredMarkers ) )
@@ -9249,22 +9472,101 @@ class BibleWriter( InternalBible ):
 
 
 
-    def doExportHelper( self, ff ):
+    def __doExportPrerequisites( self, prerequisites ):
+        """
+        Do the given (named) setup steps that exports need before they can run.
+
+        These are done once by the calling process so that the work is shared
+            (rather than repeated) by all the export tasks (including those run in worker processes).
         """
-        Only used in doAllExports for multiprocessing.
+        if 'setupWriter' in prerequisites and not self.doneSetupGeneric: self.__setupWriter()
+        if 'discover' in prerequisites and 'discoveryResults' not in dir(self): self.discover()
+        if 'verseStream' in prerequisites:
+            for BBB,bookObject in self.books.items(): self.__getVerseStream( BBB, bookObject )
+    # end of BibleWriter.__doExportPrerequisites
+
 
-        Parameter ff is a 2-tuple containing the function to run, and the folder parameter to pass
+    def __scheduleExports( self, exportTasks, timingHistory ):
         """
-        if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doExportHelper( {} )".format( ff ) )
-        function, folder = ff
-        if function is None: return None # Some exports are not always requested
+        Runs the given export tasks, respecting their dependencies.
 
-        try: result = function( folder )
-        except Exception as err: # Got to catch and report the exceptions here
-            print( "BibleWriter.doExportHelper: Unexpected error in {} using {}:".format( function, folder ), sys.exc_info()[0], err)
-            result = False
-        return result
-    # end of BibleWriter.doExportHelper
+        Parameter exportTasks is an OrderedDict of resultKey: (methodName, outputFolder, dependsOn).
+        Parameter timingHistory is a dictionary of resultKey: seconds
+            used to start the longest-running exports first on multiCPU systems.
+
+        Returns a 2-tuple containing dictionaries of results and elapsed times (both keyed by resultKey).
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.__scheduleExports( {} )".format( list(exportTasks.keys()) ) )
+        results, timings = {}, {}
+
+        def getReadyTasks( waitingTasks ):
+            """
+            Returns a list of the waiting tasks whose dependencies are all done
+                (longest expected run time first).
+            """
+            readyTasks = [resultKey for resultKey in waitingTasks
+                            if all( dependency in results or dependency not in exportTasks for dependency in exportTasks[resultKey][2] )]
+            return sorted( readyTasks, key=lambda resultKey: -timingHistory.get( resultKey, 1 ) )
+        # end of getReadyTasks
+
+        def checkDependencies( resultKey ):
+            """ Returns True if none of the dependencies of the task have failed. """
+            for dependency in exportTasks[resultKey][2]:
+                if dependency in results and not results[dependency]:
+                    logging.error( "BibleWriter.doAllExports: " + _("Skipping {} because {} failed").format( resultKey, dependency ) )
+                    return False
+            return True
+        # end of checkDependencies
+
+        waitingTasks = list( exportTasks.keys() )
+        if BibleOrgSysGlobals.maxProcesses > 1 and not BibleOrgSysGlobals.debugFlag: # Process all the exports with different processes
+            if BibleOrgSysGlobals.verbosityLevel > 0:
+                print( "BibleWriter.doAllExports: Running {} exports on {} CPUs".format( len(exportTasks), BibleOrgSysGlobals.maxProcesses ) )
+                if BibleOrgSysGlobals.verbosityLevel > 1:
+                    print( "  NOTE: Outputs (including error and warning messages) from various exports may be interspersed." )
+            finishedQueue = queue.Queue()
+            # Each worker process is given this Bible object once (rather than once per export)
+            with multiprocessing.Pool( processes=BibleOrgSysGlobals.maxProcesses, initializer=_initExportWorker, initargs=(self,) ) as pool:
+                numRunning = 0
+                while waitingTasks or numRunning:
+                    for resultKey in getReadyTasks( waitingTasks ):
+                        waitingTasks.remove( resultKey )
+                        if not checkDependencies( resultKey ):
+                            results[resultKey] = False; continue
+                        methodName, outputFolder = exportTasks[resultKey][:2]
+                        pool.apply_async( _doExportTask, ((resultKey,methodName,outputFolder),), callback=finishedQueue.put,
+                                        error_callback=lambda err, resultKey=resultKey: finishedQueue.put( (resultKey,False,0) ) )
+                        numRunning += 1
+                    if numRunning:
+                        resultKey, result, elapsedSeconds = finishedQueue.get() # Wait for the next export to finish
+                        numRunning -= 1
+                        results[resultKey], timings[resultKey] = result, elapsedSeconds
+                    elif waitingTasks: # Must be a dependency loop
+                        logging.critical( "BibleWriter.doAllExports: " + _("Unable to schedule {}").format( waitingTasks ) )
+                        for resultKey in waitingTasks: results[resultKey] = False
+                        waitingTasks = []
+            if BibleOrgSysGlobals.verbosityLevel > 0: print( "BibleWriter.doAllExports: Got {} results".format( len(results) ) )
+
+        else: # Just single threaded (or debugging)
+            while waitingTasks:
+                readyTasks = [resultKey for resultKey in waitingTasks if resultKey in getReadyTasks( waitingTasks )] # Keep our order
+                if not readyTasks: # Must be a dependency loop
+                    logging.critical( "BibleWriter.doAllExports: " + _("Unable to schedule {}").format( waitingTasks ) )
+                    for resultKey in waitingTasks: results[resultKey] = False
+                    break
+                resultKey = readyTasks[0]
+                waitingTasks.remove( resultKey )
+                if not checkDependencies( resultKey ):
+                    results[resultKey] = False; continue
+                methodName, outputFolder = exportTasks[resultKey][:2]
+                if BibleOrgSysGlobals.debugFlag: # no try/except calls so it halts on errors rather than continuing
+                    startTime = time.time()
+                    results[resultKey] = getattr( self, methodName )( outputFolder )
+                    timings[resultKey] = time.time() - startTime
+                else: resultKey, results[resultKey], timings[resultKey] = _doExportTask( (resultKey,methodName,outputFolder), self )
+
+        return results, timings
+    # end of BibleWriter.__scheduleExports
 
 
     def doAllExports( self, givenOutputFolderName=None, wantPhotoBible=None, wantODFs=None, wantPDFs=None ):
@@ -9274,7 +9576,15 @@ class BibleWriter( InternalBible ):
 
         The three very processor intensive exports require explicit inclusion.
 
-        Returns a dictionary of result flags.
+        The exports (and their prerequisites and dependencies) are listed in EXPORT_TASKS above.
+            The run time of each export is saved in the output folder
+            so that next time the slowest exports can be started first.
+        A manifest is also saved in the output folder so that next time
+            any export which would be made from exactly the same Bible contents and settings is skipped.
+
+        Returns a dictionary of result flags
+            (None for exports which weren't done, either because they weren't wanted
+                or because they were skipped as unchanged since last time).
         """
         allWord = "all" if wantPhotoBible and wantODFs and wantPDFs else "most"
         if BibleOrgSysGlobals.verbosityLevel > 1:
@@ -9290,283 +9600,72 @@ class BibleWriter( InternalBible ):
             logging.critical( "BibleWriter.doAllExports: " + _("Given {!r} folder is unwritable" ).format( givenOutputFolderName ) )
             return False
 
-        # Define our various output folders
-        pickleOutputFolder = os.path.join( givenOutputFolderName, "BOS_Bible_Object_Pickle/" )
-        listOutputFolder = os.path.join( givenOutputFolderName, "BOS_Lists/" )
-        BCVOutputFolder = os.path.join( givenOutputFolderName, "BOS_BCV_Export/" )
-        pseudoUSFMOutputFolder = os.path.join( givenOutputFolderName, "BOS_PseudoUSFM_Export/" )
-        USFMOutputFolder = os.path.join( givenOutputFolderName, "BOS_USFM_" + ("Reexport/" if self.objectTypeString=='USFM' else "Export/" ) )
-        ESFMOutputFolder = os.path.join( givenOutputFolderName, "BOS_ESFM_" + ("Reexport/" if self.objectTypeString=='ESFM' else "Export/" ) )
-        textOutputFolder = os.path.join( givenOutputFolderName, "BOS_PlainText_" + ("Reexport/" if self.objectTypeString=='Text' else "Export/" ) )
-        markdownOutputFolder = os.path.join( givenOutputFolderName, "BOS_Markdown_Export/" )
-        D43OutputFolder = os.path.join( givenOutputFolderName, "BOS_Door43_" + ("Reexport/" if self.objectTypeString=='Door43' else "Export/" ) )
-        htmlOutputFolder = os.path.join( givenOutputFolderName, "BOS_HTML5_Export/" )
-        CBOutputFolder = os.path.join( givenOutputFolderName, "BOS_CustomBible_" + "Export/" )
-        USXOutputFolder = os.path.join( givenOutputFolderName, "BOS_USX_" + ("Reexport/" if self.objectTypeString=='USX' else "Export/" ) )
-        USFXOutputFolder = os.path.join( givenOutputFolderName, "BOS_USFX_" + ("Reexport/" if self.objectTypeString=='USFX' else "Export/" ) )
-        OSISOutputFolder = os.path.join( givenOutputFolderName, "BOS_OSIS_" + ("Reexport/" if self.objectTypeString=='OSIS' else "Export/" ) )
-        zefOutputFolder = os.path.join( givenOutputFolderName, "BOS_Zefania_" + ("Reexport/" if self.objectTypeString=='Zefania' else "Export/" ) )
-        hagOutputFolder = os.path.join( givenOutputFolderName, "BOS_Haggai_" + ("Reexport/" if self.objectTypeString=='Haggia' else "Export/" ) )
-        OSOutputFolder = os.path.join( givenOutputFolderName, "BOS_OpenSong_" + ("Reexport/" if self.objectTypeString=='OpenSong' else "Export/" ) )
-        swOutputFolder = os.path.join( givenOutputFolderName, "BOS_Sword_" + ("Reexport/" if self.objectTypeString=='Sword' else "Export/" ) )
-        TWOutputFolder = os.path.join( givenOutputFolderName, "BOS_theWord_" + ("Reexport/" if self.objectTypeString=='TheWord' else "Export/" ) )
-        MySwOutputFolder = os.path.join( givenOutputFolderName, "BOS_MySword_" + ("Reexport/" if self.objectTypeString=='MySword' else "Export/" ) )
-        ESwOutputFolder = os.path.join( givenOutputFolderName, "BOS_e-Sword_" + ("Reexport/" if self.objectTypeString=='e-Sword' else "Export/" ) )
-        SwSOutputFolder = os.path.join( givenOutputFolderName, "BOS_SwordSearcher_Export/" )
-        DrOutputFolder = os.path.join( givenOutputFolderName, "BOS_DrupalBible_" + ("Reexport/" if self.objectTypeString=='DrupalBible' else "Export/" ) )
-        photoOutputFolder = os.path.join( givenOutputFolderName, "BOS_PhotoBible_Export/" )
-        ODFOutputFolder = os.path.join( givenOutputFolderName, "BOS_ODF_Export/" )
-        TeXOutputFolder = os.path.join( givenOutputFolderName, "BOS_TeX_Export/" )
-
-        if not wantPhotoBible:
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doAllExports: " + _("Skipping PhotoBible export") )
-            PhotoBibleExportResult = None
-        if not wantODFs:
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doAllExports: " + _("Skipping ODF export") )
-            ODFExportResult = None
-        if not wantPDFs:
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doAllExports: " + _("Skipping TeX/PDF export") )
-            TeXExportResult = None
+        # Decide which exports we want and define their output folders
+        wantedOptionalExports = { 'PhotoBibleExport':wantPhotoBible, 'ODFExport':wantODFs, 'TeXExport':wantPDFs }
+        # Any exports made last time from exactly the same Bible contents and settings (and by the same code) are skipped
+        exportsManifest = ExportManifest( os.path.join( givenOutputFolderName, EXPORTS_MANIFEST_FILENAME ), getSettingsHash( ProgVersion, getSourceHash( BibleWriter, MLWriter, ArchiveWriter, SQLiteBulkWriter, LibreOfficePool, ODTWriter ) ) )
+        exportsHash = self.__getExportsHash()
+        exportTasks, prerequisites, unchangedResultKeys = OrderedDict(), set(), []
+        for resultKey, methodName, outputFolderName, reexportType, taskPrerequisites, dependsOn, defaultCost in EXPORT_TASKS:
+            if resultKey in wantedOptionalExports and not wantedOptionalExports[resultKey]:
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doAllExports: " + _("Skipping {}").format( resultKey ) )
+                continue
+            if exportsManifest.isUnchanged( resultKey, exportsHash ):
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "BibleWriter.doAllExports: " + _("Skipping unchanged {}").format( resultKey ) )
+                unchangedResultKeys.append( resultKey )
+                continue
+            if reexportType is not None and self.objectTypeString==reexportType:
+                outputFolderName = outputFolderName.replace( '_Export/', '_Reexport/' )
+            exportTasks[resultKey] = (methodName, os.path.join( givenOutputFolderName, outputFolderName ), dependsOn)
+            prerequisites.update( taskPrerequisites )
+
+        # Load the timing history from any previous runs (used to start the slowest exports first)
+        timingHistoryFilepath = os.path.join( givenOutputFolderName, EXPORT_TIMINGS_FILENAME )
+        timingHistory = { resultKey:defaultCost for resultKey, methodName, outputFolderName, reexportType, taskPrerequisites, dependsOn, defaultCost in EXPORT_TASKS }
+        try:
+            with open( timingHistoryFilepath, 'rt' ) as timingFile: timingHistory.update( json.load( timingFile ) )
+        except (FileNotFoundError, ValueError): pass # No (usable) history yet
 
         # Pickle this Bible object
         # NOTE: This must be done before self.__setupWriter is called
         #       because the BRL object has a recursive pointer to self and the pickle fails
+        pickleOutputFolder = os.path.join( givenOutputFolderName, "BOS_Bible_Object_Pickle/" )
         if BibleOrgSysGlobals.debugFlag: pickleResult = self.toPickle( pickleOutputFolder ) # halts if fails
         else:
             try: pickleResult = self.toPickle( pickleOutputFolder )
             except IOError:
                 pickleResult = False
                 print( "BibleWriter.doAllExports: pickle( {} ) failed.".format( pickleOutputFolder ) )
-        if not self.doneSetupGeneric: self.__setupWriter()
-        if 'discoveryResults' not in dir(self): self.discover()
+        self.__doExportPrerequisites( prerequisites )
 
-        if BibleOrgSysGlobals.debugFlag: # no try/except calls so it halts on errors rather than continuing
-            listOutputResult = self.makeLists( listOutputFolder )
-            BCVExportResult = self.toBOSBCV( BCVOutputFolder )
-            pseudoUSFMExportResult = self.toPseudoUSFM( pseudoUSFMOutputFolder )
-            USFMExportResult = self.toUSFM( USFMOutputFolder )
-            ESFMExportResult = self.toESFM( ESFMOutputFolder )
-            textExportResult = self.toText( textOutputFolder )
-            markdownExportResult = self.toMarkdown( markdownOutputFolder )
-            D43ExportResult = self.toDoor43( D43OutputFolder )
-            htmlExportResult = self.toHTML5( htmlOutputFolder )
-            CBExportResult = self.toCustomBible( CBOutputFolder )
-            USXExportResult = self.toUSXXML( USXOutputFolder )
-            USFXExportResult = self.toUSFXXML( USFXOutputFolder )
-            OSISExportResult = self.toOSISXML( OSISOutputFolder )
-            ZefExportResult = self.toZefaniaXML( zefOutputFolder )
-            HagExportResult = self.toHaggaiXML( hagOutputFolder )
-            OSExportResult = self.toOpenSongXML( OSOutputFolder )
-            swExportResult = self.toSwordModule( swOutputFolder )
-            TWExportResult = self.totheWord( TWOutputFolder )
-            MySwExportResult = self.toMySword( MySwOutputFolder )
-            ESwExportResult = self.toESword( ESwOutputFolder )
-            SwSExportResult = self.toSwordSearcher( SwSOutputFolder )
-            DrExportResult = self.toDrupalBible( DrOutputFolder )
-            if wantPhotoBible: PhotoBibleExportResult = self.toPhotoBible( photoOutputFolder )
-            if wantODFs: ODFExportResult = self.toODF( ODFOutputFolder )
-            if wantPDFs: TeXExportResult = self.toTeX( TeXOutputFolder ) # Put this last since it's slowest
-
-        elif BibleOrgSysGlobals.maxProcesses > 1: # Process all the exports with different threads
-            # We move the three longest processes to the top here,
-            #   so they start first to help us get finished quicker on multiCPU systems.
-            self.__outputProcesses = [self.toPhotoBible if wantPhotoBible else None,
-                                    self.toODF if wantODFs else None,
-                                    self.toTeX if wantPDFs else None,
-                                    self.makeLists, self.toBOSBCV, self.toPseudoUSFM,
-                                    self.toUSFM, self.toESFM, self.toText,
-                                    self.toMarkdown, self.toDoor43, self.toHTML5, self.toCustomBible,
-                                    self.toUSXXML, self.toUSFXXML, self.toOSISXML,
-                                    self.toZefaniaXML, self.toHaggaiXML, self.toOpenSongXML,
-                                    self.toSwordModule, self.totheWord, self.toMySword, self.toESword,
-                                    self.toSwordSearcher, self.toDrupalBible, ]
-            self.__outputFolders = [photoOutputFolder, ODFOutputFolder, TeXOutputFolder,
-                                    listOutputFolder, BCVOutputFolder, pseudoUSFMOutputFolder,
-                                    USFMOutputFolder, ESFMOutputFolder,
-                                    textOutputFolder, markdownOutputFolder, D43OutputFolder,
-                                    htmlOutputFolder, CBOutputFolder,
-                                    USXOutputFolder, USFXOutputFolder, OSISOutputFolder,
-                                    zefOutputFolder, hagOutputFolder, OSOutputFolder,
-                                    swOutputFolder, TWOutputFolder, MySwOutputFolder, ESwOutputFolder,
-                                    SwSOutputFolder, DrOutputFolder, ]
-            assert( len(self.__outputFolders) == len(self.__outputProcesses) )
-            if BibleOrgSysGlobals.verbosityLevel > 0:
-                print( "BibleWriter.doAllExports: Running {} exports on {} CPUs".format( len(self.__outputProcesses), BibleOrgSysGlobals.maxProcesses ) )
-                if BibleOrgSysGlobals.verbosityLevel > 1:
-                    print( "  NOTE: Outputs (including error and warning messages) from various exports may be interspersed." )
-            with multiprocessing.Pool( processes=BibleOrgSysGlobals.maxProcesses ) as pool: # start worker processes
-                results = pool.map( self.doExportHelper, zip(self.__outputProcesses,self.__outputFolders) ) # have the pool do our loads
-                if BibleOrgSysGlobals.verbosityLevel > 0: print( "BibleWriter.doAllExports: Got {} results".format( len(results) ) )
-                assert( len(results) == len(self.__outputFolders) )
-                PhotoBibleExportResult, ODFExportResult, TeXExportResult, \
-                    listOutputResult, BCVExportResult, pseudoUSFMExportResult, \
-                    USFMExportResult, ESFMExportResult, textExportResult, \
-                    markdownExportResult, D43ExportResult, htmlExportResult, CBExportResult, \
-                    USXExportResult, USFXExportResult, OSISExportResult, ZefExportResult, HagExportResult, OSExportResult, \
-                    swExportResult, TWExportResult, MySwExportResult, ESwExportResult, SwSExportResult, DrExportResult, \
-                        = results
-
-        else: # Just single threaded and not debugging
-            try: listOutputResult = self.makeLists( listOutputFolder )
-            except Exception as err:
-                listOutputResult = False
-                print("BibleWriter.doAllExports.makeLists Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.makeLists: Oops, failed!" )
-            try: BCVExportResult = self.toBOSBCV( BCVOutputFolder )
-            except Exception as err:
-                BCVExportResult = False
-                print("BibleWriter.doAllExports.toBOSBCV Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toBOSBCV: Oops, failed!" )
-            try: pseudoUSFMExportResult = self.toPseudoUSFM( pseudoUSFMOutputFolder )
-            except Exception as err:
-                pseudoUSFMExportResult = False
-                print("BibleWriter.doAllExports.toPseudoUSFM Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toPseudoUSFM: Oops, failed!" )
-            try: USFMExportResult = self.toUSFM( USFMOutputFolder )
-            except Exception as err:
-                USFMExportResult = False
-                print("BibleWriter.doAllExports.toUSFM Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toUSFM: Oops, failed!" )
-            try: ESFMExportResult = self.toESFM( ESFMOutputFolder )
-            except Exception as err:
-                ESFMExportResult = False
-                print("BibleWriter.doAllExports.toESFM Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toESFM: Oops, failed!" )
-            try: textExportResult = self.toText( textOutputFolder )
-            except Exception as err:
-                textExportResult = False
-                print("BibleWriter.doAllExports.toText Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toText: Oops, failed!" )
-            try: markdownExportResult = self.toMarkdown( markdownOutputFolder )
-            except Exception as err:
-                markdownExportResult = False
-                print("BibleWriter.doAllExports.toMarkdown Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toMarkdown: Oops, failed!" )
-            try: D43ExportResult = self.toDoor43( D43OutputFolder )
-            except Exception as err:
-                D43ExportResult = False
-                print("BibleWriter.doAllExports.toDoor43 Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toDoor43: Oops, failed!" )
-            try: htmlExportResult = self.toHTML5( htmlOutputFolder )
-            except Exception as err:
-                htmlExportResult = False
-                print("BibleWriter.doAllExports.toHTML5 Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toHTML5: Oops, failed!" )
-            try: CBExportResult = self.toCustomBible( CBOutputFolder )
-            except Exception as err:
-                CBExportResult = False
-                print("BibleWriter.doAllExports.toCustomBible Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toCustomBible: Oops, failed!" )
-            try: USXExportResult = self.toUSXXML( USXOutputFolder )
-            except Exception as err:
-                USXExportResult = False
-                print("BibleWriter.doAllExports.toUSXXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toUSXXML: Oops, failed!" )
-            try: USFXExportResult = self.toUSFXXML( USFXOutputFolder )
-            except Exception as err:
-                USFXExportResult = False
-                print("BibleWriter.doAllExports.toUSFXXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toUSFXXML: Oops, failed!" )
-            try: OSISExportResult = self.toOSISXML( OSISOutputFolder )
-            except Exception as err:
-                OSISExportResult = False
-                print("BibleWriter.doAllExports.toOSISXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toOSISXML: Oops, failed!" )
-            try: ZefExportResult = self.toZefaniaXML( zefOutputFolder )
-            except Exception as err:
-                ZefExportResult = False
-                print("BibleWriter.doAllExports.toZefaniaXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toZefaniaXML: Oops, failed!" )
-            try: HagExportResult = self.toHaggaiXML( hagOutputFolder )
-            except Exception as err:
-                HagExportResult = False
-                print("BibleWriter.doAllExports.toHaggaiXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toHaggaiXML: Oops, failed!" )
-            try: OSExportResult = self.toOpenSongXML( OSOutputFolder )
-            except Exception as err:
-                OSExportResult = False
-                print("BibleWriter.doAllExports.toOpenSongXML Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toOpenSongXML: Oops, failed!" )
-            try: swExportResult = self.toSwordModule( swOutputFolder )
-            except Exception as err:
-                swExportResult = False
-                print("BibleWriter.doAllExports.toSwordModule Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toSwordModule: Oops, failed!" )
-            try: TWExportResult = self.totheWord( TWOutputFolder )
-            except Exception as err:
-                TWExportResult = False
-                print("BibleWriter.doAllExports.totheWord Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.totheWord: Oops, failed!" )
-            try: MySwExportResult = self.toMySword( MySwOutputFolder )
-            except Exception as err:
-                MySwExportResult = False
-                print("BibleWriter.doAllExports.toMySword Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toMySword: Oops, failed!" )
-            try: ESwExportResult = self.toESword( ESwOutputFolder )
-            except Exception as err:
-                ESwExportResult = False
-                print("BibleWriter.doAllExports.toESword Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toESword: Oops, failed!" )
-            try: SwSExportResult = self.toSwordSearcher( SwSOutputFolder )
-            except Exception as err:
-                SwSExportResult = False
-                print("BibleWriter.doAllExports.toSwordSearcher Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toSwordSearcher: Oops, failed!" )
-            try: DrExportResult = self.toDrupalBible( DrOutputFolder )
-            except Exception as err:
-                DrExportResult = False
-                print("BibleWriter.doAllExports.toDrupalBible Unexpected error:", sys.exc_info()[0], err)
-                logging.error( "BibleWriter.doAllExports.toDrupalBible: Oops, failed!" )
-            if wantPhotoBible:
-                try: PhotoBibleExportResult = self.toPhotoBible( photoOutputFolder )
-                except Exception as err:
-                    PhotoBibleExportResult = False
-                    print("BibleWriter.doAllExports.toPhotoBible Unexpected error:", sys.exc_info()[0], err)
-                    logging.error( "BibleWriter.doAllExports.toPhotoBible: Oops, failed!" )
-            if wantODFs:
-                try: ODFExportResult = self.toODF( ODFOutputFolder )
-                except Exception as err:
-                    ODFExportResult = False
-                    print("BibleWriter.doAllExports.toODF Unexpected error:", sys.exc_info()[0], err)
-                    logging.error( "BibleWriter.doAllExports.toODF: Oops, failed!" )
-            if wantPDFs: # Do TeX export last because it's slowest
-                try: TeXExportResult = self.toTeX( TeXOutputFolder )
-                except Exception as err:
-                    TeXExportResult = False
-                    print("BibleWriter.doAllExports.toTeX Unexpected error:", sys.exc_info()[0], err)
-                    logging.error( "BibleWriter.doAllExports.toTeX: Oops, failed!" )
+        exportResults, timings = self.__scheduleExports( exportTasks, timingHistory )
+
+        # Update the manifest with the files written by each export
+        for resultKey,(methodName, outputFolder, dependsOn) in exportTasks.items():
+            if exportResults[resultKey]:
+                exportsManifest.setEntry( resultKey, exportsHash, [os.path.join( folder, filename )
+                                    for folder, subfolders, filenames in os.walk( outputFolder ) for filename in filenames] )
+            else: exportsManifest.removeEntry( resultKey ) # So it's done again next time
+        exportsManifest.save()
+
+        # Save the updated timing history for next time
+        for resultKey,elapsedSeconds in timings.items():
+            if exportResults[resultKey]: timingHistory[resultKey] = round( elapsedSeconds, 3 )
+        try:
+            with open( timingHistoryFilepath, 'wt' ) as timingFile: json.dump( timingHistory, timingFile, indent=1, sort_keys=True )
+        except IOError: logging.error( "BibleWriter.doAllExports: " + _("Unable to save timings to {}").format( timingHistoryFilepath ) )
+
+        resultsDict = OrderedDict( [('Pickle',pickleResult)] )
+        for resultKey, methodName, outputFolderName, reexportType, taskPrerequisites, dependsOn, defaultCost in EXPORT_TASKS:
+            resultsDict[resultKey] = exportResults[resultKey] if resultKey in exportResults else None
 
         if BibleOrgSysGlobals.verbosityLevel > 1:
-            if pickleResult and listOutputResult and BCVExportResult \
-            and pseudoUSFMExportResult and USFMExportResult and ESFMExportResult \
-            and textExportResult and markdownExportResult and D43ExportResult and htmlExportResult and CBExportResult \
-            and USXExportResult and USFXExportResult and OSISExportResult \
-            and ZefExportResult and HagExportResult and OSExportResult \
-            and swExportResult and TWExportResult and MySwExportResult and ESwExportResult \
-            and SwSExportResult and DrExportResult \
-            and (PhotoBibleExportResult or not wantPhotoBible) and (ODFExportResult or not wantODFs) and (TeXExportResult or not wantPDFs):
+            if all( resultsDict[resultKey] for resultKey in resultsDict if resultKey in exportTasks or resultKey=='Pickle' ):
                 print( "BibleWriter.doAllExports finished them all successfully!" )
-            else: print( "BibleWriter.doAllExports finished:  Pck={}  Lst={}  BCV={} PsUSFM={} USFM={} ESFM={} Tx={}  md={} D43={}  "
-                    "HTML={} CB={}  USX={} USFX={} OSIS={}  Zef={} Hag={} OS={}  Sw={}  "
-                    "TW={} MySw={} eSw={}  SwS={} Dr={}  PB={} ODF={} TeX={}" \
-                    .format( pickleResult, listOutputResult, BCVExportResult,
-                            pseudoUSFMExportResult, USFMExportResult, ESFMExportResult,
-                            textExportResult, markdownExportResult, D43ExportResult, htmlExportResult, CBExportResult,
-                            USXExportResult, USFXExportResult, OSISExportResult,
-                            ZefExportResult, HagExportResult, OSExportResult,
-                            swExportResult, TWExportResult, MySwExportResult, ESwExportResult,
-                            SwSExportResult, DrExportResult,
-                            PhotoBibleExportResult, ODFExportResult, TeXExportResult ) )
-        return { 'Pickle':pickleResult, 'listOutput':listOutputResult, 'BCVOutput':BCVExportResult,
-                'pseudoUSFMExport':pseudoUSFMExportResult, 'USFMExport':USFMExportResult, 'ESFMExport':ESFMExportResult,
-                'textExport':textExportResult, 'markdownExport':markdownExportResult, 'D43Export':D43ExportResult,
-                'htmlExport':htmlExportResult, 'CustomBibleExport':CBExportResult,
-                'USXExport':USXExportResult, 'USFXExport':USFXExportResult, 'OSISExport':OSISExportResult,
-                'ZefExport':ZefExportResult, 'HagExport':HagExportResult, 'OSExport':OSExportResult,
-                'swExport':swExportResult,
-                'TWExport':TWExportResult, 'MySwExport':MySwExportResult, 'ESwExport':ESwExportResult,
-                'SwSExport':SwSExportResult, 'DrExport':DrExportResult,
-                'PhotoBibleExport':PhotoBibleExportResult, 'ODFExport':ODFExportResult, 'TeXExport':TeXExportResult, }
+            else: print( "BibleWriter.doAllExports finished:  {}".format( '  '.join( '{}={}'.format( resultKey, result ) for resultKey,result in resultsDict.items() ) ) )
+            if unchangedResultKeys:
+                print( "BibleWriter.doAllExports: " + _("Skipped unchanged {}").format( ', '.join( unchangedResultKeys ) ) )
+        return dict( resultsDict )
     # end of BibleWriter.doAllExports
 # end of class BibleWriter
 
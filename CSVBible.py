@@ -87,10 +87,9 @@ def CSVBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoLo
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " CSVBibleFileCheck: Looking for files in given {}".format( repr(givenFolderName) ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             ignore = False
@@ -137,10 +136,9 @@ def CSVBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoLo
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    CSVBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 ignore = False
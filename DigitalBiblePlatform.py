@@ -596,10 +596,11 @@ class DBPBible:
         """
         """
         if BibleOrgSysGlobals.debugFlag and debuggingThisModule: print( t("DBPBible.getVerseData( {} ) for {})").format( repr(key), repr(self.damRoot) ) )
-        if str(key) in self.cache:
+        cacheKey = key.getBCVS() # Cheaper than str(key) and the same for SimpleVerseKey and PackedVerseKey
+        if cacheKey in self.cache:
             if BibleOrgSysGlobals.debugFlag and debuggingThisModule: print( "  " + t("Retrieved from cache") )
-            self.cache.move_to_end( str(key) )
-            return self.cache[str(key)]
+            self.cache.move_to_end( cacheKey )
+            return self.cache[cacheKey]
         BBB = key.getBBB()
         if BBB in self.books:
             info = self.books[BBB]
@@ -613,7 +614,7 @@ class DBPBible:
                 if key.getVerseNumber()=='1': resultList.append( ('c#','c#',rawDataDict['chapter_id'],rawDataDict['chapter_id'],[]) )
                 resultList.append( ('v','v',rawDataDict['verse_id'],rawDataDict['verse_id'],[]) )
                 resultList.append( ('v~','v~',rawDataDict['verse_text'].strip(),rawDataDict['verse_text'].strip(),[]) )
-                self.cache[str(key)] = resultList
+                self.cache[cacheKey] = resultList
                 if len(self.cache) > MAX_CACHED_VERSES:
                     #print( "Removing oldest cached entry", len(self.cache) )
                     self.cache.popitem( last=False )
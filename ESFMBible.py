@@ -96,10 +96,9 @@ def ESFMBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoL
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " ESFMBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             #ignore = False
@@ -149,10 +148,9 @@ def ESFMBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoL
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    ESFMBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 #ignore = False
@@ -48,7 +48,7 @@ e.g.,
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "e-SwordBible"
 ProgName = "e-Sword Bible format handler"
 ProgVersion = '0.12'
@@ -71,6 +71,7 @@ from BibleOrganizationalSystems import BibleOrganizationalSystem
 
 filenameEndingsToAccept = ('.BBLX',) # Must be UPPERCASE here
 BibleFilenameEndingsToAccept = ('.BBLX',) # Must be UPPERCASE here
+BULK_FETCH_SIZE = 2000 # Number of table rows fetched from the database at a time
 
 
 
@@ -101,10 +102,9 @@ def ESwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, aut
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " ESwordBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             #ignore = False
@@ -144,10 +144,9 @@ def ESwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, aut
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    ESwordBibleFileCheck: Looking for files in {}".format( repr(tryFolderName) ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 #ignore = False
@@ -176,6 +175,66 @@ def ESwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, aut
 
 
 
+def iterateBibleTableVerses( cursor, BOS, firstBBB, numBooks, callerName ):
+    """
+    A generator which reads the entire Bible table (as used by e-Sword and MySword modules) in one pass
+        (ordered by Book, Chapter, Verse and fetched in batches)
+        and matches the rows against the verses expected by the BOS versification system.
+
+    Yields (BBB, C, V, line) 4-tuples (with integer C and V) for every expected verse of numBooks books
+        starting at firstBBB, where line is None if there is no row for that verse.
+
+    Rows which don't match an expected verse (and any duplicate rows after the first one)
+        are logged as errors (and are not returned).
+    """
+    def getRows():
+        """ Yields the ordered table rows a batch at a time. """
+        while True:
+            rows = cursor.fetchmany( BULK_FETCH_SIZE )
+            if not rows: break
+            for row in rows: yield row
+    # end of getRows
+
+    def getRowKey( row ):
+        """ Returns the (Book, Chapter, Verse) integers for the row (or None if they're not valid). """
+        try: return int(row[0]), int(row[1]), int(row[2])
+        except (TypeError, ValueError): return None
+    # end of getRowKey
+
+    def logExtraRow( row ):
+        """ Logs a table row which doesn't fit the versification system. """
+        try: BBB = BibleOrgSysGlobals.BibleBooksCodes.getBBBFromReferenceNumber( int(row[0]) )
+        except (KeyError, TypeError, ValueError): BBB = 'Book{}'.format( row[0] )
+        logging.error( "{}: Found extra verse line at {} {}:{} {!r}".format( callerName, BBB, row[1], row[2], row[3] ) )
+    # end of logExtraRow
+
+    cursor.execute( 'select Book, Chapter, Verse, Scripture from Bible order by Book, Chapter, Verse, rowid' )
+    rows = getRows()
+    nextRow = next( rows, None )
+    nextRowKey = getRowKey( nextRow ) if nextRow is not None else None
+    BBB = firstBBB
+    for bookCount in range( numBooks ):
+        if bookCount: BBB = BOS.getNextBookCode( BBB )
+        if BBB is None: break
+        nBBB = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
+        for C, numV in enumerate( BOS.getNumVersesList( BBB ), start=1 ):
+            for V in range( 1, numV+1 ):
+                verseKey, line = (nBBB,C,V), None
+                while nextRow is not None and (nextRowKey is None or nextRowKey <= verseKey):
+                    if nextRowKey == verseKey:
+                        if line is None: line = nextRow[3]
+                        else: logging.error( "{}: Ignored duplicate verse line at {} {}:{} {!r}".format( callerName, BBB, C, V, nextRow[3] ) )
+                    else: logExtraRow( nextRow )
+                    nextRow = next( rows, None )
+                    nextRowKey = getRowKey( nextRow ) if nextRow is not None else None
+                yield BBB, C, V, line
+    while nextRow is not None: # Anything left over after the last expected book
+        logExtraRow( nextRow )
+        nextRow = next( rows, None )
+# end of iterateBibleTableVerses
+
+
+
 class ESwordBible( Bible ):
     """
     Class for reading, validating, and converting ESwordBible files.
@@ -444,15 +503,12 @@ class ESwordBible( Bible ):
 
 
         # Just get some information from the file
-        cursor.execute( 'select * from Bible' )
-        rows = cursor.fetchall()
-        numRows = len(rows)
+        cursor.execute( 'select count(*), min(Book) from Bible' )
+        numRows, BBBn1 = cursor.fetchone()
         if BibleOrgSysGlobals.debugFlag or BibleOrgSysGlobals.verbosityLevel>2: print( '{} rows found'.format( numRows ) )
-        BBBn1 = rows[0][0]
         if BibleOrgSysGlobals.debugFlag or BibleOrgSysGlobals.verbosityLevel>2: print( 'First book number is {}'.format( BBBn1 ) )
-        del rows
         BBB1 = None
-        if BBBn1 <= 66: BBB1 = BibleOrgSysGlobals.BibleBooksCodes.getBBBFromReferenceNumber( BBBn1 )
+        if BBBn1 is not None and BBBn1 <= 66: BBB1 = BibleOrgSysGlobals.BibleBooksCodes.getBBBFromReferenceNumber( BBBn1 )
 
 
         testament = BBB = None
@@ -501,31 +557,23 @@ class ESwordBible( Bible ):
 
         BOS = BibleOrganizationalSystem( "GENERIC-KJV-66-ENG" )
 
-        # Create the first book
-        thisBook = BibleBook( self, BBB )
-        thisBook.objectNameString = "e-Sword Bible Book object"
-        thisBook.objectTypeString = "e-Sword"
-
-        verseList = BOS.getNumVersesList( BBB )
-        numC, numV = len(verseList), verseList[0]
-        nBBB = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
-        C = V = 1
-
         bookCount = 0
         ourGlobals = {}
         continued = ourGlobals['haveParagraph'] = False
-        haveLines = False
-        while True:
-            cursor.execute('select Scripture from Bible where Book=? and Chapter=? and Verse=?', (nBBB,C,V) )
-            try:
-                row = cursor.fetchone()
-                line = row[0]
-            except TypeError: # This reference is missing (row is None)
-                #print( "something wrong at", BBB, C, V )
-                #if BibleOrgSysGlobals.debugFlag: halt
-                #print( row )
-                line = None
-            #print ( nBBB, BBB, C, V, 'e-Sw file line is "' + line + '"' )
+        thisBook = None
+        for BBB, C, V, line in iterateBibleTableVerses( cursor, BOS, BBB, booksExpected, "ESwordBible.load" ):
+            if thisBook is None or BBB != thisBook.BBB: # Start a new book
+                if thisBook is not None and haveLines:
+                    if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", thisBook.BBB, bookCount )
+                    self.saveBook( thisBook )
+                #elif thisBook is not None: print( "Not saving", thisBook.BBB )
+                bookCount += 1 # Not the number saved but the number we attempted to process
+                thisBook = BibleBook( self, BBB )
+                thisBook.objectNameString = "e-Sword Bible Book object"
+                thisBook.objectTypeString = "e-Sword"
+                haveLines = False
+
+            #print ( BBB, C, V, 'e-Sw file line is "' + line + '"' )
             if line is None: logging.warning( "ESwordBible.load: Found missing verse line at {} {}:{}".format( BBB, C, V ) )
             else: # line is not None
                 if not isinstance( line, str ):
@@ -550,36 +598,14 @@ class ESwordBible( Bible ):
 
             #print( "e-Sword.load", BBB, C, V, repr(line) )
             self.handleLine( self.name, BBB, C, V, line, thisBook, ourGlobals )
-            V += 1
-            if V > numV:
-                C += 1
-                if C > numC: # Save this book now
-                    if haveLines:
-                        if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", BBB, bookCount+1 )
-                        self.saveBook( thisBook )
-                    #else: print( "Not saving", BBB )
-                    bookCount += 1 # Not the number saved but the number we attempted to process
-                    if bookCount >= booksExpected: break
-                    BBB = BOS.getNextBookCode( BBB )
-                    # Create the next book
-                    thisBook = BibleBook( self, BBB )
-                    thisBook.objectNameString = "e-Sword Bible Book object"
-                    thisBook.objectTypeString = "e-Sword"
-                    haveLines = False
-
-                    verseList = BOS.getNumVersesList( BBB )
-                    numC, numV = len(verseList), verseList[0]
-                    nBBB = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
-                    C = V = 1
-                    #thisBook.addLine( 'c', str(C) )
-                else: # next chapter only
-                    #thisBook.addLine( 'c', str(C) )
-                    numV = verseList[C-1]
-                    V = 1
 
             if ourGlobals['haveParagraph']:
                 thisBook.addLine( 'p', '' )
                 ourGlobals['haveParagraph'] = False
+        else: # Save the last book (if we didn't break out of the loop)
+            if thisBook is not None and haveLines:
+                if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", thisBook.BBB, bookCount )
+                self.saveBook( thisBook )
 
         if BibleOrgSysGlobals.strictCheckingFlag or BibleOrgSysGlobals.debugFlag: self.checkForExtraMaterial( cursor, BOS )
         cursor.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ExportManifest.py
+#
+# Module handling the manifests which let exports skip work that's already done
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module handling export manifests (used by BibleWriter).
+
+A manifest is a small JSON file which records a content hash for each entry
+    (e.g., for each book, or for each complete export)
+    along with the files that were written from that content.
+Next time, an entry whose hash hasn't changed (and whose files are all still there)
+    doesn't need to be written again.
+
+The manifest also records a hash of the settings used for the export
+    (including a hash of the source code of the exporter, see getSourceHash):
+    if the settings have changed, everything is considered to have changed.
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "ExportManifest"
+ProgName = "Export manifest handler"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, json, hashlib, inspect
+
+import BibleOrgSysGlobals
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def getSettingsHash( *settings ):
+    """
+    Returns a hash string for the given settings
+        (which can be any values with a reproducible repr, e.g., strings, numbers, tuples and sorted lists).
+    """
+    return hashlib.md5( repr( settings ).encode( 'utf-8' ) ).hexdigest()
+# end of getSettingsHash
+
+
+sourceHashes = {} # Cached by getSourceHash
+def getSourceHash( *sourceObjects ):
+    """
+    Returns a hash string of the source code of the given modules, classes or functions,
+        e.g., so that exports made by an earlier version of the exporter aren't considered to be up-to-date
+        even if the ProgVersion hasn't been updated.
+    The hash is only calculated once for each object and then cached.
+    """
+    sourceHash = hashlib.md5()
+    for sourceObject in sourceObjects:
+        try: objectHash = sourceHashes[sourceObject]
+        except KeyError:
+            try: source = inspect.getsource( sourceObject )
+            except (OSError, TypeError): # No source code available (e.g., a compiled or frozen module)
+                logging.warning( t("getSourceHash: No source code available for {}").format( sourceObject ) )
+                source = repr( sourceObject )
+            objectHash = sourceHashes[sourceObject] = hashlib.md5( source.encode( 'utf-8' ) ).hexdigest()
+        sourceHash.update( objectHash.encode( 'utf-8' ) )
+    return sourceHash.hexdigest()
+# end of getSourceHash
+
+
+def getBookHash( bookObject ):
+    """
+    Returns a hash string for the processed lines (including the notes) of the given Bible book.
+    """
+    bookHash = hashlib.md5()
+    for entry in bookObject._processedLines:
+        extras = entry.getExtras()
+        bookHash.update( repr( (entry.getMarker(), entry.getOriginalMarker(), entry.getAdjustedText(), entry.getCleanText(),
+                    [(extra.getType(), extra.getIndex(), extra.getText(),) for extra in extras] if extras else None,) ).encode( 'utf-8' ) )
+    return bookHash.hexdigest()
+# end of getBookHash
+
+
+
+class ExportManifest:
+    """
+    Class for keeping track of what was exported last time (and from what).
+
+    Usage is:
+        manifest = ExportManifest( manifestFilepath, settingsHash )
+        for each entry:
+            if manifest.isUnchanged( key, contentHash ): continue
+            ... write the files for this entry ...
+            manifest.setEntry( key, contentHash, filepaths )
+        manifest.removeOtherEntries( currentKeys ) # optional
+        if manifest.hasChanged(): ... rebuild anything made from all the entries (e.g., zip files) ...
+        manifest.save()
+    """
+    def __init__( self, manifestFilepath, settingsHash=None ):
+        """
+        Constructor: loads the manifest from last time (if there is one).
+            manifestFilepath: the JSON file (the entry filepaths are stored relative to its folder)
+            settingsHash (optional): from getSettingsHash (e.g., of the export options and getSourceHash of the exporter)
+        """
+        if BibleOrgSysGlobals.debugFlag: assert( manifestFilepath and isinstance( manifestFilepath, str ) )
+        self.manifestFilepath, self.settingsHash = manifestFilepath, settingsHash
+        self.folder = os.path.dirname( manifestFilepath )
+        self.previousEntries = {}
+        try:
+            with open( manifestFilepath, 'rt', encoding='utf-8' ) as manifestFile:
+                manifestDict = json.load( manifestFile )
+            if manifestDict['settingsHash'] == settingsHash:
+                self.previousEntries = manifestDict['entries']
+            elif BibleOrgSysGlobals.verbosityLevel > 2: print( t("ExportManifest: Settings have changed since {} was written").format( manifestFilepath ) )
+        except (OSError, ValueError, KeyError, TypeError): pass # No (usable) manifest from last time
+        self.entries = dict( self.previousEntries )
+    # end of ExportManifest.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the manifest.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "Export Manifest object"
+        result += ('\n' if result else '') + "  " + _("Filepath: {}").format( self.manifestFilepath )
+        result += ('\n' if result else '') + "  " + _("Entries: {} ({} unchanged)").format( len(self.entries),
+                    sum( 1 for key in self.entries if self.previousEntries.get( key ) == self.entries[key] ) )
+        return result
+    # end of ExportManifest.__str__
+
+
+    def isUnchanged( self, key, contentHash ):
+        """
+        Returns True if the entry had the same content hash last time
+            and all the files that were written for it still exist.
+        """
+        try: previousEntry = self.previousEntries[key]
+        except KeyError: return False
+        return previousEntry['hash'] == contentHash \
+            and all( os.path.isfile( os.path.join( self.folder, filename ) ) for filename in previousEntry['files'] )
+    # end of ExportManifest.isUnchanged
+
+
+    def isAllUnchanged( self, contentHashes ):
+        """
+        Given a dictionary of key: contentHash,
+            returns True if the manifest from last time had exactly these entries (and their files still exist).
+        """
+        return set( contentHashes ) == set( self.previousEntries ) \
+            and all( self.isUnchanged( key, contentHash ) for key, contentHash in contentHashes.items() )
+    # end of ExportManifest.isAllUnchanged
+
+
+    def getFilepaths( self, key ):
+        """
+        Returns a list of the filepaths that were recorded for the entry.
+        """
+        entry = self.entries[key] if key in self.entries else self.previousEntries[key]
+        return [os.path.join( self.folder, filename ) for filename in entry['files']]
+    # end of ExportManifest.getFilepaths
+
+
+    def setEntry( self, key, contentHash, filepaths ):
+        """
+        Records the content hash of an entry and the files that have now been written for it.
+        """
+        self.entries[key] = { 'hash':contentHash, 'files':[os.path.relpath( filepath, self.folder ) for filepath in filepaths] }
+    # end of ExportManifest.setEntry
+
+
+    def removeEntry( self, key ):
+        """
+        Forgets an entry (e.g., if the export failed) so that it will be written again next time.
+        """
+        if key in self.entries: del self.entries[key]
+    # end of ExportManifest.removeEntry
+
+
+    def removeOtherEntries( self, currentKeys ):
+        """
+        Removes all the entries (and their files) except for the given keys,
+            e.g., for books which are no longer in the Bible.
+        """
+        currentFilenames = set()
+        for key in currentKeys:
+            if key in self.entries: currentFilenames.update( self.entries[key]['files'] )
+        for key in list( self.entries ):
+            if key not in currentKeys:
+                for filename in self.entries[key]['files']:
+                    if filename not in currentFilenames:
+                        try: os.remove( os.path.join( self.folder, filename ) )
+                        except OSError: pass
+                del self.entries[key]
+    # end of ExportManifest.removeOtherEntries
+
+
+    def hasChanged( self ):
+        """
+        Returns True if any entry has changed (or been added or removed) since last time.
+        """
+        return self.entries != self.previousEntries
+    # end of ExportManifest.hasChanged
+
+
+    def save( self ):
+        """
+        Writes the manifest to its JSON file.
+        """
+        try:
+            with open( self.manifestFilepath, 'wt', encoding='utf-8' ) as manifestFile:
+                json.dump( { 'settingsHash':self.settingsHash, 'entries':self.entries }, manifestFile, indent=1, sort_keys=True )
+        except OSError: logging.error( t("save: Unable to save {}").format( self.manifestFilepath ) )
+    # end of ExportManifest.save
+# end of class ExportManifest
+
+
+
+def demo():
+    """
+    Write a few files twice and show which ones needed writing.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile, shutil
+    folder = tempfile.mkdtemp()
+    try:
+        manifestFilepath = os.path.join( folder, 'TestManifest.json' )
+        for contents in ( ('One','Two','Three'), ('One','Two!','Three'), ):
+            manifest = ExportManifest( manifestFilepath, getSettingsHash( 'Demo', 1, getSourceHash( demo ) ) )
+            written = []
+            for j, text in enumerate( contents ):
+                key, contentHash = str(j+1), getSettingsHash( text )
+                if manifest.isUnchanged( key, contentHash ): continue
+                filepath = os.path.join( folder, 'File{}.txt'.format( key ) )
+                with open( filepath, 'wt' ) as myFile: myFile.write( text )
+                manifest.setEntry( key, contentHash, [filepath] )
+                written.append( key )
+            if BibleOrgSysGlobals.verbosityLevel > 0:
+                print( manifest )
+                print( "  Wrote {} (changed={})".format( written, manifest.hasChanged() ) )
+            manifest.save()
+    finally: shutil.rmtree( folder )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of ExportManifest.py
@@ -44,7 +44,7 @@ and then fills
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-30' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "InternalBible"
 ProgName = "Internal Bible handler"
 ProgVersion = '0.62'
@@ -109,6 +109,8 @@ class InternalBible:
         self.BBBToNameDict, self.bookNameDict, self.combinedBookNameDict, self.bookAbbrevDict = {}, {}, {}, {} # Used to store book name and abbreviations (pointing to the BBB codes)
         self.reverseDict, self.guesses = {}, '' # A program history
         self.loadedAllBooks, self.triedLoadingBook = False, {}
+        self.lazyLoadingFlag, self.availableBookList = False, None # Set if books are only loaded when first needed
+        self.maxLoadedBooks, self.recentlyUsedBooks = None, OrderedDict() # For unloading the least recently used books
         self.divisions = OrderedDict()
         self.errorDictionary = OrderedDict()
         self.errorDictionary['Priority Errors'] = [] # Put this one first in the ordered dictionary
@@ -148,7 +150,10 @@ class InternalBible:
     def __len__( self ):
         """
         This method returns the number of loaded books in the Bible.
+
+        If books are loaded lazily, books which haven't been loaded yet are also counted.
         """
+        if self.lazyLoadingFlag: return len( self.getBookList() )
         if BibleOrgSysGlobals.debugFlag and not self.loadedAllBooks:
             logging.critical( t("__len__ result is unreliable because all books not loaded!") )
         return len( self.books )
@@ -159,9 +164,12 @@ class InternalBible:
         """
         This method checks whether the Bible (as loaded so far) contains the BBB book.
 
+        If books are loaded lazily, books which haven't been loaded yet are also included.
+
         Returns True or False.
         """
         if BibleOrgSysGlobals.debugFlag: assert( isinstance(BBB,str) and len(BBB)==3 )
+        if self.lazyLoadingFlag: return BBB in self.books or self.__isKnownUnloadedBook( BBB )
         if BibleOrgSysGlobals.debugFlag and debuggingThisModule and not self.loadedAllBooks:
             logging.critical( t("__contains__ result is unreliable because all books not loaded!") )
         return BBB in self.books
@@ -176,6 +184,11 @@ class InternalBible:
         """
         #print( t("__getitem__( {} )").format( keyIndex ) )
         #print( list(self.books.items()) )
+        if self.lazyLoadingFlag: # Books are only loaded as they are needed
+            if isinstance( keyIndex, int ): keyIndex = self.availableBookList[keyIndex]
+            if isinstance( keyIndex, str ) and len(keyIndex)==3: # assume it's a BBB
+                self.loadBookIfNecessary( keyIndex )
+                return self.books[keyIndex]
         if isinstance( keyIndex, int ):
             return list(self.books.items())[keyIndex][1] # element 0 is BBB, element 1 is the book object
         if isinstance( keyIndex, str ) and len(keyIndex)==3: # assume it's a BBB
@@ -188,7 +201,14 @@ class InternalBible:
         Yields the next book object.
 
         NOTE: Most other functions return the BBB -- this returns the actual book object!
+
+        If books are loaded lazily, each book is loaded as it is reached.
         """
+        if self.lazyLoadingFlag:
+            for BBB in self.availableBookList:
+                self.loadBookIfNecessary( BBB )
+                if BBB in self.books: yield self.books[BBB] # Might not be there if the file was blank
+            return
         if BibleOrgSysGlobals.debugFlag and not self.loadedAllBooks:
             logging.critical( t("__iter__ result is unreliable because all books not loaded!") )
         for BBB in self.books:
@@ -242,17 +262,48 @@ class InternalBible:
     # end of InternalBible.__getNames
 
 
+    def __isKnownUnloadedBook( self, BBB ):
+        """
+        Returns True if the lazily loaded Bible has a (not yet loaded) book for BBB,
+            i.e., it's in the availableBookList and we haven't already tried and failed to load it.
+        """
+        return BBB in self.availableBookList and BBB not in self.triedLoadingBook
+    # end of InternalBible.__isKnownUnloadedBook
+
+
     def loadBookIfNecessary( self, BBB ):
         """
+        Loads the book if it's not already loaded (and we haven't already tried).
+
+        If maxLoadedBooks is set, also keeps track of the most recently used books
+            and unloads the least recently used ones when there are too many.
         """
         if BBB not in self.books and BBB not in self.triedLoadingBook:
             try: self.loadBook( BBB ) # Some types of Bibles have this function (so an entire Bible doesn't have to be loaded at startup)
             except AttributeError: logging.info( "No function to load individual Bible book: {}".format( BBB ) ) # Ignore errors
             except FileNotFoundError: logging.info( "Unable to find and load individual Bible book: {}".format( BBB ) ) # Ignore errors
             self.triedLoadingBook[BBB] = True
+        if self.maxLoadedBooks and BBB in self.books:
+            self.recentlyUsedBooks[BBB] = True
+            self.recentlyUsedBooks.move_to_end( BBB )
+            while len(self.recentlyUsedBooks) > self.maxLoadedBooks:
+                oldBBB = self.recentlyUsedBooks.popitem( last=False )[0]
+                self.unloadBook( oldBBB )
     # end of InternalBible.loadBookIfNecessary
 
 
+    def unloadBook( self, BBB ):
+        """
+        Removes a book from memory so that it can be loaded again later if it's needed.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("unloadBook: Unloading {} from {}").format( BBB, self.name ) )
+        if BBB in self.books: del self.books[BBB]
+        if BBB in self.triedLoadingBook: del self.triedLoadingBook[BBB]
+        if BBB in self.recentlyUsedBooks: del self.recentlyUsedBooks[BBB]
+        self.loadedAllBooks = False
+    # end of InternalBible.unloadBook
+
+
     def reloadBook( self, BBB ):
         """
         Tries to load or reload a book.
@@ -374,10 +425,16 @@ class InternalBible:
     def getBookList( self ):
         """
         Returns a list of loaded book codes.
+
+        If books are loaded lazily, books which haven't been loaded yet are also included
+            (in the order of availableBookList).
         """
+        if self.lazyLoadingFlag:
+            return [BBB for BBB in self.availableBookList if BBB in self.books or self.__isKnownUnloadedBook( BBB )]
         if BibleOrgSysGlobals.debugFlag and not self.loadedAllBooks:
             logging.critical( t("getBookList result is unreliable because all books not loaded!") )
         return [BBB for BBB in self.books]
+    # end of InternalBible.getBookList
 
 
     def pickle( self, filename=None, folder=None ):
@@ -1652,16 +1709,18 @@ class InternalBible:
     # end of InternalBible.getVerseText
 
 
-    def writeBOSBCVFiles( self, outputFolderPath ):
+    def writeBOSBCVFiles( self, outputFolderPath, packedFlag=False ):
         """
         Write the internal pseudoUSFM out directly with one file per verse.
+
+        If packedFlag is set, each book is written as one verses file plus an offset index instead.
         """
         BBBList = []
         for BBB,bookObject in self.books.items():
             BBBList.append( BBB )
             bookFolderPath = os.path.join( outputFolderPath, BBB + '/' )
             os.mkdir( bookFolderPath )
-            bookObject.writeBOSBCVFiles( bookFolderPath )
+            bookObject.writeBOSBCVFiles( bookFolderPath, packedFlag )
 
         # Write the Bible metadata
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing BCV metadata...") )
@@ -1669,6 +1728,8 @@ class InternalBible:
         if self.projectName: metadataLines += 'ProjectName = {}\n'.format( self.projectName )
         if self.name: metadataLines += 'Name = {}\n'.format( self.name )
         if self.abbreviation: metadataLines += 'Abbreviation = {}\n'.format( self.abbreviation )
+        if self.objectTypeString: metadataLines += 'SourceType = {}\n'.format( self.objectTypeString )
+        if packedFlag: metadataLines += 'Packed = True\n'
         metadataLines += 'BookList = {}\n'.format( BBBList )
         with open( os.path.join( outputFolderPath, 'Metadata.txt' ), 'wt' ) as metadataFile:
             metadataFile.write( metadataLines )
@@ -49,7 +49,7 @@ ProgVersion = '0.92'
 ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
 ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
 
-BCV_VERSION = '1.0'
+BCV_VERSION = '1.1' # 1.1 added CVContexts, the text for the end markers, and the optional packed verses file
 
 debuggingThisModule = False
 MAX_NONCRITICAL_ERRORS_PER_BOOK = 5
@@ -89,6 +89,50 @@ def t( messageString ):
 
 
 
+def splitWords( segment ):
+    """
+    Breaks the text segment into raw words (still including any punctuation).
+
+    Em-dashes and en-dashes are treated as word break characters.
+    """
+    return segment.replace('—',' ').replace('–',' ').split()
+# end of splitWords
+
+
+def stripWordPunctuation( word ):
+    """
+    Removes leading and trailing punctuation from a word.
+
+    Returns the "clean" word.
+    """
+    while word and word[0] in LEADING_WORD_PUNCT_CHARS:
+        word = word[1:] # Remove leading punctuation
+    while word and word[-1] in TRAILING_WORD_PUNCT_CHARS:
+        word = word[:-1] # Remove trailing punctuation
+    return word
+# end of stripWordPunctuation
+
+
+def getCleanWords( segment ):
+    """
+    Breaks the text segment into words using the same rules as InternalBibleBook.doCheckWords,
+        i.e., with internal character markers and surrounding punctuation removed.
+
+    Returns a list of the clean words.
+    """
+    cleanWords = []
+    for rawWord in splitWords( segment ):
+        word = rawWord
+        if '\\' in word:
+            for internalMarker in INTERNAL_SFMS_TO_REMOVE: word = word.replace( internalMarker, '' )
+        word = stripWordPunctuation( word )
+        if word and not word[0].isalnum(): word = word[1:]
+        if word: cleanWords.append( word )
+    return cleanWords
+# end of getCleanWords
+
+
+
 class InternalBibleBook:
     """
     Class to create and manipulate a single internal Bible file / book.
@@ -3322,17 +3366,7 @@ class InternalBibleBook:
                 If lastWordTuple is given, checks for words repeated across segments (and returns the new value).
             """
 
-            def stripWordPunctuation( word ):
-                """Removes leading and trailing punctuation from a word.
-                    Returns the "clean" word."""
-                while word and word[0] in LEADING_WORD_PUNCT_CHARS:
-                    word = word[1:] # Remove leading punctuation
-                while word and word[-1] in TRAILING_WORD_PUNCT_CHARS:
-                    word = word[:-1] # Remove trailing punctuation
-                return word
-            # end of stripWordPunctuation
-
-            words = segment.replace('—',' ').replace('–',' ').split() # Treat em-dash and en-dash as word break characters
+            words = splitWords( segment ) # Treat em-dash and en-dash as word break characters
             if lastWordTuple is None: ourLastWord = ourLastRawWord = '' # No need to check words repeated across segment boundaries
             else: # Check in case a word has been repeated (e.g., at the end of one verse and then again at the beginning of the next verse)
                 if BibleOrgSysGlobals.debugFlag:
@@ -3971,26 +4005,37 @@ class InternalBibleBook:
     # end of InternalBibleBook.getContextVerseData
 
 
-    def writeBOSBCVFiles( self, bookFolderPath ):
+    def writeBOSBCVFiles( self, bookFolderPath, packedFlag=False ):
         """
         Write the internal pseudoUSFM out directly with one file per verse.
+
+        If packedFlag is set, the verses are all written into one file (BBB_Verses.txt)
+            along with an index file (BBB_VerseIndex.txt) giving the byte offset and length of each verse
+            (so that a reader can still get to any verse without reading the whole book).
+
+        The context of each C:V index entry is also saved in the book metadata
+            so that individual verses can be loaded without processing the entire book.
         """
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing {!r} as BCV...").format( self.BBB ) )
 
-        # Write the data out with the introduction in one file, and then each verse in a separate file
+        # Collect the data with the introduction in one unit, and then each verse in a separate unit
+        units = [] # Contains 2-tuples of the unit name (e.g., 'C0' or 'C1V1') and the text
         introLines = verseLines = ""
-        CVList = []
+        CVList, CVContexts = [], {}
         for CVKey in self._CVIndex:
             C, V = CVKey
             #print( self.BBB, C, V )
 
-            for entry in self._CVIndex.getEntries( CVKey ):
+            entries, context = self._CVIndex.getEntriesWithContext( CVKey )
+            CVContexts[CVKey] = context
+            for entry in entries:
                 #print( entry )
                 marker, originalMarker = entry.getMarker(), entry.getOriginalMarker()
                 line = '\\'+marker
                 if originalMarker and originalMarker!=marker and (marker,originalMarker) not in (('c#','c'),('v~','v'),):
                     line += '<<'+originalMarker
                 content = entry.getOriginalText()
+                if content is None: content = entry.getCleanText() # for added nesting markers like ¬v
                 if content: line += '='+content
                 line += '\n'
                 if C == '0': introLines += line # collect all of the intro parts
@@ -3998,23 +4043,36 @@ class InternalBibleBook:
 
             if C != '0':
                 if introLines:
-                    with open( os.path.join( bookFolderPath, self.BBB+'_C0.txt' ), 'wt' ) as myFile:
-                        myFile.write( introLines )
+                    units.append( ('C0', introLines) )
                     introLines = None # Will now cause an error if we try to do more introduction bits
                 else:
-                    with open( os.path.join( bookFolderPath, self.BBB+'_C'+C+'V'+V+'.txt' ), 'wt' ) as myFile:
-                        myFile.write( verseLines )
+                    units.append( ('C'+C+'V'+V, verseLines) )
                     verseLines = ""
                     CVList.append( CVKey )
         if introLines: # handle left-overs for books without chapters
-            with open( os.path.join( bookFolderPath, self.BBB+'_C0.txt' ), 'wt' ) as myFile:
-                myFile.write( introLines )
+            units.append( ('C0', introLines) )
         assert( not verseLines )
 
+        if packedFlag:
+            indexLines, offset = '', 0
+            with open( os.path.join( bookFolderPath, self.BBB+'_Verses.txt' ), 'wb' ) as myFile:
+                for unitName, unitText in units:
+                    unitBytes = unitText.encode( 'utf-8' )
+                    myFile.write( unitBytes )
+                    indexLines += '{}\t{}\t{}\n'.format( unitName, offset, len(unitBytes) )
+                    offset += len( unitBytes )
+            with open( os.path.join( bookFolderPath, self.BBB+'_VerseIndex.txt' ), 'wt' ) as myFile:
+                myFile.write( indexLines )
+        else:
+            for unitName, unitText in units:
+                with open( os.path.join( bookFolderPath, self.BBB+'_'+unitName+'.txt' ), 'wt' ) as myFile:
+                    myFile.write( unitText )
+
         if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Writing BCV book metadata...") )
         metadataLines = 'BCVVersion = {}\n'.format( BCV_VERSION )
         if self.workName: metadataLines += 'WorkName = {}\n'.format( self.workName )
         metadataLines += 'CVList = {}\n'.format( CVList )
+        metadataLines += 'CVContexts = {}\n'.format( CVContexts )
         with open( os.path.join( bookFolderPath, self.BBB+'_BookMetadata.txt' ), 'wt' ) as metadataFile:
             metadataFile.write( metadataLines )
     # end of InternalBibleBook.writeBOSBCVFiles
@@ -0,0 +1,507 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# InternalBibleCache.py
+#
+# Module handling a binary cache file format for loaded internal Bibles
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module for saving a loaded (and processed) internal Bible into a compact binary file
+    and then reading individual verses back out of that file without loading the whole Bible.
+
+Unlike a pickled Bible (which must be unpickled in full),
+    the cache file is memory-mapped and only the entries for a requested verse are decoded.
+
+The file layout is (all numbers are little-endian):
+    Signature (8 bytes) then a fixed header of
+        format version (2 bytes), source modified time (8 byte float),
+        metadata length (4 bytes), book count (2 bytes)
+    Metadata (UTF-8 encoded JSON dictionary)
+    Book table: for each book,
+        BBB (3 bytes ASCII), CV index offset (8 bytes), CV index entry count (4 bytes)
+    For each book, a CV index: for each C:V entry,
+        C and V (each as a 1-byte length and ASCII string), verse record offset (8 bytes), verse record length (4 bytes)
+    Verse records: a context marker list followed by the InternalBibleEntries for that verse.
+        Strings are stored as a 4-byte length (0xFFFFFFFF for None) followed by the UTF-8 bytes.
+
+The source modified time is used to decide if the cache file is out-of-date.
+
+Contains:
+    writeBinaryCache( BibleObject, filepath, sourcePath=None )
+    loadBinaryCache( filepath, sourcePath=None )
+    class BinaryCachedBible( filepath )
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-02' # by RJH
+ShortProgName = "InternalBibleCache"
+ProgName = "Internal Bible binary cache handler"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, struct, json, mmap
+from collections import OrderedDict
+
+import BibleOrgSysGlobals
+from InternalBible import InternalBible
+from InternalBibleInternals import InternalBibleEntryList, InternalBibleEntry, \
+                                    InternalBibleExtraList, InternalBibleExtra
+
+
+BINARY_CACHE_SIGNATURE = b'BOSCache'
+BINARY_CACHE_VERSION = 1
+BINARY_CACHE_FILENAME_EXTENSION = '.BOSCache'
+
+HEADER_STRUCT = struct.Struct( '<HdIH' ) # version, sourceModifiedTime, metadataLength, numBooks
+BOOK_STRUCT = struct.Struct( '<3sQI' ) # BBB, indexOffset, indexCount
+INDEX_STRUCT = struct.Struct( '<QI' ) # recordOffset, recordLength (after the C and V strings)
+LENGTH_STRUCT = struct.Struct( '<I' )
+COUNT_STRUCT = struct.Struct( '<H' )
+NONE_LENGTH = 0xFFFFFFFF
+NONE_COUNT = 0xFFFF
+
+# Bible attributes that get saved in the metadata
+METADATA_FIELDS = ( 'name', 'givenName', 'shortName', 'abbreviation', 'projectName',
+                   'sourceFolder', 'sourceFilename', 'sourceFilepath', 'fileExtension',
+                   'status', 'revision', 'version', 'objectTypeString', )
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def getSourceModifiedTime( sourcePath ):
+    """
+    Given a source file or folder path, return the latest modified time (as a float).
+
+    For a folder, the files directly inside the folder are also checked
+        (because editing a file doesn't necessarily update the folder time).
+
+    Returns None if the path doesn't exist.
+    """
+    try: latestTime = os.stat( sourcePath ).st_mtime
+    except OSError: return None
+    if os.path.isdir( sourcePath ):
+        for something in os.listdir( sourcePath ):
+            try: latestTime = max( latestTime, os.stat( os.path.join( sourcePath, something ) ).st_mtime )
+            except OSError: pass # it might have just been deleted
+    return latestTime
+# end of getSourceModifiedTime
+
+
+def getBibleSourcePath( BibleObject ):
+    """
+    Returns the source file or folder that the Bible object was loaded from (or None).
+    """
+    for attributeName in ( 'sourceFilepath', 'sourceFolder', ):
+        sourcePath = getattr( BibleObject, attributeName, None )
+        if sourcePath and os.path.exists( sourcePath ): return sourcePath
+# end of getBibleSourcePath
+
+
+
+def _encodeString( someString, outputBytes ):
+    """
+    Append a length-prefixed UTF-8 string (or None) to the bytearray.
+    """
+    if someString is None: outputBytes += LENGTH_STRUCT.pack( NONE_LENGTH )
+    else:
+        encodedString = someString.encode( 'utf-8' )
+        outputBytes += LENGTH_STRUCT.pack( len(encodedString) )
+        outputBytes += encodedString
+# end of _encodeString
+
+
+def _encodeVerseRecord( verseEntries, context ):
+    """
+    Encode the context list and the InternalBibleEntries for one verse into bytes.
+    """
+    record = bytearray()
+    record += COUNT_STRUCT.pack( len(context) )
+    for contextMarker in context: _encodeString( contextMarker, record )
+    record += COUNT_STRUCT.pack( len(verseEntries) )
+    for entry in verseEntries:
+        for field in ( entry.marker, entry.originalMarker, entry.adjustedText, entry.cleanText, entry.originalText ):
+            _encodeString( field, record )
+        if entry.extras is None: record += COUNT_STRUCT.pack( NONE_COUNT )
+        else:
+            record += COUNT_STRUCT.pack( len(entry.extras) )
+            for extra in entry.extras:
+                _encodeString( extra.myType, record )
+                record += LENGTH_STRUCT.pack( extra.index )
+                _encodeString( extra.noteText, record )
+                _encodeString( extra.cleanNoteText, record )
+    return bytes( record )
+# end of _encodeVerseRecord
+
+
+def writeBinaryCache( BibleObject, filepath, sourcePath=None ):
+    """
+    Write the processed books of the Bible object into a binary cache file.
+
+    If sourcePath is not given, it is taken from the Bible object (if possible).
+        The modified time of the source is saved so that out-of-date caches can be detected.
+
+    Returns True if successful.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 2: print( t("Writing binary cache to {}...").format( filepath ) )
+    if sourcePath is None: sourcePath = getBibleSourcePath( BibleObject )
+    sourceModifiedTime = getSourceModifiedTime( sourcePath ) if sourcePath else None
+
+    metadata = OrderedDict()
+    for fieldName in METADATA_FIELDS:
+        fieldValue = getattr( BibleObject, fieldName, None )
+        if isinstance( fieldValue, str ): metadata[fieldName] = fieldValue
+    metadata['sourcePath'] = sourcePath
+    encodedMetadata = json.dumps( metadata, ensure_ascii=False ).encode( 'utf-8' )
+
+    # Encode the books first so that we know where everything goes
+    bookList, bookIndexes, records = [], [], []
+    for BBB,bookObject in BibleObject.books.items():
+        if not bookObject._processedFlag:
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( "  " + _("Processing {} for binary cache...").format( BBB ) )
+            bookObject.processLines()
+        if not bookObject._indexedFlag:
+            logging.error( t("writeBinaryCache: {} {} has no index -- skipped").format( BibleObject.abbreviation, BBB ) )
+            continue
+        bookList.append( BBB )
+        bookIndex = []
+        for CVKey in bookObject._CVIndex:
+            verseEntries, context = bookObject._CVIndex.getEntriesWithContext( CVKey )
+            record = _encodeVerseRecord( verseEntries, context )
+            bookIndex.append( (CVKey, len(records), len(record)) )
+            records.append( record )
+        bookIndexes.append( bookIndex )
+
+    encodedIndexes = []
+    for bookIndex in bookIndexes: # Use temporary record numbers in the offset fields for now
+        encodedIndexes.append( [(C.encode('ascii'), V.encode('ascii'), recordNumber, recordLength) \
+                                    for (C,V), recordNumber, recordLength in bookIndex] )
+
+    # Work out the offsets
+    offset = len(BINARY_CACHE_SIGNATURE) + HEADER_STRUCT.size + len(encodedMetadata) + BOOK_STRUCT.size*len(bookList)
+    indexOffsets = []
+    for encodedIndex in encodedIndexes:
+        indexOffsets.append( offset )
+        for C, V, recordNumber, recordLength in encodedIndex:
+            offset += 2 + len(C) + len(V) + INDEX_STRUCT.size
+    recordOffsets = []
+    for record in records:
+        recordOffsets.append( offset )
+        offset += len(record)
+
+    with open( filepath, 'wb' ) as cacheFile:
+        cacheFile.write( BINARY_CACHE_SIGNATURE )
+        cacheFile.write( HEADER_STRUCT.pack( BINARY_CACHE_VERSION, sourceModifiedTime if sourceModifiedTime else 0.0,
+                                                len(encodedMetadata), len(bookList) ) )
+        cacheFile.write( encodedMetadata )
+        for BBB, indexOffset, encodedIndex in zip( bookList, indexOffsets, encodedIndexes ):
+            cacheFile.write( BOOK_STRUCT.pack( BBB.encode('ascii'), indexOffset, len(encodedIndex) ) )
+        for encodedIndex in encodedIndexes:
+            indexBytes = bytearray()
+            for C, V, recordNumber, recordLength in encodedIndex:
+                indexBytes += bytes( (len(C),) ) + C + bytes( (len(V),) ) + V
+                indexBytes += INDEX_STRUCT.pack( recordOffsets[recordNumber], recordLength )
+            cacheFile.write( indexBytes )
+        for record in records: cacheFile.write( record )
+    return True
+# end of writeBinaryCache
+
+
+
+class BinaryCachedBible( InternalBible ):
+    """
+    Class for reading verses out of a binary cache file (as written by writeBinaryCache).
+
+    The file is memory-mapped and only the book table is read when the object is created.
+        The C:V index for a book is read the first time the book is accessed,
+        and the InternalBibleEntries are only created for the verses that are requested.
+    """
+    def __init__( self, filepath ):
+        """
+        Open and memory-map the cache file and read the header and book table.
+
+        Raises a ValueError if the file isn't a valid binary cache file.
+        """
+        if BibleOrgSysGlobals.debugFlag: print( t("BinaryCachedBible.__init__( {} )").format( filepath ) )
+        # Setup and initialise the base class first
+        InternalBible.__init__( self )
+        self.objectNameString = "Binary Cached Bible object"
+        self.objectTypeString = "BinaryCache"
+        self.cacheFilepath = filepath
+
+        self.__cacheFile = open( filepath, 'rb' )
+        try:
+            self.__mmap = mmap.mmap( self.__cacheFile.fileno(), 0, access=mmap.ACCESS_READ )
+        except ValueError: # Can't mmap an empty file
+            self.__cacheFile.close()
+            raise ValueError( "Empty binary cache file {}".format( filepath ) )
+        if self.__mmap[:len(BINARY_CACHE_SIGNATURE)] != BINARY_CACHE_SIGNATURE:
+            self.close()
+            raise ValueError( "Invalid binary cache file signature in {}".format( filepath ) )
+        offset = len(BINARY_CACHE_SIGNATURE)
+        formatVersion, sourceModifiedTime, metadataLength, numBooks = HEADER_STRUCT.unpack_from( self.__mmap, offset )
+        if formatVersion != BINARY_CACHE_VERSION:
+            self.close()
+            raise ValueError( "Unknown binary cache version {} in {}".format( formatVersion, filepath ) )
+        self.sourceModifiedTime = sourceModifiedTime if sourceModifiedTime else None
+        offset += HEADER_STRUCT.size
+        self.metadata = json.loads( self.__mmap[offset:offset+metadataLength].decode( 'utf-8' ) )
+        for fieldName in METADATA_FIELDS:
+            if fieldName in self.metadata and fieldName != 'objectTypeString': setattr( self, fieldName, self.metadata[fieldName] )
+        self.sourcePath = self.metadata.get( 'sourcePath' )
+        offset += metadataLength
+
+        self.__bookTable = OrderedDict()
+        for j in range( numBooks ):
+            BBBBytes, indexOffset, indexCount = BOOK_STRUCT.unpack_from( self.__mmap, offset )
+            self.__bookTable[BBBBytes.decode('ascii')] = (indexOffset, indexCount)
+            offset += BOOK_STRUCT.size
+        self.__CVIndexes = {} # Filled as each book is used
+        self.loadedAllBooks = True # All the books in the cache are available
+    # end of BinaryCachedBible.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of a binary cached Bible.
+
+        @return: the name of a Bible object formatted as a string
+        @rtype: string
+        """
+        result = self.objectNameString
+        if self.abbreviation: result += ('\n' if result else '') + "  " + _("Abbreviation: ") + self.abbreviation
+        if self.name: result += ('\n' if result else '') + "  " + _("Name: ") + self.name
+        result += ('\n' if result else '') + "  " + _("Cache file: ") + self.cacheFilepath
+        result += ('\n' if result else '') + "  " + _("Number of books = ") + str(len(self.__bookTable))
+        result += ('\n' if result else '') + "  " + _("Number of indexed books = ") + str(len(self.__CVIndexes))
+        return result
+    # end of BinaryCachedBible.__str__
+
+
+    def __len__( self ): return len( self.__bookTable )
+    def __contains__( self, BBB ): return BBB in self.__bookTable
+    def getBookList( self ): return list( self.__bookTable.keys() )
+
+
+    def isOutOfDate( self, sourcePath=None ):
+        """
+        Returns True if the source file/folder has been modified since the cache was written.
+
+        If sourcePath is not given, the source path saved in the cache is used.
+        A missing source is not considered to make the cache out-of-date.
+        """
+        if sourcePath is None: sourcePath = self.sourcePath
+        if not sourcePath: return False
+        sourceModifiedTime = getSourceModifiedTime( sourcePath )
+        if sourceModifiedTime is None: return False
+        return self.sourceModifiedTime is None or sourceModifiedTime > self.sourceModifiedTime
+    # end of BinaryCachedBible.isOutOfDate
+
+
+    def __getCVIndex( self, BBB ):
+        """
+        Returns the C:V index dictionary for the book (reading it from the file if necessary).
+
+        Raises a KeyError if the book isn't in the cache.
+        """
+        try: return self.__CVIndexes[BBB]
+        except KeyError: pass
+        indexOffset, indexCount = self.__bookTable[BBB] # Gives a KeyError if we don't have this book
+        CVIndex = {}
+        theMmap, offset = self.__mmap, indexOffset
+        for j in range( indexCount ):
+            CLength = theMmap[offset]
+            C = theMmap[offset+1:offset+1+CLength].decode( 'ascii' )
+            offset += 1 + CLength
+            VLength = theMmap[offset]
+            V = theMmap[offset+1:offset+1+VLength].decode( 'ascii' )
+            offset += 1 + VLength
+            CVIndex[(C,V)] = INDEX_STRUCT.unpack_from( theMmap, offset )
+            offset += INDEX_STRUCT.size
+        self.__CVIndexes[BBB] = CVIndex
+        return CVIndex
+    # end of BinaryCachedBible.__getCVIndex
+
+
+    def __decodeVerseRecord( self, offset ):
+        """
+        Decode the verse record at the given file offset.
+
+        Returns an InternalBibleEntryList and a context list.
+        """
+        theMmap = self.__mmap
+
+        def getString():
+            nonlocal offset
+            stringLength, = LENGTH_STRUCT.unpack_from( theMmap, offset )
+            offset += LENGTH_STRUCT.size
+            if stringLength == NONE_LENGTH: return None
+            offset += stringLength
+            return theMmap[offset-stringLength:offset].decode( 'utf-8' )
+        # end of getString
+
+        def getCount():
+            nonlocal offset
+            count, = COUNT_STRUCT.unpack_from( theMmap, offset )
+            offset += COUNT_STRUCT.size
+            return count
+        # end of getCount
+
+        context = [getString() for j in range( getCount() )]
+        verseEntries = InternalBibleEntryList()
+        for j in range( getCount() ):
+            marker, originalMarker, adjustedText, cleanText, originalText = getString(), getString(), getString(), getString(), getString()
+            numExtras = getCount()
+            if numExtras == NONE_COUNT: extras = None
+            else:
+                extras = InternalBibleExtraList()
+                for k in range( numExtras ):
+                    myType = getString()
+                    index, = LENGTH_STRUCT.unpack_from( theMmap, offset )
+                    offset += LENGTH_STRUCT.size
+                    noteText = getString()
+                    extras.append( InternalBibleExtra( myType, index, noteText, getString() ) )
+            verseEntries.append( InternalBibleEntry( marker, originalMarker, adjustedText, cleanText, extras, originalText ) )
+        return verseEntries, context
+    # end of BinaryCachedBible.__decodeVerseRecord
+
+
+    def getCVList( self, BBB ):
+        """
+        Returns a list of (C,V) 2-tuples for the given book (in the original order).
+
+        Raises a KeyError if the book isn't in the cache.
+        """
+        return list( self.__getCVIndex( BBB ).keys() )
+    # end of BinaryCachedBible.getCVList
+
+
+    def getContextVerseData( self, BCVReference ):
+        """
+        Search for a Bible reference
+            and return a 2-tuple containing
+                the Bible text (in a InternalBibleEntryList)
+                along with the context.
+
+        Expects a SimpleVerseKey for the parameter
+            but also copes with a (B,C,V,S) tuple.
+
+        Returns None if there is no information for this book.
+        Raises a KeyError if there is no such CV reference.
+        """
+        if isinstance( BCVReference, tuple ): BBB, C, V = BCVReference[0], BCVReference[1], BCVReference[2]
+        else: # Assume it's a SimpleVerseKeyObject
+            BBB = BCVReference.getBBB()
+            C, V = BCVReference.getCV()
+        if BBB not in self.__bookTable: return None
+        recordOffset, recordLength = self.__getCVIndex( BBB )[(str(C),str(V))] # Gives a KeyError if not found
+        return self.__decodeVerseRecord( recordOffset )
+    # end of BinaryCachedBible.getContextVerseData
+
+
+    def close( self ):
+        """
+        Release the memory-map and close the file.
+        """
+        self.__mmap.close()
+        self.__cacheFile.close()
+    # end of BinaryCachedBible.close
+
+
+    def __getstate__( self ):
+        raise TypeError( "BinaryCachedBible objects can't be pickled" )
+# end of class BinaryCachedBible
+
+
+
+def loadBinaryCache( filepath, sourcePath=None ):
+    """
+    Try to open a binary cache file.
+
+    If sourcePath is given (or was saved in the cache), the cache is only used
+        if the source hasn't been modified since the cache was written.
+
+    Returns a BinaryCachedBible object, or None if the cache is missing, invalid, or out-of-date.
+    """
+    if not os.path.isfile( filepath ): return None
+    try: cachedBible = BinaryCachedBible( filepath )
+    except ( ValueError, struct.error ) as err:
+        logging.warning( t("loadBinaryCache: Unable to use {}: {}").format( filepath, err ) )
+        return None
+    if cachedBible.isOutOfDate( sourcePath ):
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("loadBinaryCache: {} is out-of-date").format( filepath ) )
+        cachedBible.close()
+        return None
+    return cachedBible
+# end of loadBinaryCache
+
+
+
+def demo():
+    """
+    Write a binary cache for a test USFM Bible and read some verses back out of it.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile
+    from USFMBible import USFMBible
+    testFolder = 'Tests/DataFilesForTests/USFMTest1/'
+    if os.access( testFolder, os.R_OK ):
+        UB = USFMBible( testFolder, 'USFMTest1', 'T1' )
+        UB.load()
+        cacheFilepath = os.path.join( tempfile.gettempdir(), 'T1' + BINARY_CACHE_FILENAME_EXTENSION )
+        writeBinaryCache( UB, cacheFilepath )
+        cachedBible = loadBinaryCache( cacheFilepath )
+        if BibleOrgSysGlobals.verbosityLevel > 0: print( cachedBible )
+        if cachedBible is not None:
+            for reference in ( ('MAT','1','1'), ('MRK','1','1'), ('JDE','1','3'), ('REV','22','21'), ):
+                try: print( "  {} {!r}".format( reference, cachedBible.getVerseText( reference ) ) )
+                except KeyError: print( "  {} not available".format( reference ) )
+            cachedBible.close()
+    else: print( "Sorry, test folder {!r} is not readable on this computer.".format( testFolder ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of InternalBibleCache.py
@@ -39,6 +39,11 @@ Module for defining and manipulating internal Bible objects including:
 
     InternalBibleIndexEntry
     InternalBibleIndex
+
+These classes use __slots__ (rather than a per-instance dictionary)
+    and share marker strings and duplicated text fields
+    because a loaded Bible can contain several hundred thousand of them.
+    measureEntryMemory( BibleObject ) can be used to check the memory used per entry.
 """
 
 from gettext import gettext as _
@@ -54,7 +59,7 @@ debuggingThisModule = False
 MAX_NONCRITICAL_ERRORS_PER_BOOK = 5
 
 
-import os, logging
+import os, sys, logging
 from collections import OrderedDict
 
 import BibleOrgSysGlobals
@@ -143,10 +148,27 @@ def t( messageString ):
 
 
 
+MAX_INTERNED_TEXT_LENGTH = 4 # Short texts (like chapter and verse numbers) are shared between entries
+
+
+def _setSlotsState( someObject, state ):
+    """
+    Restore the slot fields of an unpickled object.
+
+    Older pickles saved the instance dictionary (before the classes used __slots__)
+        whereas newer ones save a (None, slotsDictionary) 2-tuple.
+    """
+    if isinstance( state, tuple ): state = state[1]
+    for fieldName, value in state.items(): setattr( someObject, fieldName, value )
+# end of _setSlotsState
+
+
+
 class InternalBibleExtra:
     """
     This class represents an entry in the _processedLines list.
     """
+    __slots__ = ( 'myType', 'index', 'noteText', 'cleanNoteText', )
 
     def __init__( self, myType, index, noteText, cleanNoteText ):
         """
@@ -164,9 +186,12 @@ class InternalBibleExtra:
                 assert( '\\'+letters+'*' not in noteText )
             assert( cleanNoteText and isinstance( cleanNoteText, str ) ) # Mustn't be blank
             assert( '\\' not in cleanNoteText and '\n' not in cleanNoteText and '\r' not in cleanNoteText )
-        self.myType, self.index, self.noteText, self.cleanNoteText = myType, index, noteText, cleanNoteText
+        if cleanNoteText == noteText: cleanNoteText = noteText # Share the string object
+        self.myType, self.index, self.noteText, self.cleanNoteText = sys.intern( myType ), index, noteText, cleanNoteText
     # end of InternalBibleExtra.__init__
 
+    def __setstate__( self, state ): _setSlotsState( self, state )
+
 
     #def __eq__( self, other ):
         #if type( other ) is type( self ): return self.__dict__ == other.__dict__
@@ -205,6 +230,7 @@ class InternalBibleExtraList:
 
     (It's mainly here for extra data validation and the str function for debugging.)
     """
+    __slots__ = ( 'data', )
 
     def __init__( self, initialData=None ):
         """
@@ -219,6 +245,8 @@ class InternalBibleExtraList:
         else: assert( not self.data )
     # end of InternalBibleExtraList.__init__
 
+    def __setstate__( self, state ): _setSlotsState( self, state )
+
 
     #def __eq__( self, other ):
         #if type( other ) is type( self ): return self.__dict__ == other.__dict__
@@ -290,11 +318,17 @@ class InternalBibleExtraList:
 # end of class InternalBibleExtraList
 
 
+# All entries without any extras share this one empty (and unchangeable) list
+EMPTY_EXTRA_LIST = InternalBibleExtraList()
+EMPTY_EXTRA_LIST.data = () # so that append() fails
+
+
 
 class InternalBibleEntry:
     """
     This class represents an entry in the _processedLines list.
     """
+    __slots__ = ( 'marker', 'originalMarker', 'adjustedText', 'cleanText', 'extras', 'originalText', )
 
     def __init__( self, marker, originalMarker, adjustedText, cleanText, extras, originalText ):
         """
@@ -336,6 +370,15 @@ class InternalBibleEntry:
                 #assert( marker in BibleOrgSysGlobals.USFMMarkers or marker in BOS_ADDED_CONTENT_MARKERS )
                 if marker not in BibleOrgSysGlobals.USFMMarkers and marker not in BOS_ADDED_CONTENT_MARKERS:
                     logging.warning( "InternalBibleEntry doesn't handle {!r} marker yet.".format( marker ) )
+        # Save memory by sharing markers, short texts, identical texts, and empty extras lists
+        marker = sys.intern( marker )
+        if originalMarker is not None: originalMarker = sys.intern( originalMarker )
+        if adjustedText is not None:
+            if len(adjustedText) <= MAX_INTERNED_TEXT_LENGTH: adjustedText = sys.intern( adjustedText )
+            if cleanText == adjustedText: cleanText = adjustedText
+            if originalText == adjustedText: originalText = adjustedText
+        elif cleanText is not None and len(cleanText) <= MAX_INTERNED_TEXT_LENGTH: cleanText = sys.intern( cleanText )
+        if extras is not None and not extras: extras = EMPTY_EXTRA_LIST
         self.marker, self.originalMarker, self.adjustedText, self.cleanText, self.extras, self.originalText = marker, originalMarker, adjustedText, cleanText, extras, originalText
 
         if BibleOrgSysGlobals.debugFlag and debuggingThisModule \
@@ -345,6 +388,8 @@ class InternalBibleEntry:
             #halt # When does this happen?
     # end of InternalBibleEntry.__init__
 
+    def __setstate__( self, state ): _setSlotsState( self, state )
+
 
     #def __eq__( self, other ):
         #if type( other ) is type( self ): return self.__dict__ == other.__dict__
@@ -435,6 +480,7 @@ class InternalBibleEntryList:
 
     (It's mainly here for extra data validation and the str function for debugging.)
     """
+    __slots__ = ( 'data', )
 
     def __init__( self, initialData=None ):
         """
@@ -449,6 +495,8 @@ class InternalBibleEntryList:
         else: assert( not self.data )
     # end of InternalBibleEntryList.__init__
 
+    def __setstate__( self, state ): _setSlotsState( self, state )
+
 
     #def __eq__( self, other ):
         #if type( other ) is type( self ): return self.__dict__ == other.__dict__
@@ -516,6 +564,8 @@ class InternalBibleIndexEntry:
         2/ entryCount: the number of BibleEntries
         3/ context: a list containing contextual markers which still apply to this entry.
     """
+    __slots__ = ( 'entryIndex', 'entryCount', 'context', 'indexNext', )
+
     def __init__( self, entryIndex, entryCount, context=None ):
         #if context: print( "XXXXXXXX", entryIndex, entryCount, context )
         if context is None: context = []
@@ -523,6 +573,8 @@ class InternalBibleIndexEntry:
         self.indexNext = self.entryIndex + entryCount
     # end of InternalBibleIndexEntry.__init__
 
+    def __setstate__( self, state ): _setSlotsState( self, state )
+
     def __str__( self ):
         """
         Just display a simplified view of the index entry.
@@ -989,6 +1041,68 @@ class InternalBibleIndex:
 
 
 
+ENTRY_SIZE_HANDLERS = {
+    InternalBibleEntry: lambda entry: ( entry.marker, entry.originalMarker, entry.adjustedText, entry.cleanText, entry.extras, entry.originalText, ),
+    InternalBibleExtra: lambda extra: ( extra.myType, extra.index, extra.noteText, extra.cleanNoteText, ),
+    InternalBibleEntryList: lambda entryList: ( entryList.data, ),
+    InternalBibleExtraList: lambda extraList: ( extraList.data, ),
+    }
+
+
+class _UncompactedEntry:
+    """
+    Used by measureEntryMemory to model the earlier (pre-__slots__) layout
+        where every entry, extra, and extras list had its own instance dictionary.
+    """
+    def __init__( self, marker, originalMarker, adjustedText, cleanText, extras, originalText ):
+        self.marker, self.originalMarker, self.adjustedText, self.cleanText, self.extras, self.originalText = marker, originalMarker, adjustedText, cleanText, extras, originalText
+class _UncompactedExtra:
+    def __init__( self, myType, index, noteText, cleanNoteText ):
+        self.myType, self.index, self.noteText, self.cleanNoteText = myType, index, noteText, cleanNoteText
+class _UncompactedExtraList:
+    def __init__( self, data ): self.data = data
+# end of _Uncompacted classes
+
+
+def measureEntryMemory( BibleObject ):
+    """
+    Use BibleOrgSysGlobals.totalSize to measure the memory used by the processed entries
+        of all of the loaded books of the Bible object.
+
+    Returns a dictionary containing the number of entries and
+        the estimated bytes per entry 'before' (modelling the earlier layout
+            with instance dictionaries, separate marker strings, and separate empty extras lists)
+        and 'after' (as they actually are now).
+    """
+    allEntries, uncompactedEntries = [], []
+    for BBB,bookObject in BibleObject.books.items():
+        if not bookObject._processedFlag: bookObject.processLines()
+        for entry in bookObject._processedLines:
+            allEntries.append( entry )
+            copies = {} # Equal strings within an entry were often the same object anyway
+            def unshared( someString ): # Make a separate copy of the string (Python shares single characters anyway)
+                if someString is None or len(someString) < 2: return someString
+                if someString not in copies: copies[someString] = someString[:1] + someString[1:]
+                return copies[someString]
+            # end of unshared
+            extras = entry.extras
+            if extras is not None:
+                extras = _UncompactedExtraList( [_UncompactedExtra( unshared(extra.myType), extra.index, unshared(extra.noteText), unshared(extra.cleanNoteText) ) \
+                                                    for extra in extras] )
+            uncompactedEntries.append( _UncompactedEntry( unshared(entry.marker), unshared(entry.originalMarker),
+                                unshared(entry.adjustedText), unshared(entry.cleanText), extras, unshared(entry.originalText) ) )
+
+    numEntries = len( allEntries )
+    afterSize = BibleOrgSysGlobals.totalSize( allEntries, ENTRY_SIZE_HANDLERS )
+    dictHandler = lambda something: ( something.__dict__, )
+    beforeSize = BibleOrgSysGlobals.totalSize( uncompactedEntries, { _UncompactedEntry:dictHandler, _UncompactedExtra:dictHandler, _UncompactedExtraList:dictHandler, } )
+    return { 'numEntries':numEntries,
+            'beforeBytesPerEntry':beforeSize/numEntries if numEntries else 0,
+            'afterBytesPerEntry':afterSize/numEntries if numEntries else 0, }
+# end of measureEntryMemory
+
+
+
 def demo():
     """
     Demonstrate reading and processing some Bible databases.
@@ -998,6 +1112,17 @@ def demo():
     print( "Since these are only helper classes, they can't actually do much at all." )
     print( "  Try running USFMBibleBook or USXXMLBibleBook which use these classes." )
 
+    from USFMBible import USFMBible
+    import InternalBibleInternals # so that our classes match those used by USFMBible (rather than the __main__ ones)
+    testFolder = 'Tests/DataFilesForTests/USFMAllMarkersProject/'
+    if os.access( testFolder, os.R_OK ):
+        UB = USFMBible( testFolder, 'AllMarkers' )
+        UB.load()
+        results = InternalBibleInternals.measureEntryMemory( UB )
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( "  {} entries: {:.1f} bytes/entry before, {:.1f} bytes/entry now".format( results['numEntries'], results['beforeBytesPerEntry'], results['afterBytesPerEntry'] ) )
+    else: print( "Sorry, test folder {!r} is not readable on this computer.".format( testFolder ) )
+
     #IBB = InternalBibleInternals( 'GEN' )
     ## The following fields would normally be filled in a by "load" routine in the derived class
     #IBB.objectNameString = "Dummy test Internal Bible Book object"
@@ -0,0 +1,411 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# InternalBibleSearchIndex.py
+#
+# Module handling a full-text search index for internal Bibles
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module for building an inverted (word) index over the verse text of one or more loaded internal Bibles
+    so that word, word prefix, and phrase searches don't have to work through every processed line.
+
+The index is kept separately for each book of each Bible,
+    so books can be (re)indexed one at a time and indexes for different Bibles can be merged.
+
+Words are found using the same rules as InternalBibleBook.doCheckWords
+    and are compared case insensitively.
+
+For each book, the index holds a list of (C,V) references
+    and, for each lower-case word, an array of packed (verse number, word position) integers
+    which is in increasing order (so that phrase searches are just set intersections).
+
+Contains:
+    class InternalBibleSearchIndex()
+    loadSearchIndex( filepath )
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-04' # by RJH
+ShortProgName = "InternalBibleSearchIndex"
+ProgName = "Internal Bible search index handler"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, pickle
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+import BibleOrgSysGlobals
+from InternalBibleBook import getCleanWords
+
+
+SEARCH_INDEX_VERSION = 1
+SEARCH_INDEX_FILENAME_EXTENSION = '.BOSIndex'
+
+POSITION_BITS = 12 # Allows for 4,096 words in one verse (and about a million verses in one book)
+MAX_POSITION = ( 1 << POSITION_BITS ) - 1
+
+INDEXED_MARKERS = ( 'v~', 'p~', ) # The verse text entries
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def makeBookIndex( bookObject ):
+    """
+    Indexes the verse text of the given (processed) book.
+
+    Returns a 2-tuple with a list of (C,V) references
+        and a dictionary of packed posting arrays by lower-case word.
+    """
+    if not bookObject._processedFlag:
+        print( "InternalBibleSearchIndex: processing lines from 'makeBookIndex'" )
+        bookObject.processLines()
+
+    CVList, wordPostings = [], {}
+    C, V = '0', '0'
+    verseNumber = position = -1
+    for entry in bookObject._processedLines:
+        marker = entry.getMarker()
+        if marker == 'c':
+            text = entry.getText()
+            if text: C, V = text.split()[0], '0'
+            verseNumber = -1 # Any more text belongs to the next verse
+        elif marker == 'v':
+            text = entry.getText()
+            if text: V = text.split()[0]
+            verseNumber = -1
+        elif marker in INDEXED_MARKERS:
+            cleanText = entry.getCleanText()
+            if not cleanText: continue
+            if verseNumber < 0: # Start a new verse
+                CVList.append( (C, V) )
+                verseNumber, position = len(CVList) - 1, 0
+            for word in getCleanWords( cleanText ):
+                if position > MAX_POSITION:
+                    logging.warning( t("makeBookIndex: Not indexing the rest of {} {}:{} after {} words").format( bookObject.BBB, C, V, position ) )
+                    break
+                lcWord = word.lower()
+                try: wordPostings[lcWord].append( (verseNumber << POSITION_BITS) | position )
+                except KeyError: wordPostings[lcWord] = array( 'L', ((verseNumber << POSITION_BITS) | position,) )
+                position += 1
+    return CVList, wordPostings
+# end of makeBookIndex
+
+
+
+class InternalBibleSearchIndex:
+    """
+    Class for handling a full-text search index over one or more internal Bibles.
+
+    Search results are lists of (bibleName, BBB, C, V) 4-tuples,
+        in the order that the Bibles and books were added to the index.
+    """
+    def __init__( self ):
+        """
+        Constructor: creates an empty index.
+        """
+        self.bookIndexes = OrderedDict() # Keys are (bibleName,BBB), entries are (CVList,wordPostings) 2-tuples
+        self.__sortedWords = None # Built when first needed by prefix searches
+    # end of InternalBibleSearchIndex.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the index.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "Internal Bible Search Index object"
+        result += ('\n' if result else '') + "  " + _("Number of Bibles: {}").format( len(self.getBibleNames()) )
+        result += ('\n' if result else '') + "  " + _("Number of books: {}").format( len(self.bookIndexes) )
+        result += ('\n' if result else '') + "  " + _("Number of verses: {}").format( sum( len(CVList) for CVList,wordPostings in self.bookIndexes.values() ) )
+        if BibleOrgSysGlobals.verbosityLevel > 2:
+            result += ('\n' if result else '') + "  " + _("Number of distinct words: {}").format( len(self.__getSortedWords()) )
+        return result
+    # end of InternalBibleSearchIndex.__str__
+
+
+    def __len__( self ):
+        """
+        Returns the number of indexed books.
+        """
+        return len( self.bookIndexes )
+    # end of InternalBibleSearchIndex.__len__
+
+
+    def getBibleNames( self ):
+        """
+        Returns a list of the names of the indexed Bibles.
+        """
+        bibleNames = []
+        for bibleName,BBB in self.bookIndexes:
+            if bibleName not in bibleNames: bibleNames.append( bibleName )
+        return bibleNames
+    # end of InternalBibleSearchIndex.getBibleNames
+
+
+    def addBook( self, bookObject, bibleName ):
+        """
+        Indexes (or reindexes) a single book.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 3: print( "  Indexing {} {}...".format( bibleName, bookObject.BBB ) )
+        self.bookIndexes[(bibleName,bookObject.BBB)] = makeBookIndex( bookObject )
+        self.__sortedWords = None
+    # end of InternalBibleSearchIndex.addBook
+
+
+    def addBible( self, BibleObject, bibleName=None ):
+        """
+        Indexes (or reindexes) all the books of a loaded Bible.
+
+        If bibleName is not given, the Bible abbreviation (or name) is used.
+        """
+        if bibleName is None:
+            bibleName = BibleObject.abbreviation if BibleObject.abbreviation else BibleObject.name
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( _("Indexing {} Bible...").format( bibleName ) )
+        for BBB,bookObject in BibleObject.books.items():
+            self.addBook( bookObject, bibleName )
+    # end of InternalBibleSearchIndex.addBible
+
+
+    def removeBible( self, bibleName ):
+        """
+        Removes all of the books of the given Bible from the index.
+        """
+        for key in [key for key in self.bookIndexes if key[0]==bibleName]:
+            del self.bookIndexes[key]
+        self.__sortedWords = None
+    # end of InternalBibleSearchIndex.removeBible
+
+
+    def merge( self, otherIndex ):
+        """
+        Adds the books from another index into this one.
+
+        Books for the same Bible name and BBB are replaced.
+        """
+        self.bookIndexes.update( otherIndex.bookIndexes )
+        self.__sortedWords = None
+    # end of InternalBibleSearchIndex.merge
+
+
+    def __getSortedWords( self ):
+        """
+        Returns a sorted list of all the (lower-case) words in the index.
+        """
+        if self.__sortedWords is None:
+            allWords = set()
+            for CVList,wordPostings in self.bookIndexes.values():
+                allWords.update( wordPostings )
+            self.__sortedWords = sorted( allWords )
+        return self.__sortedWords
+    # end of InternalBibleSearchIndex.__getSortedWords
+
+
+    def __selectBooks( self, bibleNames, BBBList ):
+        """
+        Generator giving the (bibleName,BBB,CVList,wordPostings) of the books to be searched.
+        """
+        for (bibleName,BBB),(CVList,wordPostings) in self.bookIndexes.items():
+            if (bibleNames is None or bibleName in bibleNames) and (BBBList is None or BBB in BBBList):
+                yield bibleName, BBB, CVList, wordPostings
+    # end of InternalBibleSearchIndex.__selectBooks
+
+
+    def findWord( self, word, bibleNames=None, BBBList=None ):
+        """
+        Find the verses which contain the given word (case insensitive).
+
+        The search can be restricted to a list of Bible names and/or a list of books.
+
+        Returns a list of (bibleName, BBB, C, V) 4-tuples.
+        """
+        return self.findWords( (word,), bibleNames, BBBList )
+    # end of InternalBibleSearchIndex.findWord
+
+
+    def findPrefix( self, prefix, bibleNames=None, BBBList=None ):
+        """
+        Find the verses which contain any word starting with the given prefix (case insensitive).
+
+        Returns a list of (bibleName, BBB, C, V) 4-tuples.
+        """
+        lcPrefix = prefix.lower()
+        sortedWords = self.__getSortedWords()
+        matchingWords = []
+        index = bisect_left( sortedWords, lcPrefix )
+        while index < len(sortedWords) and sortedWords[index].startswith( lcPrefix ):
+            matchingWords.append( sortedWords[index] )
+            index += 1
+        return self.findWords( matchingWords, bibleNames, BBBList )
+    # end of InternalBibleSearchIndex.findPrefix
+
+
+    def findWords( self, words, bibleNames=None, BBBList=None ):
+        """
+        Find the verses which contain any of the given words (case insensitive).
+
+        Returns a list of (bibleName, BBB, C, V) 4-tuples.
+        """
+        lcWords = [word.lower() for word in words]
+        results = []
+        for bibleName, BBB, CVList, wordPostings in self.__selectBooks( bibleNames, BBBList ):
+            verseNumbers = set()
+            for lcWord in lcWords:
+                if lcWord in wordPostings:
+                    verseNumbers.update( posting >> POSITION_BITS for posting in wordPostings[lcWord] )
+            for verseNumber in sorted( verseNumbers ):
+                C, V = CVList[verseNumber]
+                results.append( (bibleName, BBB, C, V) )
+        return results
+    # end of InternalBibleSearchIndex.findWords
+
+
+    def findPhrase( self, phrase, bibleNames=None, BBBList=None ):
+        """
+        Find the verses which contain the given phrase (case insensitive),
+            i.e., the words of the phrase in order in the same verse.
+
+        Punctuation in the phrase is ignored.
+
+        Returns a list of (bibleName, BBB, C, V) 4-tuples.
+        """
+        lcWords = [word.lower() for word in getCleanWords( phrase )]
+        if not lcWords: return []
+        results = []
+        for bibleName, BBB, CVList, wordPostings in self.__selectBooks( bibleNames, BBBList ):
+            if any( lcWord not in wordPostings for lcWord in lcWords ): continue
+            matches = set( wordPostings[lcWords[0]] )
+            for offset,lcWord in enumerate( lcWords[1:], start=1 ):
+                matches.intersection_update( posting-offset for posting in wordPostings[lcWord] )
+                if not matches: break
+            verseNumbers = sorted( set( posting >> POSITION_BITS for posting in matches ) )
+            for verseNumber in verseNumbers:
+                C, V = CVList[verseNumber]
+                results.append( (bibleName, BBB, C, V) )
+        return results
+    # end of InternalBibleSearchIndex.findPhrase
+
+
+    def getWordCount( self, word, bibleNames=None, BBBList=None ):
+        """
+        Returns the total number of times the given word (case insensitive) occurs in the verse text.
+        """
+        lcWord = word.lower()
+        return sum( len(wordPostings[lcWord]) for bibleName, BBB, CVList, wordPostings in self.__selectBooks( bibleNames, BBBList ) \
+                                                if lcWord in wordPostings )
+    # end of InternalBibleSearchIndex.getWordCount
+
+
+    def save( self, filepath ):
+        """
+        Saves the index to disk so that it can be quickly reloaded with loadSearchIndex.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( _("Saving search index to {}...").format( filepath ) )
+        folder = os.path.dirname( filepath )
+        if folder and not os.access( folder, os.W_OK ): os.makedirs( folder, exist_ok=True )
+        with open( filepath, 'wb' ) as indexFile:
+            pickle.dump( (SEARCH_INDEX_VERSION, list( self.bookIndexes.items() )), indexFile, pickle.HIGHEST_PROTOCOL )
+    # end of InternalBibleSearchIndex.save
+# end of class InternalBibleSearchIndex
+
+
+
+def loadSearchIndex( filepath ):
+    """
+    Loads a search index that was previously saved to disk.
+
+    Returns the index, or None if the file was missing or is an unknown version.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 2: print( _("Loading search index from {}...").format( filepath ) )
+    try:
+        with open( filepath, 'rb' ) as indexFile:
+            version, bookIndexItems = pickle.load( indexFile )
+    except OSError: return None
+    if version != SEARCH_INDEX_VERSION:
+        logging.warning( t("loadSearchIndex: Ignoring version {} index in {}").format( version, filepath ) )
+        return None
+    searchIndex = InternalBibleSearchIndex()
+    searchIndex.bookIndexes.update( bookIndexItems )
+    return searchIndex
+# end of loadSearchIndex
+
+
+
+def demo():
+    """
+    Index a couple of test USFM Bibles and do some searches.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile, time
+    from USFMBible import USFMBible
+    searchIndex = InternalBibleSearchIndex()
+    for testFolder,name,abbreviation in ( ('Tests/DataFilesForTests/USFMTest1/','USFMTest1','T1'),
+                                          ('Tests/DataFilesForTests/USFMTest2/','USFMTest2','T2'), ):
+        if os.access( testFolder, os.R_OK ):
+            UB = USFMBible( testFolder, name, abbreviation )
+            UB.load()
+            searchIndex.addBible( UB )
+        else: print( "Sorry, test folder {!r} is not readable on this computer.".format( testFolder ) )
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( searchIndex )
+
+    indexFilepath = os.path.join( tempfile.gettempdir(), 'Test' + SEARCH_INDEX_FILENAME_EXTENSION )
+    searchIndex.save( indexFilepath )
+    searchIndex = loadSearchIndex( indexFilepath )
+    for searchFunction,query in ( (searchIndex.findWord,'Manama'), (searchIndex.findPrefix,'kalibut'),
+                                 (searchIndex.findPhrase,'te Manama'), (searchIndex.findPhrase,'ka langit wey ka kalibutan'), ):
+        startTime = time.time()
+        results = searchFunction( query )
+        elapsedTime = time.time() - startTime
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( "  {}( {!r} ) found {} verses in {:.2f}ms, e.g., {}".format( searchFunction.__name__, query, len(results), elapsedTime*1000, results[:3] ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of InternalBibleSearchIndex.py
@@ -0,0 +1,361 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# LibreOfficePool.py
+#
+# Module handling a pool of headless LibreOffice worker processes
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module handling a pool of headless LibreOffice (soffice) processes
+    which can be driven through UNO (used by BibleWriter.toODF).
+
+Each worker runs its own soffice process (with its own user profile folder
+    so that the processes don't interfere with each other)
+    listening on its own named pipe.
+Jobs (e.g., Bible books) are given to whichever worker is idle.
+A worker whose job takes longer than the timeout is killed (and the job fails),
+    and a worker which has crashed (or been killed) is restarted for its next job.
+A LibreOffice server that we didn't start can't be killed, so a job there which takes
+    longer than the timeout just fails when it eventually finishes.
+
+The workers are only started when they're first needed
+    and then kept running until the pool is closed,
+    so the same pool can be used for many Bibles in one run.
+
+If LibreOffice can't be found, the pool just uses one worker which connects
+    to a LibreOffice server that's already running (and listening on port 2002), e.g., started with:
+        /usr/bin/libreoffice --accept="socket,host=localhost,port=2002;urp;StarOffice.ServiceManager" --norestore --nologo --headless
+
+NOTE: This requires the Python UNO bridge (e.g., the python3-uno package).
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "LibreOfficePool"
+ProgName = "LibreOffice worker pool"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, shutil, logging, time, queue, tempfile, threading
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+import BibleOrgSysGlobals
+
+
+DEFAULT_OPENOFFICE_PORT = 2002 # Used if we have to connect to an already running LibreOffice server
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def findLibreOffice():
+    """
+    Returns the path of the LibreOffice (soffice) program or None if it can't be found.
+    """
+    for programName in ( 'soffice', 'libreoffice', ):
+        programPath = shutil.which( programName )
+        if programPath: return programPath
+    for programPath in ( '/usr/lib/libreoffice/program/soffice', '/opt/libreoffice/program/soffice',
+                        '/Applications/LibreOffice.app/Contents/MacOS/soffice', ):
+        if os.access( programPath, os.X_OK ): return programPath
+    return None
+# end of findLibreOffice
+
+
+
+class LibreOfficeWorker:
+    """
+    Class for one headless LibreOffice process (and our UNO connection to it).
+    """
+    def __init__( self, workerIndex, programPath=None, startTimeout=60 ):
+        """
+        Constructor: doesn't start LibreOffice yet.
+            programPath: the soffice program (or None to connect to an already running server)
+        """
+        self.workerIndex, self.programPath, self.startTimeout = workerIndex, programPath, startTimeout
+        self.pipeName = 'BOS_LibreOffice_{}_{}'.format( os.getpid(), workerIndex )
+        self.process = self.profileFolder = self.desktop = None
+        self.startCount = self.jobCount = 0
+    # end of LibreOfficeWorker.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the worker.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "LibreOffice Worker object"
+        result += ('\n' if result else '') + "  " + _("Worker: {}").format( self.workerIndex )
+        result += ('\n' if result else '') + "  " + _("Connection: {}").format( "pipe {}".format( self.pipeName ) if self.programPath
+                                                                                    else "port {}".format( DEFAULT_OPENOFFICE_PORT ) )
+        result += ('\n' if result else '') + "  " + _("Started {} times and did {} jobs").format( self.startCount, self.jobCount )
+        return result
+    # end of LibreOfficeWorker.__str__
+
+
+    def start( self ):
+        """
+        Starts LibreOffice (if we can) and connects to it.
+
+        Sets self.desktop (the com.sun.star.frame.Desktop) ready for loading documents.
+        """
+        import uno
+        from com.sun.star.connection import NoConnectException
+
+        if self.programPath:
+            if BibleOrgSysGlobals.verbosityLevel > 2: print( t("start: Starting LibreOffice worker {}...").format( self.workerIndex ) )
+            self.profileFolder = tempfile.mkdtemp( prefix='BOS_LibreOffice_' ) # Each process needs its own user profile
+            parameters = [ self.programPath, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault', '--nolockcheck',
+                            '-env:UserInstallation={}'.format( uno.systemPathToFileUrl( self.profileFolder ) ),
+                            '--accept=pipe,name={};urp;StarOffice.ComponentContext'.format( self.pipeName ) ]
+            self.process = subprocess.Popen( parameters, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL )
+            connectString = 'uno:pipe,name={};urp;StarOffice.ComponentContext'.format( self.pipeName )
+        else: connectString = 'uno:socket,host=localhost,port={};urp;StarOffice.ComponentContext'.format( DEFAULT_OPENOFFICE_PORT )
+        self.startCount += 1
+
+        localContext = uno.getComponentContext()
+        urlResolver = localContext.ServiceManager.createInstanceWithContext( "com.sun.star.bridge.UnoUrlResolver", localContext )
+        endTime = time.time() + self.startTimeout
+        while True: # It takes a while for LibreOffice to start up and be ready for us
+            try: componentContext = urlResolver.resolve( connectString ); break
+            except NoConnectException:
+                if time.time() > endTime or (self.process is not None and self.process.poll() is not None):
+                    logging.error( t("start: Unable to connect to LibreOffice worker {}").format( self.workerIndex ) )
+                    self.stop()
+                    raise
+                time.sleep( 0.25 )
+        self.desktop = componentContext.ServiceManager.createInstanceWithContext( "com.sun.star.frame.Desktop", componentContext )
+    # end of LibreOfficeWorker.start
+
+
+    def kill( self ):
+        """
+        Kills our LibreOffice process (e.g., when a job has taken too long).
+
+        Any UNO call that's waiting on it will then fail.
+        """
+        if self.process is not None:
+            logging.warning( t("kill: Killing LibreOffice worker {}").format( self.workerIndex ) )
+            self.process.kill()
+        else: logging.error( t("kill: Can't kill a LibreOffice server that we didn't start") )
+    # end of LibreOfficeWorker.kill
+
+
+    def stop( self ):
+        """
+        Stops our LibreOffice process (if we started one) and cleans up.
+
+        It's safe to call this even if the process has already crashed or been killed.
+        """
+        if self.process is not None:
+            if self.desktop is not None and self.process.poll() is None:
+                try: self.desktop.terminate() # Ask it nicely first
+                except Exception: pass # Probably it's already gone
+            try: self.process.wait( timeout=10 )
+            except subprocess.TimeoutExpired:
+                self.process.kill(); self.process.wait()
+            self.process = None
+        if self.profileFolder is not None:
+            shutil.rmtree( self.profileFolder, ignore_errors=True )
+            self.profileFolder = None
+        self.desktop = None
+    # end of LibreOfficeWorker.stop
+# end of class LibreOfficeWorker
+
+
+
+class LibreOfficePool:
+    """
+    Class for running jobs on a pool of headless LibreOffice workers.
+
+    Usage is:
+        with LibreOfficePool( numWorkers ) as pool:
+            for job, result, successFlag in pool.run( jobFunction, jobs, jobTimeout ): ...
+    where jobFunction( desktop, job ) is called (in a thread) with the com.sun.star.frame.Desktop of an idle worker.
+    """
+    def __init__( self, numWorkers=None, programPath=None, startTimeout=60, maxAttempts=2 ):
+        """
+        Constructor: doesn't start any LibreOffice processes yet.
+            numWorkers (optional): defaults to BibleOrgSysGlobals.maxProcesses
+            programPath (optional): the soffice program (found automatically if not given)
+            maxAttempts: how many times a job is tried if the worker crashes
+        """
+        if numWorkers is None: numWorkers = BibleOrgSysGlobals.maxProcesses
+        if programPath is None: programPath = findLibreOffice()
+        if not programPath:
+            logging.warning( t("LibreOfficePool: Unable to find LibreOffice so will try to use a server on port {}").format( DEFAULT_OPENOFFICE_PORT ) )
+            numWorkers = 1 # We can only talk to the one server
+        self.programPath, self.maxAttempts = programPath, maxAttempts
+        self.workers = [LibreOfficeWorker( j, programPath, startTimeout ) for j in range( max( 1, numWorkers ) )]
+        self.__idleWorkers = queue.Queue()
+        for worker in self.workers: self.__idleWorkers.put( worker )
+    # end of LibreOfficePool.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the pool.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "LibreOffice Pool object"
+        result += ('\n' if result else '') + "  " + _("Program: {}").format( self.programPath )
+        result += ('\n' if result else '') + "  " + _("Workers: {}").format( len(self.workers) )
+        result += ('\n' if result else '') + "  " + _("Started {} times and did {} jobs").format(
+                            sum( worker.startCount for worker in self.workers ), sum( worker.jobCount for worker in self.workers ) )
+        return result
+    # end of LibreOfficePool.__str__
+
+
+    def __enter__( self ): return self
+    def __exit__( self, exceptionType, exceptionValue, traceback ): self.close()
+
+
+    def __runJob( self, jobFunction, job, jobTimeout ):
+        """
+        Runs the job on the next idle worker (starting or restarting it if necessary).
+
+        Returns a 3-tuple with the job, the result from the job function, and a success flag.
+        """
+        worker = self.__idleWorkers.get()
+        try:
+            for attempt in range( self.maxAttempts ):
+                if worker.desktop is None:
+                    try: worker.start()
+                    except Exception as err:
+                        logging.error( t("run: Unable to start LibreOffice worker {} for {}: {}").format( worker.workerIndex, job, err ) )
+                        continue
+                timedOut = []
+                def timeout():
+                    timedOut.append( True )
+                    if worker.process is not None: worker.kill()
+                    else: logging.warning( t("run: Job {} has taken more than {} seconds but can't be stopped on a LibreOffice server that we didn't start").format( job, jobTimeout ) )
+                timer = threading.Timer( jobTimeout, timeout ) if jobTimeout else None
+                if timer is not None: timer.start()
+                jobError = None
+                try: result = jobFunction( worker.desktop, job )
+                except Exception as err: jobError = err
+                finally:
+                    if timer is not None: timer.cancel() # Straight away so that it can't fire while we're handling the result
+                if timedOut: # The job fails even if it finished after all (because the worker might have been killed under it)
+                    logging.error( t("run: Job {} timed out after {} seconds").format( job, jobTimeout ) )
+                    worker.stop() # It will be restarted when it's next needed
+                    break # No point trying it again
+                if jobError is None:
+                    worker.jobCount += 1
+                    return job, result, True
+                logging.error( t("run: Job {} failed on LibreOffice worker {}: {}").format( job, worker.workerIndex, jobError ) )
+                worker.stop() # It will be restarted when it's next needed
+            return job, None, False
+        finally: self.__idleWorkers.put( worker )
+    # end of LibreOfficePool.__runJob
+
+
+    def run( self, jobFunction, jobs, jobTimeout=None ):
+        """
+        Runs the jobs on the workers (as they become idle) with the given timeout (in seconds) for each job.
+
+        Yields a 3-tuple with the job, the result from jobFunction( desktop, job ), and a success flag
+            for each job as it finishes (so not necessarily in the original order).
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("run: Running {} jobs on {} LibreOffice workers...").format( len(jobs), len(self.workers) ) )
+        def runJob( job ): return self.__runJob( jobFunction, job, jobTimeout )
+        numThreads = min( len(self.workers), len(jobs) )
+        if numThreads < 2: # No need for any threads
+            for job in jobs: yield runJob( job )
+            return
+        # Threads are enough because the actual work is done by the LibreOffice processes
+        pool = ThreadPool( numThreads )
+        try:
+            for jobResult in pool.imap_unordered( runJob, jobs ): yield jobResult
+        finally: pool.close(); pool.join()
+    # end of LibreOfficePool.run
+
+
+    def close( self ):
+        """
+        Stops all the LibreOffice worker processes.
+        """
+        for worker in self.workers: worker.stop()
+    # end of LibreOfficePool.close
+# end of class LibreOfficePool
+
+
+
+def demo():
+    """
+    Convert some text into a few ODF documents on a couple of workers.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    try: import uno
+    except ImportError:
+        logging.error( "Sorry, the Python UNO bridge isn't available on this computer." ); return
+
+    outputFolder = os.path.abspath( "OutputFiles/LibreOfficePoolTest/" )
+    if not os.access( outputFolder, os.F_OK ): os.makedirs( outputFolder ) # Make the empty folder if there wasn't already one there
+
+    def writeDocument( desktop, job ):
+        """ Writes a one-line document. """
+        filepath = os.path.join( outputFolder, 'Test{}.odt'.format( job ) )
+        document = desktop.loadComponentFromURL( "private:factory/swriter", "_blank", 0, () )
+        document.Text.setString( "This is test document number {}.".format( job ) )
+        document.storeAsURL( uno.systemPathToFileUrl( filepath ), () )
+        document.dispose()
+        return filepath
+    # end of writeDocument
+
+    with LibreOfficePool( 2 ) as pool:
+        for job, result, successFlag in pool.run( writeDocument, list( range( 1, 6 ) ), jobTimeout=60 ):
+            if BibleOrgSysGlobals.verbosityLevel > 0: print( "  Job {}: {} {}".format( job, 'wrote' if successFlag else 'FAILED', result ) )
+        if BibleOrgSysGlobals.verbosityLevel > 0: print( pool )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of LibreOfficePool.py
@@ -31,7 +31,11 @@ Why write yet another module to do this?
     Better control of file layout and indentation
     It only took half a day anyway.
 
-TODO: Add buffering
+Output is gathered in a list of string chunks (rather than by repeated string concatenation)
+    and written out in large blocks, but the end of the buffer is always held back
+    so that removeFinalNewline can still retract the last newline sequence.
+The output file can optionally be compressed (gzip or xz) as it is written.
+
 TODO: Add writeAutoDTD
 
 """
@@ -41,7 +45,7 @@ ProgVersion = "0.31"
 ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
 
 
-import os, logging
+import os, logging, gzip, lzma
 from gettext import gettext as _
 
 import BibleOrgSysGlobals
@@ -51,6 +55,7 @@ allowedOutputTypes = 'XML','HTML'
 HTMLParaTags = 'p', # Not automatically started on a new line
 HTMLInsideTags = 'a', 'b', 'em', 'i', 'sup', 'sub', 'span' # Not automatically started on or finished with a new line
 HTMLCombinedTags = HTMLParaTags + HTMLInsideTags
+allowedCompressionTypes = 'gz','xz'
 
 
 
@@ -83,12 +88,16 @@ class MLWriter:
 
         self._status = 'Idle' # Not sure that we really even need this
         self._sectionName = 'None' # Else 'Header' or 'Main' (allows finer use of humanReadable control)
-        self._buffer = ''
-        self._bufferFlushSize = 1000 # Flush the buffer to the disk when it gets this many characters
+        self._buffer = [] # A list of string chunks not yet written to the file
+        self._bufferLength = 0 # Total number of characters in the buffer chunks
+        self._bufferFlushSize = 65536 # Flush the buffer to the disk when it gets this many characters
         self._bufferSaveSize = 30 # How much off the buffer to hold back for possible backtracking
         self._openStack = [] # Here we keep track of what XML markers need to be closed
         self._currentColumn = 0
         self._nl = '\n'
+        self._checkFlag = True # Set to False (with setFastMode) to skip checking of tags and text
+        self._compression = None
+        self._archiveWriter, self._archiveChunks = None, None # Set by setArchiveWriter
         self.linesWritten = 0
     # end of MLWriter.__init__
 
@@ -141,11 +150,32 @@ class MLWriter:
     # end of MLWriter.setSection
 
 
+    def setFastMode( self, value=True ):
+        """
+        If set, tags, text and attributes are no longer checked as they are written
+            (for use by exporters which have already validated or escaped everything).
+        """
+        self._checkFlag = not value
+    # end of MLWriter.setFastMode
+
+
+    def setArchiveWriter( self, archiveWriter ):
+        """
+        If set, everything that's written to the file is also kept
+            and then passed to the given ArchiveWriter when the file is closed
+            (so the archive doesn't need to read the file back in again).
+        """
+        assert( self._status == 'Idle' )
+        self._archiveWriter = archiveWriter
+    # end of MLWriter.setArchiveWriter
+
+
     def _writeToFile( self, string ):
         """ Writes a string to the file.
             NOTE: This doesn't update self._currentColumn (because we don't know what we're writing here). """
         assert( self.__outputFile is not None )
         self.__outputFile.write( string )
+        if self._archiveChunks is not None: self._archiveChunks.append( string )
     # end of MLWriter._writeToFile
 
 
@@ -153,14 +183,14 @@ class MLWriter:
         """ Writes the buffer to the file. """
         assert( self.__outputFile is not None )
         if self._buffer:
-            #print( "Writing buffer of {} characters".format( len(self._buffer) ) )
+            #print( "Writing buffer of {} characters in {} chunks".format( self._bufferLength, len(self._buffer) ) )
             if writeAll: # Write it all
-                self._writeToFile( self._buffer )
-                self._buffer = ''
-            elif len(self._buffer) > self._bufferSaveSize: # Write most of it (in case we need to retrack)
-                #print( "From {!r} writing {!r} leaving {!r}".format( self._buffer, self._buffer[:-self._bufferSaveSize], self._buffer[-self._bufferSaveSize:] ) )
-                self._writeToFile( self._buffer[:-self._bufferSaveSize] )
-                self._buffer = self._buffer[-self._bufferSaveSize:]
+                self._writeToFile( ''.join( self._buffer ) )
+                self._buffer, self._bufferLength = [], 0
+            elif self._bufferLength > self._bufferSaveSize: # Write most of it (in case we need to retract)
+                chars = ''.join( self._buffer )
+                self._writeToFile( chars[:-self._bufferSaveSize] )
+                self._buffer, self._bufferLength = [chars[-self._bufferSaveSize:]], self._bufferSaveSize
             #else: pass # Write none
     # end of MLWriter._writeBuffer
 
@@ -168,9 +198,11 @@ class MLWriter:
     def _writeToBuffer( self, string ):
         """ Writes a string to the buffer.
             NOTE: This doesn't update self._currentColumn (because we don't know what we're writing here). """
-        if len(self._buffer) >= self._bufferFlushSize: # Our buffer is getting too big (and slow)
-            self._writeBuffer( False ) # Physically write most of it to disk
-        self._buffer += string
+        if string:
+            self._buffer.append( string )
+            self._bufferLength += len( string )
+            if self._bufferLength >= self._bufferFlushSize: # Our buffer is getting big
+                self._writeBuffer( False ) # Physically write most of it to disk
     # end of MLWriter._writeToBuffer
 
 
@@ -237,36 +269,52 @@ class MLWriter:
         """ Removes a final newline sequence from the buffer. """
         removed = False
         if self._buffer:
-            if self._nl in ('\n','\r') and self._buffer[-1]==self._nl:
-                self._buffer = self._buffer[:-1]
-                removed = True
-            elif self._nl=='\r\n' and len(self._buffer)>=2 and self._buffer[-2:]=='\r\n':
-                self._buffer = self._buffer[:-2]
+            nlLength = len( self._nl )
+            if len(self._buffer)>1 and len(self._buffer[-1])<nlLength: # The newline might be split across chunks
+                self._buffer = [''.join( self._buffer )]
+            if self._buffer[-1].endswith( self._nl ):
+                self._buffer[-1] = self._buffer[-1][:-nlLength]
+                self._bufferLength -= nlLength
                 removed = True
         if not removed: logging.error( "MLWriter: No newline to remove" )
         self._suppressFollowingIndent = suppressFollowingIndent
     # end of MLWriter.removeFinalNewline
 
 
-    def start( self, lineEndings='l', noAutoXML=False, writeBOM=False ):
+    def start( self, lineEndings='l', noAutoXML=False, writeBOM=False, compression=None ):
         """
         Opens the file and writes a header record to it.
             lineEndings: l for Linux
                          w for Windows
+            compression (optional): 'gz' or 'xz'
+                (the matching extension is appended to the output filename)
         """
         assert( self._status == 'Idle' )
         if lineEndings == 'l': self._nl = '\n'
         elif lineEndings == 'w': self._nl = '\r\n'
         else: logging.error( "MLWriter: Unknown {!r} lineEndings flag".format( lineEndings ) )
+        if compression is not None:
+            assert( compression in allowedCompressionTypes )
+            self._compression = compression
+            self._filename += '.' + compression
+            self._outputFilePath += '.' + compression
+        if self._archiveWriter is not None:
+            assert( compression is None ) # The archive would get the uncompressed data
+            self._archiveChunks = ['\ufeff'] if writeBOM else []
         if BibleOrgSysGlobals.verbosityLevel>2: print( _("Writing {}...").format(self._outputFilePath) )
-        self.__outputFile = open( self._outputFilePath, 'wt' ) # Just create the empty file
-        self.__outputFile.close()
-        if writeBOM:
-            #logging.error( "Haven't worked out how to write BOM yet" )
-            with open( self._outputFilePath, 'ab' ) as self.__outputFile: # Append binary bytes
-                self.__outputFile.write( b'\xef\xbb\xbf' )
-                #self.__outputFile.write( decode( codecs.BOM_UTF8 ) )
-        self.__outputFile = open( self._outputFilePath, 'at' ) # Append text mode
+        if compression is not None:
+            opener = gzip.open if compression=='gz' else lzma.open
+            self.__outputFile = opener( self._outputFilePath, 'wt', encoding='utf-8' )
+            if writeBOM: self.__outputFile.write( '\ufeff' )
+        else:
+            self.__outputFile = open( self._outputFilePath, 'wt' ) # Just create the empty file
+            self.__outputFile.close()
+            if writeBOM:
+                #logging.error( "Haven't worked out how to write BOM yet" )
+                with open( self._outputFilePath, 'ab' ) as self.__outputFile: # Append binary bytes
+                    self.__outputFile.write( b'\xef\xbb\xbf' )
+                    #self.__outputFile.write( decode( codecs.BOM_UTF8 ) )
+            self.__outputFile = open( self._outputFilePath, 'at' ) # Append text mode
         self._status = 'Open'
         self._currentColumn = 0
         if self._outputType=='XML' and not noAutoXML:
@@ -280,6 +328,7 @@ class MLWriter:
     def checkTag( self, tagString ):
         """ Returns a checked string containing the tag name. Note that special characters should have already been handled before calling this routine. """
         #print( "tagString: {!r}", tagString )
+        if not self._checkFlag: return tagString
         assert( tagString ) # It can't be blank
         assert( '<' not in tagString and '>' not in tagString and '"' not in tagString )
         return tagString
@@ -288,6 +337,7 @@ class MLWriter:
 
     def checkText( self, textString ):
         """ Returns a checked string containing the tag name. Note that special characters should have already been handled before calling this routine. """
+        if not self._checkFlag: return textString
         assert( textString ) # It can't be blank
         if ('<' in textString or '>' in textString or '"' in textString): logging.error( _("MLWriter:checkText: unexpected characters found in {!r}").format( textString ) )
         return textString
@@ -296,6 +346,7 @@ class MLWriter:
 
     def checkAttribName( self, nameString ):
         """ Returns a checked string containing the attribute name. Note that special characters should have already been handled before calling this routine. """
+        if not self._checkFlag: return nameString
         assert( nameString ) # It can't be blank
         assert( '<' not in nameString and '>' not in nameString and '"' not in nameString )
         return nameString
@@ -305,6 +356,7 @@ class MLWriter:
     def checkAttribValue( self, valueString ):
         """ Returns a checked string containing the attribute value. Note that special characters should have already been handled before calling this routine. """
         if isinstance( valueString, int ): valueString = str( valueString ) # Do an automatic conversion if they pass us an integer
+        if not self._checkFlag: return valueString
         assert( valueString ) # It can't be blank (can it?)
         assert( '<' not in valueString and '>' not in valueString and '"' not in valueString )
         return valueString
@@ -427,6 +479,9 @@ class MLWriter:
         if self._buffer: self._writeBuffer()
         if self._status != "Buffered": pass
         self.__outputFile.close()
+        if self._archiveChunks is not None:
+            self._archiveWriter.addData( os.path.basename( self._filename ), ''.join( self._archiveChunks ).encode( self.__outputFile.encoding ) )
+            self._archiveChunks = None
         self._status = "Closed"
     # end of MLWriter.close
 
@@ -69,6 +69,7 @@ import BibleOrgSysGlobals
 from Bible import Bible, BibleBook
 from BibleOrganizationalSystems import BibleOrganizationalSystem
 from TheWordBible import handleLine
+from ESwordBible import iterateBibleTableVerses
 
 
 
@@ -104,10 +105,9 @@ def MySwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, au
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " MySwordBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             #ignore = False
@@ -146,10 +146,9 @@ def MySwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, au
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    MySwordBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 #ignore = False
@@ -246,31 +245,23 @@ class MySwordBible( Bible ):
 
         BOS = BibleOrganizationalSystem( "GENERIC-KJV-66-ENG" )
 
-        # Create the first book
-        thisBook = BibleBook( self, BBB )
-        thisBook.objectNameString = "MySword Bible Book object"
-        thisBook.objectTypeString = "MySword"
-
-        verseList = BOS.getNumVersesList( BBB )
-        numC, numV = len(verseList), verseList[0]
-        nBBB = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
-        C = V = 1
-
         bookCount = 0
         ourGlobals = {}
         continued = ourGlobals['haveParagraph'] = False
-        haveLines = False
-        while True:
-            cursor.execute('select Scripture from Bible where Book=? and Chapter=? and Verse=?', (nBBB,C,V) )
-            try:
-                row = cursor.fetchone()
-                line = row[0]
-            except TypeError: # This reference is missing (row is None)
-                #print( "something wrong at", BBB, C, V )
-                #if BibleOrgSysGlobals.debugFlag: halt
-                #print( row )
-                line = None
-            #print ( nBBB, BBB, C, V, 'MySw file line is "' + line + '"' )
+        thisBook = None
+        for BBB, C, V, line in iterateBibleTableVerses( cursor, BOS, BBB, booksExpected, "MySwordBible.load" ):
+            if thisBook is None or BBB != thisBook.BBB: # Start a new book
+                if thisBook is not None and haveLines:
+                    if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", thisBook.BBB, bookCount )
+                    self.saveBook( thisBook )
+                #elif thisBook is not None: print( "Not saving", thisBook.BBB )
+                bookCount += 1 # Not the number saved but the number we attempted to process
+                thisBook = BibleBook( self, BBB )
+                thisBook.objectNameString = "MySword Bible Book object"
+                thisBook.objectTypeString = "MySword"
+                haveLines = False
+
+            #print ( BBB, C, V, 'MySw file line is "' + line + '"' )
             if line is None: logging.warning( "MySwordBible.load: Found missing verse line at {} {}:{}".format( BBB, C, V ) )
             else: # line is not None
                 if not isinstance( line, str ):
@@ -292,36 +283,14 @@ class MySwordBible( Bible ):
 
             #print( "MySword.load", BBB, C, V, repr(line) )
             handleLine( self.name, BBB, C, V, line, thisBook, ourGlobals )
-            V += 1
-            if V > numV:
-                C += 1
-                if C > numC: # Save this book now
-                    if haveLines:
-                        if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", BBB, bookCount+1 )
-                        self.saveBook( thisBook )
-                    #else: print( "Not saving", BBB )
-                    bookCount += 1 # Not the number saved but the number we attempted to process
-                    if bookCount >= booksExpected: break
-                    BBB = BOS.getNextBookCode( BBB )
-                    # Create the next book
-                    thisBook = BibleBook( self, BBB )
-                    thisBook.objectNameString = "MySword Bible Book object"
-                    thisBook.objectTypeString = "MySword"
-                    haveLines = False
-
-                    verseList = BOS.getNumVersesList( BBB )
-                    numC, numV = len(verseList), verseList[0]
-                    nBBB = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
-                    C = V = 1
-                    #thisBook.addLine( 'c', str(C) )
-                else: # next chapter only
-                    #thisBook.addLine( 'c', str(C) )
-                    numV = verseList[C-1]
-                    V = 1
 
             if ourGlobals['haveParagraph']:
                 thisBook.addLine( 'p', '' )
                 ourGlobals['haveParagraph'] = False
+        else: # Save the last book (if we didn't break out of the loop)
+            if thisBook is not None and haveLines:
+                if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", thisBook.BBB, bookCount )
+                self.saveBook( thisBook )
         cursor.close()
         self.doPostLoadProcessing()
     # end of MySwordBible.load
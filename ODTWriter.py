@@ -0,0 +1,453 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ODTWriter.py
+#
+# Module writing OpenDocument text (.odt) files directly (without LibreOffice)
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module writing OpenDocument text files (used by BibleWriter).
+
+An .odt file is just a zip archive containing a mimetype entry (which must come first and be stored uncompressed),
+    content.xml (the text), styles.xml (the named styles), meta.xml and META-INF/manifest.xml,
+    so it can be written directly without needing a LibreOffice process (and UNO) at all.
+
+Styles are referred to by their display names (e.g., "Prose Paragraph").
+If a template (.ott) file is given, its styles.xml (and settings.xml) are used,
+    otherwise (and for any styles which aren't in the template)
+    the styles are built from the given style definitions.
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-06' # by RJH
+ShortProgName = "ODTWriter"
+ProgName = "ODT writer"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, re, io
+import zipfile
+from datetime import datetime
+
+import BibleOrgSysGlobals
+
+
+ODT_MIMETYPE = 'application/vnd.oasis.opendocument.text'
+ODF_VERSION = '1.2'
+ODF_NAMESPACES = ' '.join( 'xmlns:{}="{}"'.format( prefix, URI ) for prefix, URI in (
+    ('office', "urn:oasis:names:tc:opendocument:xmlns:office:1.0"),
+    ('style', "urn:oasis:names:tc:opendocument:xmlns:style:1.0"),
+    ('text', "urn:oasis:names:tc:opendocument:xmlns:text:1.0"),
+    ('fo', "urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0"),
+    ('meta', "urn:oasis:names:tc:opendocument:xmlns:meta:1.0"),
+    ('dc', "http://purl.org/dc/elements/1.1/"), ) )
+ODT_STYLE_NAME_RE = re.compile( r'<style:style style:name="([^"]+)"' )
+ODT_MULTIPLE_SPACES_RE = re.compile( '  +' )
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+def encodeStyleName( displayName ):
+    """
+    Returns the internal ODF style name for the given display name
+        (in the same way as LibreOffice, e.g., "Prose Paragraph" becomes "Prose_20_Paragraph").
+    """
+    return ''.join( char if char.isalnum() or char in '-.' else '_{:x}_'.format( ord(char) ) for char in displayName )
+# end of encodeStyleName
+
+
+def escapeXML( text ):
+    """
+    Returns the text with the XML special characters escaped (suitable for text or attribute values).
+    """
+    return text.replace( '&', '&amp;' ).replace( '<', '&lt;' ).replace( '>', '&gt;' ).replace( '"', '&quot;' )
+# end of escapeXML
+
+
+
+class ODTWriter:
+    """
+    Class for writing an OpenDocument text file.
+
+    Usage is:
+        writer = ODTWriter( templateFilepath, styleDefinitions )
+        writer.setUserField( fieldName, value ) # optional, e.g., for running headers in the template
+        writer.startParagraph( paragraphStyleName )
+        writer.addText( text, characterStyleName )
+        writer.addNote( 'footnote', paragraphStyleName, [(characterStyleName,text), ...] )
+        writer.startColumns( 2 ) # optional: the following paragraphs go in a multi-column section
+        writer.save( filepath ) or data = writer.getBytes()
+
+    The style definitions are a dictionary with display names as keys
+        and 4-tuples as values: (family, parentName, paragraphProperties, textProperties)
+        where family is 'paragraph' or 'text'
+        and the properties are dictionaries of ODF attributes (e.g., {'fo:text-align':'center'}).
+    """
+    def __init__( self, templateFilepath=None, styleDefinitions=None ):
+        """
+        Constructor: reads the styles from the template (if given).
+        """
+        self.templateFilepath, self.styleDefinitions = templateFilepath, styleDefinitions if styleDefinitions else {}
+        self.templateStylesXML = self.templateSettingsXML = None
+        if templateFilepath:
+            try:
+                with zipfile.ZipFile( templateFilepath ) as templateZip:
+                    self.templateStylesXML = templateZip.read( 'styles.xml' ).decode( 'utf-8' )
+                    if 'settings.xml' in templateZip.namelist():
+                        self.templateSettingsXML = templateZip.read( 'settings.xml' ).decode( 'utf-8' )
+            except (OSError, KeyError, zipfile.BadZipFile):
+                logging.error( t("ODTWriter: Unable to read styles from template {!r}").format( templateFilepath ) )
+        self.templateStyleNames = set( ODT_STYLE_NAME_RE.findall( self.templateStylesXML ) ) if self.templateStylesXML else set()
+
+        self.__bodyParts = []
+        self.__usedStyles = {} # Display name: family
+        self.__userFields = []
+        self.__noteCounts = { 'footnote':0, 'endnote':0 }
+        self.__paragraphOpen = self.__sectionOpen = False
+        self.__lastCharWasSpace = True # Leading spaces in a paragraph must be encoded
+        self.sectionCount = self.paragraphCount = 0
+    # end of ODTWriter.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the ODT writer.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "ODT Writer object"
+        if self.templateFilepath: result += ('\n' if result else '') + "  " + _("Template: {}").format( self.templateFilepath )
+        result += ('\n' if result else '') + "  " + _("Paragraphs: {}").format( self.paragraphCount )
+        result += ('\n' if result else '') + "  " + _("Notes: {}").format( sum( self.__noteCounts.values() ) )
+        result += ('\n' if result else '') + "  " + _("Styles used: {}").format( len(self.__usedStyles) )
+        return result
+    # end of ODTWriter.__str__
+
+
+    def __useStyle( self, styleName, family ):
+        """
+        Records that the style is used and returns its internal (encoded) name.
+        """
+        self.__usedStyles[styleName] = family
+        return encodeStyleName( styleName )
+    # end of ODTWriter.__useStyle
+
+
+    def __encodeText( self, text ):
+        """
+        Returns the escaped text with spaces, tabs and newlines encoded
+            so that they're not collapsed when the document is loaded.
+        """
+        text = escapeXML( text )
+        if self.__lastCharWasSpace and text.startswith( ' ' ):
+            strippedText = text.lstrip( ' ' )
+            spaceCount = len(text) - len(strippedText)
+            text = ('<text:s/>' if spaceCount==1 else '<text:s text:c="{}"/>'.format( spaceCount )) + strippedText
+        if '  ' in text:
+            text = ODT_MULTIPLE_SPACES_RE.sub( lambda match: ' <text:s/>' if len(match.group(0))==2 else ' <text:s text:c="{}"/>'.format( len(match.group(0))-1 ), text )
+        if '\t' in text: text = text.replace( '\t', '<text:tab/>' )
+        if '\n' in text: text = text.replace( '\n', '<text:line-break/>' )
+        return text
+    # end of ODTWriter.__encodeText
+
+
+    def __closeParagraph( self ):
+        """
+        Closes the current paragraph (if there is one).
+        """
+        if self.__paragraphOpen:
+            self.__bodyParts.append( '</text:p>' )
+            self.__paragraphOpen = False
+    # end of ODTWriter.__closeParagraph
+
+
+    def setUserField( self, fieldName, value ):
+        """
+        Sets the value of a user field (e.g., one used in the running header of the template).
+        """
+        self.__userFields.append( (fieldName, value) )
+    # end of ODTWriter.setUserField
+
+
+    def startColumns( self, columnCount, columnGap='0.5cm' ):
+        """
+        Starts a new section with the given number of columns
+            which contains all the following paragraphs.
+        """
+        self.__closeParagraph()
+        if self.__sectionOpen: self.__bodyParts.append( '</text:section>' )
+        self.sectionCount += 1
+        self.__bodyParts.append( ('section', columnCount, columnGap) ) # Automatic style is made when the content is written
+        self.__sectionOpen = True
+    # end of ODTWriter.startColumns
+
+
+    def startParagraph( self, paragraphStyleName ):
+        """
+        Closes any current paragraph and starts a new one with the given style.
+        """
+        self.__closeParagraph()
+        self.__bodyParts.append( '<text:p text:style-name="{}">'.format( self.__useStyle( paragraphStyleName, 'paragraph' ) ) )
+        self.__paragraphOpen = self.__lastCharWasSpace = True
+        self.paragraphCount += 1
+    # end of ODTWriter.startParagraph
+
+
+    def addText( self, text, characterStyleName=None ):
+        """
+        Adds text (with the given character style if any) to the current paragraph.
+        """
+        if not text: return
+        if not self.__paragraphOpen: self.startParagraph( 'Standard' )
+        encodedText = self.__encodeText( text )
+        if characterStyleName:
+            self.__bodyParts.append( '<text:span text:style-name="{}">{}</text:span>'.format( self.__useStyle( characterStyleName, 'text' ), encodedText ) )
+        else: self.__bodyParts.append( encodedText )
+        self.__lastCharWasSpace = text[-1] == ' '
+    # end of ODTWriter.addText
+
+
+    def addLineBreak( self ):
+        """
+        Adds a manual line break to the current paragraph.
+        """
+        if not self.__paragraphOpen: self.startParagraph( 'Standard' )
+        self.__bodyParts.append( '<text:line-break/>' )
+        self.__lastCharWasSpace = True
+    # end of ODTWriter.addLineBreak
+
+
+    def addNote( self, noteClass, paragraphStyleName, segments, citation=None ):
+        """
+        Adds a footnote or endnote at the current position in the current paragraph.
+            noteClass: 'footnote' or 'endnote'
+            segments: a list of 2-tuples (characterStyleName or None, text)
+            citation (optional): defaults to the next number
+        """
+        if BibleOrgSysGlobals.debugFlag: assert( noteClass in self.__noteCounts )
+        if not self.__paragraphOpen: self.startParagraph( 'Standard' )
+        self.__noteCounts[noteClass] += 1
+        noteNumber = self.__noteCounts[noteClass]
+        if citation is None: citation = str( noteNumber )
+        saveParagraphState = self.__lastCharWasSpace
+        self.__lastCharWasSpace = True
+        noteParts = []
+        for characterStyleName, text in segments:
+            if not text: continue
+            encodedText = self.__encodeText( text )
+            noteParts.append( '<text:span text:style-name="{}">{}</text:span>'.format( self.__useStyle( characterStyleName, 'text' ), encodedText )
+                                if characterStyleName else encodedText )
+            self.__lastCharWasSpace = text[-1] == ' '
+        self.__lastCharWasSpace = saveParagraphState
+        self.__bodyParts.append( '<text:note text:id="{}{}" text:note-class="{}"><text:note-citation>{}</text:note-citation>' \
+                                '<text:note-body><text:p text:style-name="{}">{}</text:p></text:note-body></text:note>' \
+                    .format( 'ftn' if noteClass=='footnote' else 'edn', noteNumber, noteClass, escapeXML( citation ),
+                            self.__useStyle( paragraphStyleName, 'paragraph' ), ''.join( noteParts ) ) )
+    # end of ODTWriter.addNote
+
+
+    def __getStyleXML( self, styleName, family ):
+        """
+        Returns the XML for the named style
+            (using the style definitions if it's there).
+        """
+        try: family, parentName, paragraphProperties, textProperties = self.styleDefinitions[styleName]
+        except KeyError: parentName, paragraphProperties, textProperties = 'Standard' if family=='paragraph' else None, None, None
+        encodedName = encodeStyleName( styleName )
+        styleXML = '<style:style style:name="{}"'.format( encodedName )
+        if encodedName != styleName: styleXML += ' style:display-name="{}"'.format( escapeXML( styleName ) )
+        styleXML += ' style:family="{}"'.format( family )
+        if parentName: styleXML += ' style:parent-style-name="{}"'.format( encodeStyleName( parentName ) )
+        styleXML += '>'
+        for propertiesTag, properties in (('style:paragraph-properties',paragraphProperties), ('style:text-properties',textProperties)):
+            if properties:
+                styleXML += '<{} {}/>'.format( propertiesTag,
+                                ' '.join( '{}="{}"'.format( attribute, escapeXML( value ) ) for attribute, value in sorted( properties.items() ) ) )
+        return styleXML + '</style:style>'
+    # end of ODTWriter.__getStyleXML
+
+
+    def __getStylesXML( self ):
+        """
+        Returns the styles.xml contents
+            i.e., the template styles (if any) plus any other styles used in the document.
+        """
+        # Find which styles (and their parent styles) aren't in the template
+        wantedStyles, styleNames = {}, list( self.__usedStyles.items() )
+        while styleNames:
+            styleName, family = styleNames.pop()
+            if styleName in wantedStyles or encodeStyleName( styleName ) in self.templateStyleNames: continue
+            if styleName == 'Standard' and self.templateStylesXML is None: continue # Always written below
+            if styleName in self.styleDefinitions:
+                family, parentName = self.styleDefinitions[styleName][:2]
+                if parentName: styleNames.append( (parentName, family) )
+            elif self.templateStylesXML is not None:
+                logging.warning( t("getStylesXML: {!r} style isn't in the template or the style definitions").format( styleName ) )
+            wantedStyles[styleName] = family
+        newStylesXML = ''.join( self.__getStyleXML( styleName, wantedStyles[styleName] ) for styleName in sorted( wantedStyles ) )
+
+        if self.templateStylesXML is not None:
+            return self.templateStylesXML.replace( '</office:styles>', newStylesXML + '</office:styles>', 1 )
+
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<office:document-styles {} office:version="{}"><office:styles>' \
+            '<style:default-style style:family="paragraph"><style:paragraph-properties fo:orphans="2" fo:widows="2"/>' \
+                '<style:text-properties style:font-name="Liberation Serif" fo:font-size="12pt"/></style:default-style>' \
+            '<style:style style:name="Standard" style:family="paragraph" style:class="text"/>' \
+            '{}</office:styles><office:automatic-styles><style:page-layout style:name="pm1">' \
+                '<style:page-layout-properties fo:page-width="21.001cm" fo:page-height="29.7cm" style:print-orientation="portrait"' \
+                ' fo:margin-top="2cm" fo:margin-bottom="2cm" fo:margin-left="2cm" fo:margin-right="2cm"/></style:page-layout></office:automatic-styles>' \
+            '<office:master-styles><style:master-page style:name="Standard" style:page-layout-name="pm1"/></office:master-styles>' \
+            '</office:document-styles>'.format( ODF_NAMESPACES, ODF_VERSION, newStylesXML )
+    # end of ODTWriter.__getStylesXML
+
+
+    def __getContentXML( self ):
+        """
+        Returns the content.xml contents.
+        """
+        automaticStyles, bodyParts = [], []
+        for part in self.__bodyParts:
+            if isinstance( part, tuple ): # Start of a new section
+                sectionType, columnCount, columnGap = part
+                sectionNumber = len(automaticStyles) + 1
+                automaticStyles.append( '<style:style style:name="Sect{}" style:family="section"><style:section-properties>' \
+                                        '<style:columns fo:column-count="{}" fo:column-gap="{}"/></style:section-properties></style:style>' \
+                                        .format( sectionNumber, columnCount, columnGap ) )
+                bodyParts.append( '<text:section text:style-name="Sect{0}" text:name="Section{0}">'.format( sectionNumber ) )
+            else: bodyParts.append( part )
+        if self.__paragraphOpen: bodyParts.append( '</text:p>' )
+        if self.__sectionOpen: bodyParts.append( '</text:section>' )
+        userFieldsXML = '<text:user-field-decls>{}</text:user-field-decls>'.format( ''.join(
+                    '<text:user-field-decl office:value-type="string" office:string-value="{}" text:name="{}"/>' \
+                        .format( escapeXML( value ), escapeXML( fieldName ) ) for fieldName, value in self.__userFields ) ) \
+                    if self.__userFields else ''
+        return '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<office:document-content {} office:version="{}"><office:automatic-styles>{}</office:automatic-styles>' \
+            '<office:body><office:text>{}{}</office:text></office:body></office:document-content>' \
+            .format( ODF_NAMESPACES, ODF_VERSION, ''.join( automaticStyles ), userFieldsXML, ''.join( bodyParts ) )
+    # end of ODTWriter.__getContentXML
+
+
+    def getBytes( self ):
+        """
+        Returns the complete .odt file as bytes.
+        """
+        metaXML = '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<office:document-meta {} office:version="{}"><office:meta><meta:generator>{}</meta:generator>' \
+            '<meta:creation-date>{}</meta:creation-date></office:meta></office:document-meta>' \
+            .format( ODF_NAMESPACES, ODF_VERSION, escapeXML( ProgNameVersion ), datetime.now().strftime( '%Y-%m-%dT%H:%M:%S' ) )
+        members = [ ('content.xml', self.__getContentXML()), ('styles.xml', self.__getStylesXML()), ('meta.xml', metaXML) ]
+        if self.templateSettingsXML is not None: members.append( ('settings.xml', self.templateSettingsXML) )
+        manifestXML = '<?xml version="1.0" encoding="UTF-8"?>\n' \
+            '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="{}">\n' \
+            ' <manifest:file-entry manifest:full-path="/" manifest:version="{}" manifest:media-type="{}"/>\n' \
+            .format( ODF_VERSION, ODF_VERSION, ODT_MIMETYPE )
+        for memberName, memberXML in members:
+            manifestXML += ' <manifest:file-entry manifest:full-path="{}" manifest:media-type="text/xml"/>\n'.format( memberName )
+        manifestXML += '</manifest:manifest>\n'
+        members.append( ('META-INF/manifest.xml', manifestXML) )
+
+        outputBuffer = io.BytesIO()
+        with zipfile.ZipFile( outputBuffer, 'w' ) as odtZip:
+            odtZip.writestr( 'mimetype', ODT_MIMETYPE, compress_type=zipfile.ZIP_STORED ) # Must be first and uncompressed
+            for memberName, memberXML in members:
+                odtZip.writestr( memberName, memberXML.encode( 'utf-8' ), compress_type=zipfile.ZIP_DEFLATED )
+        return outputBuffer.getvalue()
+    # end of ODTWriter.getBytes
+
+
+    def save( self, filepath ):
+        """
+        Writes the .odt file.
+
+        Returns the bytes that were written (e.g., so that they can also be added to an archive).
+        """
+        data = self.getBytes()
+        with open( filepath, 'wb' ) as odtFile: odtFile.write( data )
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("save: Wrote {} paragraphs to {}").format( self.paragraphCount, filepath ) )
+        return data
+    # end of ODTWriter.save
+# end of class ODTWriter
+
+
+
+def demo():
+    """
+    Write a small document (with and without the template) and check it by reading it back.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile
+    from xml.etree import ElementTree
+    folder = tempfile.mkdtemp()
+    styleDefinitions = { 'Prose Paragraph':('paragraph','Standard',None,None),
+                        'Verse Number':('text',None,None,{'style:text-position':'super 58%'}),
+                        'Bible Footnote':('paragraph','Standard',None,{'fo:font-size':'10pt'}), }
+    for templateFilepath in ( None, 'ControlFiles/BibleBook.ott', ):
+        if templateFilepath and not os.access( templateFilepath, os.R_OK ): continue
+        writer = ODTWriter( templateFilepath, styleDefinitions )
+        writer.setUserField( 'BookHeader', 'Demo Book' )
+        writer.startColumns( 2 )
+        writer.startParagraph( 'Prose Paragraph' )
+        writer.addText( '1', 'Verse Number' )
+        writer.addText( ' In the  beginning ' )
+        writer.addNote( 'footnote', 'Bible Footnote', [(None,'A <test> footnote & more')] )
+        writer.addText( ' the end.' )
+        filepath = os.path.join( folder, 'Test{}.odt'.format( 'WithTemplate' if templateFilepath else '' ) )
+        writer.save( filepath )
+        with zipfile.ZipFile( filepath ) as odtZip:
+            assert( odtZip.namelist()[0] == 'mimetype' )
+            for memberName in odtZip.namelist():
+                if memberName.endswith( '.xml' ): ElementTree.fromstring( odtZip.read( memberName ) ) # Check that it's well-formed
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( writer )
+            print( "  Wrote {} ({:,} bytes)".format( filepath, os.path.getsize( filepath ) ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of ODTWriter.py
@@ -32,11 +32,16 @@ This is a quickly updated version of an early module,
     and it's both ugly and fragile  :-(
 
 Updated Sept 2013 to also handle Kahunapule's "modified OSIS".
+
+Large files are read with iterparse (rather than building the entire element tree)
+    so that each book div is validated and then discarded as soon as it has been read.
+    If multiprocessing is enabled, the loaded books are processed by a pool of worker processes
+    while the rest of the file is still being read.
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-18' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "OSISBible"
 ProgName = "OSIS XML Bible format handler"
 ProgVersion = '0.47'
@@ -46,8 +51,9 @@ ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), La
 debuggingThisModule = False
 
 
-import logging, os
-from xml.etree.ElementTree import ElementTree
+import logging, os, multiprocessing
+from collections import OrderedDict
+from xml.etree.ElementTree import ElementTree, iterparse
 
 import BibleOrgSysGlobals
 from ISO_639_3_Languages import ISO_639_3_Languages
@@ -61,6 +67,9 @@ EXTENSIONS_TO_IGNORE = ( 'ASC', 'BAK', 'BBLX', 'BC', 'CCT', 'CSS', 'DOC', 'DTS',
                     'STY', 'SSF', 'TXT', 'USFM', 'USX', 'VRS', 'YET', 'ZIP', ) # Must be UPPERCASE and NOT begin with a dot
 
 
+STREAMING_FILESIZE_THRESHOLD = 20000000 # Files bigger than this (in bytes) are loaded with iterparse by default
+
+
 # Get the data tables that we need for proper checking
 ISOLanguages = ISO_639_3_Languages().loadData()
 
@@ -105,10 +114,9 @@ def OSISXMLBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, au
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " OSISXMLBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             ignore = False
@@ -153,10 +161,9 @@ def OSISXMLBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, au
         tryFolderName = os.path.join( givenFolderName, thisFolderName+'/' )
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    OSISXMLBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 ignore = False
@@ -229,6 +236,17 @@ def clean( elementText, loadErrors=None, location=None, verseMilestone=None ):
 
 
 
+def processBookLinesMP( bookObject ):
+    """
+    Multiprocessing version!
+    Process the lines of the given (detached) Bible book and return it.
+    """
+    bookObject.processLines()
+    return bookObject
+# end of processBookLinesMP
+
+
+
 class OSISXMLBible( Bible ):
     """
     Class for reading, validating, and converting OSISXMLBible XML.
@@ -262,6 +280,7 @@ class OSISXMLBible( Bible ):
         self.tree = self.header = self.frontMatter = self.divs = self.divTypesString = None
         #self.bkData, self.USFMBooks = OrderedDict(), OrderedDict()
         self.lang = self.language = None
+        self.__deferredBooks = None # Only used while streaming with multiprocessing
 
 
         # Do a preliminary check on the readability of our file(s)
@@ -287,18 +306,25 @@ class OSISXMLBible( Bible ):
     # end of OSISXMLBible.__init__
 
 
-    def load( self ):
+    def load( self, streamingFlag=None ):
         """
         Loads the OSIS XML file or files.
+
+        If streamingFlag is None, files over STREAMING_FILESIZE_THRESHOLD bytes
+            are loaded book by book with iterparse (so peak memory use is bounded by the largest book),
+            and smaller files are parsed into a complete element tree.
         """
         loadErrors = []
         if self.possibleFilenames: # then we possibly have multiple files, probably one for each book
-            for filename in self.possibleFilenames:
-                pathname = os.path.join( self.sourceFolder, filename )
-                self.__loadFile( pathname, loadErrors )
+            filepaths = [os.path.join( self.sourceFolder, filename ) for filename in self.possibleFilenames]
         elif os.path.isfile( self.sourceFilepath ): # most often we have all the Bible books in one file
-            self.__loadFile( self.sourceFilepath, loadErrors )
-        else:
+            filepaths = [self.sourceFilepath]
+        else: filepaths = []
+        for filepath in filepaths:
+            if streamingFlag or ( streamingFlag is None and os.path.getsize( filepath ) > STREAMING_FILESIZE_THRESHOLD ):
+                self.__loadFileStreaming( filepath, loadErrors )
+            else: self.__loadFile( filepath, loadErrors )
+        if not filepaths:
             logging.critical( "OSISXMLBible: Didn't find anything to load at {!r}".format( self.sourceFilepath ) )
             loadErrors.append( _("OSISXMLBible: Didn't find anything to load at {!r}").format( self.sourceFilepath ) )
         if loadErrors:
@@ -308,6 +334,50 @@ class OSISXMLBible( Bible ):
     # end of OSISXMLBible.load
 
 
+    def __validateOSISAttributes( self, osisElement, location, loadErrors ):
+        """
+        Process the attributes of the main (osis) container.
+        """
+        self.schemaLocation = None
+        for attrib,value in osisElement.items():
+            if attrib.endswith("schemaLocation"):
+                self.schemaLocation = value
+            else:
+                logging.warning( "fv6g Unprocessed {} attribute ({}) in {}".format( attrib, value, location ) )
+                loadErrors.append( "Unprocessed {} attribute ({}) in {} (fv6g)".format( attrib, value, location ) )
+    # end of OSISXMLBible.__validateOSISAttributes
+
+
+    def __validateOSISTextAttributes( self, textElement, sublocation, loadErrors ):
+        """
+        Process the attributes of the submain (osisText) container.
+        """
+        self.osisIDWork = self.osisRefWork = canonical = None
+        for attrib,value in textElement.items():
+            if attrib=='osisIDWork':
+                self.osisIDWork = value
+                if not self.name: self.name = value
+            elif attrib=='osisRefWork': self.osisRefWork = value
+            elif attrib=='canonical':
+                canonical = value
+                assert( canonical in ('true','false',) )
+            elif attrib==OSISXMLBible.XMLNameSpace+'lang': self.lang = value
+            else:
+                logging.warning( "gb2d Unprocessed {} attribute ({}) in {}".format( attrib, value, sublocation ) )
+                loadErrors.append( "Unprocessed {} attribute ({}) in {} (gb2d)".format( attrib, value, sublocation ) )
+        if self.osisRefWork:
+            if self.osisRefWork not in ('bible','Bible','defaultReferenceScheme',):
+                logging.warning( "New variety of osisRefWork: {!r}".format( self.osisRefWork ) )
+                loadErrors.append( "New variety of osisRefWork: {!r}".format( self.osisRefWork ) )
+        if self.lang:
+            if self.lang in ('en','he',): # Only specifically recognise these ones so far (English, Hebrew)
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "    Language is {!r}".format( self.lang ) )
+            else:
+                logging.info( "Discovered an unknown {!r} language".format( self.lang ) )
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( "  osisIDWork is {!r}".format( self.osisIDWork ) )
+    # end of OSISXMLBible.__validateOSISTextAttributes
+
+
     def __loadFile( self, OSISFilepath, loadErrors ):
         """
         Load a single source XML file and remove the header from the tree.
@@ -322,14 +392,7 @@ class OSISXMLBible( Bible ):
             location = "OSIS file"
             BibleOrgSysGlobals.checkXMLNoText( self.tree, location, '4f6h', loadErrors )
             BibleOrgSysGlobals.checkXMLNoTail( self.tree, location, '1wk8', loadErrors )
-            # Process the attributes first
-            self.schemaLocation = None
-            for attrib,value in self.tree.items():
-                if attrib.endswith("schemaLocation"):
-                    self.schemaLocation = value
-                else:
-                    logging.warning( "fv6g Unprocessed {} attribute ({}) in {}".format( attrib, value, location ) )
-                    loadErrors.append( "Unprocessed {} attribute ({}) in {} (fv6g)".format( attrib, value, location ) )
+            self.__validateOSISAttributes( self.tree, location, loadErrors )
 
             # Find the submain (osisText) container
             if len(self.tree)==1 and self.tree[0].tag == OSISXMLBible.textTag:
@@ -337,30 +400,7 @@ class OSISXMLBible( Bible ):
                 textElement = self.tree[0]
                 BibleOrgSysGlobals.checkXMLNoText( textElement, sublocation, '3b5g', loadErrors )
                 BibleOrgSysGlobals.checkXMLNoTail( textElement, sublocation, '7h9k', loadErrors )
-                # Process the attributes first
-                self.osisIDWork = self.osisRefWork = canonical = None
-                for attrib,value in textElement.items():
-                    if attrib=='osisIDWork':
-                        self.osisIDWork = value
-                        if not self.name: self.name = value
-                    elif attrib=='osisRefWork': self.osisRefWork = value
-                    elif attrib=='canonical':
-                        canonical = value
-                        assert( canonical in ('true','false',) )
-                    elif attrib==OSISXMLBible.XMLNameSpace+'lang': self.lang = value
-                    else:
-                        logging.warning( "gb2d Unprocessed {} attribute ({}) in {}".format( attrib, value, sublocation ) )
-                        loadErrors.append( "Unprocessed {} attribute ({}) in {} (gb2d)".format( attrib, value, sublocation ) )
-                if self.osisRefWork:
-                    if self.osisRefWork not in ('bible','Bible','defaultReferenceScheme',):
-                        logging.warning( "New variety of osisRefWork: {!r}".format( self.osisRefWork ) )
-                        loadErrors.append( "New variety of osisRefWork: {!r}".format( self.osisRefWork ) )
-                if self.lang:
-                    if self.lang in ('en','he',): # Only specifically recognise these ones so far (English, Hebrew)
-                        if BibleOrgSysGlobals.verbosityLevel > 2: print( "    Language is {!r}".format( self.lang ) )
-                    else:
-                        logging.info( "Discovered an unknown {!r} language".format( self.lang ) )
-                if BibleOrgSysGlobals.verbosityLevel > 2: print( "  osisIDWork is {!r}".format( self.osisIDWork ) )
+                self.__validateOSISTextAttributes( textElement, sublocation, loadErrors )
 
                 # Find (and move) the header container
                 if textElement[0].tag == OSISXMLBible.headerTag:
@@ -422,6 +462,152 @@ class OSISXMLBible( Bible ):
     # end of OSISXMLBible.loadFile
 
 
+    def __loadFileStreaming( self, OSISFilepath, loadErrors ):
+        """
+        Load a single source XML file using iterparse (rather than building the entire element tree).
+
+        Each div in the osisText container (and each book div inside a bookGroup div)
+            is validated and extracted as soon as its end tag has been read,
+            and it is then removed from its parent element
+            so that peak memory use is bounded by the largest book (not the entire file).
+
+        If multiprocessing is enabled, each book is passed to a pool of worker processes
+            for processLines() while the rest of the file is being read.
+            (saveBook just holds the books back until then, because saving a book processes it.)
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( _("Loading {} (streaming)...").format( OSISFilepath ) )
+        self.tree = None # We don't keep the entire tree
+        self.divs, self.divTypesString = [], None # and we don't keep the div elements either
+        pendingResults = OrderedDict()
+
+
+        def dispatchLoadedBooks( pool ):
+            """
+            Send any newly completed books off to the worker pool.
+
+            The pool pickles the books later (in its own thread)
+                so the books are detached from this Bible (which we're still adding to)
+                and we don't touch them again until they come back.
+            """
+            for BBB,bookObject in self.__deferredBooks.items():
+                if BBB not in pendingResults:
+                    bookObject.containerBibleObject = None # so that we don't send the whole Bible to the worker
+                    pendingResults[BBB] = pool.apply_async( processBookLinesMP, (bookObject,) )
+        # end of dispatchLoadedBooks
+
+
+        def streamElements( pool ):
+            """
+            Go through the start and end events of the XML file.
+            """
+            location = "OSIS file"
+            sublocation = "osisText in " + location
+            sub2location = "div in " + sublocation
+            elementStack, textElement = [], None
+            numTextChildren, haveMainDiv = 0, False
+            for event, element in iterparse( OSISFilepath, events=('start','end',) ):
+                if event == 'start':
+                    depth = len( elementStack )
+                    if depth == 0: # the main (osis) container
+                        if element.tag == OSISXMLBible.treeTag:
+                            self.__validateOSISAttributes( element, location, loadErrors )
+                        else:
+                            logging.error( "Expected to load {!r} but got {!r}".format( OSISXMLBible.treeTag, element.tag ) )
+                            loadErrors.append( "Expected to load {!r} but got {!r}".format( OSISXMLBible.treeTag, element.tag ) )
+                    elif depth == 1: # the submain (osisText) container
+                        if element.tag == OSISXMLBible.textTag and textElement is None:
+                            textElement = element
+                            self.__validateOSISTextAttributes( textElement, sublocation, loadErrors )
+                        else:
+                            logging.error( "Expected to find {!r} but got {!r}".format( OSISXMLBible.textTag, element.tag ) )
+                            loadErrors.append( "Expected to find {!r} but got {!r}".format( OSISXMLBible.textTag, element.tag ) )
+                    elif depth == 2 and elementStack[1] is textElement:
+                        numTextChildren += 1
+                        if numTextChildren == 1 and element.tag != OSISXMLBible.headerTag:
+                            logging.warning( "Missing header element (looking for {!r} tag)".format( OSISXMLBible.headerTag ) )
+                            loadErrors.append( "Missing header element (looking for {!r} tag)".format( OSISXMLBible.headerTag ) )
+                    elementStack.append( element )
+                    continue
+
+                # Otherwise it's the end of an element (which is now complete)
+                elementStack.pop()
+                depth = len( elementStack )
+                if depth == 2 and elementStack[1] is textElement: # it's a child of osisText
+                    if element.tag == OSISXMLBible.headerTag and numTextChildren == 1:
+                        self.header = element
+                        self.validateHeader( self.header, loadErrors )
+                    elif element.tag == OSISXMLBible.divTag:
+                        divType = element.get( 'type' )
+                        if divType == 'front' and not haveMainDiv:
+                            self.frontMatter = element
+                            self.validateFrontMatter( self.frontMatter, loadErrors )
+                        else:
+                            BibleOrgSysGlobals.checkXMLNoText( element, sub2location, '3a2s', loadErrors )
+                            BibleOrgSysGlobals.checkXMLNoTail( element, sub2location, '4k8a', loadErrors )
+                            if divType is None:
+                                logging.error( "Missing div type in OSIS file" )
+                                loadErrors.append( "Missing div type in OSIS file" )
+                            if divType != self.divTypesString:
+                                if not self.divTypesString: self.divTypesString = divType
+                                else: self.divTypesString = 'MixedTypes'
+                            self.validateAndExtractMainDiv( element, loadErrors ) # Any book divs in a bookGroup have already been done
+                            haveMainDiv = True
+                    else:
+                        logging.error( "Expected to find {!r} but got {!r}".format( OSISXMLBible.divTag, element.tag ) )
+                        loadErrors.append( "Expected to find {!r} but got {!r}".format( OSISXMLBible.divTag, element.tag ) )
+                    textElement.remove( element ) # Free up the memory
+                    if pool is not None: dispatchLoadedBooks( pool )
+                elif depth == 3 and elementStack[1] is textElement and element.tag == OSISXMLBible.divTag \
+                and elementStack[2].tag == OSISXMLBible.divTag and elementStack[2].get( 'type' ) == 'bookGroup':
+                    # It's a book in a book group -- do it now rather than waiting for the end of the group
+                    self.haveBook = False
+                    self.validateAndExtractBookDiv( element, loadErrors )
+                    elementStack[2].remove( element ) # Free up the memory
+                    if pool is not None: dispatchLoadedBooks( pool )
+                elif depth == 1 and element is textElement:
+                    BibleOrgSysGlobals.checkXMLNoText( textElement, sublocation, '3b5g', loadErrors )
+                    BibleOrgSysGlobals.checkXMLNoTail( textElement, sublocation, '7h9k', loadErrors )
+                elif depth == 0 and element.tag == OSISXMLBible.treeTag:
+                    BibleOrgSysGlobals.checkXMLNoText( element, location, '4f6h', loadErrors )
+                    BibleOrgSysGlobals.checkXMLNoTail( element, location, '1wk8', loadErrors )
+        # end of streamElements
+
+
+        if BibleOrgSysGlobals.maxProcesses > 1: # Process the books while we're still reading the file
+            if BibleOrgSysGlobals.verbosityLevel > 1:
+                print( _("  Processing books using {} CPUs...").format( BibleOrgSysGlobals.maxProcesses ) )
+            self.__deferredBooks = OrderedDict()
+            try:
+                with multiprocessing.Pool( processes=BibleOrgSysGlobals.maxProcesses ) as pool: # start worker processes
+                    streamElements( pool )
+                    dispatchLoadedBooks( pool ) # In case there's any left
+                    while pendingResults:
+                        BBB, asyncResult = pendingResults.popitem( last=False )
+                        bookObject = asyncResult.get()
+                        # We don't need the unprocessed book any more (and it might still be the last thisBook that we loaded)
+                        if self.__deferredBooks.pop( BBB ) is getattr( self, 'thisBook', None ): self.thisBook = None
+                        bookObject.containerBibleObject = self
+                        Bible.saveBook( self, bookObject )
+            finally: self.__deferredBooks = None
+        else: streamElements( None )
+    # end of OSISXMLBible.__loadFileStreaming
+
+
+    def saveBook( self, bookData ):
+        """
+        Save the Bible book into our object.
+
+        While streaming with multiprocessing, the book is just held back
+            until it can be sent off to be processed (see __loadFileStreaming).
+        """
+        if self.__deferredBooks is None: Bible.saveBook( self, bookData )
+        else:
+            if bookData.BBB in self.__deferredBooks:
+                logging.critical( "saveBook: overwriting already existing {} book!".format( bookData.BBB ) )
+            self.__deferredBooks[bookData.BBB] = bookData
+    # end of OSISXMLBible.saveBook
+
+
     def validateHeader( self, header, loadErrors ):
         """
         Check/validate the given OSIS header record.
@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# SQLiteBulkWriter.py
+#
+# Module handling fast writing of new SQLite database files
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module handling the creation of SQLite database files (e.g., for MySword and e-Sword exports)
+    which are built from scratch in one go.
+
+Because the file is new (and will simply be rebuilt if anything goes wrong):
+    rows are gathered into batches and written with executemany,
+    everything is written in one explicit transaction,
+    the rollback journal and disk syncs are turned off while writing,
+    and indexes are only created after all the rows are loaded.
+
+Optionally, the database can be built in memory and then backed up to the disk file at the end.
+
+If anything goes wrong, the connection is closed and the partly written file is removed.
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "SQLiteBulkWriter"
+ProgName = "SQLite bulk writer"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, sqlite3
+
+import BibleOrgSysGlobals
+
+
+DEFAULT_BATCH_SIZE = 2000 # Number of rows to gather before writing them
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+class SQLiteBulkWriter:
+    """
+    Class for writing a new SQLite database file as quickly as possible.
+
+    Usage is:
+        with SQLiteBulkWriter( filepath ) as sqlWriter:
+            sqlWriter.execute( 'CREATE TABLE ...' )
+            sqlWriter.addRow( 'TableName', (value1,value2,...) ) # as many times as needed
+            sqlWriter.addIndex( 'CREATE INDEX ...' )
+    which calls start() at the beginning, and close() at the end
+        (or abort() if an exception is raised).
+    """
+    def __init__( self, filepath, inMemoryFlag=False, batchSize=None ):
+        """
+        Constructor.
+            filepath: the database file to be created (any existing file is replaced)
+            inMemoryFlag (optional): build the database in memory and then back it up to the file
+            batchSize (optional): the number of rows to gather before writing them
+        """
+        if BibleOrgSysGlobals.debugFlag: assert( filepath and isinstance( filepath, str ) )
+        self.filepath, self.inMemoryFlag = filepath, inMemoryFlag
+        self.batchSize = batchSize if batchSize else DEFAULT_BATCH_SIZE
+        self.connection = None
+        self.pendingRows = {} # Lists of row tuples by table name
+        self.deferredIndexStatements = []
+        self.rowCount = 0
+    # end of SQLiteBulkWriter.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of the writer.
+
+        @return: the name of the object formatted as a string
+        @rtype: string
+        """
+        result = "SQLite Bulk Writer object"
+        result += ('\n' if result else '') + "  " + _("Filepath: {}{}").format( self.filepath, ' (built in memory)' if self.inMemoryFlag else '' )
+        result += ('\n' if result else '') + "  " + _("Rows written: {}").format( self.rowCount )
+        return result
+    # end of SQLiteBulkWriter.__str__
+
+
+    def __enter__( self ):
+        """
+        Starts the new database when used as a context manager.
+        """
+        self.start()
+        return self
+    # end of SQLiteBulkWriter.__enter__
+
+
+    def __exit__( self, excType, excValue, traceback ):
+        """
+        Finishes the database, or removes it if an exception was raised.
+        """
+        if excType is None: self.close()
+        else: self.abort()
+        return False # Don't suppress any exception
+    # end of SQLiteBulkWriter.__exit__
+
+
+    def start( self ):
+        """
+        Creates the new database and starts the (single) transaction.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("start: Creating {}...").format( self.filepath ) )
+        if os.path.exists( self.filepath ): os.remove( self.filepath )
+        self.connection = sqlite3.connect( ':memory:' if self.inMemoryFlag else self.filepath )
+        try:
+            self.connection.isolation_level = None # We handle the transaction ourselves
+            if not self.inMemoryFlag: # No need for crash protection while building a brand new file
+                self.connection.execute( 'PRAGMA journal_mode = OFF' )
+                self.connection.execute( 'PRAGMA synchronous = OFF' )
+                self.connection.execute( 'PRAGMA locking_mode = EXCLUSIVE' )
+            self.connection.execute( 'BEGIN' )
+        except Exception:
+            self.abort()
+            raise
+    # end of SQLiteBulkWriter.start
+
+
+    def execute( self, SQLString, values=None ):
+        """
+        Executes the SQL statement immediately, e.g., to create a table.
+
+        Any rows already gathered are written first so that everything stays in order.
+        """
+        self.flush()
+        if values is None: self.connection.execute( SQLString )
+        else: self.connection.execute( SQLString, values )
+    # end of SQLiteBulkWriter.execute
+
+
+    def addRow( self, tableName, values ):
+        """
+        Gathers a row (tuple or list of values) to be inserted into the given table.
+        """
+        try: pendingTableRows = self.pendingRows[tableName]
+        except KeyError: pendingTableRows = self.pendingRows[tableName] = []
+        pendingTableRows.append( values )
+        if len(pendingTableRows) >= self.batchSize: self.flush( tableName )
+    # end of SQLiteBulkWriter.addRow
+
+
+    def flush( self, tableName=None ):
+        """
+        Writes any gathered rows for the given table (or for all tables) to the database.
+        """
+        for thisTableName in ( (tableName,) if tableName else list( self.pendingRows ) ):
+            pendingTableRows = self.pendingRows.get( thisTableName )
+            if pendingTableRows:
+                SQLString = 'INSERT INTO "{}" VALUES({})'.format( thisTableName, ','.join( '?' * len(pendingTableRows[0]) ) )
+                self.connection.executemany( SQLString, pendingTableRows )
+                self.rowCount += len( pendingTableRows )
+                self.pendingRows[thisTableName] = []
+    # end of SQLiteBulkWriter.flush
+
+
+    def addIndex( self, SQLString ):
+        """
+        Saves a CREATE INDEX statement to be executed after all the rows are loaded.
+        """
+        self.deferredIndexStatements.append( SQLString )
+    # end of SQLiteBulkWriter.addIndex
+
+
+    def close( self ):
+        """
+        Writes any remaining rows, creates the indexes, and commits the transaction.
+
+        If the database was built in memory, it's then backed up to the disk file.
+
+        If anything fails, the partly written file is removed (by abort) before the exception is passed on.
+        """
+        try:
+            self.flush()
+            for SQLString in self.deferredIndexStatements:
+                self.connection.execute( SQLString )
+            self.connection.execute( 'COMMIT' )
+            if self.inMemoryFlag:
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( t("close: Saving in-memory database to {}...").format( self.filepath ) )
+                diskConnection = sqlite3.connect( self.filepath )
+                try: self.connection.backup( diskConnection )
+                finally: diskConnection.close()
+        except Exception:
+            self.abort()
+            raise
+        self.connection.close()
+        self.connection = None
+    # end of SQLiteBulkWriter.close
+
+
+    def abort( self ):
+        """
+        Closes the connection (without committing) and removes any partly written database file.
+
+        Safe to call more than once.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("abort: Abandoning {}").format( self.filepath ) )
+        if self.connection is not None:
+            try: self.connection.close()
+            except sqlite3.Error as err: logging.error( t("abort: Unable to close {}: {}").format( self.filepath, err ) )
+            self.connection = None
+        self.pendingRows = {}
+        if os.path.exists( self.filepath ):
+            try: os.remove( self.filepath )
+            except OSError as err: logging.error( t("abort: Unable to remove {}: {}").format( self.filepath, err ) )
+    # end of SQLiteBulkWriter.abort
+# end of class SQLiteBulkWriter
+
+
+
+def demo():
+    """
+    Write a test database both ways and check the results.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    import tempfile, time
+    for inMemoryFlag in ( False, True, ):
+        filepath = os.path.join( tempfile.gettempdir(), 'SQLiteBulkWriterTest{}.sqlite'.format( 'M' if inMemoryFlag else '' ) )
+        startTime = time.time()
+        with SQLiteBulkWriter( filepath, inMemoryFlag=inMemoryFlag ) as sqlWriter:
+            sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+            for bookNumber in range( 1, 67 ):
+                for chapterNumber in range( 1, 30 ):
+                    for verseNumber in range( 1, 17 ):
+                        sqlWriter.addRow( 'Bible', (bookNumber,chapterNumber,verseNumber,'Verse text {}:{}'.format( chapterNumber, verseNumber )) )
+            sqlWriter.addIndex( 'CREATE INDEX BookChapterVerseIndex ON Bible (Book, Chapter, Verse)' )
+        elapsedTime = time.time() - startTime
+        connection = sqlite3.connect( filepath )
+        numRows = connection.execute( 'SELECT COUNT(*) FROM Bible' ).fetchone()[0]
+        connection.close()
+        if BibleOrgSysGlobals.verbosityLevel > 0:
+            print( sqlWriter )
+            print( "  Read back {} rows; took {:.2f}s".format( numRows, elapsedTime ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of SQLiteBulkWriter.py
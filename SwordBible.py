@@ -30,11 +30,15 @@ Files are usually:
     ot.vss
     nt
     nt.vss
+    or compressed: ot.bzs ot.bzv ot.bzz nt.bzs nt.bzv nt.bzz
+
+Uncompressed (rawtext) and zip compressed (ztext) modules are read by our own SwordModules code.
+Other modules can be read if the Crosswire Sword library with Python bindings is installed.
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-27' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "SwordBible"
 ProgName = "Sword Bible format handler"
 ProgVersion = '0.25'
@@ -49,9 +53,11 @@ import multiprocessing
 
 try: import Sword # Assumes that the Sword Python bindings are installed on this computer
 except ImportError: # Sword library (dll and python bindings) seem to be not available
-    logging.critical( _("You need to install the Sword library with Python3 bindings on your computer in order to use this module.") )
+    Sword = None
+    logging.info( _("Without the Sword library with Python3 bindings, only rawtext and ztext modules can be read.") )
 
 import BibleOrgSysGlobals
+import SwordModules
 from Bible import Bible, BibleBook
 from BibleOrganizationalSystems import BibleOrganizationalSystem
 
@@ -169,14 +175,13 @@ def SwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, auto
         print( " SwordBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
     numFound = foundFolderCount = foundFileCount = 0
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder:
             if something == '__MACOSX': continue # don't visit these directories
             foundFolders.append( something ) # Save folder name in case we have to go a level down
             if something in compulsoryTopFolders:
                 foundFolderCount += 1
-        elif os.path.isfile( somepath ):
+        elif somethingIsFile:
             somethingUpper = something.upper()
             if somethingUpper in compulsoryFiles: foundFileCount += 1
     if foundFolderCount == len(compulsoryTopFolders):
@@ -203,12 +208,11 @@ def SwordBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, auto
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    SwordBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder:
                 foundSubfolders.append( something )
                 if something in compulsoryTopFolders: foundFolderCount += 1
-            elif os.path.isfile( somepath ):
+            elif somethingIsFile:
                 if somethingUpper in compulsoryFiles: foundFileCount += 1
         if foundFolderCount == len(compulsoryTopFolders):
             assert( foundFileCount == 0 )
@@ -1064,6 +1068,20 @@ class SwordBible( Bible ):
                     print( "Got", foundConfs[0] )
                     self.moduleName = foundConfs[0]
 
+        # Try to find our module using our own code first
+        self.SWMgr = self.nativeModule = None
+        library = SwordModules.SwordModules( [self.sourceFolder] if self.sourceFolder else None )
+        resultFlag, nativeModule = library.loadModule( self.moduleName ) if self.moduleName else (False, None)
+        if resultFlag:
+            self.moduleName = nativeModule.getName() # Get the case correct
+            self.nativeModule = nativeModule
+            self.abbreviation = self.moduleName
+            return
+        if Sword is None:
+            logging.critical( _("You need to install the Sword library with Python3 bindings on your computer in order to read the {!r} module.").format( self.moduleName ) )
+            self.abbreviation = self.moduleName
+            return
+
         # Load the Sword manager and find our module
         self.SWMgr = Sword.SWMgr()
         if BibleOrgSysGlobals.debugFlag and debuggingThisModule:
@@ -1096,39 +1114,11 @@ class SwordBible( Bible ):
     # end of SwordBible.__init__
 
 
-    def load( self ):
+    def __iterateSwordLibraryVerses( self, module, markupCode ):
         """
-        Load the compressed data file and import book elements.
+        A generator which uses the Sword library to yield (BBB, C, V, nativeVerseText) 4-tuples
+            for the given module.
         """
-        if BibleOrgSysGlobals.verbosityLevel > 1: print( _("\nLoading {} module...").format( self.moduleName ) )
-        module = self.SWMgr.getModule( self.moduleName )
-        if module is None:
-            logging.critical( "Unable to load {!r} module -- not known by Sword".format( self.moduleName ) )
-            return
-
-        markupCode = ord( module.getMarkup() )
-        encoding = ord( module.getEncoding() )
-        if encoding == ENC_LATIN1: self.encoding = 'latin-1'
-        elif encoding == ENC_UTF8: self.encoding = 'utf-8'
-        elif encoding == ENC_UTF16: self.encoding = 'utf-16'
-        elif BibleOrgSysGlobals.debugFlag and debuggingThisModule: halt
-
-        if BibleOrgSysGlobals.verbosityLevel > 3:
-            print( 'Description: {!r}'.format( module.getDescription() ) )
-            print( 'Direction: {!r}'.format( ord(module.getDirection()) ) )
-            print( 'Encoding: {!r}'.format( encoding ) )
-            print( 'Language: {!r}'.format( module.getLanguage() ) )
-            print( 'Markup: {!r}={}'.format( markupCode, FMT_DICT[markupCode] ) )
-            print( 'Name: {!r}'.format( module.getName() ) )
-            print( 'RenderHeader: {!r}'.format( module.getRenderHeader() ) )
-            print( 'Type: {!r}'.format( module.getType() ) )
-            print( 'IsSkipConsecutiveLinks: {!r}'.format( module.isSkipConsecutiveLinks() ) )
-            print( 'IsUnicode: {!r}'.format( module.isUnicode() ) )
-            print( 'IsWritable: {!r}'.format( module.isWritable() ) )
-            #return
-
-        bookCount = 0
-        currentBBB = None
         for index in range( 0, 999999 ):
             module.setIndex( index )
             if module.getIndex() != index: break # Gone too far
@@ -1176,35 +1166,92 @@ class SwordBible( Bible ):
             vkBits = vkBits[1].split( ':' )
             assert( len(vkBits) == 2 )
             C, V = vkBits
-            #print( 'At {} {}:{}'.format( BBB, C, V ) )
-
-            # Start a new book if necessary
-            if BBB != currentBBB:
-                if currentBBB is not None and haveText: # Save the previous book
-                    if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", currentBBB, bookCount )
-                    self.saveBook( thisBook )
-                # Create the new book
-                if BibleOrgSysGlobals.verbosityLevel > 2:  print( '  Loading {} {}...'.format( self.moduleName, BBB ) )
-                thisBook = BibleBook( self, BBB )
-                thisBook.objectNameString = "Sword Bible Book object"
-                thisBook.objectTypeString = "Sword Bible"
-                currentBBB, currentC, haveText = BBB, '0', False
-                bookCount += 1
-
-            if C != currentC:
-                thisBook.addLine( 'c', C )
-                #if C == '2': halt
-                currentC = C
-
-            if nativeVerseText:
-                haveText = True
-                if markupCode == FMT_OSIS: importOSISVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
-                elif markupCode == FMT_GBF: importGBFVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
-                elif markupCode == FMT_THML: importTHMLVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
-                else:
-                    print( 'markupCode', repr(markupCode) )
-                    if BibleOrgSysGlobals.debugFlag: halt
-                    return
+            yield BBB, C, V, nativeVerseText
+    # end of SwordBible.__iterateSwordLibraryVerses
+
+
+    def load( self ):
+        """
+        Load the compressed data file and import book elements.
+
+        Uses our own SwordModules code if possible (much faster)
+            else uses the Sword library.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( _("\nLoading {} module...").format( self.moduleName ) )
+        if self.nativeModule is not None: # Use our own code
+            module = self.nativeModule
+            markupCode = module.getMarkupCode()
+            self.encoding = module.encoding
+            if BibleOrgSysGlobals.verbosityLevel > 3: print( module )
+            verseIterator = module.iterateVerses()
+        elif self.SWMgr is not None: # Use the Sword library
+            module = self.SWMgr.getModule( self.moduleName )
+            if module is None:
+                logging.critical( "Unable to load {!r} module -- not known by Sword".format( self.moduleName ) )
+                return
+
+            markupCode = ord( module.getMarkup() )
+            encoding = ord( module.getEncoding() )
+            if encoding == ENC_LATIN1: self.encoding = 'latin-1'
+            elif encoding == ENC_UTF8: self.encoding = 'utf-8'
+            elif encoding == ENC_UTF16: self.encoding = 'utf-16'
+            elif BibleOrgSysGlobals.debugFlag and debuggingThisModule: halt
+
+            if BibleOrgSysGlobals.verbosityLevel > 3:
+                print( 'Description: {!r}'.format( module.getDescription() ) )
+                print( 'Direction: {!r}'.format( ord(module.getDirection()) ) )
+                print( 'Encoding: {!r}'.format( encoding ) )
+                print( 'Language: {!r}'.format( module.getLanguage() ) )
+                print( 'Markup: {!r}={}'.format( markupCode, FMT_DICT[markupCode] ) )
+                print( 'Name: {!r}'.format( module.getName() ) )
+                print( 'RenderHeader: {!r}'.format( module.getRenderHeader() ) )
+                print( 'Type: {!r}'.format( module.getType() ) )
+                print( 'IsSkipConsecutiveLinks: {!r}'.format( module.isSkipConsecutiveLinks() ) )
+                print( 'IsUnicode: {!r}'.format( module.isUnicode() ) )
+                print( 'IsWritable: {!r}'.format( module.isWritable() ) )
+                #return
+            verseIterator = self.__iterateSwordLibraryVerses( module, markupCode )
+        else:
+            logging.critical( "Unable to load {!r} module".format( self.moduleName ) )
+            return
+
+        try:
+            bookCount = 0
+            currentBBB = None
+            for BBB, C, V, nativeVerseText in verseIterator:
+                #print( 'At {} {}:{}'.format( BBB, C, V ) )
+
+                # Start a new book if necessary
+                if BBB != currentBBB:
+                    if currentBBB is not None and haveText: # Save the previous book
+                        if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", currentBBB, bookCount )
+                        self.saveBook( thisBook )
+                    # Create the new book
+                    if BibleOrgSysGlobals.verbosityLevel > 2:  print( '  Loading {} {}...'.format( self.moduleName, BBB ) )
+                    thisBook = BibleBook( self, BBB )
+                    thisBook.objectNameString = "Sword Bible Book object"
+                    thisBook.objectTypeString = "Sword Bible"
+                    currentBBB, currentC, haveText = BBB, '0', False
+                    bookCount += 1
+
+                if C != currentC:
+                    thisBook.addLine( 'c', C )
+                    #if C == '2': halt
+                    currentC = C
+
+                if nativeVerseText:
+                    haveText = True
+                    if markupCode == FMT_OSIS: importOSISVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
+                    elif markupCode == FMT_GBF: importGBFVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
+                    elif markupCode == FMT_THML: importTHMLVerseLine( nativeVerseText, thisBook, self.moduleName, BBB, C, V )
+                    elif markupCode == FMT_PLAIN:
+                        thisBook.addVerseSegments( V, ' '.join( nativeVerseText.split() ), '{} {} {}:{}'.format( self.moduleName, BBB, C, V ) )
+                    else:
+                        logging.critical( _("SwordBible.load: Unable to handle {} markup in {!r} module").format( FMT_DICT.get( markupCode, markupCode ), self.moduleName ) )
+                        if BibleOrgSysGlobals.debugFlag: halt
+                        return
+        finally:
+            if self.nativeModule is not None: self.nativeModule.close() # Its files are reopened if they're needed again
 
         if currentBBB is not None and haveText: # Save the very last book
             if BibleOrgSysGlobals.verbosityLevel > 3: print( "Saving", self.moduleName, currentBBB, bookCount )
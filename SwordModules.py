@@ -0,0 +1,489 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# SwordModules.py
+#
+# Module handling Sword Bible modules using our own Python code
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module reading Crosswire Sword Bible modules
+    without needing the Sword engine (libsword) or its Python bindings.
+
+Handles the two common Bible text layouts:
+    rawtext (and rawtext4): ot, ot.vss, nt, nt.vss
+        where each .vss index entry is a 4-byte offset and a 2-byte (4-byte for rawtext4) size
+    ztext (and ztext4): ot.bzs, ot.bzv, ot.bzz, nt.bzs, nt.bzv, nt.bzz
+        where each .bzv verse index entry is a 4-byte block number, a 4-byte offset, and a 2-byte (4-byte) size,
+        and each .bzs block index entry is a 4-byte offset, a 4-byte compressed size, and a 4-byte uncompressed size
+        into the .bzz file of zlib compressed blocks.
+All index numbers are little-endian.
+
+Only KJV versification (the Sword default) is currently handled.
+Enciphered modules, SCSU encoding, and LZSS compression are not handled.
+
+Contains classes:
+    SwordModule( confDict, sourceFolder )
+    SwordModules( searchFolders=None )
+"""
+
+from gettext import gettext as _
+
+LastModifiedDate = '2015-05-08' # by RJH
+ShortProgName = "SwordModules"
+ProgName = "Sword module handler"
+ProgVersion = '0.10'
+ProgNameVersion = '{} v{}'.format( ShortProgName, ProgVersion )
+ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), LastModifiedDate )
+
+debuggingThisModule = False
+
+
+import os, logging, re, struct, zlib
+from collections import OrderedDict
+
+import BibleOrgSysGlobals
+from BibleVersificationSystems import BibleVersificationSystem
+from InternalBibleInternals import InternalBibleEntryList, InternalBibleEntry
+
+
+DEFAULT_SWORD_SEARCH_FOLDERS = ( os.path.join( os.path.expanduser('~'), '.sword/' ), '/usr/share/sword/', '/usr/local/share/sword/', )
+DEFAULT_BLOCK_CACHE_SIZE = 16 # Number of decompressed ztext blocks to keep for each module
+
+# Sword markup names (from the SourceType conf field) mapped to the FMT_ codes used by SwordBible
+SOURCE_TYPE_DICT = { 'PLAIN':1, 'THML':2, 'GBF':3, 'OSIS':7, 'TEI':9, }
+ENCODING_DICT = { 'UTF-8':'utf-8', 'UTF-16':'utf-16', 'LATIN1':'latin-1', } # Python has no SCSU codec
+
+# The books in each testament of the Sword KJV versification
+SWORD_KJV_OT_BOOKS = ( 'GEN', 'EXO', 'LEV', 'NUM', 'DEU', 'JOS', 'JDG', 'RUT', 'SA1', 'SA2', 'KI1', 'KI2', 'CH1', 'CH2',
+                      'EZR', 'NEH', 'EST', 'JOB', 'PSA', 'PRO', 'ECC', 'SNG', 'ISA', 'JER', 'LAM', 'EZE', 'DAN',
+                      'HOS', 'JOL', 'AMO', 'OBA', 'JNA', 'MIC', 'NAH', 'HAB', 'ZEP', 'HAG', 'ZEC', 'MAL', )
+SWORD_KJV_NT_BOOKS = ( 'MAT', 'MRK', 'LUK', 'JHN', 'ACT', 'ROM', 'CO1', 'CO2', 'GAL', 'EPH', 'PHP', 'COL', 'TH1', 'TH2',
+                      'TI1', 'TI2', 'TIT', 'PHM', 'HEB', 'JAM', 'PE1', 'PE2', 'JN1', 'JN2', 'JN3', 'JDE', 'REV', )
+
+# Module drivers that we know how to read: (layout, index size field format)
+MODULE_DRIVER_DICT = { 'RAWTEXT':('raw','H'), 'RAWTEXT4':('raw','I'), 'ZTEXT':('z','H'), 'ZTEXT4':('z','I'), }
+
+
+
+def t( messageString ):
+    """
+    Prepends the module name to a error or warning message string
+        if we are in debug mode.
+    Returns the new string.
+    """
+    try: nameBit, errorBit = messageString.split( ': ', 1 )
+    except ValueError: nameBit, errorBit = '', messageString
+    if BibleOrgSysGlobals.debugFlag or debuggingThisModule:
+        nameBit = '{}{}{}: '.format( ShortProgName, '.' if nameBit else '', nameBit )
+    return '{}{}'.format( nameBit, _(errorBit) )
+# end of t
+
+
+
+_swordIndexDict = None
+def getSwordIndexDict():
+    """
+    Calculates (once) where each book and chapter starts in the Sword KJV verse indexes.
+
+    Each testament index starts with a module heading entry and a testament heading entry,
+        then each book has a book heading entry,
+        and each chapter has a chapter heading entry (verse 0) followed by the verses.
+
+    Returns a dictionary with BBB keys and 2-tuple entries containing
+        the testament ('ot' or 'nt') and a list of index numbers for verse 0 of each chapter
+        (with the book heading index number in position 0,
+        and the index number following the last verse of the book at the end).
+    """
+    global _swordIndexDict
+    if _swordIndexDict is None:
+        KJVVersification = BibleVersificationSystem( 'KJV' )
+        _swordIndexDict = {}
+        for testament, bookList in ( ('ot',SWORD_KJV_OT_BOOKS), ('nt',SWORD_KJV_NT_BOOKS) ):
+            index = 2 # Skip the module and testament headings
+            for BBB in bookList:
+                chapterStarts = [index] # The book heading
+                index += 1
+                for numVerses in KJVVersification.getNumVersesList( BBB ):
+                    chapterStarts.append( index ) # The chapter heading (verse 0)
+                    index += 1 + numVerses
+                chapterStarts.append( index )
+                _swordIndexDict[BBB] = testament, chapterStarts
+    return _swordIndexDict
+# end of getSwordIndexDict
+
+
+
+def readConfFile( confFilepath ):
+    """
+    Reads a Sword .conf file.
+
+    Returns an OrderedDict with the module name in 'Name' and the conf fields
+        (with repeated fields like GlobalOptionFilter gathered into lists).
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 3: print( t("readConfFile( {} )").format( confFilepath ) )
+    confDict = OrderedDict()
+    lastField = None
+    with open( confFilepath, 'rt', encoding='utf-8', errors='replace' ) as confFile:
+        for line in confFile:
+            line = line.rstrip( '\r\n' )
+            if lastField and lastField in confDict:
+                if isinstance( confDict[lastField], list ): # Continue the last of the repeated values
+                    if confDict[lastField][-1].endswith( '\\' ):
+                        confDict[lastField][-1] = confDict[lastField][-1][:-1] + '\n' + line # Continuation line
+                        continue
+                elif confDict[lastField].endswith( '\\' ):
+                    confDict[lastField] = confDict[lastField][:-1] + '\n' + line # Continuation line
+                    continue
+            if not line or line[0] in '#;': continue
+            if line[0]=='[' and line[-1]==']':
+                confDict['Name'] = line[1:-1]; continue
+            if '=' not in line:
+                logging.warning( t("readConfFile: Ignored {!r} line in {}").format( line, confFilepath ) ); continue
+            field, value = line.split( '=', 1 )
+            field, value = field.strip(), value.strip()
+            if field in confDict and field!='Name': # Some fields are allowed to repeat
+                if not isinstance( confDict[field], list ): confDict[field] = [confDict[field]]
+                confDict[field].append( value )
+            else: confDict[field] = value
+            lastField = field
+    return confDict
+# end of readConfFile
+
+
+
+class SwordModule:
+    """
+    Class for reading one Sword Bible module (rawtext or ztext)
+        with random access to individual verses.
+    """
+    def __init__( self, confDict, sourceFolder, blockCacheSize=DEFAULT_BLOCK_CACHE_SIZE ):
+        """
+        Constructor: just sets up the module object from its conf dictionary.
+
+        The sourceFolder is the one containing the mods.d and modules folders
+            (DataPath in the conf file is relative to it).
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 3: print( t("SwordModule.__init__( {}, {} )").format( confDict['Name'], sourceFolder ) )
+        self.confDict, self.sourceFolder, self.blockCacheSize = confDict, sourceFolder, blockCacheSize
+        self.name = confDict['Name']
+        self.dataFolder = os.path.normpath( os.path.join( sourceFolder, confDict.get( 'DataPath', '' ) ) )
+
+        self.driverName = confDict.get( 'ModDrv', '' ).upper()
+        self.layout, sizeFormat = MODULE_DRIVER_DICT[self.driverName] if self.driverName in MODULE_DRIVER_DICT else (None,None)
+        self.sourceType = confDict.get( 'SourceType', 'Plain' ).upper()
+        self.markupCode = SOURCE_TYPE_DICT.get( self.sourceType, 1 )
+        self.encodingName = confDict.get( 'Encoding', 'Latin1' ).upper()
+        self.encoding = ENCODING_DICT.get( self.encodingName, 'latin-1' )
+        if self.layout == 'raw': self.indexFormat = '<I' + sizeFormat
+        elif self.layout == 'z': self.indexFormat = '<II' + sizeFormat
+        self.indexEntrySize = struct.calcsize( self.indexFormat ) if self.layout else None
+
+        self.problem = None
+        if self.layout is None: self.problem = "Unhandled {!r} module driver".format( confDict.get( 'ModDrv' ) )
+        elif 'CipherKey' in confDict: self.problem = "Enciphered modules are not handled"
+        elif self.encodingName not in ENCODING_DICT:
+            self.problem = "Unhandled {!r} encoding".format( confDict['Encoding'] )
+        elif self.layout=='z' and confDict.get( 'CompressType', 'ZIP' ).upper() != 'ZIP':
+            self.problem = "Unhandled {!r} compression".format( confDict['CompressType'] )
+        elif confDict.get( 'Versification', 'KJV' ) != 'KJV':
+            self.problem = "Unhandled {!r} versification".format( confDict['Versification'] )
+        if self.problem: logging.warning( t("SwordModule: {} in {} module").format( self.problem, self.name ) )
+
+        self.__files = {} # Open file objects (opened when first needed)
+        self.__blockIndexes = {} # Block indexes for ztext modules (read when first needed)
+        self.__blockCache = OrderedDict() # Least recently used decompressed blocks at the front
+    # end of SwordModule.__init__
+
+
+    def __str__( self ):
+        """
+        This method returns the string representation of a Sword module.
+
+        @return: the name of a Sword module formatted as a string
+        @rtype: string
+        """
+        result = "Sword module object: {} ({}, {})".format( self.name, self.driverName, self.sourceType )
+        if self.problem: result += ('\n' if result else '') + "  " + _("Problem: {}").format( self.problem )
+        if BibleOrgSysGlobals.verbosityLevel > 2: result += ('\n' if result else '') + "  " + _("Data folder: {}").format( self.dataFolder )
+        return result
+    # end of SwordModule.__str__
+
+
+    def getName( self ): return self.name
+    def getDescription( self ): return self.confDict.get( 'Description', '' )
+    def getLanguage( self ): return self.confDict.get( 'Lang', '' )
+    def getMarkupCode( self ): return self.markupCode
+    def isReadable( self ): return self.problem is None
+
+
+    def close( self ):
+        """
+        Close any open files (they'll be reopened if needed again).
+        """
+        for fileObject in self.__files.values(): fileObject.close()
+        self.__files, self.__blockIndexes = {}, {}
+        self.__blockCache.clear()
+    # end of SwordModule.close
+
+
+    def __getFile( self, filename ):
+        """
+        Returns the open (binary) file object for the given file in our data folder.
+
+        Raises FileNotFoundError if there's no such file (e.g., a NT only module has no ot files).
+        """
+        try: return self.__files[filename]
+        except KeyError:
+            self.__files[filename] = open( os.path.join( self.dataFolder, filename ), 'rb' )
+            return self.__files[filename]
+    # end of SwordModule.__getFile
+
+
+    def __getIndexEntry( self, testament, index ):
+        """
+        Returns the verse index entry tuple for the given testament index number.
+            (offset, size) for rawtext, or (blockNumber, offset, size) for ztext.
+        Returns None if the index file doesn't go that far.
+        """
+        indexFile = self.__getFile( testament + ('.vss' if self.layout=='raw' else '.bzv') )
+        indexFile.seek( index * self.indexEntrySize )
+        indexBytes = indexFile.read( self.indexEntrySize )
+        if len(indexBytes) < self.indexEntrySize: return None
+        return struct.unpack( self.indexFormat, indexBytes )
+    # end of SwordModule.__getIndexEntry
+
+
+    def __getBlock( self, testament, blockNumber ):
+        """
+        Returns the given decompressed ztext block as bytes.
+
+        Only the one block that is needed is decompressed
+            and the most recently used blocks are cached.
+        """
+        cacheKey = (testament, blockNumber)
+        try:
+            block = self.__blockCache.pop( cacheKey )
+            self.__blockCache[cacheKey] = block # Move it to the most recently used end
+            return block
+        except KeyError: pass
+
+        if testament not in self.__blockIndexes: # Read the whole (small) block index
+            with open( os.path.join( self.dataFolder, testament+'.bzs' ), 'rb' ) as blockIndexFile:
+                blockIndexBytes = blockIndexFile.read()
+            self.__blockIndexes[testament] = [struct.unpack_from( '<III', blockIndexBytes, j ) for j in range( 0, len(blockIndexBytes)-11, 12 )]
+        offset, compressedSize, uncompressedSize = self.__blockIndexes[testament][blockNumber]
+        dataFile = self.__getFile( testament+'.bzz' )
+        dataFile.seek( offset )
+        block = zlib.decompress( dataFile.read( compressedSize ) )
+        if BibleOrgSysGlobals.debugFlag and len(block)!=uncompressedSize:
+            logging.warning( t("SwordModule: {} {} block {} decompressed to {} bytes (expected {})").format( self.name, testament, blockNumber, len(block), uncompressedSize ) )
+
+        self.__blockCache[cacheKey] = block
+        while len(self.__blockCache) > self.blockCacheSize: self.__blockCache.popitem( last=False ) # Discard the least recently used
+        return block
+    # end of SwordModule.__getBlock
+
+
+    def __getRawEntry( self, testament, index ):
+        """
+        Returns the decoded entry for the given testament index number
+            or None if there's no entry (or no file for that testament).
+        """
+        try: indexEntry = self.__getIndexEntry( testament, index )
+        except FileNotFoundError: return None
+        if indexEntry is None: return None
+        if self.layout == 'raw':
+            offset, size = indexEntry
+            if not size: return ''
+            dataFile = self.__getFile( testament )
+            dataFile.seek( offset )
+            entryBytes = dataFile.read( size )
+        else: # ztext
+            blockNumber, offset, size = indexEntry
+            if not size: return ''
+            entryBytes = self.__getBlock( testament, blockNumber )[offset:offset+size]
+        return entryBytes.decode( self.encoding, 'replace' ).rstrip( '\x00' )
+    # end of SwordModule.__getRawEntry
+
+
+    def getRawVerse( self, BBB, C, V ):
+        """
+        Returns the raw (native markup) text for the given verse
+            with verse '0' giving any chapter heading and chapter '0' giving any book heading.
+        Returns None if this module doesn't contain that testament.
+
+        Raises KeyError if the reference isn't in the versification system.
+        """
+        if BibleOrgSysGlobals.debugFlag and debuggingThisModule: print( t("SwordModule.getRawVerse( {} {} {} )").format( BBB, C, V ) )
+        if self.problem: raise KeyError( self.problem )
+        testament, chapterStarts = getSwordIndexDict()[BBB]
+        intC, intV = int( C ), int( V )
+        if intC == 0: index = chapterStarts[0] # Book heading
+        elif intC < len(chapterStarts)-1 and intV < chapterStarts[intC+1]-chapterStarts[intC]:
+            index = chapterStarts[intC] + intV
+        else: raise KeyError( "{} {}:{}".format( BBB, C, V ) )
+        return self.__getRawEntry( testament, index )
+    # end of SwordModule.getRawVerse
+
+
+    def iterateVerses( self, includeHeadings=False ):
+        """
+        A generator which yields (BBB, C, V, rawText) 4-tuples
+            in index order for all the verses in the module which contain text.
+
+        Book headings are given as chapter '0' verse '0'
+            and chapter headings as verse '0' if includeHeadings is set.
+        """
+        if self.problem: return
+        for testament, bookList in ( ('ot',SWORD_KJV_OT_BOOKS), ('nt',SWORD_KJV_NT_BOOKS) ):
+            try: self.__getFile( testament + ('.vss' if self.layout=='raw' else '.bzv') )
+            except FileNotFoundError: continue # No text for this testament
+            for BBB in bookList:
+                chapterStarts = getSwordIndexDict()[BBB][1]
+                if includeHeadings:
+                    rawText = self.__getRawEntry( testament, chapterStarts[0] )
+                    if rawText: yield BBB, '0', '0', rawText
+                for intC in range( 1, len(chapterStarts)-1 ):
+                    C = str( intC )
+                    for intV in range( 0 if includeHeadings else 1, chapterStarts[intC+1]-chapterStarts[intC] ):
+                        rawText = self.__getRawEntry( testament, chapterStarts[intC]+intV )
+                        if rawText: yield BBB, C, str(intV), rawText
+    # end of SwordModule.iterateVerses
+
+
+    def getContextVerseData( self, key ):
+        """
+        Given a verse key (with getBBB, getChapterNumberStr, getVerseNumberStr methods),
+            returns a 2-tuple containing an InternalBibleEntryList and an (empty) context list.
+
+        The markup is simply stripped from the text.
+
+        Raises KeyError if there's no text for the verse.
+        """
+        BBB, c, v = key.getBBB(), key.getChapterNumberStr(), key.getVerseNumberStr()
+        rawText = self.getRawVerse( BBB, c, v )
+        if not rawText: raise KeyError( "{} {}:{}".format( BBB, c, v ) )
+        verseText = re.sub( '<[^>]*?>', '', rawText ).strip()
+        verseData = InternalBibleEntryList()
+        if v=='1': verseData.append( InternalBibleEntry( 'c#','c', c, c, None, c ) )
+        verseData.append( InternalBibleEntry( 'v','v', v, v, None, v ) )
+        verseData.append( InternalBibleEntry( 'v~','v~', verseText, verseText, None, rawText ) )
+        return verseData, [] # No context
+    # end of SwordModule.getContextVerseData
+# end of class SwordModule
+
+
+
+class SwordModules:
+    """
+    Class for finding the installed Sword modules (by reading their .conf files).
+    """
+    def __init__( self, searchFolders=None ):
+        """
+        Constructor: finds all the .conf files in the mods.d subfolder of the given (or default) folders.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("SwordModules.__init__( {} )").format( searchFolders ) )
+        self.confDicts = OrderedDict() # Keys are UPPERCASE module names, entries are (sourceFolder, confDict)
+        self.modules = {} # Already loaded SwordModule objects
+        for folder in (DEFAULT_SWORD_SEARCH_FOLDERS if searchFolders is None else searchFolders):
+            self.augmentModules( folder )
+    # end of SwordModules.__init__
+
+
+    def __len__( self ):
+        return len( self.confDicts )
+
+
+    def augmentModules( self, sourceFolder ):
+        """
+        Add any modules found in the mods.d subfolder of the given folder.
+
+        Returns the number of modules found.
+        """
+        confFolder = os.path.join( sourceFolder, 'mods.d/' )
+        if not os.path.isdir( confFolder ): return 0
+        numFound = 0
+        for filename in sorted( os.listdir( confFolder ) ):
+            if not filename.lower().endswith( '.conf' ): continue
+            try: confDict = readConfFile( os.path.join( confFolder, filename ) )
+            except OSError as err:
+                logging.error( t("SwordModules: Unable to read {} conf file: {}").format( filename, err ) ); continue
+            if 'Name' not in confDict: confDict['Name'] = filename[:-5]
+            self.confDicts[confDict['Name'].upper()] = sourceFolder, confDict
+            numFound += 1
+        return numFound
+    # end of SwordModules.augmentModules
+
+
+    def getAvailableModuleCodes( self ):
+        """
+        Returns a list of available Sword module codes (with their original case).
+        """
+        return [confDict['Name'] for sourceFolder,confDict in self.confDicts.values()]
+    # end of SwordModules.getAvailableModuleCodes
+
+
+    def loadModule( self, moduleName ):
+        """
+        Returns a 2-tuple containing a success flag and the SwordModule object (or None).
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 2: print( t("SwordModules.loadModule( {} )").format( moduleName ) )
+        moduleKey = moduleName.upper()
+        if moduleKey not in self.modules:
+            if moduleKey not in self.confDicts:
+                logging.error( t("SwordModules.loadModule: Unable to find {!r} Sword module").format( moduleName ) )
+                return False, None
+            sourceFolder, confDict = self.confDicts[moduleKey]
+            self.modules[moduleKey] = SwordModule( confDict, sourceFolder )
+        module = self.modules[moduleKey]
+        return module.isReadable(), module
+    # end of SwordModules.loadModule
+# end of class SwordModules
+
+
+
+def demo():
+    """
+    Main program to handle command line parameters and then run what they want.
+    """
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( ProgNameVersion )
+
+    library = SwordModules()
+    availableModuleCodes = library.getAvailableModuleCodes()
+    if BibleOrgSysGlobals.verbosityLevel > 0: print( "Found {} Sword modules: {}".format( len(library), availableModuleCodes ) )
+    for moduleName in availableModuleCodes[:5]:
+        resultFlag, module = library.loadModule( moduleName )
+        if BibleOrgSysGlobals.verbosityLevel > 1: print( module )
+        if resultFlag:
+            for BBB, C, V in ( ('GEN','1','1'), ('PSA','3','0'), ('MAT','1','1'), ('REV','22','21'), ):
+                try: print( "  {} {} {}:{} {!r}".format( moduleName, BBB, C, V, module.getRawVerse( BBB, C, V ) ) )
+                except KeyError: print( "  {} {} {}:{} not available".format( moduleName, BBB, C, V ) )
+# end of demo
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    demo()
+
+    BibleOrgSysGlobals.closedown( ProgName, ProgVersion )
+# end of SwordModules.py
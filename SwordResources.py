@@ -25,7 +25,7 @@
 """
 Module handling content modules produced for Crosswire Sword.
 This module uses the Sword engine (libsword) via the Python SWIG bindings.
-(If you don't want to install that, consider our SwordModules module.)
+(If you don't want to install that, our SwordModules module can read rawtext and ztext modules.)
 """
 
 from gettext import gettext as _
@@ -280,14 +280,15 @@ class SwordInterface():
                 print( "Can't decode utf-8 text of {} {}".format( module.getName(), key.getShortText() ) )
                 return ''
         elif SwordType == "OurCode":
-            verseData = module.getContextVerseData( key )
+            try: verseData, context = module.getContextVerseData( key )
+            except KeyError: return ''
             #print( "gVT", module.getName(), key, verseData )
-            assert( isinstance( verseData, list ) )
+            assert( isinstance( verseData, InternalBibleEntryList ) )
             assert( 2 <= len(verseData) <= 5 )
             verseText = ''
             for entry in verseData:
                 marker, cleanText = entry.getMarker(), entry.getCleanText()
-                if marker == 'c': pass # Ignore
+                if marker in ('c','c#'): pass # Ignore
                 elif marker == 'p': verseText += '¶' + cleanText
                 elif marker == 'm': verseText += '§' + cleanText
                 elif marker == 'v': pass # Ignore
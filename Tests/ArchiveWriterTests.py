@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ArchiveWriterTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing ArchiveWriter.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing ArchiveWriter.py.
+
+The archives are read back with the standard zipfile and tarfile modules.
+"""
+
+ProgName = "Archive writer tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, tarfile, tempfile, unittest, zipfile
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, BibleWriter
+from ArchiveWriter import ArchiveWriter
+from USFMBible import USFMBible
+
+
+TEST_MEMBERS = [('Test{}.txt'.format( j ), 'Line {} of some text which compresses well\n'.format( j ) * (j*50)) for j in range( 12 )] \
+                + [('Ünicode‘name’.txt', 'Some ‘quoted’ text'), ('Empty.txt', '')]
+
+
+
+class ArchiveWriterTests( unittest.TestCase ):
+    """ Unit tests for the ArchiveWriter object. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        for BBB in ( 'GEN', 'MAT', 'REV', ): cls.UB.loadBook( BBB )
+        cls.UB.doPostLoadProcessing()
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSArchiveTest' )
+        self.zipFilepath, self.tarFilepath = os.path.join( self.tempFolder, 'Test.zip' ), os.path.join( self.tempFolder, 'Test.tar.gz' )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def test_010_roundTrip( self ):
+        """ Test that both archives contain the same members in order (whether or not threads are used). """
+        for maxThreads in ( 1, 3, ):
+            with ArchiveWriter( self.zipFilepath, self.tarFilepath, maxThreads=maxThreads ) as archiveWriter:
+                for archiveName, text in TEST_MEMBERS: archiveWriter.addData( archiveName, text )
+            self.assertEqual( archiveWriter.memberCount, len(TEST_MEMBERS) )
+            with zipfile.ZipFile( self.zipFilepath ) as zf:
+                self.assertIsNone( zf.testzip() )
+                self.assertEqual( [(name, zf.read( name ).decode( 'utf-8' )) for name in zf.namelist()], TEST_MEMBERS )
+            with tarfile.open( self.tarFilepath, 'r:gz' ) as tf:
+                self.assertEqual( [(member.name, tf.extractfile( member ).read().decode( 'utf-8' )) for member in tf.getmembers()], TEST_MEMBERS )
+    # end of test_010_roundTrip
+
+    def test_020_addFile( self ):
+        """ Test adding existing files (without their paths) to just a zip archive. """
+        filepath = os.path.join( self.tempFolder, 'Existing.txt' )
+        with open( filepath, 'wt' ) as myFile: myFile.write( 'Existing file' )
+        archiveWriter = ArchiveWriter( self.zipFilepath )
+        archiveWriter.addFile( filepath )
+        archiveWriter.addFile( filepath, 'Renamed.txt' )
+        archiveWriter.close()
+        self.assertFalse( os.path.exists( self.tarFilepath ) )
+        with zipfile.ZipFile( self.zipFilepath ) as zf:
+            self.assertEqual( zf.namelist(), ['Existing.txt','Renamed.txt'] )
+            self.assertEqual( zf.read( 'Renamed.txt' ), b'Existing file' )
+        self.assertTrue( isinstance( str(archiveWriter), str ) )
+    # end of test_020_addFile
+
+    def test_030_abort( self ):
+        """ Test that an exception removes the partly written archives. """
+        for maxThreads in ( 1, 3, ):
+            archiveWriter = ArchiveWriter( self.zipFilepath, self.tarFilepath, maxThreads=maxThreads )
+            with self.assertRaises( ValueError ):
+                with archiveWriter:
+                    for archiveName, text in TEST_MEMBERS[:5]: archiveWriter.addData( archiveName, text )
+                    raise ValueError( "Something went wrong in the exporter" )
+            self.assertEqual( os.listdir( self.tempFolder ), [] )
+            archiveWriter.abort() # Can be called again
+    # end of test_030_abort
+
+    def test_040_exports( self ):
+        """ Test that the XML exports which are zipped as they're written make good archives. """
+        for methodName, zipFilename, subfolderName in ( ('toUSXXML','AllUSXFiles.zip','USXFiles'),
+                                ('toUSFXXML','USFMTest2_USFX_Bible.xml.zip',''), ('toOSISXML','USFMTest2_OSIS_Bible.xml.zip',''), ):
+            outputFolder = os.path.join( self.tempFolder, methodName )
+            self.assertTrue( getattr( self.UB, methodName )( outputFolder ) )
+            with zipfile.ZipFile( os.path.join( outputFolder, zipFilename ) ) as zf:
+                self.assertIsNone( zf.testzip() )
+                self.assertTrue( zf.namelist() )
+                for name in zf.namelist():
+                    with open( os.path.join( outputFolder, subfolderName, name ), 'rb' ) as xmlFile:
+                        self.assertEqual( zf.read( name ), xmlFile.read() )
+    # end of test_040_exports
+
+    def test_050_failedExports( self ):
+        """ Test that the XML exports don't leave partial archives behind if they fail part way through. """
+        for methodName in ( 'toUSXXML', 'toUSFXXML', 'toOSISXML', ):
+            outputFolder = os.path.join( self.tempFolder, methodName )
+            with mock.patch.object( BibleWriter.MLWriter, 'writeLineClose', side_effect=RuntimeError( "Export failed" ) ):
+                self.assertRaises( RuntimeError, getattr( self.UB, methodName ), outputFolder )
+            self.assertEqual( [filename for filename in os.listdir( outputFolder ) if filename.endswith( ('.zip','.qz',) )], [] )
+    # end of test_050_failedExports
+# end of ArchiveWriterTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of ArchiveWriterTests.py
@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# BCVBibleTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing BCVBible.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing BCVBible.py.
+
+The test USFM Bibles are exported with BibleWriter.toBOSBCV (both loose and packed)
+    and read back in (both fully and lazily) and every indexed verse compared with the original.
+"""
+
+ProgName = "BCV Bible tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, tempfile, unittest
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+from BCVBible import BCVBible, BCVBibleFileCheck, readMetadataFile
+from USFMBible import USFMBible
+
+
+def getEntriesSummary( entries ):
+    """
+    Returns a list of tuples with the fields of each InternalBibleEntry (and its extras) so that they can be compared.
+    """
+    return [(entry.getMarker(), entry.getOriginalMarker(), entry.getAdjustedText(), entry.getCleanText(),
+                [(extra.myType, extra.index, extra.noteText, extra.cleanNoteText) for extra in (entry.getExtras() or [])])
+                    for entry in entries]
+# end of getEntriesSummary
+
+
+
+class BCVBibleTests( unittest.TestCase ):
+    """ Unit tests for the BCVBible object. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.tempFolder = tempfile.mkdtemp( prefix='BOSBCVTest' )
+        cls.UB = USFMBible( 'Tests/DataFilesForTests/USFMAllMarkersProject/', 'WEB+' ) # This is a RELATIVE path
+        cls.UB.load()
+        cls.looseFolder, cls.packedFolder = os.path.join( cls.tempFolder, 'Loose/' ), os.path.join( cls.tempFolder, 'Packed/' )
+        cls.UB.toBOSBCV( cls.looseFolder )
+        cls.UB.toBOSBCV( cls.packedFolder, packedFlag=True )
+
+    @classmethod
+    def tearDownClass( cls ):
+        shutil.rmtree( cls.tempFolder )
+
+    def checkSameVerses( self, originalBible, BCVFolder, lazyFlag, expectedDifferences=None ):
+        """
+        Checks that every indexed verse in the original Bible is the same when read back in.
+        """
+        bcvB = BCVBible( BCVFolder )
+        if lazyFlag: bcvB.loadLazily()
+        else: bcvB.load()
+        differences = []
+        for BBB, bookObject in originalBible.books.items():
+            for CVKey in bookObject._CVIndex:
+                originalEntries, originalContext = originalBible.getContextVerseData( (BBB,)+CVKey )
+                entries, context = bcvB.getContextVerseData( (BBB,)+CVKey )
+                if getEntriesSummary( entries ) != getEntriesSummary( originalEntries ) or context != originalContext:
+                    differences.append( (BBB,)+CVKey )
+        self.assertEqual( differences, expectedDifferences if expectedDifferences else [] )
+        return bcvB
+    # end of checkSameVerses
+
+    def test_010_metadata( self ):
+        """ Test the Bible and book metadata. """
+        for BCVFolder, packedFlag in ( (self.looseFolder,False), (self.packedFolder,True), ):
+            bcvB = BCVBible( BCVFolder )
+            self.assertEqual( bcvB.availableBookList, list( self.UB.books ) )
+            self.assertEqual( bcvB.packedFlag, packedFlag )
+            self.assertEqual( bcvB.sourceType, self.UB.objectTypeString )
+            self.assertEqual( len(bcvB), 0 ) # Nothing loaded yet
+            bookMetadata = bcvB.getBookMetadata( 'MAT' )
+            self.assertIn( ('1','1'), bookMetadata['CVList'] )
+            self.assertIn( ('0','0'), bookMetadata['CVContexts'] )
+            self.assertEqual( 'VerseIndex' in bookMetadata, packedFlag )
+            self.assertIsNone( bcvB.getBookMetadata( 'XYZ' ) )
+            self.assertEqual( readMetadataFile( os.path.join( BCVFolder, 'Metadata.txt' ) )['BookList'], bcvB.availableBookList )
+    # end of test_010_metadata
+
+    def test_020_load( self ):
+        """ Test loading the whole Bible (loose and packed). """
+        for BCVFolder in ( self.looseFolder, self.packedFolder, ):
+            bcvB = self.checkSameVerses( self.UB, BCVFolder, lazyFlag=False )
+            self.assertEqual( list( bcvB.books ), list( self.UB.books ) )
+            self.assertRaises( KeyError, bcvB.getContextVerseData, ('MAT','1','999') )
+    # end of test_020_load
+
+    def test_030_loadLazily( self ):
+        """ Test reading individual verses (loose and packed) without loading the books. """
+        for BCVFolder in ( self.looseFolder, self.packedFolder, ):
+            bcvB = self.checkSameVerses( self.UB, BCVFolder, lazyFlag=True )
+            self.assertEqual( len(bcvB.books), 0 ) # Only the individual verses were read
+            self.assertIsNone( bcvB.getContextVerseData( ('XYZ','1','1') ) )
+            self.assertRaises( KeyError, bcvB.getContextVerseData, ('MAT','1','999') )
+            self.assertEqual( bcvB['MAT'].BBB, 'MAT' ) # But it can still be loaded when needed
+            self.assertEqual( list( bcvB.books ), ['MAT'] )
+    # end of test_030_loadLazily
+
+    def test_040_verseCache( self ):
+        """ Test that only the most recently used verses are kept. """
+        bcvB = BCVBible( self.packedFolder )
+        bcvB.loadLazily( maxCachedVerses=5 )
+        for V in range( 1, 11 ):
+            result = bcvB.getContextVerseData( ('MAT','1',str(V)) )
+            self.assertLessEqual( len(bcvB.recentlyUsedVerses), 5 )
+        self.assertIs( bcvB.getContextVerseData( ('MAT','1','10') ), result ) # From the cache
+        self.assertEqual( list( bcvB.recentlyUsedVerses )[-1], ('MAT','1','10') )
+        self.assertNotIn( ('MAT','1','1'), bcvB.recentlyUsedVerses )
+    # end of test_040_verseCache
+
+    def test_050_oldVersion( self ):
+        """ Test that a version 1.0 export (without the contexts) still loads lazily (by loading the book). """
+        oldFolder = os.path.join( self.tempFolder, 'Old/' )
+        shutil.copytree( self.looseFolder, oldFolder )
+        bookMetadataFilepath = os.path.join( oldFolder, 'MAT/', 'MAT_BookMetadata.txt' )
+        with open( bookMetadataFilepath, 'rt', encoding='utf-8' ) as bookMetadataFile: lines = bookMetadataFile.readlines()
+        with open( bookMetadataFilepath, 'wt', encoding='utf-8' ) as bookMetadataFile:
+            bookMetadataFile.writelines( line for line in lines if not line.startswith( 'CVContexts' ) )
+        bcvB = BCVBible( oldFolder )
+        bcvB.loadLazily()
+        self.assertEqual( getEntriesSummary( bcvB.getContextVerseData( ('MAT','2','3') )[0] ),
+                            getEntriesSummary( self.UB.getContextVerseData( ('MAT','2','3') )[0] ) )
+        self.assertEqual( list( bcvB.books ), ['MAT'] )
+        shutil.rmtree( oldFolder )
+    # end of test_050_oldVersion
+
+    def test_060_verseNumberFootnote( self ):
+        """ Test another Bible -- the only thing lost is a footnote on a verse number (because it's not exported). """
+        UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' )
+        UB.loadBook( 'MAT' )
+        UB.doPostLoadProcessing()
+        BCVFolder = os.path.join( self.tempFolder, 'USFMTest2/' )
+        UB.toBOSBCV( BCVFolder )
+        for lazyFlag in ( False, True, ):
+            self.checkSameVerses( UB, BCVFolder, lazyFlag, expectedDifferences=[('MAT','1','1')] )
+        shutil.rmtree( BCVFolder )
+    # end of test_060_verseNumberFootnote
+
+    def test_070_fileCheck( self ):
+        """ Test finding BCV Bibles. """
+        self.assertEqual( BCVBibleFileCheck( self.looseFolder ), 1 )
+        self.assertEqual( BCVBibleFileCheck( self.tempFolder ), 2 ) # Loose and Packed
+        bcvB = BCVBibleFileCheck( self.packedFolder, autoLoad=True )
+        self.assertIsInstance( bcvB, BCVBible )
+        self.assertEqual( len(bcvB), 0 )
+        self.assertFalse( BCVBibleFileCheck( 'Tests/DataFilesForTests/USFMTest2/' ) )
+    # end of test_070_fileCheck
+# end of BCVBibleTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of BCVBibleTests.py
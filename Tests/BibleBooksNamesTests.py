@@ -2,11 +2,11 @@
 # -*- coding: utf-8 -*-
 #
 # BibleBooksNamesTests.py
-#   Last modified: 2014-12-15 (also update ProgVersion below)
+#   Last modified: 2015-05-08 (also update ProgVersion below)
 #
 # Module testing BibleBooksNames.py
 #
-# Copyright (C) 2011-2014 Robert Hunt
+# Copyright (C) 2011-2015 Robert Hunt
 # Author: Robert Hunt <Freely.Given.org@gmail.com>
 # License: See gpl-3.0.txt
 #
@@ -28,7 +28,7 @@ Module testing BibleBooksNamesConverter.py and BibleBooksNames.py.
 """
 
 ProgName = "Bible Books Names tests"
-ProgVersion = '0.31'
+ProgVersion = '0.32'
 ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
 
 
@@ -182,6 +182,20 @@ class BibleBooksNamesSystemsTests( unittest.TestCase ):
         self.assertFalse( '' in results )
         self.assertEqual( self.bbnss.getBooksNamesSystem('SomeName', sampleBookList), None )
     # end of test_2060_getBooksNamesSystem
+
+    def test_2070_getBBB( self ):
+        """ Test the getBBB function (which uses the names index from all the systems). """
+        for name, BBB in ( ('Phil','PHP'), ('Ps','PSA'), ('Da','DAN'), ('Re','REV'), ('Ha','HAB'), ('Es','EST'), ('G','GEN'),
+                            ('Is','ISA'), ('Jo','JOS'), ('Ti','TIT'), ('1Ti','TI1'), ('1 Ti','TI1'), ('1Sam','SA1'), ('ISam','SA1'),
+                            ('Psalm','PSA'), ('Gen','GEN'), ('genesis','GEN'), ('Jn','JHN'), ):
+            self.assertEqual( self.bbnss.getBBB( name, languagePriority=['eng'] ), BBB )
+        for name, BBB in ( ('Phil','PHP'), ('Ps','PSA'), ('Ha','HAB'), ('Psalm','PSA'), ('Gen','GEN'), ): # Whatever the system order
+            self.assertEqual( self.bbnss.getBBB( name ), BBB )
+        for badName in ( 'XYZ', '1', '', ):
+            self.assertIsNone( self.bbnss.getBBB( badName, languagePriority=['eng'] ) )
+        self.assertEqual( self.bbnss.getNamesIndex().getPossibleBBBs( 'Phil' ), ('PHM','PHP') )
+        self.assertEqual( self.bbnss.getNamesIndex().getPossibleBBBs( 'XYZ' ), () )
+    # end of test_2070_getBBB
 # end of BibleBooksNamesSystemsTests class
 
 
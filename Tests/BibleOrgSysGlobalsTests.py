@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# BibleOrgSysGlobalsTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing BibleOrgSysGlobals.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing BibleOrgSysGlobals.py (so far just the loading of the global Bible data sets and the derived tables bundle).
+"""
+
+ProgName = "Bible Org Sys Globals tests"
+ProgVersion = '0.11'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import os, sys, pickle, shutil, subprocess, tempfile, threading, time, unittest
+from io import BytesIO
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+
+
+GLOBAL_DATA_SET_NAMES = ( 'BibleBooksCodes', 'USFMMarkers', 'USFMParagraphMarkers', )
+
+
+
+class BibleOrgSysGlobalsTests( unittest.TestCase ):
+    """ Unit tests for the BibleOrgSysGlobals module. """
+
+    def test_010_lazyLoad( self ):
+        """ Test that importing the module doesn't load the global Bible data sets (in a fresh process). """
+        output = subprocess.check_output( [sys.executable, '-c', "import sys; sys.path.append( '.' ); import BibleOrgSysGlobals as G; "
+                            "print( [name in vars(G) for name in {!r}] ); G.USFMParagraphMarkers; "
+                            "print( [name in vars(G) for name in {!r}] )".format( GLOBAL_DATA_SET_NAMES, GLOBAL_DATA_SET_NAMES )],
+                        universal_newlines=True )
+        self.assertEqual( output.split( '\n' )[-3:], ['[False, False, False]', '[False, True, True]', ''] )
+    # end of test_010_lazyLoad
+
+    def test_020_getattr( self ):
+        """ Test that the loaded data sets become normal module variables. """
+        for name in GLOBAL_DATA_SET_NAMES:
+            self.assertIs( getattr( BibleOrgSysGlobals, name ), vars(BibleOrgSysGlobals)[name] )
+        self.assertEqual( BibleOrgSysGlobals.BibleBooksCodes.getBBB( 'Gen' ), 'GEN' )
+        self.assertIn( 'p', BibleOrgSysGlobals.USFMParagraphMarkers )
+        self.assertRaises( AttributeError, getattr, BibleOrgSysGlobals, 'NotAGlobalDataSet' )
+        self.assertFalse( hasattr( BibleOrgSysGlobals, 'NotAGlobalDataSet' ) )
+    # end of test_020_getattr
+
+    def test_030_threads( self ):
+        """ Test that a data set is only loaded once even when several threads ask for it at the same time. """
+        originalParagraphMarkers = BibleOrgSysGlobals.USFMParagraphMarkers
+        getNewlineMarkersList, calls, results = BibleOrgSysGlobals.USFMMarkers.getNewlineMarkersList, [], []
+        def slowGetNewlineMarkersList( *args ):
+            calls.append( args )
+            time.sleep( 0.2 ) # Give the other threads time to ask too
+            return getNewlineMarkersList( *args )
+        # end of slowGetNewlineMarkersList
+        del BibleOrgSysGlobals.USFMParagraphMarkers
+        try:
+            with mock.patch.object( BibleOrgSysGlobals.USFMMarkers, 'getNewlineMarkersList', slowGetNewlineMarkersList ):
+                threads = [threading.Thread( target=lambda: results.append( BibleOrgSysGlobals.USFMParagraphMarkers ) ) for j in range( 5 )]
+                for thread in threads: thread.start()
+                for thread in threads: thread.join()
+        finally:
+            if 'USFMParagraphMarkers' not in vars(BibleOrgSysGlobals): BibleOrgSysGlobals.USFMParagraphMarkers = originalParagraphMarkers
+        self.assertEqual( calls, [('CanonicalText',)] )
+        self.assertEqual( len(results), 5 )
+        for result in results: self.assertIs( result, results[0] )
+        self.assertEqual( results[0], originalParagraphMarkers )
+    # end of test_030_threads
+
+    def test_040_tablesBundle( self ):
+        """ Test that the tables come from the bundle only while the bundled copies are still current. """
+        tempFolder = tempfile.mkdtemp()
+        self.addCleanup( shutil.rmtree, tempFolder )
+        self.addCleanup( BibleOrgSysGlobals.derivedTablesBundles.pop, os.path.abspath( tempFolder ), None )
+        tables = { 'One_Tables.pickle':{'one':1}, 'Two_Tables.pickle':['two',2], 'Other.pickle':'Not a table' }
+        for filename, table in tables.items():
+            with open( os.path.join( tempFolder, filename ), 'wb' ) as pickleFile: pickle.dump( table, pickleFile )
+        def loadTable( filename ):
+            with BibleOrgSysGlobals.openDerivedTablesFile( os.path.join( tempFolder, filename ) ) as pickleFile:
+                return type( pickleFile ), pickle.load( pickleFile )
+
+        self.assertEqual( loadTable( 'One_Tables.pickle' )[0].__name__, 'BufferedReader' ) # No bundle yet
+        bundleFilepath = BibleOrgSysGlobals.makeDerivedTablesBundle( tempFolder )
+        self.assertEqual( os.path.basename( bundleFilepath ), BibleOrgSysGlobals.TABLES_BUNDLE_FILENAME )
+        for filename in ( 'One_Tables.pickle', 'Two_Tables.pickle', ):
+            self.assertEqual( loadTable( filename ), (BytesIO, tables[filename]) )
+        self.assertEqual( loadTable( 'Other.pickle' )[0].__name__, 'BufferedReader' ) # Not bundled
+
+        # Change a table (without remaking the bundle)
+        with open( os.path.join( tempFolder, 'Two_Tables.pickle' ), 'wb' ) as pickleFile: pickle.dump( ['Two',22], pickleFile )
+        self.assertEqual( loadTable( 'Two_Tables.pickle' )[1], ['Two',22] )
+        self.assertEqual( loadTable( 'One_Tables.pickle' ), (BytesIO, tables['One_Tables.pickle']) )
+
+        # An out-of-date bundle is ignored
+        with open( bundleFilepath, 'r+b' ) as bundleFile:
+            bundleFile.seek( len(BibleOrgSysGlobals.TABLES_BUNDLE_MAGIC) ); bundleFile.write( b'\x00\x01' )
+        BibleOrgSysGlobals.derivedTablesBundles.pop( os.path.abspath( tempFolder ) )
+        with self.assertLogs( level='WARNING' ):
+            self.assertEqual( loadTable( 'One_Tables.pickle' )[0].__name__, 'BufferedReader' )
+    # end of test_040_tablesBundle
+# end of BibleOrgSysGlobalsTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of BibleOrgSysGlobalsTests.py
@@ -238,6 +238,32 @@ class BibleOrganizationalSystemTests(unittest.TestCase):
         self.assertTrue( result )
     # end of test_3080_isValidBCVRef
 
+    def test_3090_absoluteVerseNumbers( self ):
+        """ Test the getAbsoluteVerseNumber and convertAbsoluteVerseNumber functions. """
+        for ref,avNumber in ((('GEN','1','1'),1), (('GEN','1','31'),31), (('GEN','2','1'),32), (('MAT','1','1'),23146), (('REV','22','21'),31102), ):
+            self.assertEqual( self.bos.getAbsoluteVerseNumber( *ref ), avNumber )
+            self.assertEqual( self.bos.convertAbsoluteVerseNumber( avNumber ), ref )
+        for badRef in (('GEN','1','0'),('GEN','1','32'), ):
+            self.assertIsNone( self.bos.getAbsoluteVerseNumber( *badRef ) )
+        for badRef in (('GEN','0','1'),('GEN','51','1'),('XYZ','1','1'), ):
+            self.assertRaises( KeyError, self.bos.getAbsoluteVerseNumber, *badRef )
+        for badNumber in (0, 31103, ):
+            self.assertIsNone( self.bos.convertAbsoluteVerseNumber( badNumber ) )
+        otherBos = BibleOrganizationalSystems.BibleOrganizationalSystem( 'RSV52' ) # Each system has its own numbering
+        self.assertEqual( otherBos.convertAbsoluteVerseNumber( 31102 ), ('REV','22','20') )
+        self.assertEqual( self.bos.convertAbsoluteVerseNumber( 31102 ), ('REV','22','21') )
+    # end of test_3090_absoluteVerseNumbers
+
+    def test_3100_absoluteVerseNumbersBatch( self ):
+        """ Test the getAbsoluteVerseNumbers and convertAbsoluteVerseNumbers functions. """
+        results = self.bos.convertAbsoluteVerseNumbers( range( 0, 31104 ) )
+        self.assertEqual( len(results), 31104 )
+        self.assertIsNone( results[0] )
+        self.assertIsNone( results[-1] )
+        self.assertEqual( results[32], ('GEN','2','1') )
+        self.assertEqual( self.bos.getAbsoluteVerseNumbers( results[1:-1] ), list( range( 1, 31103 ) ) )
+    # end of test_3100_absoluteVerseNumbersBatch
+
 
     # Tests of the BibleVersificationSystem subclass
     def test_3200_getNumChapters( self ):
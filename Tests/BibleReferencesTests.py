@@ -2,11 +2,11 @@
 # -*- coding: utf-8 -*-
 #
 # BibleReferencesTests.py
-#   Last modified: 2014-12-15 by RJH (also update ProgVersion below)
+#   Last modified: 2015-05-08 by RJH (also update ProgVersion below)
 #
 # Module testing BibleReferences.py
 #
-# Copyright (C) 2012-2014 Robert Hunt
+# Copyright (C) 2012-2015 Robert Hunt
 # Author: Robert Hunt <Freely.Given.org@gmail.com>
 # License: See gpl-3.0.txt
 #
@@ -28,11 +28,12 @@ Module testing BibleReferences.py.
 """
 
 ProgName = "Bible References tests"
-ProgVersion = '0.25'
+ProgVersion = '0.26'
 ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
 
 
-import sys, unittest
+import sys, logging, random, threading, unittest
+from unittest import mock
 
 sourceFolder = "."
 sys.path.append( sourceFolder )
@@ -41,6 +42,54 @@ import BibleBooksCodes, BibleOrganizationalSystems
 import BibleReferences
 
 
+def makeRandomReferenceString( rng, BOS, punctuationDict ):
+    """
+    Returns a random reference string (mostly valid references with a few bad ones)
+        using the book names and punctuation of the given system.
+    """
+    def pick( key ): return rng.choice( punctuationDict[key] )
+    def randomNumber( maxNumber ): return rng.randint( 1, maxNumber ) if rng.random() < 0.9 else rng.randint( 0, maxNumber+2 )
+
+    bookStrings = []
+    for b in range( rng.randint( 1, 3 ) ):
+        BBB = rng.choice( BOS.getBookList() )
+        bookName = rng.choice( [BOS.getBookName( BBB ), BOS.getBookAbbreviation( BBB ), BBB.capitalize()] ) if rng.random() < 0.95 else 'Xyz'
+        if not bookName: bookName = BBB
+        if punctuationDict['punctuationAfterBookAbbreviation'] and rng.random() < 0.4: bookName += pick( 'punctuationAfterBookAbbreviation' )
+        maxChapters = BOS.getNumChapters( BBB ) or 1
+        chapterStrings = []
+        for c in range( rng.randint( 1, 3 ) ):
+            C = randomNumber( maxChapters )
+            try: maxVerses = BOS.getNumVerses( BBB, str(C) )
+            except KeyError: maxVerses = 30
+            def verse( suffixAllowed=True ): # The state machine doesn't handle suffixes on the end of a range
+                suffix = rng.choice( punctuationDict['allowedVerseSuffixes'] + 'x' ) if suffixAllowed and rng.random() < 0.1 else ''
+                return str( randomNumber( maxVerses ) ) + suffix
+            verseString = verse()
+            for v in range( rng.randint( 0, 2 ) ):
+                verseString += pick( 'verseBridgeCharacter' ) + verse( False ) if rng.random() < 0.2 else pick( 'verseSeparator' ) + verse()
+            chapterString = verseString if maxChapters==1 and rng.random() < 0.5 else '{}{}{}'.format( C, pick( 'chapterVerseSeparator' ), verseString )
+            if rng.random() < 0.1:
+                chapterString += pick( 'chapterBridgeCharacter' ) + str( rng.randint( 1, maxChapters ) ) + pick( 'chapterVerseSeparator' ) + verse( False )
+            chapterStrings.append( chapterString )
+        bookStrings.append( bookName + ' ' + (pick( 'chapterSeparator' )+' ').join( chapterStrings ) )
+    referenceString = (pick( 'bookSeparator' )+' ').join( bookStrings )
+    if rng.random() < 0.05: referenceString = referenceString.replace( ' ', '  ', 1 )
+    return referenceString
+# end of makeRandomReferenceString
+
+
+def getParseResult( parseFunction, referenceString ):
+    """
+    Returns the result of the parse function (with a copy of the list)
+        or the type of the exception that it raised (the state machine can't handle everything).
+    """
+    try: successFlag, haveWarnings, referenceList = parseFunction( referenceString )
+    except Exception as err: return type( err )
+    return successFlag, haveWarnings, list( referenceList )
+# end of getParseResult
+
+
 class BibleReferencesTests( unittest.TestCase ):
     """ Unit tests for the BibleReferences object. """
 
@@ -284,6 +333,87 @@ class BibleReferencesTests( unittest.TestCase ):
             #print( BAR ) # Just print a summary
             self.assertFalse( BAR.matchesAnchorString( ourAnchor ) )
     # end of test_410_BibleAnchorReference
+
+    def test_500_fastParsing( self ):
+        """ Test that parseReferenceString gives exactly the same results as the state machine on random references. """
+        for systemName in ( 'RSV', 'KJV-1611', 'GENERIC-KJV-66-ENG', ):
+            BOS = BibleOrganizationalSystems.BibleOrganizationalSystem( systemName )
+            BRL = BibleReferences.BibleReferenceList( BOS )
+            rng = random.Random( systemName ) # So that any failures can be repeated
+            BibleReferences.parsedReferenceStringsCache.clear()
+            numQuick = 0
+            logging.disable( logging.CRITICAL ) # The state machine complains a lot about the bad ones
+            try:
+                for j in range( 1000 ):
+                    referenceString = makeRandomReferenceString( rng, BOS, BRL.punctuationDict )
+                    quickList = BRL._BibleReferenceList__parseQuickly( referenceString )
+                    expectedResult = getParseResult( BRL.parseReferenceStringWithStateMachine, referenceString )
+                    if quickList is not None:
+                        numQuick += 1
+                        self.assertEqual( expectedResult, (True, False, quickList), referenceString )
+                    for k in range( 2 ): # Parse it twice to also check the cached result
+                        self.assertEqual( getParseResult( BRL.parseReferenceString, referenceString ), expectedResult, referenceString )
+            finally: logging.disable( logging.NOTSET )
+            self.assertGreater( numQuick, 100, systemName )
+    # end of test_500_fastParsing
+
+    def test_510_parseCache( self ):
+        """ Test that only clean results are cached (so the others are always reported). """
+        BRL = BibleReferences.BibleReferenceList( self.BOS )
+        BibleReferences.parsedReferenceStringsCache.clear()
+        stateMachine = BRL.parseReferenceStringWithStateMachine
+        with mock.patch.object( BRL, 'parseReferenceStringWithStateMachine', side_effect=stateMachine ) as mocked:
+            for location in ( 'Here', 'There', ):
+                self.assertEqual( BRL.parseReferenceString( 'Mat. 7:3,7; 8:1-9:2; Jude 7', location ),
+                                (True, False, [('MAT','7','3',''), ('MAT','7','7',''), (('MAT','8','1',''),('MAT','9','2','')), ('JDE','1','7','')]) )
+                self.assertEqual( BRL.parseReferenceString( 'Job  8:4', location ), (True, False, [('JOB','8','4','')]) ) # Needs the state machine
+                with self.assertLogs( level='WARNING' ):
+                    self.assertEqual( BRL.parseReferenceString( 'Mat. 7:3,3', location ), (True, True, [('MAT','7','3',''), ('MAT','7','3','')]) )
+                with self.assertLogs( level='ERROR' ):
+                    self.assertFalse( BRL.parseReferenceString( 'Mat. 77:3', location )[0] )
+            self.assertEqual( [call[0][1] for call in mocked.call_args_list], ['Here', 'Here', 'Here', 'There', 'There'] )
+        self.assertEqual( set( BibleReferences.parsedReferenceStringsCache ), { ('Mat. 7:3,7; 8:1-9:2; Jude 7', 'RSV'), ('Job  8:4', 'RSV') } )
+
+        # The cached list can't be changed by the caller
+        result = BRL.parseReferenceString( 'Job  8:4' )
+        result[2].append( 'Something' )
+        self.assertEqual( BRL.parseReferenceString( 'Job  8:4' ), (True, False, [('JOB','8','4','')]) )
+
+        # The least recently used results are dropped
+        with mock.patch.object( BibleReferences, 'MAX_CACHED_REFERENCE_STRINGS', 3 ):
+            BRL.parseReferenceString( 'Job  8:4' )
+            for referenceString in ( 'Gen. 1:1', 'Gen. 1:2', 'Gen. 1:3', ):
+                BRL.parseReferenceString( referenceString )
+                BRL.parseReferenceString( 'Job  8:4' )
+            self.assertEqual( list( BibleReferences.parsedReferenceStringsCache ), [('Gen. 1:2','RSV'), ('Gen. 1:3','RSV'), ('Job  8:4','RSV')] )
+    # end of test_510_parseCache
+
+    def test_520_parseReferenceStrings( self ):
+        """ Test parsing a list of reference strings (also from several threads at once). """
+        BRL = BibleReferences.BibleReferenceList( self.BOS )
+        rng = random.Random( 520 )
+        referenceStrings = [makeRandomReferenceString( rng, self.BOS, BRL.punctuationDict ) for j in range( 300 )]
+        referenceStrings = [referenceString for referenceString in referenceStrings if not isinstance( getParseResult( BRL.parseReferenceString, referenceString ), type )]
+        logging.disable( logging.CRITICAL )
+        try:
+            expectedResults = [getParseResult( BRL.parseReferenceStringWithStateMachine, referenceString ) for referenceString in referenceStrings]
+            self.assertEqual( [(successFlag, haveWarnings, list( referenceList )) for successFlag, haveWarnings, referenceList in BRL.parseReferenceStrings( referenceStrings )],
+                            expectedResults )
+            threadResults = {}
+            def parseInThread( threadNumber ): # Each thread needs its own BibleReferenceList (because it keeps the last list)
+                threadBRL = BibleReferences.BibleReferenceList( self.BOS )
+                threadResults[threadNumber] = [(successFlag, haveWarnings, list( referenceList ))
+                                                for successFlag, haveWarnings, referenceList in threadBRL.parseReferenceStrings( referenceStrings*3 )]
+            BibleReferences.parsedReferenceStringsCache.clear()
+            with mock.patch.object( BibleReferences, 'MAX_CACHED_REFERENCE_STRINGS', 50 ): # So that results are dropped all the time
+                threads = [threading.Thread( target=parseInThread, args=(threadNumber,) ) for threadNumber in range( 4 )]
+                for thread in threads: thread.start()
+                for thread in threads: thread.join()
+        finally: logging.disable( logging.NOTSET )
+        for threadNumber in range( 4 ):
+            self.assertEqual( threadResults[threadNumber], expectedResults*3 )
+        self.assertLessEqual( len(BibleReferences.parsedReferenceStringsCache), 50 )
+    # end of test_520_parseReferenceStrings
 # end of BibleReferencesTests class
 
 
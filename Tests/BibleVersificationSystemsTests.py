@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 #
 # BibleVersificationSystemsTests.py
-#   Last modified: 2014-12-15 (also update ProgVersion below)
+#   Last modified: 2015-05-08 (also update ProgVersion below)
 #
 # Module testing BibleVersificationSystems.py
 #
@@ -28,12 +28,13 @@ Module testing BibleVersificationSystemsConverter.py and BibleVersificationSyste
 """
 
 ProgName = "Bible Versification Systems tests"
-ProgVersion = '0.48'
+ProgVersion = '0.49'
 ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
 
 
-import sys, os.path
+import sys, os.path, shutil, tempfile
 import unittest
+from unittest import mock
 from collections import OrderedDict
 
 
@@ -223,6 +224,69 @@ class BibleVersificationSystemTests(unittest.TestCase):
 # end of BibleVersificationSystemTests class
 
 
+class BibleVersificationMappingTests(unittest.TestCase):
+    """ Unit tests for the BibleVersificationMapping object (and the reference versification conversions). """
+
+    def setUp( self ):
+        # Create the BibleVersificationSystems object
+        self.bvss = BibleVersificationSystems.BibleVersificationSystems().loadData( os.path.join( sourceFolder, "DataFiles/VersificationSystems/" ) ) # Doesn't reload the XML unnecessarily :)
+
+    def test_4010_alignBook( self ):
+        """ Test the _alignBook function with made-up verse counts. """
+        alignBook = BibleVersificationSystems._alignBook
+        self.assertEqual( alignBook( 'GEN', [3,4,5], [3,4,5] ), [(0,0,3),(3,3,4),(7,7,5)] )
+        self.assertEqual( alignBook( 'MAL', [14,17,18,6], [14,17,24] ), [(0,0,14),(14,14,17),(31,31,24)] ) # Chapter break in a different place
+        self.assertEqual( alignBook( 'GEN', [3,4,5], [3,6,5] ), [(0,0,3),(3,3,4),(7,9,5)] ) # Can't map the last two verses of chapter 2
+        self.assertEqual( alignBook( 'PSA', [6,8,9], [6,9,9] ), [(0,0,6),(6,6,8),(14,15,9)] ) # Not enough psalms to decide that titles are numbered
+        self.assertEqual( alignBook( 'PSA', [5]*30, [6]*30 )[:2], [(0,1,5),(5,7,5)] ) # Numbered titles
+        self.assertEqual( alignBook( 'PSA', [6]*30, [5]*30 )[:2], [(1,0,5),(7,5,5)] )
+        self.assertEqual( alignBook( 'PSA', [10,20,14], [10,11,20,14] ), [(0,0,10),(10,10,11),(21,32,9),(30,41,14)] ) # Psalm split with the verse numbers carried on
+    # end of test_4010_alignBook
+
+    def test_4020_referenceVersification( self ):
+        """ Test converting to and from the reference versification. """
+        bvs = BibleVersificationSystems.BibleVersificationSystem( 'KJV' )
+        for KJVRef, refRef in ( (('MAL','4','1'),('MAL','3','19')), (('JOL','2','28'),('JOL','3','1')), (('PSA','3','1'),('PSA','3','2')),
+                                (('EXO','8','1'),('EXO','7','26')), (('GEN','1','1'),('GEN','1','1')), (('PSA','10','1'),('PSA','10','1')), ):
+            self.assertEqual( bvs.convertToReferenceVersification( *KJVRef ), refRef+(None,) )
+            self.assertEqual( bvs.convertFromReferenceVersification( *refRef, refS='a' ), KJVRef+('a',) )
+        self.assertIsNone( bvs.convertFromReferenceVersification( 'PSA', '3', '1' ) ) # The psalm title isn't numbered in the KJV
+        self.assertIsNone( bvs.convertToReferenceVersification( 'MAL', '5', '1' ) ) # No such verse
+    # end of test_4020_referenceVersification
+
+    def test_4030_psalms( self ):
+        """ Test mapping the Psalms between systems which number them differently (via the reference versification). """
+        for systemName, refPairs in ( ('Vulgate1', ( (('PSA','9','1'),('PSA','9','2')), (('PSA','10','1'),('PSA','9','22')), (('PSA','11','1'),('PSA','10','1')),
+                                                    (('PSA','115','1'),('PSA','113','9')), (('PSA','116','10'),('PSA','115','1')), (('PSA','147','12'),('PSA','147','1')), ) ),
+                                    ('Vulgate', ( (('PSA','10','1'),('PSA','9','22')), (('PSA','11','1'),('PSA','10','1')), # The Stuttgart Vulgate numbers Psalms 115 and 147 from 10 and 12
+                                                    (('PSA','147','1'),('PSA','146','1')), (('PSA','147','12'),('PSA','147','12')), ) ), ):
+            mapping, reverseMapping = self.bvss.getVersificationMapping( 'KJV', systemName ), self.bvss.getVersificationMapping( systemName, 'KJV' )
+            for KJVRef, otherRef in refPairs:
+                self.assertEqual( mapping.convertReference( *KJVRef ), otherRef+(None,) )
+                self.assertEqual( reverseMapping.convertReference( *otherRef ), KJVRef+(None,) )
+            self.assertEqual( mapping.convertReferences( [KJVRef for KJVRef, otherRef in refPairs] ), [otherRef+(None,) for KJVRef, otherRef in refPairs] )
+        self.assertIsNone( self.bvss.getVersificationMapping( 'KJV', 'XYZ' ) )
+    # end of test_4030_psalms
+
+    def test_4040_cache( self ):
+        """ Test that the mapping tables are saved in the cache folder (not with the data files) and loaded from there. """
+        tempFolder = tempfile.mkdtemp( prefix='BOSMappingTest' )
+        cacheFolder = os.path.join( tempFolder, 'Mappings/' )
+        with mock.patch.object( BibleVersificationSystems, 'MAPPING_CACHE_FOLDER', cacheFolder ), \
+             mock.patch.dict( BibleVersificationSystems.loadedMappings, clear=True ):
+            mapping = self.bvss.getVersificationMapping( 'NRSV', 'Original' )
+            self.assertEqual( os.listdir( cacheFolder ), ['BibleVersificationMapping_NRSV_Original.pickle'] )
+            BibleVersificationSystems.loadedMappings.clear()
+            reloadedMapping = self.bvss.getVersificationMapping( 'NRSV', 'Original' )
+            self.assertIsNot( reloadedMapping, mapping )
+            self.assertEqual( reloadedMapping.table, mapping.table )
+            self.assertIs( self.bvss.getVersificationMapping( 'NRSV', 'Original' ), reloadedMapping )
+        self.assertFalse( os.path.exists( os.path.join( sourceFolder, "DataFiles/DerivedFiles/BibleVersificationMapping_NRSV_Original.pickle" ) ) )
+        shutil.rmtree( tempFolder )
+    # end of test_4040_cache
+# end of BibleVersificationMappingTests class
+
+
 if __name__ == '__main__':
     # Configure basic set-up
     parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
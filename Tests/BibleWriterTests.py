@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# BibleWriterTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing BibleWriter.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing BibleWriter.py.
+
+The external programs (ImageMagick convert and xelatex) are replaced by FakeProcess
+    which just makes the output files and remembers what it was asked to do.
+"""
+
+ProgName = "Bible writer tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, json, shutil, subprocess, tempfile, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, BibleWriter
+from USFMBible import USFMBible
+from VerseReferences import SimpleVerseKey
+
+
+USFM_TEST_FOLDER = 'Tests/DataFilesForTests/USFMTest2/' # This is a RELATIVE path
+USFM_TEST_FILENAMES = ( 'MBT01GEN.SCP', 'MBT41MAT.SCP', 'MBTV.SSF', )
+
+
+class FakeProcess:
+    """
+    Used instead of subprocess.Popen to make the output files that convert or xelatex would have made.
+    """
+    outputFilepaths = [] # The files that were made (set to a new list by each test)
+
+    def __init__( self, parameters, cwd=None, stdout=None, stderr=None ):
+        if parameters[-1].endswith( '.jpg' ): # convert writes the JPEG file given last
+            outputFilepaths = [ parameters[-1] ]
+        else: # xelatex writes the PDF and the log into its working folder
+            jobName = os.path.basename( parameters[-1] )[:-4] # Remove the .tex bit
+            outputFilepaths = [ os.path.join( cwd, jobName+extension ) for extension in ( '.pdf', '.log', ) ]
+        for outputFilepath in outputFilepaths:
+            with open( outputFilepath, 'wb' ) as outputFile: outputFile.write( b'Fake' )
+        FakeProcess.outputFilepaths.append( outputFilepaths[0] )
+        self.returncode = 0
+
+    def communicate( self, timeout=None ):
+        return b'', b''
+
+    def kill( self ):
+        pass
+# end of FakeProcess class
+
+
+def loadTestBible( folder, changeMatthew=False ):
+    """
+    Copies Genesis and Matthew from the test Bible into the given folder (adding a word to Matthew 1:2 if requested)
+        and then loads them.
+
+    Returns the loaded USFMBible.
+    """
+    if not os.path.isdir( folder ): os.makedirs( folder )
+    for filename in USFM_TEST_FILENAMES:
+        with open( os.path.join( USFM_TEST_FOLDER, filename ), 'rt', encoding='utf-8' ) as sourceFile: text = sourceFile.read()
+        if changeMatthew and 'MAT' in filename: text = text.replace( '\\v 2 ', '\\v 2 Changed ', 1 )
+        with open( os.path.join( folder, filename ), 'wt', encoding='utf-8' ) as outputFile: outputFile.write( text )
+    UB = USFMBible( folder, 'USFMTest2', 'T2' )
+    UB.load()
+    return UB
+# end of loadTestBible
+
+
+
+class BibleWriterTests( unittest.TestCase ):
+    """ Unit tests for the BibleWriter exports. """
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSWriterTest' )
+        self.outputFolder = os.path.join( self.tempFolder, 'Output/' )
+        self.savedMaxProcesses = BibleOrgSysGlobals.maxProcesses
+        BibleOrgSysGlobals.maxProcesses = 2 # So that the pools of workers are used
+        FakeProcess.outputFilepaths = []
+
+    def tearDown( self ):
+        BibleOrgSysGlobals.maxProcesses = self.savedMaxProcesses
+        shutil.rmtree( self.tempFolder )
+
+    def runExport( self, UB, exportFunctionName ):
+        """
+        Runs the export with the fake external program.
+
+        Returns a sorted list of the files that were made (relative to the output folder).
+        """
+        FakeProcess.outputFilepaths = []
+        with mock.patch.object( subprocess, 'Popen', FakeProcess ):
+            self.assertTrue( getattr( UB, exportFunctionName )( self.outputFolder ) )
+        return sorted( os.path.relpath( filepath, self.outputFolder ) for filepath in FakeProcess.outputFilepaths )
+    # end of runExport
+
+    def test_010_toPhotoBible( self ):
+        """ Test that only the PhotoBible pages which have changed are rendered again. """
+        UB = loadTestBible( os.path.join( self.tempFolder, 'Bible/' ) )
+        renderedPages = self.runExport( UB, 'toPhotoBible' )
+        self.assertTrue( any( page.startswith( 'OT/01-' ) for page in renderedPages ) )
+        self.assertTrue( any( page.startswith( 'NT/40-' ) for page in renderedPages ) )
+        renderInfoFilepath = os.path.join( self.outputFolder, BibleWriter.PHOTOBIBLE_RENDER_INFO_FILENAME )
+        with open( renderInfoFilepath, 'rt', encoding='utf-8' ) as renderInfoFile: renderInfo = json.load( renderInfoFile )
+        self.assertEqual( sorted( renderInfo['pageHashes'] ), renderedPages )
+        self.assertEqual( list( renderInfo['bookStats'] ), ['GEN','MAT'] )
+        self.assertEqual( sum( stats['pages'] for stats in renderInfo['bookStats'].values() ), len(renderedPages) )
+
+        # Nothing has changed so nothing is rendered
+        self.assertEqual( self.runExport( UB, 'toPhotoBible' ), [] )
+        with open( renderInfoFilepath, 'rt', encoding='utf-8' ) as renderInfoFile: renderInfo = json.load( renderInfoFile )
+        self.assertEqual( sorted( renderInfo['pageHashes'] ), renderedPages )
+        self.assertEqual( renderInfo['bookStats']['GEN']['unchanged'], renderInfo['bookStats']['GEN']['pages'] )
+
+        # Only Matthew has changed so only (some of) its pages are rendered
+        UB = loadTestBible( os.path.join( self.tempFolder, 'ChangedBible/' ), changeMatthew=True )
+        changedPages = self.runExport( UB, 'toPhotoBible' )
+        self.assertTrue( changedPages )
+        self.assertTrue( all( page.startswith( 'NT/40-' ) for page in changedPages ) )
+        self.assertLessEqual( len(changedPages), len([page for page in renderedPages if page.startswith( 'NT/40-' )]) )
+
+        # A missing page is rendered again
+        os.remove( os.path.join( self.outputFolder, renderedPages[0] ) )
+        self.assertEqual( self.runExport( UB, 'toPhotoBible' ), [renderedPages[0]] )
+    # end of test_010_toPhotoBible
+
+    def test_020_toTeX( self ):
+        """ Test that only the PDFs whose TeX files have changed are made again (and that the working folders are removed). """
+        def getJobNames( outputFilepaths ): # The PDFs are made in a working folder named after the job
+            return sorted( os.path.basename( os.path.dirname( filepath ) ) for filepath in outputFilepaths )
+        UB = loadTestBible( os.path.join( self.tempFolder, 'Bible/' ) )
+        allJobNames = [ '{}.{}'.format( jobName, filenamePart ) for jobName in ( '00-GEN_BOS-BibleWriter', '01-MAT_BOS-BibleWriter', 'All-BOS-BibleWriter', )
+                                                                for filenamePart in ( 'Bible1', 'Bible2', ) ]
+        self.assertEqual( getJobNames( self.runExport( UB, 'toTeX' ) ), allJobNames )
+        for jobName in allJobNames:
+            self.assertTrue( os.path.isfile( os.path.join( self.outputFolder, jobName+'.pdf' ) ) )
+            self.assertTrue( os.path.isfile( os.path.join( self.outputFolder, jobName+'.log' ) ) )
+        self.assertFalse( os.path.exists( os.path.join( self.outputFolder, BibleWriter.TEX_WORK_FOLDERNAME ) ) )
+        buildInfoFilepath = os.path.join( self.outputFolder, BibleWriter.TEX_BUILD_INFO_FILENAME )
+        with open( buildInfoFilepath, 'rt', encoding='utf-8' ) as buildInfoFile: buildInfo = json.load( buildInfoFile )
+        self.assertEqual( sorted( buildInfo['pdfHashes'] ), [jobName+'.pdf' for jobName in allJobNames] )
+
+        # Nothing has changed so nothing is made
+        self.assertEqual( self.runExport( UB, 'toTeX' ), [] )
+        with open( buildInfoFilepath, 'rt', encoding='utf-8' ) as buildInfoFile: self.assertEqual( json.load( buildInfoFile ), buildInfo )
+
+        # Only Matthew has changed so only its PDFs (and the whole Bible ones) are made
+        UB = loadTestBible( os.path.join( self.tempFolder, 'ChangedBible/' ), changeMatthew=True )
+        self.assertEqual( getJobNames( self.runExport( UB, 'toTeX' ) ), [jobName for jobName in allJobNames if not jobName.startswith( '00-GEN' )] )
+        self.assertFalse( os.path.exists( os.path.join( self.outputFolder, BibleWriter.TEX_WORK_FOLDERNAME ) ) )
+    # end of test_020_toTeX
+
+    def test_030_verseStream( self ):
+        """ Test the shared verse stream and the text and Markdown exports which use it. """
+        UB = loadTestBible( os.path.join( self.tempFolder, 'Bible/' ) )
+        records = UB._BibleWriter__getVerseStream( 'MAT', UB.books['MAT'] )
+        self.assertIs( UB._BibleWriter__getVerseStream( 'MAT', UB.books['MAT'] ), records ) # Cached
+        self.assertEqual( UB._BibleWriter__getVerseStream( 'MAT', None ), [] )
+        self.assertEqual( records[0][:4], ('0', None, None, None) ) # The book headings and introduction
+        self.assertEqual( [kind for kind,entry in records[0][4]][:3], ['header','header','header'] )
+        self.assertIn( 'introduction', [kind for kind,entry in records[0][4]] )
+        self.assertEqual( records[1][:4], ('1', None, None, None) )
+        self.assertEqual( records[3][:3], ('1', '2', '2') )
+        self.assertEqual( records[3][3], UB.getVerseText( SimpleVerseKey( 'MAT', '1', '2' ) ).lstrip( '¶' ) )
+        self.assertEqual( [record[1] for record in records if record[0]=='2'], [None] + [str(V) for V in range( 1, UB.getNumVerses( 'MAT', '2' )+1 )] )
+        for C, V, published, plainText, segments, notes in records: # Every field is kept (except the added ones)
+            for kind, entry in segments:
+                self.assertIn( kind, BibleWriter.VERSE_STREAM_SEGMENT_KINDS )
+                self.assertNotIn( '¬', entry.getMarker() )
+        self.assertEqual( sum( len(record[4]) for record in records ) + len(records) - 1, # Each record after the first starts with a c or v field
+                        len([entry for entry in UB.books['MAT']._processedLines if '¬' not in entry.getMarker()
+                                    and entry.getMarker() not in BibleWriter.BOS_ADDED_NESTING_MARKERS and entry.getMarker()!='vp~']) )
+
+        # The exports write the verses from the stream
+        self.assertTrue( UB.toText( self.outputFolder ) )
+        self.assertTrue( UB.toMarkdown( self.outputFolder ) )
+        with open( os.path.join( self.outputFolder, 'BOS-BibleWriter-MAT.txt' ), 'rt', encoding='utf-8' ) as textFile: textLines = textFile.read().split( '\n' )
+        with open( os.path.join( self.outputFolder, 'BOS-BibleWriter-MAT.md' ), 'rt', encoding='utf-8' ) as markdownFile: markdownText = markdownFile.read()
+        simpleRecords = [record for record in records if record[1] and [kind for kind,entry in record[4]]==['text'] and not record[5]] # No formatting or notes
+        self.assertGreater( len(simpleRecords), 400 )
+        for C, V, published, plainText, segments, notes in simpleRecords:
+            self.assertIn( '{} {}'.format( published, plainText ), textLines )
+            self.assertIn( plainText.strip(), markdownText )
+    # end of test_030_verseStream
+# end of BibleWriterTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of BibleWriterTests.py
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ESwordBibleTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing ESwordBible.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing ESwordBible.py.
+
+Uses the Wycliffe New Testament module in Tests/DataFilesForTests/e-SwordTest/
+    (which has a few verses missing and a few extra verses at the end of Revelation 12).
+"""
+
+ProgName = "e-Sword Bible tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, sqlite3, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+from ESwordBible import ESwordBible, ESwordBibleFileCheck, iterateBibleTableVerses
+from BibleOrganizationalSystems import BibleOrganizationalSystem
+from VerseReferences import SimpleVerseKey
+
+
+TEST_FOLDER = 'Tests/DataFilesForTests/e-SwordTest/' # This is a RELATIVE path
+TEST_FILENAME = 'Wycliffe_New_Testament(1385).bblx'
+NT_BOOKS = ['MAT', 'MRK', 'LUK', 'JHN', 'ACT', 'ROM', 'CO1', 'CO2', 'GAL', 'EPH', 'PHP', 'COL', 'TH1', 'TH2',
+            'TI1', 'TI2', 'TIT', 'PHM', 'HEB', 'JAM', 'PE1', 'PE2', 'JN1', 'JN2', 'JN3', 'JDE', 'REV']
+
+
+
+class ESwordBibleTests( unittest.TestCase ):
+    """ Unit tests for the ESwordBible object. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.eSwB = ESwordBible( TEST_FOLDER, TEST_FILENAME )
+        with mock.patch.object( BibleOrgSysGlobals, 'strictCheckingFlag', False ):
+            cls.eSwB.load()
+
+    def test_010_fileCheck( self ):
+        """ Test finding the e-Sword module. """
+        self.assertEqual( ESwordBibleFileCheck( TEST_FOLDER ), 1 )
+        self.assertFalse( ESwordBibleFileCheck( 'Tests/DataFilesForTests/USFMTest1/' ) )
+    # end of test_010_fileCheck
+
+    def test_020_books( self ):
+        """ Test that all of the NT books are loaded in order. """
+        self.assertEqual( list( self.eSwB.books ), NT_BOOKS )
+        self.assertEqual( self.eSwB.getNumChapters( 'MAT' ), 28 )
+        self.assertEqual( self.eSwB.getNumVerses( 'MAT', '28' ), 20 )
+        self.assertEqual( self.eSwB.getNumVerses( 'JDE', '1' ), 25 )
+    # end of test_020_books
+
+    def test_030_verses( self ):
+        """ Test the text of some verses (at the start and end of books). """
+        for reference, text in ( (('MAT','1','1'),"The book of the generacioun of Jhesu Crist, the sone of Dauid, the sone of Abraham."),
+                                (('MRK','16','20'),"And thei yeden forth, and prechiden euery where, for the Lord wrouyte with hem, and confermyde the word with signes folewynge."),
+                                (('JHN','3','16'),"For God louede so the world, that he yaf his `oon bigetun sone, that ech man that bileueth in him perische not, but haue euerlastynge lijf."),
+                                (('REV','22','21'),"The grace of oure Lord Jhesu Crist be with you alle. Amen."), ):
+            self.assertEqual( self.eSwB.getVerseText( SimpleVerseKey( *reference ) ), text )
+        self.assertRaises( KeyError, self.eSwB.getVerseText, SimpleVerseKey( 'REV', '12', '18' ) ) # Extra verses aren't loaded
+    # end of test_030_verses
+
+    def test_040_missingAndExtraVerses( self ):
+        """ Test that the missing and extra verses are logged (and that strict checking also checks for extra material). """
+        for strictFlag in ( False, True, ):
+            eSwB = ESwordBible( TEST_FOLDER, TEST_FILENAME )
+            with mock.patch.object( BibleOrgSysGlobals, 'strictCheckingFlag', strictFlag ), self.assertLogs( level='WARNING' ) as logs:
+                eSwB.load()
+            self.assertIn( "WARNING:root:ESwordBible.load: Found missing verse line at REV 10:11", logs.output )
+            self.assertTrue( any( line.startswith( "ERROR:root:ESwordBible.load: Found extra verse line at REV 12:18 " ) for line in logs.output ) )
+            self.assertEqual( any( line.startswith( "ERROR:root:checkForExtraMaterial: 1385 Wycliffe New Testament contains REV 12:18 " )
+                                    for line in logs.output ), strictFlag )
+            self.assertEqual( list( eSwB.books ), NT_BOOKS )
+    # end of test_040_missingAndExtraVerses
+
+    def test_050_iterateBibleTableVerses( self ):
+        """ Test merging the table rows against the expected verses. """
+        connection = sqlite3.connect( ':memory:' )
+        cursor = connection.cursor()
+        cursor.execute( 'create table Bible (Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+        cursor.executemany( 'insert into Bible values (?,?,?,?)', [ (66,1,1,'Rev 1:1'), (65,1,1,'Jude 1:1'), (65,1,1,'Jude 1:1 again'),
+                            (65,1,3,'Jude 1:3'), (65,1,26,'Jude 1:26'), (64,1,1,'3 John 1:1'), (67,1,1,'Tobit 1:1'), ] )
+        BOS = BibleOrganizationalSystem( 'GENERIC-KJV-66-ENG' )
+        with self.assertLogs( level='ERROR' ) as logs:
+            results = list( iterateBibleTableVerses( cursor, BOS, 'JDE', 2, 'Test' ) )
+        self.assertEqual( len(results), 25 + sum( BOS.getNumVersesList( 'REV' ) ) )
+        self.assertEqual( results[:4], [('JDE',1,1,'Jude 1:1'), ('JDE',1,2,None), ('JDE',1,3,'Jude 1:3'), ('JDE',1,4,None)] )
+        self.assertEqual( results[25], ('REV',1,1,'Rev 1:1') )
+        self.assertEqual( logs.output, [ "ERROR:root:Test: Found extra verse line at JN3 1:1 '3 John 1:1'",
+                                        "ERROR:root:Test: Ignored duplicate verse line at JDE 1:1 'Jude 1:1 again'",
+                                        "ERROR:root:Test: Found extra verse line at JDE 1:26 'Jude 1:26'",
+                                        "ERROR:root:Test: Found extra verse line at Book67 1:1 'Tobit 1:1'" ] )
+        connection.close()
+    # end of test_050_iterateBibleTableVerses
+# end of ESwordBibleTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of ESwordBibleTests.py
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ExportManifestTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing ExportManifest.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing ExportManifest.py (and the exports which use it to skip unchanged work).
+"""
+
+ProgName = "Export manifest tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, tempfile, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, BibleWriter
+from ExportManifest import ExportManifest, getSettingsHash, getSourceHash
+from USFMBible import USFMBible
+
+
+def getModifiedTimes( folder ):
+    """ Returns a dictionary of filename: modified time for the exported book files in the folder. """
+    return { filename:os.stat( os.path.join( folder, filename ) ).st_mtime_ns for filename in os.listdir( folder )
+                                                if filename.startswith( 'BOS-BibleWriter-' ) }
+# end of getModifiedTimes
+
+
+def setOldModifiedTimes( folder ):
+    """ Sets the modified times of the exported book files in the folder back to 1970 (so that any rewrite can be seen). """
+    for filename in getModifiedTimes( folder ):
+        os.utime( os.path.join( folder, filename ), (0,0) )
+# end of setOldModifiedTimes
+
+
+
+class ExportManifestTests( unittest.TestCase ):
+    """ Unit tests for the ExportManifest object. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        for BBB in ( 'GEN', 'MAT', ): cls.UB.loadBook( BBB )
+        cls.UB.doPostLoadProcessing()
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSManifestTest' )
+        self.manifestFilepath = os.path.join( self.tempFolder, 'Manifest.json' )
+        self.savedMaxProcesses = BibleOrgSysGlobals.maxProcesses
+
+    def tearDown( self ):
+        BibleOrgSysGlobals.maxProcesses = self.savedMaxProcesses
+        shutil.rmtree( self.tempFolder )
+
+    def writeEntries( self, settingsHash, contents ):
+        """
+        Writes a file for each entry (unless it's unchanged) and saves the manifest.
+
+        Returns a list of the keys of the entries which were written.
+        """
+        manifest = ExportManifest( self.manifestFilepath, settingsHash )
+        written = []
+        for key, text in sorted( contents.items() ):
+            contentHash = getSettingsHash( text )
+            if manifest.isUnchanged( key, contentHash ): continue
+            filepath = os.path.join( self.tempFolder, key + '.txt' )
+            with open( filepath, 'wt' ) as myFile: myFile.write( text )
+            manifest.setEntry( key, contentHash, [filepath] )
+            written.append( key )
+        manifest.removeOtherEntries( contents )
+        manifest.save()
+        return written
+    # end of writeEntries
+
+    def test_010_unchanged( self ):
+        """ Test that only the changed entries are written again. """
+        settingsHash = getSettingsHash( 'Test', 1 )
+        self.assertEqual( self.writeEntries( settingsHash, {'A':'One','B':'Two'} ), ['A','B'] )
+        self.assertEqual( self.writeEntries( settingsHash, {'A':'One','B':'Two'} ), [] )
+        self.assertEqual( self.writeEntries( settingsHash, {'A':'One','B':'Two!'} ), ['B'] )
+        os.remove( os.path.join( self.tempFolder, 'A.txt' ) )
+        self.assertEqual( self.writeEntries( settingsHash, {'A':'One','B':'Two!'} ), ['A'] ) # Because its file was missing
+        manifest = ExportManifest( self.manifestFilepath, settingsHash )
+        self.assertTrue( manifest.isAllUnchanged( {'A':getSettingsHash( 'One' ), 'B':getSettingsHash( 'Two!' )} ) )
+        self.assertFalse( manifest.isAllUnchanged( {'A':getSettingsHash( 'One' )} ) )
+        self.assertEqual( manifest.getFilepaths( 'B' ), [os.path.join( self.tempFolder, 'B.txt' )] )
+        self.assertFalse( manifest.hasChanged() )
+        manifest.removeEntry( 'B' )
+        self.assertTrue( manifest.hasChanged() )
+    # end of test_010_unchanged
+
+    def test_020_settingsChanged( self ):
+        """ Test that everything is written again if the settings have changed. """
+        self.assertEqual( self.writeEntries( getSettingsHash( 'Test', 1 ), {'A':'One','B':'Two'} ), ['A','B'] )
+        self.assertEqual( self.writeEntries( getSettingsHash( 'Test', 2 ), {'A':'One','B':'Two'} ), ['A','B'] )
+        with open( self.manifestFilepath, 'wt' ) as manifestFile: manifestFile.write( 'Not JSON' )
+        self.assertEqual( self.writeEntries( getSettingsHash( 'Test', 2 ), {'A':'One','B':'Two'} ), ['A','B'] )
+    # end of test_020_settingsChanged
+
+    def test_030_removeOtherEntries( self ):
+        """ Test that the files of entries which have gone are deleted. """
+        self.writeEntries( None, {'A':'One','B':'Two','C':'Three'} )
+        self.writeEntries( None, {'A':'One','C':'Three'} )
+        self.assertEqual( sorted( os.listdir( self.tempFolder ) ), ['A.txt','C.txt','Manifest.json'] )
+    # end of test_030_removeOtherEntries
+
+    def test_040_sourceHash( self ):
+        """ Test that the source hash depends on the code. """
+        self.assertEqual( getSourceHash( getSettingsHash ), getSourceHash( getSettingsHash ) )
+        self.assertNotEqual( getSourceHash( getSettingsHash ), getSourceHash( getSourceHash ) )
+        self.assertNotEqual( getSourceHash( getSettingsHash, getSourceHash ), getSourceHash( getSourceHash, getSettingsHash ) )
+        self.assertNotEqual( getSourceHash( BibleWriter.BibleWriter ), getSourceHash( BibleWriter.BibleWriter, BibleWriter.MLWriter ) )
+    # end of test_040_sourceHash
+
+    def test_050_textExport( self ):
+        """ Test that a per-book export only rewrites books if the contents or the exporter have changed. """
+        self.assertTrue( self.UB.toText( self.tempFolder ) )
+        self.assertTrue( os.path.isfile( os.path.join( self.tempFolder, 'BOS-BibleWriter-GEN.txt' ) ) )
+        setOldModifiedTimes( self.tempFolder )
+        self.assertTrue( self.UB.toText( self.tempFolder ) )
+        self.assertEqual( set( getModifiedTimes( self.tempFolder ).values() ), {0} ) # Nothing was written
+        with mock.patch.object( BibleWriter, 'getSourceHash', lambda *sourceObjects: 'A different exporter' ):
+            self.assertTrue( self.UB.toText( self.tempFolder ) )
+        modifiedTimes = getModifiedTimes( self.tempFolder )
+        self.assertNotEqual( modifiedTimes['BOS-BibleWriter-GEN.txt'], 0 )
+        self.assertNotEqual( modifiedTimes['BOS-BibleWriter-MAT.txt'], 0 )
+    # end of test_050_textExport
+
+    def test_060_doAllExports( self ):
+        """ Test that unchanged exports are skipped (and aren't reported as successful). """
+        BibleOrgSysGlobals.maxProcesses = 1
+        textTask = [task for task in BibleWriter.EXPORT_TASKS if task[0]=='textExport']
+        textFolder = os.path.join( self.tempFolder, textTask[0][2] )
+        with mock.patch.object( BibleWriter, 'EXPORT_TASKS', textTask ):
+            self.assertTrue( self.UB.doAllExports( self.tempFolder )['textExport'] )
+            setOldModifiedTimes( textFolder )
+            self.assertIsNone( self.UB.doAllExports( self.tempFolder )['textExport'] )
+            self.assertEqual( set( getModifiedTimes( textFolder ).values() ), {0} ) # Nothing was written
+            with mock.patch.object( BibleWriter, 'getSourceHash', lambda *sourceObjects: 'A different exporter' ):
+                self.assertTrue( self.UB.doAllExports( self.tempFolder )['textExport'] )
+        self.assertNotEqual( getModifiedTimes( textFolder )['BOS-BibleWriter-GEN.txt'], 0 )
+    # end of test_060_doAllExports
+# end of ExportManifestTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of ExportManifestTests.py
@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# InternalBibleCacheTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing InternalBibleCache.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing InternalBibleCache.py
+    (and the compact InternalBibleInternals entries that it caches).
+"""
+
+ProgName = "Internal Bible cache tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, pickle, shutil, tempfile, time, unittest
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, InternalBibleCache
+from USFMBible import USFMBible
+
+
+def entryFields( entry ):
+    """ Returns the fields of an InternalBibleEntry (including its extras) for comparing. """
+    extras = None if entry.getExtras() is None \
+        else [(extra.getType(), extra.getIndex(), extra.getText(), extra.getCleanText()) for extra in entry.getExtras()]
+    return entry.getMarker(), entry.getOriginalMarker(), entry.getAdjustedText(), entry.getCleanText(), entry.getOriginalText(), extras
+# end of entryFields
+
+
+
+class InternalBibleCacheTests( unittest.TestCase ):
+    """ Unit tests for writing and reading binary Bible caches. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.sourceFolder = 'Tests/DataFilesForTests/USFMTest2/' # This is a RELATIVE path
+        cls.UB = USFMBible( cls.sourceFolder, 'USFMTest2', 'T2' )
+        cls.UB.load() # Only load it once for all the tests
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSCacheTest' )
+        self.cacheFilepath = os.path.join( self.tempFolder, 'T2' + InternalBibleCache.BINARY_CACHE_FILENAME_EXTENSION )
+        self.assertTrue( InternalBibleCache.writeBinaryCache( self.UB, self.cacheFilepath ) )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def test_010_header( self ):
+        """ Test the book table and metadata. """
+        cachedBible = InternalBibleCache.BinaryCachedBible( self.cacheFilepath )
+        self.assertEqual( cachedBible.getBookList(), list( self.UB.books.keys() ) )
+        self.assertEqual( len(cachedBible), len(self.UB.books) )
+        for BBB in self.UB.books: self.assertTrue( BBB in cachedBible )
+        self.assertFalse( 'EXO' in cachedBible )
+        self.assertEqual( cachedBible.abbreviation, 'T2' )
+        self.assertEqual( cachedBible.sourcePath, self.sourceFolder )
+        self.assertTrue( isinstance( str(cachedBible), str ) )
+        cachedBible.close()
+    # end of test_010_header
+
+    def test_020_roundTrip( self ):
+        """ Test that every verse comes back out exactly as it went in. """
+        cachedBible = InternalBibleCache.loadBinaryCache( self.cacheFilepath )
+        self.assertIsNotNone( cachedBible )
+        numVerses = 0
+        for BBB,bookObject in self.UB.books.items():
+            self.assertEqual( cachedBible.getCVList( BBB ), list( bookObject._CVIndex ) )
+            for C,V in bookObject._CVIndex:
+                originalEntries, originalContext = bookObject._CVIndex.getEntriesWithContext( (C,V) )
+                cachedEntries, cachedContext = cachedBible.getContextVerseData( (BBB,C,V) )
+                self.assertEqual( cachedContext, originalContext )
+                self.assertEqual( [entryFields(entry) for entry in cachedEntries], [entryFields(entry) for entry in originalEntries] )
+                numVerses += 1
+        self.assertGreater( numVerses, 100 )
+        cachedBible.close()
+    # end of test_020_roundTrip
+
+    def test_030_missingReferences( self ):
+        """ Test the error paths for references that aren't in the cache. """
+        cachedBible = InternalBibleCache.loadBinaryCache( self.cacheFilepath )
+        self.assertIsNone( cachedBible.getContextVerseData( ('EXO','1','1') ) )
+        self.assertRaises( KeyError, cachedBible.getContextVerseData, ('GEN','999','1') )
+        self.assertRaises( KeyError, cachedBible.getCVList, 'EXO' )
+        self.assertRaises( TypeError, pickle.dumps, cachedBible )
+        cachedBible.close()
+    # end of test_030_missingReferences
+
+    def test_040_invalidFiles( self ):
+        """ Test that invalid cache files are rejected. """
+        self.assertIsNone( InternalBibleCache.loadBinaryCache( os.path.join( self.tempFolder, 'NoSuchFile' ) ) )
+        for badContents in ( b'', b'NotACacheFile', b'BOSCache\xff\xff' + bytes(20), ):
+            badFilepath = os.path.join( self.tempFolder, 'Bad.BOSCache' )
+            with open( badFilepath, 'wb' ) as badFile: badFile.write( badContents )
+            self.assertRaises( ValueError, InternalBibleCache.BinaryCachedBible, badFilepath )
+            self.assertIsNone( InternalBibleCache.loadBinaryCache( badFilepath ) )
+    # end of test_040_invalidFiles
+
+    def test_050_outOfDate( self ):
+        """ Test that a cache is rejected once its source is modified. """
+        sourceFolder = os.path.join( self.tempFolder, 'Source' )
+        shutil.copytree( self.sourceFolder, sourceFolder )
+        oldTime = time.time() - 100
+        for filename in os.listdir( sourceFolder ): os.utime( os.path.join( sourceFolder, filename ), (oldTime,oldTime) )
+        os.utime( sourceFolder, (oldTime,oldTime) )
+        InternalBibleCache.writeBinaryCache( self.UB, self.cacheFilepath, sourceFolder )
+        cachedBible = InternalBibleCache.loadBinaryCache( self.cacheFilepath )
+        self.assertIsNotNone( cachedBible )
+        self.assertFalse( cachedBible.isOutOfDate() )
+        cachedBible.close()
+        os.utime( os.path.join( sourceFolder, 'MBT67REV.SCP' ), None ) # Touch one of the source files
+        self.assertIsNone( InternalBibleCache.loadBinaryCache( self.cacheFilepath ) )
+    # end of test_050_outOfDate
+
+    def test_060_compactEntries( self ):
+        """ Test the compact (__slots__) layout of the entries and extras which are cached. """
+        from InternalBibleInternals import InternalBibleEntry, InternalBibleExtra, InternalBibleExtraList, EMPTY_EXTRA_LIST, measureEntryMemory
+        for entry in self.UB.books['MAT']._processedLines:
+            self.assertFalse( hasattr( entry, '__dict__' ) )
+            for extra in entry.getExtras() or (): self.assertFalse( hasattr( extra, '__dict__' ) )
+        entry1 = InternalBibleEntry( 'c', 'c', '12', '12', InternalBibleExtraList(), '12' )
+        entry2 = InternalBibleEntry( ''.join( ['c'] ), 'c', ''.join( ['1','2'] ), ''.join( ['1','2'] ), InternalBibleExtraList(), '12' )
+        self.assertIs( entry2.getMarker(), entry1.getMarker() ) # Interned
+        self.assertIs( entry2.getAdjustedText(), entry1.getAdjustedText() )
+        self.assertIs( entry2.getCleanText(), entry2.getAdjustedText() )
+        self.assertIs( entry2.getExtras(), EMPTY_EXTRA_LIST )
+        self.assertRaises( AttributeError, EMPTY_EXTRA_LIST.append, InternalBibleExtra( 'fn', 1, 'Note', 'Note' ) )
+        longText = 'In the beginning'
+        entry3 = InternalBibleEntry( 'v~', 'v~', longText, ''.join( longText ), None, longText[:] )
+        self.assertIs( entry3.getCleanText(), entry3.getAdjustedText() ) # Equal texts are shared
+        for protocol in range( 2, pickle.HIGHEST_PROTOCOL+1 ): # The protocols which can handle __slots__
+            self.assertEqual( entryFields( pickle.loads( pickle.dumps( entry3, protocol ) ) ), entryFields( entry3 ) )
+        oldEntry = InternalBibleEntry.__new__( InternalBibleEntry ) # As unpickled from before the entries had __slots__
+        oldEntry.__setstate__( { 'marker':'v~', 'originalMarker':'v~', 'adjustedText':longText, 'cleanText':longText, 'extras':None, 'originalText':longText } )
+        self.assertEqual( entryFields( oldEntry ), entryFields( entry3 ) )
+        results = measureEntryMemory( self.UB )
+        self.assertEqual( results['numEntries'], sum( len(bookObject._processedLines) for bookObject in self.UB.books.values() ) )
+        self.assertLess( results['afterBytesPerEntry'], results['beforeBytesPerEntry'] )
+    # end of test_060_compactEntries
+# end of InternalBibleCacheTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of InternalBibleCacheTests.py
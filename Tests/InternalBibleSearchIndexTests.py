@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# InternalBibleSearchIndexTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing InternalBibleSearchIndex.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing InternalBibleSearchIndex.py.
+
+The index results are checked against simply searching through the processed lines.
+"""
+
+ProgName = "Internal Bible search index tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, pickle, shutil, tempfile, unittest
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, InternalBibleSearchIndex
+from InternalBibleBook import getCleanWords
+from USFMBible import USFMBible
+
+
+def getVerseWords( bibleName, BibleObject ):
+    """
+    Returns a list of ((bibleName,BBB,C,V), lowerCaseWordList) 2-tuples
+        found by going through the processed lines of each book.
+    """
+    results = []
+    for BBB,bookObject in BibleObject.books.items():
+        C, V, words = '0', '0', None
+        for entry in bookObject._processedLines:
+            marker = entry.getMarker()
+            if marker in ( 'c', 'v', ):
+                if entry.getText():
+                    if marker == 'c': C, V = entry.getText().split()[0], '0'
+                    else: V = entry.getText().split()[0]
+                words = None
+            elif marker in InternalBibleSearchIndex.INDEXED_MARKERS and entry.getCleanText():
+                if words is None:
+                    words = []
+                    results.append( ((bibleName,BBB,C,V), words) )
+                words.extend( word.lower() for word in getCleanWords( entry.getCleanText() ) )
+    return results
+# end of getVerseWords
+
+
+
+class InternalBibleSearchIndexTests( unittest.TestCase ):
+    """ Unit tests for the InternalBibleSearchIndex object. """
+
+    @classmethod
+    def setUpClass( cls ):
+        testFolder = 'Tests/DataFilesForTests/USFMTest2/' # This is a RELATIVE path
+        cls.UB = USFMBible( testFolder, 'USFMTest2', 'T2' )
+        cls.UB.load() # Only load it once for all the tests
+        cls.verseWords = getVerseWords( 'T2', cls.UB )
+
+    def setUp( self ):
+        self.searchIndex = InternalBibleSearchIndex.InternalBibleSearchIndex()
+        self.searchIndex.addBible( self.UB )
+
+    def findVerses( self, testFunction ):
+        """ Returns the references of the verses where testFunction( lowerCaseWordList ) is True. """
+        return [reference for reference,words in self.verseWords if testFunction( words )]
+    # end of findVerses
+
+    def test_010_basics( self ):
+        """ Test the index contents. """
+        self.assertEqual( len(self.searchIndex), len(self.UB.books) )
+        self.assertEqual( self.searchIndex.getBibleNames(), ['T2'] )
+        self.assertTrue( isinstance( str(self.searchIndex), str ) )
+        self.assertGreater( len(self.verseWords), 100 )
+    # end of test_010_basics
+
+    def test_020_findWord( self ):
+        """ Test finding single words (case insensitively). """
+        for word in ( 'Manama', 'manama', 'MANAMA', 'kalibutan', 'Jesus', 'NoSuchWord', ):
+            expected = self.findVerses( lambda words: word.lower() in words )
+            self.assertEqual( self.searchIndex.findWord( word ), expected )
+        self.assertGreater( len( self.searchIndex.findWord( 'Manama' ) ), 10 )
+        self.assertEqual( self.searchIndex.findWord( 'NoSuchWord' ), [] )
+        self.assertEqual( self.searchIndex.getWordCount( 'Manama' ), sum( words.count( 'manama' ) for reference,words in self.verseWords ) )
+    # end of test_020_findWord
+
+    def test_030_findWords( self ):
+        """ Test finding any of several words. """
+        expected = self.findVerses( lambda words: 'langit' in words or 'kalibutan' in words )
+        self.assertEqual( self.searchIndex.findWords( ('langit','Kalibutan') ), expected )
+    # end of test_030_findWords
+
+    def test_040_findPrefix( self ):
+        """ Test finding words by their beginnings. """
+        for prefix in ( 'kalibut', 'Mana', 'zzz', ):
+            expected = self.findVerses( lambda words: any( word.startswith( prefix.lower() ) for word in words ) )
+            self.assertEqual( self.searchIndex.findPrefix( prefix ), expected )
+    # end of test_040_findPrefix
+
+    def test_050_findPhrase( self ):
+        """ Test finding phrases (words in order in the same verse). """
+        def containsPhrase( words, phraseWords ):
+            return any( words[j:j+len(phraseWords)] == phraseWords for j in range( len(words) ) )
+        for phrase in ( 'te Manama', 'ka langit wey ka kalibutan', 'Manama te', 'kalibutan ka langit', 'NoSuch phrase', ):
+            phraseWords = [word.lower() for word in getCleanWords( phrase )]
+            expected = self.findVerses( lambda words: containsPhrase( words, phraseWords ) )
+            self.assertEqual( self.searchIndex.findPhrase( phrase ), expected )
+        self.assertGreater( len( self.searchIndex.findPhrase( 'te Manama' ) ), 5 )
+        self.assertEqual( self.searchIndex.findPhrase( '.,;' ), [] ) # Nothing left to search for
+    # end of test_050_findPhrase
+
+    def test_060_restrictions( self ):
+        """ Test restricting searches to some Bibles and books. """
+        allResults = self.searchIndex.findWord( 'Manama' )
+        self.assertEqual( self.searchIndex.findWord( 'Manama', BBBList=['MAT'] ), [result for result in allResults if result[1]=='MAT'] )
+        self.assertEqual( self.searchIndex.findWord( 'Manama', bibleNames=['T2'] ), allResults )
+        self.assertEqual( self.searchIndex.findWord( 'Manama', bibleNames=['Other'] ), [] )
+    # end of test_060_restrictions
+
+    def test_070_mergeAndRemove( self ):
+        """ Test combining indexes for several Bibles. """
+        otherIndex = InternalBibleSearchIndex.InternalBibleSearchIndex()
+        otherIndex.addBook( self.UB.books['MAT'], 'Other' )
+        self.searchIndex.merge( otherIndex )
+        self.assertEqual( self.searchIndex.getBibleNames(), ['T2','Other'] )
+        results = self.searchIndex.findPrefix( 'Manam' )
+        self.assertEqual( [result[1:] for result in results if result[0]=='Other'],
+                          [result[1:] for result in results if result[0]=='T2' and result[1]=='MAT'] )
+        self.searchIndex.removeBible( 'T2' )
+        self.assertEqual( self.searchIndex.getBibleNames(), ['Other'] )
+        self.assertEqual( len(self.searchIndex), 1 )
+        self.assertTrue( all( result[0]=='Other' for result in self.searchIndex.findPrefix( 'Manam' ) ) )
+    # end of test_070_mergeAndRemove
+
+    def test_080_saveAndLoad( self ):
+        """ Test saving and reloading the index. """
+        tempFolder = tempfile.mkdtemp( prefix='BOSIndexTest' )
+        try:
+            indexFilepath = os.path.join( tempFolder, 'Sub', 'T2' + InternalBibleSearchIndex.SEARCH_INDEX_FILENAME_EXTENSION )
+            self.searchIndex.save( indexFilepath )
+            loadedIndex = InternalBibleSearchIndex.loadSearchIndex( indexFilepath )
+            self.assertEqual( len(loadedIndex), len(self.searchIndex) )
+            for query in ( 'Manama', 'kalibutan', ):
+                self.assertEqual( loadedIndex.findWord( query ), self.searchIndex.findWord( query ) )
+            self.assertEqual( loadedIndex.findPhrase( 'te Manama' ), self.searchIndex.findPhrase( 'te Manama' ) )
+            self.assertIsNone( InternalBibleSearchIndex.loadSearchIndex( os.path.join( tempFolder, 'NoSuchFile' ) ) )
+            with open( indexFilepath, 'wb' ) as indexFile: # Write an index with the wrong version number
+                pickle.dump( (InternalBibleSearchIndex.SEARCH_INDEX_VERSION+1, []), indexFile )
+            self.assertIsNone( InternalBibleSearchIndex.loadSearchIndex( indexFilepath ) )
+        finally: shutil.rmtree( tempFolder )
+    # end of test_080_saveAndLoad
+# end of InternalBibleSearchIndexTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of InternalBibleSearchIndexTests.py
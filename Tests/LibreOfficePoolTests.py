@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# LibreOfficePoolTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing LibreOfficePool.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing LibreOfficePool.py.
+
+These tests don't need LibreOffice (or UNO): each worker just starts
+    a sleeping Python process instead, and its "desktop" is a FakeDesktop
+    whose calls fail once that process has been killed.
+"""
+
+ProgName = "LibreOffice pool tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, subprocess, time, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, LibreOfficePool
+
+
+JOB_TIMEOUT = 0.5 # seconds
+crashedJobNames = set()
+
+
+
+class FakeDesktop:
+    """
+    Stands in for the com.sun.star.frame.Desktop of a worker.
+    """
+    def __init__( self, worker ): self.worker = worker
+
+    def isAlive( self ):
+        """ Returns False if the worker's process has been killed. """
+        return self.worker.process is None or self.worker.process.poll() is None
+
+    def terminate( self ):
+        if self.worker.process is not None: self.worker.process.kill()
+# end of FakeDesktop class
+
+
+def fakeStart( worker ):
+    """ Used instead of LibreOfficeWorker.start. """
+    worker.startCount += 1
+    if worker.programPath: # Start a process that can be killed
+        worker.process = subprocess.Popen( [sys.executable, '-c', 'import time; time.sleep( 60 )'] )
+    worker.desktop = FakeDesktop( worker )
+# end of fakeStart
+
+
+def doJob( desktop, job ):
+    """
+    The job function: the job is a 2-tuple with a name and what to do.
+    """
+    name, action = job
+    if action == 'hang': # Waits until it's killed like a UNO call would
+        while desktop.isAlive(): time.sleep( 0.05 )
+        raise RuntimeError( "Lost the connection" )
+    if action == 'slow': time.sleep( JOB_TIMEOUT * 3 )
+    elif action == 'crash' and name not in crashedJobNames: # Only the first time
+        crashedJobNames.add( name )
+        raise RuntimeError( "Crashed" )
+    if not desktop.isAlive(): raise RuntimeError( "Lost the connection" )
+    return name.upper()
+# end of doJob
+
+
+
+class LibreOfficePoolTests( unittest.TestCase ):
+    """ Unit tests for the LibreOfficePool object. """
+
+    def setUp( self ):
+        patcher = mock.patch.object( LibreOfficePool.LibreOfficeWorker, 'start', fakeStart )
+        patcher.start()
+        self.addCleanup( patcher.stop )
+
+    def runJobs( self, pool, jobs ):
+        """ Returns a dictionary of job name: (result, successFlag). """
+        return { job[0]:(result, successFlag) for job, result, successFlag in pool.run( doJob, jobs, JOB_TIMEOUT ) }
+    # end of runJobs
+
+    def test_010_run( self ):
+        """ Test that all the jobs are done on the workers. """
+        for numWorkers in ( 1, 3, ):
+            with LibreOfficePool.LibreOfficePool( numWorkers, programPath='soffice' ) as pool:
+                jobs = [('job{}'.format( j ), 'quick') for j in range( 7 )]
+                self.assertEqual( self.runJobs( pool, jobs ), { name:(name.upper(), True) for name, action in jobs } )
+                self.assertEqual( sum( worker.jobCount for worker in pool.workers ), len(jobs) )
+                self.assertLessEqual( sum( worker.startCount for worker in pool.workers ), numWorkers )
+            for worker in pool.workers: self.assertIsNone( worker.process )
+    # end of test_010_run
+
+    def test_020_crash( self ):
+        """ Test that a job is tried again (on a restarted worker) if it crashes. """
+        with LibreOfficePool.LibreOfficePool( 1, programPath='soffice' ) as pool:
+            self.assertEqual( self.runJobs( pool, [('job1','crash'),('job2','quick')] ), {'job1':('JOB1',True), 'job2':('JOB2',True)} )
+            self.assertEqual( pool.workers[0].startCount, 2 )
+    # end of test_020_crash
+
+    def test_030_timeout( self ):
+        """ Test that a job which hangs is killed (and not retried) and the worker is restarted for the next job. """
+        with LibreOfficePool.LibreOfficePool( 1, programPath='soffice' ) as pool:
+            self.assertEqual( self.runJobs( pool, [('job1','hang'),('job2','quick')] ), {'job1':(None,False), 'job2':('JOB2',True)} )
+            self.assertEqual( pool.workers[0].startCount, 2 )
+            self.assertEqual( pool.workers[0].jobCount, 1 )
+    # end of test_030_timeout
+
+    def test_040_timerCancelled( self ):
+        """ Test that the timer can't kill a worker after its job has finished. """
+        with LibreOfficePool.LibreOfficePool( 1, programPath='soffice' ) as pool:
+            self.assertEqual( self.runJobs( pool, [('job1','quick')] ), {'job1':('JOB1',True)} )
+            process = pool.workers[0].process
+            time.sleep( JOB_TIMEOUT * 2 )
+            self.assertIsNone( process.poll() ) # Still running
+    # end of test_040_timerCancelled
+
+    def test_050_server( self ):
+        """ Test that a slow job on a server that we didn't start fails without trying to kill anything. """
+        with mock.patch.object( LibreOfficePool, 'findLibreOffice', return_value=None ), \
+             mock.patch.object( LibreOfficePool.LibreOfficeWorker, 'kill' ) as mockKill:
+            with LibreOfficePool.LibreOfficePool( 3 ) as pool:
+                self.assertEqual( len(pool.workers), 1 )
+                self.assertEqual( self.runJobs( pool, [('job1','slow'),('job2','quick')] ), {'job1':(None,False), 'job2':('JOB2',True)} )
+                self.assertEqual( pool.workers[0].startCount, 2 ) # Reconnected for the next job
+            mockKill.assert_not_called()
+    # end of test_050_server
+# end of LibreOfficePoolTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of LibreOfficePoolTests.py
@@ -0,0 +1,224 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# MLWriterTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing MLWriter.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing MLWriter.py.
+
+The output of the (chunked) MLWriter is compared with the output of
+    the previous string-concatenation buffer (kept here as ConcatenatingMLWriter).
+"""
+
+ProgName = "ML writer tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, filecmp, gzip, logging, lzma, shutil, tempfile, time, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, BibleWriter
+from MLWriter import MLWriter
+
+
+class ConcatenatingMLWriter( MLWriter ):
+    """
+    The previous string-concatenation buffer -- used to check that the output hasn't changed.
+    """
+    def __init__( self, filename, folder=None, outputType=None ):
+        MLWriter.__init__( self, filename, folder, outputType )
+        self._buffer, self._bufferFlushSize = '', 1000
+
+    def _writeBuffer( self, writeAll=True ):
+        if self._buffer:
+            if writeAll:
+                self._writeToFile( self._buffer )
+                self._buffer = ''
+            elif len(self._buffer) > self._bufferSaveSize:
+                self._writeToFile( self._buffer[:-self._bufferSaveSize] )
+                self._buffer = self._buffer[-self._bufferSaveSize:]
+
+    def _writeToBuffer( self, string ):
+        if len(self._buffer) >= self._bufferFlushSize: self._writeBuffer( False )
+        self._buffer += string
+
+    def removeFinalNewline( self, suppressFollowingIndent=False ):
+        if self._buffer.endswith( self._nl ): self._buffer = self._buffer[:-len(self._nl)]
+        else: logging.error( "MLWriter: No newline to remove" )
+        self._suppressFollowingIndent = suppressFollowingIndent
+
+    def setFastMode( self, value=True ):
+        pass # The old writer always checked everything
+# end of ConcatenatingMLWriter class
+
+
+def writeTestFile( writerClass, folder, filename='test.xml', numVerses=2000, **startArgs ):
+    """
+    Writes a test XML file (big enough to need flushing several times) with the given writer class.
+
+    Returns the writer object.
+    """
+    mlWr = writerClass( filename, folder )
+    mlWr.setHumanReadable( 'All' )
+    mlWr.start( **startArgs )
+    mlWr.setSectionName( 'Header' )
+    mlWr.writeLineOpen( 'bible', [('xmlns','http://someURL.net/namespace'),('id','Test')] )
+    mlWr.writeLineOpenClose( 'title', 'Test Bible ‘quoted’' )
+    mlWr.setSectionName( 'Main' )
+    mlWr.writeLineOpen( 'book', ('code','GEN') )
+    for v in range( 1, numVerses+1 ):
+        mlWr.writeLineOpenSelfclose( 'verse', [('osisID','Gen.1.{}'.format( v ))] )
+        mlWr.writeLineText( 'Verse {} text with some words in it'.format( v ) )
+        if v % 7 == 0:
+            mlWr.writeLineOpen( 'note' )
+            mlWr.removeFinalNewline( True )
+            mlWr.writeLineText( 'A note', noNL=True )
+            mlWr.writeLineClose( 'note' )
+    mlWr.autoClose()
+    return mlWr
+# end of writeTestFile
+
+
+
+class MLWriterTests( unittest.TestCase ):
+    """ Unit tests for the MLWriter object. """
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSMLWriterTest' )
+        self.oldFolder, self.newFolder = os.path.join( self.tempFolder, 'Old' ), os.path.join( self.tempFolder, 'New' )
+        os.mkdir( self.oldFolder ); os.mkdir( self.newFolder )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def test_010_sameOutput( self ):
+        """ Test that the chunked buffer writes exactly the same files as the old buffer. """
+        for startArgs in ( {}, {'lineEndings':'w'}, {'writeBOM':True}, {'noAutoXML':True}, ):
+            for numVerses in ( 1, 2000, ):
+                writeTestFile( ConcatenatingMLWriter, self.oldFolder, numVerses=numVerses, **startArgs )
+                writeTestFile( MLWriter, self.newFolder, numVerses=numVerses, **startArgs )
+                self.assertTrue( filecmp.cmp( os.path.join( self.oldFolder, 'test.xml' ), os.path.join( self.newFolder, 'test.xml' ), shallow=False ) )
+        self.assertGreater( os.path.getsize( os.path.join( self.newFolder, 'test.xml' ) ), 2 * 65536 ) # So several flushes were needed
+    # end of test_010_sameOutput
+
+    def test_020_removeFinalNewline( self ):
+        """ Test removing a newline that's split across buffer chunks. """
+        mlWr = MLWriter( 'test.xml', self.newFolder )
+        mlWr.start( lineEndings='w', noAutoXML=True )
+        mlWr.writeLineText( 'Text', noNL=True )
+        mlWr._writeToBuffer( '\r' ); mlWr._writeToBuffer( '\n' )
+        mlWr.removeFinalNewline()
+        mlWr.writeLineText( 'More' )
+        mlWr.close()
+        with open( os.path.join( self.newFolder, 'test.xml' ), 'rb' ) as xmlFile:
+            self.assertEqual( xmlFile.read(), b'TextMore\r\n' )
+    # end of test_020_removeFinalNewline
+
+    def test_030_compression( self ):
+        """ Test writing compressed files. """
+        writeTestFile( MLWriter, self.oldFolder, writeBOM=True )
+        with open( os.path.join( self.oldFolder, 'test.xml' ), 'rb' ) as xmlFile: expectedBytes = xmlFile.read()
+        for compression, opener in ( ('gz',gzip.open), ('xz',lzma.open), ):
+            writeTestFile( MLWriter, self.newFolder, writeBOM=True, compression=compression )
+            compressedFilepath = os.path.join( self.newFolder, 'test.xml.' + compression )
+            self.assertFalse( os.path.exists( os.path.join( self.newFolder, 'test.xml' ) ) )
+            with opener( compressedFilepath, 'rb' ) as compressedFile:
+                self.assertEqual( compressedFile.read(), expectedBytes )
+            self.assertLess( os.path.getsize( compressedFilepath ), len(expectedBytes) // 4 )
+    # end of test_030_compression
+
+    def test_040_OSISExport( self ):
+        """ Test that a Bible export gives exactly the same files as with the old buffer. """
+        from USFMBible import USFMBible
+        UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        for BBB in ( 'GEN', 'MAT', 'REV', ): UB.loadBook( BBB )
+        UB.doPostLoadProcessing()
+        with mock.patch.object( BibleWriter, 'MLWriter', ConcatenatingMLWriter ):
+            self.assertTrue( UB.toOSISXML( self.oldFolder ) )
+        self.assertTrue( UB.toOSISXML( self.newFolder ) )
+        XMLFilenames = [filename for filename in os.listdir( self.oldFolder ) if filename.endswith( '.xml' )]
+        self.assertTrue( XMLFilenames )
+        match, mismatch, errors = filecmp.cmpfiles( self.oldFolder, self.newFolder, XMLFilenames, shallow=False )
+        self.assertEqual( (mismatch,errors), ([],[]) )
+    # end of test_040_OSISExport
+
+    def test_050_fastMode( self ):
+        """ Test that the fast mode skips the checks and that the XML exports use it. """
+        mlWr = MLWriter( 'test.xml', self.newFolder )
+        self.assertEqual( mlWr.checkTag( 'tag' ), 'tag' )
+        with self.assertLogs( level='ERROR' ): mlWr.checkText( 'a<b' )
+        self.assertRaises( AssertionError, mlWr.checkAttribValue, 'a"b' )
+        mlWr.setFastMode()
+        with mock.patch.object( logging, 'error' ) as mockedError:
+            self.assertEqual( mlWr.checkText( 'a<b' ), 'a<b' )
+        mockedError.assert_not_called()
+        self.assertEqual( mlWr.checkTag( '' ), '' )
+        self.assertEqual( mlWr.checkAttribName( 'a"b' ), 'a"b' )
+        self.assertEqual( mlWr.checkAttribValue( 12 ), '12' )
+        mlWr.setFastMode( False )
+        self.assertRaises( AssertionError, mlWr.checkTag, '' )
+
+        from USFMBible import USFMBible
+        UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        UB.loadBook( 'MAT' )
+        UB.doPostLoadProcessing()
+        for exportFunctionName in ( 'toOSISXML', 'toUSXXML', 'toUSFXXML', 'toZefaniaXML', 'toHaggaiXML', ):
+            with mock.patch.object( MLWriter, 'setFastMode', autospec=True ) as mockedSetFastMode:
+                self.assertTrue( getattr( UB, exportFunctionName )( os.path.join( self.newFolder, exportFunctionName ) ) )
+            self.assertTrue( mockedSetFastMode.called, exportFunctionName )
+            for call in mockedSetFastMode.call_args_list: self.assertEqual( call[0][1:], (True,) )
+    # end of test_050_fastMode
+
+    def test_060_benchmark( self ):
+        """ Time a full-Bible OSIS export with the old buffer (with checking) and the new one (in fast mode) and check they're the same. """
+        from USFMBible import USFMBible
+        UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        UB.load()
+        timings = {}
+        for name, folder, writerClass in ( ('Old',self.oldFolder,ConcatenatingMLWriter), ('New',self.newFolder,MLWriter), ):
+            with mock.patch.object( BibleWriter, 'MLWriter', writerClass ):
+                startTime = time.perf_counter()
+                self.assertTrue( UB.toOSISXML( folder ) )
+                timings[name] = time.perf_counter() - startTime
+        if BibleOrgSysGlobals.verbosityLevel > 1:
+            print( "\n  OSIS export of {} books: old MLWriter {:.3f}s, new MLWriter {:.3f}s".format( len(UB), timings['Old'], timings['New'] ) )
+        XMLFilenames = [filename for filename in os.listdir( self.oldFolder ) if filename.endswith( '.xml' )]
+        self.assertTrue( XMLFilenames )
+        match, mismatch, errors = filecmp.cmpfiles( self.oldFolder, self.newFolder, XMLFilenames, shallow=False )
+        self.assertEqual( (mismatch,errors), ([],[]) )
+    # end of test_060_benchmark
+# end of MLWriterTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of MLWriterTests.py
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# ODTWriterTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing ODTWriter.py (and BibleWriter.toODT)
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing ODTWriter.py (and BibleWriter.toODT).
+
+The .odt files are opened as zip archives and their content.xml and styles.xml checked.
+"""
+
+ProgName = "ODT writer tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, tempfile, unittest, zipfile
+from xml.etree import ElementTree
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+from ODTWriter import ODTWriter, encodeStyleName, ODT_MIMETYPE
+from USFMBible import USFMBible
+
+
+TEMPLATE_FILEPATH = 'ControlFiles/BibleBook.ott'
+NAMESPACES = { 'office':"urn:oasis:names:tc:opendocument:xmlns:office:1.0",
+                'style':"urn:oasis:names:tc:opendocument:xmlns:style:1.0",
+                'text':"urn:oasis:names:tc:opendocument:xmlns:text:1.0", }
+TEST_USFM = """\\id GEN Test book
+\\h Genesis
+\\toc1 The Book of Genesis
+\\mt1 Genesis
+\\ip Some introduction.
+\\c 1
+\\s1 The Creation
+\\p
+\\v 1 In the beginning God created the \\nd LORD\\nd* heavens\\f + \\fr 1:1 \\ft A footnote.\\f* and the earth.
+\\v 2 The earth was empty.
+\\q1
+\\v 3 A line of poetry
+\\q2 with a second line.
+\\b
+\\p
+\\v 4 More text.
+"""
+
+
+def qualifiedName( name ):
+    """ Returns the ElementTree name for the given prefixed name, e.g., text:p. """
+    prefix, localName = name.split( ':' )
+    return '{{{}}}{}'.format( NAMESPACES[prefix], localName )
+# end of qualifiedName
+
+
+def readODT( filepath ):
+    """
+    Checks the basic structure of the .odt file.
+
+    Returns the content and styles XML as ElementTree elements.
+    """
+    with zipfile.ZipFile( filepath ) as odtZip:
+        mimetypeInfo = odtZip.infolist()[0]
+        assert( mimetypeInfo.filename == 'mimetype' and mimetypeInfo.compress_type == zipfile.ZIP_STORED )
+        assert( odtZip.read( 'mimetype' ).decode( 'ascii' ) == ODT_MIMETYPE )
+        manifest = odtZip.read( 'META-INF/manifest.xml' ).decode( 'utf-8' )
+        for memberName in ( 'content.xml', 'styles.xml', 'meta.xml', ): assert( memberName in manifest )
+        return ElementTree.fromstring( odtZip.read( 'content.xml' ) ), ElementTree.fromstring( odtZip.read( 'styles.xml' ) )
+# end of readODT
+
+
+def getText( element ):
+    """
+    Returns all the text in the element
+        (with any encoded spaces expanded but without the note citations).
+    """
+    if element.tag == qualifiedName( 'text:note-citation' ): text = ''
+    elif element.tag == qualifiedName( 'text:s' ): text = ' ' * int( element.get( qualifiedName( 'text:c' ), '1' ) )
+    else: text = element.text or ''
+    for childElement in element:
+        text += getText( childElement ) + (childElement.tail or '')
+    return text
+# end of getText
+
+
+def getParagraphs( element ):
+    """
+    Returns a list of 2-tuples with the style name and all the text (including notes) of each paragraph
+        (not including the paragraphs inside notes).
+    """
+    notePs = set( element.iterfind( './/{}//{}'.format( qualifiedName( 'text:note' ), qualifiedName( 'text:p' ) ) ) )
+    return [(p.get( qualifiedName( 'text:style-name' ) ), getText( p )) for p in element.iter( qualifiedName( 'text:p' ) ) if p not in notePs]
+# end of getParagraphs
+
+
+def getSpans( element, styleName ):
+    """ Returns a list of the text of the spans with the given (display) style name. """
+    return [getText( span ) for span in element.iter( qualifiedName( 'text:span' ) )
+                                if span.get( qualifiedName( 'text:style-name' ) ) == encodeStyleName( styleName )]
+# end of getSpans
+
+
+def getStyleNames( stylesElement ):
+    """ Returns a set of the (encoded) style names defined in the styles XML. """
+    return { style.get( qualifiedName( 'style:name' ) ) for style in stylesElement.iter( qualifiedName( 'style:style' ) ) }
+# end of getStyleNames
+
+
+def getUsedStyleNames( contentElement ):
+    """ Returns a set of the (encoded) style names used by paragraphs and spans in the content XML (not including automatic styles). """
+    automaticStyleNames = getStyleNames( contentElement.find( qualifiedName( 'office:automatic-styles' ) ) )
+    return { element.get( qualifiedName( 'text:style-name' ) ) for tag in ( 'text:p', 'text:span', )
+                                for element in contentElement.iter( qualifiedName( tag ) ) } - automaticStyleNames
+# end of getUsedStyleNames
+
+
+
+class ODTWriterTests( unittest.TestCase ):
+    """ Unit tests for the ODTWriter object and the ODT export. """
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSODTTest' )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def test_010_encodeStyleName( self ):
+        """ Test the internal style names. """
+        self.assertEqual( encodeStyleName( 'Standard' ), 'Standard' )
+        self.assertEqual( encodeStyleName( 'Prose Paragraph' ), 'Prose_20_Paragraph' )
+        self.assertEqual( encodeStyleName( 'Verse Number (Small)' ), 'Verse_20_Number_20__28_Small_29_' )
+    # end of test_010_encodeStyleName
+
+    def test_020_writer( self ):
+        """ Test a small document written directly. """
+        styleDefinitions = { 'Prose Paragraph':('paragraph','Bible Paragraph',None,None),
+                            'Bible Paragraph':('paragraph','Standard',{'fo:text-align':'justify'},None),
+                            'Verse Number':('text',None,None,{'style:text-position':'super 58%'}), }
+        for templateFilepath in ( None, TEMPLATE_FILEPATH, ):
+            writer = ODTWriter( templateFilepath, styleDefinitions )
+            writer.setUserField( 'BookHeader', 'A & B' )
+            writer.startParagraph( 'Prose Paragraph' )
+            writer.addText( '1', 'Verse Number' )
+            writer.addText( ' In the  beginning <tag>' )
+            writer.addNote( 'footnote', 'Standard', [(None,'A note'), ('Verse Number','2')] )
+            writer.addLineBreak()
+            writer.startColumns( 2 )
+            writer.startParagraph( 'Standard' )
+            writer.addText( '  Leading spaces' )
+            filepath = os.path.join( self.tempFolder, 'Test.odt' )
+            writer.save( filepath )
+            content, styles = readODT( filepath )
+            self.assertEqual( getParagraphs( content ), [('Prose_20_Paragraph','1 In the  beginning <tag>A note2'), ('Standard','  Leading spaces')] )
+            self.assertEqual( getSpans( content, 'Verse Number' ), ['1','2'] )
+            self.assertEqual( len(list( content.iter( qualifiedName( 'text:line-break' ) ) )), 1 )
+            self.assertEqual( len(list( content.iter( qualifiedName( 'text:section' ) ) )), 1 )
+            self.assertEqual( [field.get( qualifiedName( 'office:string-value' ) ) for field in content.iter( qualifiedName( 'text:user-field-decl' ) )], ['A & B'] )
+            self.assertLessEqual( getUsedStyleNames( content ), getStyleNames( styles ) | {'Standard'} )
+            if templateFilepath is None: # Our own styles (including the parents)
+                self.assertLessEqual( {'Prose_20_Paragraph','Bible_20_Paragraph','Verse_20_Number'}, getStyleNames( styles ) )
+    # end of test_020_writer
+
+    def test_030_toODT( self ):
+        """ Test the styles in an ODT export of a small USFM book. """
+        USFMFolder, outputFolder = os.path.join( self.tempFolder, 'USFM' ), os.path.join( self.tempFolder, 'ODT' )
+        os.mkdir( USFMFolder )
+        with open( os.path.join( USFMFolder, 'GENTest.SFM' ), 'wt', encoding='utf-8' ) as USFMFile: USFMFile.write( TEST_USFM )
+        UB = USFMBible( USFMFolder, 'Test' )
+        UB.load()
+        for useTemplate in ( False, True, ):
+            self.assertTrue( UB.toODT( outputFolder, useTemplate=useTemplate ) )
+            filepath = os.path.join( outputFolder, '00-GEN_BOS-BibleWriter.odt' )
+            content, styles = readODT( filepath )
+            self.assertEqual( getParagraphs( content ), [
+                        (encodeStyleName( 'Major Title 1' ), 'Genesis'),
+                        (encodeStyleName( 'Introduction Paragraph' ), 'Some introduction.'),
+                        (encodeStyleName( 'Blank Line Paragraph' ), ''),
+                        (encodeStyleName( 'Section Heading 1' ), 'The Creation'),
+                        (encodeStyleName( 'Prose Paragraph' ), '1 In the beginning God created the LORD heavens1:1 A footnote. and the earth. 2 The earth was empty.'),
+                        (encodeStyleName( 'Poetry Paragraph 1' ), '3 A line of poetry'),
+                        (encodeStyleName( 'Poetry Paragraph 2' ), 'with a second line.'),
+                        (encodeStyleName( 'Blank Line Paragraph' ), ''),
+                        (encodeStyleName( 'Prose Paragraph' ), '4 More text.'), ] )
+            self.assertEqual( getSpans( content, 'Chapter Number' ), ['1'] )
+            self.assertEqual( getSpans( content, 'Verse Number' ), ['2','3','4'] )
+            self.assertEqual( getSpans( content, 'Divine Name' ), ['LORD'] )
+            self.assertEqual( getSpans( content, 'Footnote Origin' ), ['1:1 '] )
+            self.assertEqual( getSpans( content, 'Verse Text' ), ['The earth was empty.','A line of poetry','with a second line.','More text.'] )
+            notes = list( content.iter( qualifiedName( 'text:note' ) ) )
+            self.assertEqual( [note.get( qualifiedName( 'text:note-class' ) ) for note in notes], ['footnote'] )
+            self.assertEqual( getParagraphs( notes[0] )[0][0], encodeStyleName( 'Bible Footnote' ) )
+            sections = list( content.iter( qualifiedName( 'text:section' ) ) )
+            self.assertEqual( len(sections), 1 )
+            self.assertEqual( getParagraphs( sections[0] )[0], (encodeStyleName( 'Section Heading 1' ), 'The Creation') ) # The chapters are in the columns
+            self.assertEqual( [field.get( qualifiedName( 'office:string-value' ) ) for field in content.iter( qualifiedName( 'text:user-field-decl' ) )], ['The Book of Genesis'] )
+            if not useTemplate: # All the styles used are defined (any others come from the template)
+                self.assertLessEqual( getUsedStyleNames( content ), getStyleNames( styles ) )
+            with zipfile.ZipFile( os.path.join( outputFolder, 'AllODTFiles.zip' ) ) as zf:
+                self.assertEqual( zf.namelist(), ['00-GEN_BOS-BibleWriter.odt'] )
+    # end of test_030_toODT
+# end of ODTWriterTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of ODTWriterTests.py
@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# OSISXMLBibleTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing OSISXMLBible.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing OSISXMLBible.py.
+"""
+
+ProgName = "OSIS XML Bible tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, gc, pickle, unittest, weakref
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, OSISXMLBible as OSISXMLBibleModule
+from OSISXMLBible import OSISXMLBible
+
+
+def getBookLines( bookObject ):
+    """ Returns a list of the (marker, cleanText) 2-tuples for the processed book. """
+    return [(entry.getMarker(), entry.getCleanText()) for entry in bookObject._processedLines]
+# end of getBookLines
+
+
+class DelayedPicklingPool:
+    """
+    A stand-in for multiprocessing.Pool which (like the real pool's task handler thread)
+        only pickles the task arguments some time after apply_async has returned
+        -- in this case, not until the results are asked for.
+    """
+    sentObjects = [] # (BBB, containerBibleObject) as they were pickled
+    def __init__( self, processes=None ): pass
+    def __enter__( self ): return self
+    def __exit__( self, *args ): return False
+    def apply_async( self, function, args ):
+        class DelayedResult:
+            def get( self ):
+                sentArgs = pickle.loads( pickle.dumps( args ) )
+                DelayedPicklingPool.sentObjects.extend( (sentArg.BBB,sentArg.containerBibleObject) for sentArg in sentArgs )
+                return function( *sentArgs )
+        return DelayedResult()
+# end of class DelayedPicklingPool
+
+
+
+class OSISXMLBibleTests( unittest.TestCase ):
+    """ Unit tests for loading OSIS XML Bibles (with and without streaming). """
+
+    def setUp( self ):
+        self.testFolder = 'Tests/DataFilesForTests/OSISTest2/' # This is a RELATIVE path
+        self.savedMaxProcesses = BibleOrgSysGlobals.maxProcesses
+
+    def tearDown( self ):
+        BibleOrgSysGlobals.maxProcesses = self.savedMaxProcesses
+
+    def loadBible( self, streamingFlag, maxProcesses ):
+        """ Load the test Bible using the given settings. """
+        BibleOrgSysGlobals.maxProcesses = maxProcesses
+        OSISBible = OSISXMLBible( self.testFolder, 'OSISTest2', 'OT2' )
+        OSISBible.load( streamingFlag )
+        return OSISBible
+    # end of loadBible
+
+    def test_010_treeLoad( self ):
+        """ Test loading the complete element tree. """
+        OSISBible = self.loadBible( False, 1 )
+        self.assertEqual( OSISBible.getBookList(), ['GEN','EXO','RUT','MAT','JHN'] )
+        self.assertEqual( OSISBible.getVerseText( ('GEN','1','2') ), 'And the earth was without form, and void.' )
+        self.assertIsNotNone( OSISBible.header )
+    # end of test_010_treeLoad
+
+    def test_020_streamingLoad( self ):
+        """ Test that streaming gives the same books as loading the complete tree. """
+        treeBible = self.loadBible( False, 1 )
+        streamedBible = self.loadBible( True, 1 )
+        self.assertIsNone( streamedBible.tree )
+        self.assertEqual( streamedBible.getBookList(), treeBible.getBookList() )
+        for BBB in treeBible.books:
+            self.assertEqual( getBookLines( streamedBible.books[BBB] ), getBookLines( treeBible.books[BBB] ) )
+        self.assertEqual( streamedBible.errorDictionary.get( 'Load Errors' ), treeBible.errorDictionary.get( 'Load Errors' ) )
+    # end of test_020_streamingLoad
+
+    def test_030_multiprocessStreamingLoad( self ):
+        """ Test that processing the streamed books in worker processes gives the same books. """
+        treeBible = self.loadBible( False, 1 )
+        for j in range( 3 ): # Try it a few times because the pool works in the background
+            streamedBible = self.loadBible( True, 2 )
+            self.assertEqual( streamedBible.getBookList(), treeBible.getBookList() )
+            for BBB,bookObject in streamedBible.books.items():
+                self.assertTrue( bookObject._processedFlag )
+                self.assertIs( bookObject.containerBibleObject, streamedBible )
+                self.assertEqual( getBookLines( bookObject ), getBookLines( treeBible.books[BBB] ) )
+            self.assertEqual( streamedBible.getVerseText( ('JHN','1','1') ), treeBible.getVerseText( ('JHN','1','1') ) )
+    # end of test_030_multiprocessStreamingLoad
+
+    def test_040_detachedBooks( self ):
+        """ Test that only detached books (not the whole Bible) get sent to the worker processes. """
+        DelayedPicklingPool.sentObjects = []
+        with mock.patch.object( OSISXMLBibleModule.multiprocessing, 'Pool', DelayedPicklingPool ):
+            streamedBible = self.loadBible( True, 2 )
+        self.assertEqual( [BBB for BBB,container in DelayedPicklingPool.sentObjects], ['GEN','EXO','RUT','MAT','JHN'] )
+        for BBB,container in DelayedPicklingPool.sentObjects:
+            self.assertIsNone( container )
+        self.assertEqual( streamedBible.getBookList(), ['GEN','EXO','RUT','MAT','JHN'] )
+        for bookObject in streamedBible.books.values():
+            self.assertIs( bookObject.containerBibleObject, streamedBible )
+    # end of test_040_detachedBooks
+
+    def test_050_unprocessedBooksFreed( self ):
+        """ Test that each unprocessed book is let go as soon as its processed book has come back. """
+        unprocessedBooks, savedStates = [], []
+        class RecordingPool( DelayedPicklingPool ):
+            def apply_async( self, function, args ):
+                unprocessedBooks.append( weakref.ref( args[0] ) )
+                return DelayedPicklingPool.apply_async( self, function, args )
+        def recordingSaveBook( bibleObject, bookObject ):
+            gc.collect()
+            savedStates.append( (bookObject.BBB, [ref() is None for ref in unprocessedBooks]) )
+            originalSaveBook( bibleObject, bookObject )
+        originalSaveBook = OSISXMLBibleModule.Bible.saveBook
+        with mock.patch.object( OSISXMLBibleModule.multiprocessing, 'Pool', RecordingPool ), \
+             mock.patch.object( OSISXMLBibleModule.Bible, 'saveBook', recordingSaveBook ):
+            streamedBible = self.loadBible( True, 2 )
+        self.assertEqual( streamedBible.getBookList(), ['GEN','EXO','RUT','MAT','JHN'] )
+        self.assertEqual( savedStates, [(BBB, [True]*j + [False]*(5-j)) for j,BBB in enumerate( ['GEN','EXO','RUT','MAT','JHN'] )] )
+        gc.collect()
+        self.assertEqual( [ref() for ref in unprocessedBooks], [None]*5 )
+    # end of test_050_unprocessedBooksFreed
+# end of OSISXMLBibleTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of OSISXMLBibleTests.py
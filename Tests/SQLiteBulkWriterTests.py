@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# SQLiteBulkWriterTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing SQLiteBulkWriter.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing SQLiteBulkWriter.py.
+"""
+
+ProgName = "SQLite bulk writer tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, sqlite3, tempfile, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, SQLiteBulkWriter
+
+
+TEST_ROWS = [(b,c,v,'Text {} {}:{}'.format( b, c, v )) for b in range( 1, 4 ) for c in range( 1, 5 ) for v in range( 1, 6 )]
+
+
+def readRows( filepath, SQLString='SELECT * FROM Bible ORDER BY rowid' ):
+    """ Returns all the rows from the Bible table of the given database file. """
+    connection = sqlite3.connect( filepath )
+    try: return connection.execute( SQLString ).fetchall()
+    finally: connection.close()
+# end of readRows
+
+
+
+class SQLiteBulkWriterTests( unittest.TestCase ):
+    """ Unit tests for the SQLiteBulkWriter object. """
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp( prefix='BOSSQLiteTest' )
+        self.filepath = os.path.join( self.tempFolder, 'Test.sqlite' )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def writeTestDatabase( self, inMemoryFlag=False, batchSize=None ):
+        """ Writes the test rows and returns the writer. """
+        with SQLiteBulkWriter.SQLiteBulkWriter( self.filepath, inMemoryFlag=inMemoryFlag, batchSize=batchSize ) as sqlWriter:
+            sqlWriter.execute( 'CREATE TABLE Details (Description TEXT, Version TEXT)' )
+            sqlWriter.execute( 'INSERT INTO "Details" VALUES(?,?)', ('Test','1.0') )
+            sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+            for row in TEST_ROWS: sqlWriter.addRow( 'Bible', row )
+            sqlWriter.addIndex( 'CREATE INDEX BookChapterVerseIndex ON Bible (Book, Chapter, Verse)' )
+        return sqlWriter
+    # end of writeTestDatabase
+
+    def test_010_roundTrip( self ):
+        """ Test that the rows come back in order, either way that the database is built. """
+        for inMemoryFlag in ( False, True, ):
+            for batchSize in ( None, 1, 7, ):
+                sqlWriter = self.writeTestDatabase( inMemoryFlag, batchSize )
+                self.assertIsNone( sqlWriter.connection )
+                self.assertEqual( sqlWriter.rowCount, len(TEST_ROWS) )
+                self.assertEqual( readRows( self.filepath ), TEST_ROWS )
+                self.assertEqual( readRows( self.filepath, 'SELECT * FROM Details' ), [('Test','1.0')] )
+                self.assertEqual( readRows( self.filepath, "SELECT name FROM sqlite_master WHERE type='index'" ), [('BookChapterVerseIndex',)] )
+                self.assertTrue( isinstance( str(sqlWriter), str ) )
+    # end of test_010_roundTrip
+
+    def test_020_replacesFile( self ):
+        """ Test that any existing file is replaced. """
+        with open( self.filepath, 'wt' ) as oldFile: oldFile.write( 'Not a database' )
+        self.writeTestDatabase()
+        self.assertEqual( len( readRows( self.filepath ) ), len(TEST_ROWS) )
+    # end of test_020_replacesFile
+
+    def test_030_failureWhileWriting( self ):
+        """ Test that an exception while writing closes the connection and removes the partial file. """
+        for inMemoryFlag in ( False, True, ):
+            sqlWriter = SQLiteBulkWriter.SQLiteBulkWriter( self.filepath, inMemoryFlag=inMemoryFlag, batchSize=5 )
+            with self.assertRaises( ValueError ):
+                with sqlWriter:
+                    sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+                    for row in TEST_ROWS[:12]: sqlWriter.addRow( 'Bible', row )
+                    raise ValueError( "Something went wrong in the exporter" )
+            self.assertIsNone( sqlWriter.connection )
+            self.assertEqual( sqlWriter.pendingRows, {} )
+            self.assertFalse( os.path.exists( self.filepath ) )
+    # end of test_030_failureWhileWriting
+
+    def test_040_failureWhileClosing( self ):
+        """ Test that an SQL error in the deferred statements also removes the partial file. """
+        for inMemoryFlag in ( False, True, ):
+            sqlWriter = SQLiteBulkWriter.SQLiteBulkWriter( self.filepath, inMemoryFlag=inMemoryFlag )
+            with self.assertRaises( sqlite3.Error ):
+                with sqlWriter:
+                    sqlWriter.execute( 'CREATE TABLE Bible(Book INT, Chapter INT, Verse INT, Scripture TEXT)' )
+                    sqlWriter.addRow( 'Bible', TEST_ROWS[0] )
+                    sqlWriter.addRow( 'NoSuchTable', TEST_ROWS[1] ) # Only written when flushed by close()
+            self.assertIsNone( sqlWriter.connection )
+            self.assertFalse( os.path.exists( self.filepath ) )
+        sqlWriter.abort() # Can be called again
+    # end of test_040_failureWhileClosing
+
+    def test_050_failedExport( self ):
+        """ Test that a MySword export which fails part way through doesn't leave a partial database behind. """
+        from USFMBible import USFMBible
+        UB = USFMBible( 'Tests/DataFilesForTests/USFMTest2/', 'USFMTest2', 'T2' ) # This is a RELATIVE path
+        UB.loadBook( 'MAT' )
+        UB.doPostLoadProcessing()
+        self.assertTrue( UB.toMySword( self.tempFolder ) )
+        exportFilepath = os.path.join( self.tempFolder, 'MBTV.bbl.mybible' ) # Named from the SSF file
+        self.assertTrue( readRows( exportFilepath, 'SELECT * FROM Bible WHERE Book=40 AND Chapter=1 AND Verse=1' ) )
+        for filename in os.listdir( self.tempFolder ): os.remove( os.path.join( self.tempFolder, filename ) )
+        originalAddRow = SQLiteBulkWriter.SQLiteBulkWriter.addRow
+        def failingAddRow( sqlWriter, tableName, values ):
+            if sqlWriter.rowCount + len( sqlWriter.pendingRows.get( tableName, () ) ) > 100: raise RuntimeError( "Export failed" )
+            originalAddRow( sqlWriter, tableName, values )
+        with mock.patch.object( SQLiteBulkWriter.SQLiteBulkWriter, 'addRow', failingAddRow ):
+            self.assertRaises( RuntimeError, UB.toMySword, self.tempFolder )
+        self.assertEqual( os.listdir( self.tempFolder ), [] )
+    # end of test_050_failedExport
+# end of SQLiteBulkWriterTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of SQLiteBulkWriterTests.py
@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# SwordModulesTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing SwordModules.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing SwordModules.py.
+
+The test modules are written into a temporary folder by the tests themselves.
+"""
+
+ProgName = "Sword modules tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, struct, tempfile, unittest, zlib
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals, SwordModules
+
+
+TEST_VERSES = { ('GEN','1','1'):'In the beginning', ('GEN','1','2'):'And the earth', ('PSA','3','0'):'A Psalm of David',
+                ('MAL','4','6'):'And he shall turn', ('MAT','1','1'):'The book of the generation', ('REV','22','21'):'The grace', }
+
+
+def getTestIndex( BBB, C, V ):
+    """ Returns the testament and the Sword KJV index number for the given reference. """
+    testament, chapterStarts = SwordModules.getSwordIndexDict()[BBB]
+    return testament, chapterStarts[int(C)] + int(V)
+# end of getTestIndex
+
+
+def makeTestModule( rootFolder, moduleName, driver, extraConfLines=(), encoding='utf-8', verses=TEST_VERSES, blockSize=3 ):
+    """
+    Writes a small rawtext or ztext module (and its conf file) into the rootFolder.
+    """
+    dataPath = 'modules/texts/{}/{}/'.format( driver.lower(), moduleName.lower() )
+    os.makedirs( os.path.join( rootFolder, 'mods.d' ), exist_ok=True )
+    with open( os.path.join( rootFolder, 'mods.d', moduleName.lower()+'.conf' ), 'wt', encoding='utf-8' ) as confFile:
+        confFile.write( '[{}]\nDataPath=./{}\nModDrv={}\nDescription=Test module\n'.format( moduleName, dataPath, driver ) )
+        for line in extraConfLines: confFile.write( line + '\n' )
+    dataFolder = os.path.join( rootFolder, dataPath )
+    os.makedirs( dataFolder, exist_ok=True )
+    for testament in ( 'ot', 'nt', ):
+        entries = {}
+        for (BBB,C,V),text in verses.items():
+            verseTestament, index = getTestIndex( BBB, C, V )
+            if verseTestament == testament: entries[index] = text.encode( encoding )
+        numEntries = max( entries ) + 1
+        if driver == 'RawText':
+            with open( os.path.join( dataFolder, testament ), 'wb' ) as dataFile, \
+                 open( os.path.join( dataFolder, testament+'.vss' ), 'wb' ) as indexFile:
+                for index in range( numEntries ):
+                    data = entries.get( index, b'' )
+                    indexFile.write( struct.pack( '<IH', dataFile.tell(), len(data) ) )
+                    dataFile.write( data )
+        else: # zText -- put a few entries into each compressed block
+            blocks, verseIndex = [], []
+            for index in range( numEntries ):
+                data = entries.get( index, b'' )
+                if not blocks or len(blocks[-1]) >= blockSize: blocks.append( [] )
+                verseIndex.append( (len(blocks)-1, sum( len(d) for d in blocks[-1] ), len(data)) )
+                blocks[-1].append( data )
+            with open( os.path.join( dataFolder, testament+'.bzv' ), 'wb' ) as indexFile:
+                for entry in verseIndex: indexFile.write( struct.pack( '<IIH', *entry ) )
+            with open( os.path.join( dataFolder, testament+'.bzz' ), 'wb' ) as dataFile, \
+                 open( os.path.join( dataFolder, testament+'.bzs' ), 'wb' ) as blockIndexFile:
+                for block in blocks:
+                    uncompressed = b''.join( block )
+                    compressed = zlib.compress( uncompressed )
+                    blockIndexFile.write( struct.pack( '<III', dataFile.tell(), len(compressed), len(uncompressed) ) )
+                    dataFile.write( compressed )
+# end of makeTestModule
+
+
+
+class SwordModulesTests( unittest.TestCase ):
+    """ Unit tests for the SwordModule and SwordModules objects. """
+
+    def setUp( self ):
+        self.testFolder = tempfile.mkdtemp( prefix='BOSSwordTest' )
+        makeTestModule( self.testFolder, 'TestRaw', 'RawText' )
+        makeTestModule( self.testFolder, 'TestZ', 'zText', ('CompressType=ZIP',) )
+        makeTestModule( self.testFolder, 'TestSCSU', 'RawText', ('Encoding=SCSU',) )
+        makeTestModule( self.testFolder, 'TestLZSS', 'zText', ('CompressType=LZSS',) )
+        self.library = SwordModules.SwordModules( [self.testFolder] )
+
+    def tearDown( self ):
+        shutil.rmtree( self.testFolder )
+
+    def test_010_getSwordIndexDict( self ):
+        """ Test the KJV index layout. """
+        indexDict = SwordModules.getSwordIndexDict()
+        self.assertEqual( len(indexDict), 66 )
+        self.assertEqual( indexDict['GEN'][0], 'ot' )
+        self.assertEqual( indexDict['GEN'][1][:2], [2,3] ) # Book heading then chapter 1 heading
+        self.assertEqual( indexDict['MAT'][0], 'nt' )
+        self.assertEqual( indexDict['MAT'][1][:2], [2,3] )
+        self.assertEqual( len(indexDict['PSA'][1]), 150+2 )
+        self.assertEqual( indexDict['EXO'][1][0], indexDict['GEN'][1][-1] ) # Books follow on
+    # end of test_010_getSwordIndexDict
+
+    def test_020_readConfFile( self ):
+        """ Test reading conf files with repeated fields and continuation lines. """
+        confFilepath = os.path.join( self.testFolder, 'test.conf' )
+        with open( confFilepath, 'wt', encoding='utf-8' ) as confFile:
+            confFile.write( '[Test]\n# A comment\nAbout=First line\\\nsecond line\nGlobalOptionFilter=OSISFootnotes\n'
+                            'GlobalOptionFilter=OSISHeadings\\\ncontinued\nBadLine\nVersion=1.0\n' )
+        confDict = SwordModules.readConfFile( confFilepath )
+        self.assertEqual( confDict['Name'], 'Test' )
+        self.assertEqual( confDict['About'], 'First line\nsecond line' )
+        self.assertEqual( confDict['GlobalOptionFilter'], ['OSISFootnotes','OSISHeadings\ncontinued'] )
+        self.assertEqual( confDict['Version'], '1.0' )
+        self.assertFalse( 'BadLine' in confDict )
+    # end of test_020_readConfFile
+
+    def test_030_SwordModules( self ):
+        """ Test finding and loading modules. """
+        self.assertEqual( len(self.library), 4 )
+        self.assertEqual( sorted( self.library.getAvailableModuleCodes() ), ['TestLZSS','TestRaw','TestSCSU','TestZ'] )
+        self.assertEqual( self.library.loadModule( 'NoSuchModule' ), (False,None) )
+        resultFlag, module = self.library.loadModule( 'testraw' ) # Not case sensitive
+        self.assertTrue( resultFlag )
+        self.assertEqual( module.getName(), 'TestRaw' )
+        self.assertEqual( module.getDescription(), 'Test module' )
+        self.assertEqual( module.getMarkupCode(), 1 ) # Plain
+        self.assertTrue( isinstance( str(module), str ) )
+        self.assertIs( self.library.loadModule( 'TestRaw' )[1], module ) # Only loaded once
+    # end of test_030_SwordModules
+
+    def test_040_getRawVerse( self ):
+        """ Test that verses round-trip through both module layouts. """
+        for moduleName in ( 'TestRaw', 'TestZ', ):
+            resultFlag, module = self.library.loadModule( moduleName )
+            self.assertTrue( resultFlag )
+            for (BBB,C,V),text in TEST_VERSES.items():
+                self.assertEqual( module.getRawVerse( BBB, C, V ), text )
+            self.assertEqual( module.getRawVerse( 'GEN', '1', '3' ), '' ) # Empty entry
+            self.assertEqual( module.getRawVerse( 'REV', '1', '1' ), '' )
+            self.assertRaises( KeyError, module.getRawVerse, 'GEN', '51', '1' )
+            self.assertRaises( KeyError, module.getRawVerse, 'GEN', '1', '32' )
+            module.close()
+            self.assertEqual( module.getRawVerse( 'MAT', '1', '1' ), TEST_VERSES[('MAT','1','1')] ) # Reopens files
+            module.close()
+    # end of test_040_getRawVerse
+
+    def test_050_iterateVerses( self ):
+        """ Test iterating through the verses. """
+        for moduleName in ( 'TestRaw', 'TestZ', ):
+            module = self.library.loadModule( moduleName )[1]
+            results = list( module.iterateVerses() )
+            self.assertEqual( results, [(BBB,C,V,text) for (BBB,C,V),text in TEST_VERSES.items() if V!='0'] )
+            results = list( module.iterateVerses( includeHeadings=True ) )
+            self.assertEqual( len(results), len(TEST_VERSES) )
+            self.assertTrue( ('PSA','3','0','A Psalm of David') in results )
+            module.close()
+    # end of test_050_iterateVerses
+
+    def test_060_unhandledModules( self ):
+        """ Test that modules that we can't decode properly are refused rather than misread. """
+        for moduleName, problemWord in ( ('TestSCSU','SCSU'), ('TestLZSS','LZSS'), ):
+            resultFlag, module = self.library.loadModule( moduleName )
+            self.assertFalse( resultFlag )
+            self.assertFalse( module.isReadable() )
+            self.assertTrue( problemWord in module.problem )
+            self.assertRaises( KeyError, module.getRawVerse, 'GEN', '1', '1' )
+            self.assertEqual( list( module.iterateVerses() ), [] )
+    # end of test_060_unhandledModules
+
+    def test_070_plainSwordBible( self ):
+        """ Test that SwordBible loads the text of a plain module. """
+        from SwordBible import SwordBible
+        swordBible = SwordBible( self.testFolder, 'TestRaw' )
+        swordBible.load()
+        self.assertTrue( 'GEN' in swordBible )
+        self.assertTrue( 'MAT' in swordBible )
+        verseText = ''.join( entry.getCleanText() for entry in swordBible.books['GEN']._processedLines if entry.getMarker()=='v~' )
+        self.assertTrue( 'In the beginning' in verseText )
+    # end of test_070_plainSwordBible
+
+    def test_080_swordBibleClosesModule( self ):
+        """ Test that SwordBible closes the module files once it's loaded (even if loading fails). """
+        from SwordBible import SwordBible
+        for failFlag in ( False, True, ):
+            swordBible = SwordBible( self.testFolder, 'TestZ' )
+            with mock.patch.object( SwordModules.SwordModule, 'close', autospec=True, side_effect=SwordModules.SwordModule.close ) as mockClose:
+                if failFlag:
+                    with mock.patch( 'SwordBible.BibleBook', side_effect=RuntimeError( "Failed" ) ):
+                        self.assertRaises( RuntimeError, swordBible.load )
+                else: swordBible.load()
+            mockClose.assert_called_once_with( swordBible.nativeModule )
+        self.assertEqual( swordBible.nativeModule.getRawVerse( 'MAT', '1', '1' ), TEST_VERSES[('MAT','1','1')] ) # Reopens files
+        swordBible.nativeModule.close()
+    # end of test_080_swordBibleClosesModule
+# end of SwordModulesTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of SwordModulesTests.py
@@ -44,6 +44,7 @@ import ISO_639_3_LanguagesTests, BiblePunctuationSystemsTests
 import BibleBooksNamesTests, BibleVersificationSystemsTests, BibleOrganizationalSystemsTests
 import BibleReferencesTests
 import USFMMarkersTests, USFMFilenamesTests, USXFilenamesTests
+import SwordModulesTests, InternalBibleCacheTests, OSISXMLBibleTests, InternalBibleSearchIndexTests, USFMBibleTests, SQLiteBulkWriterTests, MLWriterTests, ExportManifestTests, ArchiveWriterTests, LibreOfficePoolTests, ODTWriterTests, BCVBibleTests, VerseReferencesTests, BibleOrgSysGlobalsTests, ESwordBibleTests, UnknownBibleTests, BibleWriterTests
 
 
 # Handle command line parameters (for compatibility)
@@ -78,6 +79,7 @@ suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleBooksNamesTe
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleVersificationSystemsTests.BibleVersificationSystemsConverterTests ) )
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleVersificationSystemsTests.BibleVersificationSystemsTests ) )
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleVersificationSystemsTests.BibleVersificationSystemTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleVersificationSystemsTests.BibleVersificationMappingTests ) )
 
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleOrganizationalSystemsTests.BibleOrganizationalSystemsConverterTests ) )
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleOrganizationalSystemsTests.BibleOrganizationalSystemsTests ) )
@@ -93,6 +95,24 @@ suiteList.append( unittest.TestLoader().loadTestsFromTestCase( USFMFilenamesTest
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( USXFilenamesTests.USXFilenamesTests1 ) )
 suiteList.append( unittest.TestLoader().loadTestsFromTestCase( USXFilenamesTests.USXFilenamesTests2 ) )
 
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( SwordModulesTests.SwordModulesTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( InternalBibleCacheTests.InternalBibleCacheTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( OSISXMLBibleTests.OSISXMLBibleTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( InternalBibleSearchIndexTests.InternalBibleSearchIndexTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( USFMBibleTests.USFMBibleTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( SQLiteBulkWriterTests.SQLiteBulkWriterTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( MLWriterTests.MLWriterTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( ExportManifestTests.ExportManifestTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( ArchiveWriterTests.ArchiveWriterTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( LibreOfficePoolTests.LibreOfficePoolTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( ODTWriterTests.ODTWriterTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BCVBibleTests.BCVBibleTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( VerseReferencesTests.PackedVerseKeyTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleOrgSysGlobalsTests.BibleOrgSysGlobalsTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( ESwordBibleTests.ESwordBibleTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( UnknownBibleTests.UnknownBibleTests ) )
+suiteList.append( unittest.TestLoader().loadTestsFromTestCase( BibleWriterTests.BibleWriterTests ) )
+
 
 # Now run all the tests in the suite
 allTests = unittest.TestSuite( suiteList )
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# USFMBibleTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing USFMBible.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing USFMBible.py (especially lazy loading).
+"""
+
+ProgName = "USFM Bible tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, os, shutil, tempfile, unittest
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+from USFMBible import USFMBible
+
+
+class USFMBibleTests( unittest.TestCase ):
+    """ Unit tests for loading USFM Bibles all at once or lazily. """
+
+    @classmethod
+    def setUpClass( cls ):
+        cls.sourceFolder = 'Tests/DataFilesForTests/USFMTest2/' # This is a RELATIVE path
+        cls.UB = USFMBible( cls.sourceFolder, 'USFMTest2', 'T2' )
+        cls.UB.load() # Only load it once for all the tests
+
+    def getLazyBible( self, maxLoadedBooks=None ):
+        """ Returns the test Bible set up for lazy loading. """
+        lazyBible = USFMBible( self.sourceFolder, 'USFMTest2', 'T2' )
+        lazyBible.loadLazily( maxLoadedBooks )
+        return lazyBible
+    # end of getLazyBible
+
+    def test_010_load( self ):
+        """ Test loading all of the books. """
+        self.assertTrue( self.UB.loadedAllBooks )
+        self.assertEqual( len(self.UB), len(self.UB.books) )
+        self.assertEqual( self.UB.getBookList()[:3], ['GEN','LEV','NUM'] )
+        self.assertTrue( 'MAT' in self.UB )
+        self.assertFalse( 'EXO' in self.UB )
+        self.assertTrue( self.UB.containsAnyOT39Books() )
+        self.assertTrue( self.UB.containsAnyNT27Books() )
+    # end of test_010_load
+
+    def test_020_lazyBookList( self ):
+        """ Test that books which aren't loaded yet are still counted. """
+        lazyBible = self.getLazyBible()
+        self.assertEqual( lazyBible.books, {} )
+        self.assertEqual( lazyBible.getBookList(), self.UB.getBookList() )
+        self.assertEqual( len(lazyBible), len(self.UB) )
+        self.assertTrue( 'MAT' in lazyBible )
+        self.assertFalse( 'EXO' in lazyBible )
+        self.assertTrue( lazyBible.containsAnyNT27Books() )
+        self.assertEqual( lazyBible.books, {} ) # None of that needed to load any books
+        lazyBible['MAT']
+        self.assertEqual( list( lazyBible.books.keys() ), ['MAT'] )
+        self.assertEqual( lazyBible.getBookList(), self.UB.getBookList() )
+        self.assertEqual( len(lazyBible), len(self.UB) )
+    # end of test_020_lazyBookList
+
+    def test_030_lazyVerses( self ):
+        """ Test that lazily loaded books give the same verses. """
+        lazyBible = self.getLazyBible()
+        for reference in ( ('GEN','1','1'), ('MAT','1','1'), ('REV','22','21'), ):
+            self.assertEqual( lazyBible.getVerseText( reference ), self.UB.getVerseText( reference ) )
+        self.assertIs( lazyBible[0], lazyBible['GEN'] )
+        self.assertEqual( [bookObject.BBB for bookObject in lazyBible], self.UB.getBookList() )
+    # end of test_030_lazyVerses
+
+    def test_040_unloading( self ):
+        """ Test that the least recently used books are unloaded but still known. """
+        lazyBible = self.getLazyBible( maxLoadedBooks=2 )
+        for BBB in ( 'GEN', 'MAT', 'GEN', 'REV', ):
+            lazyBible[BBB]
+        self.assertEqual( sorted( lazyBible.books.keys() ), ['GEN','REV'] )
+        self.assertTrue( 'MAT' in lazyBible )
+        self.assertEqual( len(lazyBible), len(self.UB) )
+        self.assertEqual( lazyBible.getVerseText( ('MAT','1','1') ), self.UB.getVerseText( ('MAT','1','1') ) ) # Reloaded
+        self.assertEqual( len(lazyBible.books), 2 )
+    # end of test_040_unloading
+
+    def test_050_blankBook( self ):
+        """ Test that a book whose file turns out to be blank is dropped once we've tried to load it. """
+        tempFolder = tempfile.mkdtemp( prefix='BOSUSFMTest' )
+        try:
+            for filename in ( 'MBT01GEN.SCP', 'MBT41MAT.SCP', 'MBTV.SSF', ):
+                shutil.copy( os.path.join( self.sourceFolder, filename ), tempFolder )
+            open( os.path.join( tempFolder, 'MBT42MRK.SCP' ), 'wt' ).close() # A blank book file
+            lazyBible = USFMBible( tempFolder, 'Blank', 'Blank' )
+            lazyBible.loadLazily()
+            self.assertEqual( lazyBible.getBookList(), ['GEN','MAT','MRK'] )
+            self.assertEqual( [bookObject.BBB for bookObject in lazyBible], ['GEN','MAT'] )
+            self.assertEqual( lazyBible.getBookList(), ['GEN','MAT'] )
+            self.assertEqual( len(lazyBible), 2 )
+            self.assertFalse( 'MRK' in lazyBible )
+        finally: shutil.rmtree( tempFolder )
+    # end of test_050_blankBook
+# end of USFMBibleTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of USFMBibleTests.py
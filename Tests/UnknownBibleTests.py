@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# UnknownBibleTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing UnknownBible.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing UnknownBible.py.
+
+Uses the folders in Tests/DataFilesForTests/ (copied into a temporary folder where they need to be changed).
+"""
+
+ProgName = "Unknown Bible tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import os, sys, shutil, tempfile, threading, unittest
+from unittest import mock
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+import UnknownBible
+from UnknownBible import getFolderFingerprint, loadSearchCache
+
+
+TEST_FOLDERS = ( 'Tests/DataFilesForTests/USFMTest1/', 'Tests/DataFilesForTests/USFMTest2/',
+                'Tests/DataFilesForTests/USXTest1/', 'Tests/DataFilesForTests/USXTest2/',
+                'Tests/DataFilesForTests/OSISTest1/', 'Tests/DataFilesForTests/USFX-WEB/', ) # These are RELATIVE paths
+USFM_TEST_FOLDER = 'Tests/DataFilesForTests/USFMTest1/'
+
+
+
+class UnknownBibleTests( unittest.TestCase ):
+    """ Unit tests for the UnknownBible search. """
+
+    def setUp( self ):
+        self.tempFolder = tempfile.mkdtemp()
+        self.usfmFolder = os.path.join( self.tempFolder, 'USFMTest1/' )
+        shutil.copytree( USFM_TEST_FOLDER, self.usfmFolder )
+        cachePatcher = mock.patch.object( UnknownBible, 'SEARCH_CACHE_FOLDER', os.path.join( self.tempFolder, 'Cache/' ) )
+        cachePatcher.start()
+        self.addCleanup( cachePatcher.stop )
+
+    def tearDown( self ):
+        shutil.rmtree( self.tempFolder )
+
+    def test_010_getFolderFingerprint( self ):
+        """ Test listing a folder (and the folders inside it) and making its fingerprint. """
+        folderListings, fingerprint = getFolderFingerprint( USFM_TEST_FOLDER )
+        self.assertEqual( list( folderListings ), [USFM_TEST_FOLDER] )
+        self.assertEqual( sorted( folderListings[USFM_TEST_FOLDER] ), sorted( BibleOrgSysGlobals.scanFolder( USFM_TEST_FOLDER ) ) )
+        self.assertEqual( getFolderFingerprint( USFM_TEST_FOLDER )[1], fingerprint )
+        self.assertEqual( getFolderFingerprint( self.usfmFolder )[1], fingerprint ) # Copies keep their sizes and times
+        self.assertNotEqual( getFolderFingerprint( 'Tests/DataFilesForTests/USFMTest2/' )[1], fingerprint )
+
+        # Folders inside are listed (using the same path that the FileCheck functions use)
+        os.mkdir( os.path.join( self.usfmFolder, 'Inner' ) )
+        with open( os.path.join( self.usfmFolder, 'Inner', 'Inner.txt' ), 'wt' ) as innerFile: innerFile.write( 'Some text\n' )
+        folderListings, newFingerprint = getFolderFingerprint( self.usfmFolder )
+        self.assertEqual( folderListings[os.path.join( self.usfmFolder, 'Inner/' )], [('Inner.txt', False, True)] )
+        self.assertIn( ('Inner', True, False), folderListings[self.usfmFolder] )
+        self.assertNotEqual( newFingerprint, fingerprint )
+
+        # Changing the size or the time of a file changes the fingerprint
+        filepath = os.path.join( self.usfmFolder, 'XYZ01GEN.SCP' )
+        with open( filepath, 'at' ) as changedFile: changedFile.write( '\n' )
+        self.assertNotEqual( getFolderFingerprint( self.usfmFolder )[1], newFingerprint )
+        newFingerprint = getFolderFingerprint( self.usfmFolder )[1]
+        statInfo = os.stat( filepath )
+        os.utime( filepath, ns=(statInfo.st_atime_ns, statInfo.st_mtime_ns+1000000000) )
+        self.assertNotEqual( getFolderFingerprint( self.usfmFolder )[1], newFingerprint )
+    # end of test_010_getFolderFingerprint
+
+    def test_020_loadSearchCache( self ):
+        """ Test saving the search results and only loading them back for the same folder, fingerprint, and strictness. """
+        fingerprint = getFolderFingerprint( self.usfmFolder )[1]
+        self.assertIsNone( loadSearchCache( self.usfmFolder, fingerprint, True ) )
+        self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search(), 'USFM Bible' )
+        counts = loadSearchCache( self.usfmFolder, fingerprint, True )
+        self.assertEqual( counts['USFM'], 1 )
+        self.assertEqual( set( counts ), set( UnknownBible.FILE_CHECKER_DICT ) )
+        self.assertIsNone( loadSearchCache( self.usfmFolder, fingerprint, False ) )
+        self.assertIsNone( loadSearchCache( self.usfmFolder, fingerprint[::-1], True ) )
+        self.assertIsNone( loadSearchCache( USFM_TEST_FOLDER, fingerprint, True ) ) # Cached by folder
+        with mock.patch.object( UnknownBible, 'ProgVersion', '0.00' ):
+            self.assertIsNone( loadSearchCache( self.usfmFolder, fingerprint, True ) )
+        with open( UnknownBible.getSearchCacheFilepath( self.usfmFolder ), 'wt' ) as cacheFile: cacheFile.write( '{Broken' )
+        self.assertIsNone( loadSearchCache( self.usfmFolder, fingerprint, True ) )
+    # end of test_020_loadSearchCache
+
+    def test_030_cacheInvalidation( self ):
+        """ Test that the cached results are used until the folder changes. """
+        runFileChecks = UnknownBible.UnknownBible._UnknownBible__runFileChecks
+        with mock.patch.object( UnknownBible.UnknownBible, '_UnknownBible__runFileChecks', autospec=True, side_effect=runFileChecks ) as mocked:
+            self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search(), 'USFM Bible' )
+            self.assertEqual( mocked.call_count, 1 )
+            self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search(), 'USFM Bible' )
+            self.assertEqual( mocked.call_count, 1 ) # Used the cache
+            self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search( useCache=False ), 'USFM Bible' )
+            self.assertEqual( mocked.call_count, 2 )
+
+            # Now remove the USFM files so there's no Bible left
+            for filename in os.listdir( self.usfmFolder ):
+                if filename.endswith( '.SCP' ): os.remove( os.path.join( self.usfmFolder, filename ) )
+            self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search(), 'None found' )
+            self.assertEqual( mocked.call_count, 3 )
+            self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search(), 'None found' )
+            self.assertEqual( mocked.call_count, 3 )
+    # end of test_030_cacheInvalidation
+
+    def test_040_concurrentChecks( self ):
+        """ Test that running the FileCheck functions in threads finds the same Bibles. """
+        for testFolder in TEST_FOLDERS + (self.usfmFolder,):
+            for strictCheck in ( True, False ):
+                sequentialResult = UnknownBible.UnknownBible( testFolder ).search( strictCheck=strictCheck, useCache=False )
+                concurrentResult = UnknownBible.UnknownBible( testFolder ).search( strictCheck=strictCheck, useCache=False, concurrentChecks=True )
+                self.assertEqual( concurrentResult, sequentialResult )
+        self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search( useCache=False, concurrentChecks=True ), 'USFM Bible' )
+        self.assertIsNone( getattr( BibleOrgSysGlobals.folderListingCache, 'listings', None ) ) # Left as it was
+    # end of test_040_concurrentChecks
+
+    def test_050_sharedListings( self ):
+        """ Test that the FileCheck functions use the shared listing (and only in their own thread). """
+        def listingFileCheck( givenFolderName, strictCheck=True ):
+            foundListings.append( BibleOrgSysGlobals.scanFolder( givenFolderName ) )
+            return len( foundListings[-1] )
+        folderListings = { self.usfmFolder:[('Only.txt', False, True)] } # Pretend that the folder only has one file
+        fileCheckers = ( ('USFM',listingFileCheck), ('USX',listingFileCheck), ('OSIS',listingFileCheck), )
+        with mock.patch.object( UnknownBible, 'FILE_CHECKERS', fileCheckers ), \
+        mock.patch.object( UnknownBible, 'getFolderFingerprint', return_value=(folderListings, None) ):
+            for concurrentChecks in ( False, True ):
+                foundListings = []
+                self.assertEqual( UnknownBible.UnknownBible( self.usfmFolder ).search( concurrentChecks=concurrentChecks ), 'Many types found' )
+                self.assertEqual( foundListings, [folderListings[self.usfmFolder]] * len(fileCheckers) )
+
+        otherThreadListings = []
+        BibleOrgSysGlobals.folderListingCache.listings = folderListings
+        try:
+            self.assertEqual( BibleOrgSysGlobals.scanFolder( self.usfmFolder ), [('Only.txt', False, True)] )
+            otherThread = threading.Thread( target=lambda: otherThreadListings.append( BibleOrgSysGlobals.scanFolder( self.usfmFolder ) ) )
+            otherThread.start(); otherThread.join()
+            # A search inside puts our listings back afterwards
+            self.assertEqual( UnknownBible.UnknownBible( USFM_TEST_FOLDER ).search( useCache=False ), 'USFM Bible' )
+            self.assertIs( BibleOrgSysGlobals.folderListingCache.listings, folderListings )
+        finally: BibleOrgSysGlobals.folderListingCache.listings = None
+        self.assertEqual( sorted( otherThreadListings[0] ), sorted( BibleOrgSysGlobals.scanFolder( self.usfmFolder ) ) )
+    # end of test_050_sharedListings
+# end of UnknownBibleTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of UnknownBibleTests.py
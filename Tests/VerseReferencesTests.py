@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# VerseReferencesTests.py
+#   Last modified: 2015-05-08 (also update ProgVersion below)
+#
+# Module testing VerseReferences.py
+#
+# Copyright (C) 2015 Robert Hunt
+# Author: Robert Hunt <Freely.Given.org@gmail.com>
+# License: See gpl-3.0.txt
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Module testing VerseReferences.py (so far just the PackedVerseKey class).
+"""
+
+ProgName = "Verse references tests"
+ProgVersion = '0.10'
+ProgNameVersion = "{} v{}".format( ProgName, ProgVersion )
+
+
+import sys, gc, pickle, unittest
+
+sourceFolder = "."
+sys.path.append( sourceFolder )
+import BibleOrgSysGlobals
+from VerseReferences import SimpleVerseKey, PackedVerseKey
+
+
+SORTED_REFERENCES = [('GEN','1','1',''), ('GEN','1','2',''), ('GEN','1','2','a'), ('GEN','1','2','b'), ('GEN','1','10',''),
+                    ('GEN','2','1',''), ('GEN','10','1',''), ('EXO','1','1',''), ('MAL','4','6',''), ('MAT','1','1',''), ('REV','22','21',''), ]
+
+
+
+class PackedVerseKeyTests( unittest.TestCase ):
+    """ Unit tests for the PackedVerseKey object. """
+
+    def test_010_pack( self ):
+        """ Test that the reference is unpacked again. """
+        vK = PackedVerseKey( 'SA2', '19', '12', 'b' )
+        self.assertEqual( vK.getBCVS(), ('SA2','19','12','b') )
+        self.assertEqual( (vK.getBBB(), vK.getChapterNumberInt(), vK.getVerseNumberInt(), vK.getVerseSuffix()), ('SA2',19,12,'b') )
+        self.assertEqual( vK.getVerseKeyText(), 'SA2_19:12!b' )
+        self.assertEqual( vK.getShortText(), 'SA2 19:12b' )
+        self.assertEqual( vK.getOSISReference(), '2Sam.19.12' )
+        self.assertEqual( list( vK ), [vK] )
+        for BBB, C, V, S in SORTED_REFERENCES:
+            self.assertEqual( PackedVerseKey( BBB, C, V, S ).getBCVS(), (BBB,C,V,S) )
+            self.assertEqual( PackedVerseKey( BBB, int(C), int(V), S or None ).getBCVS(), (BBB,C,V,S) )
+        self.assertEqual( PackedVerseKey( 'GEN', '01', '007' ).getBCV(), ('GEN','1','7') ) # Leading zeroes are lost
+    # end of test_010_pack
+
+    def test_020_ordering( self ):
+        """ Test that the keys sort in book, chapter, verse, suffix order. """
+        keys = [PackedVerseKey( *reference ) for reference in SORTED_REFERENCES]
+        self.assertEqual( sorted( reversed( keys ) ), keys )
+        self.assertEqual( sorted( keys, key=lambda vK: vK.packedKey ), keys )
+        for j in range( len(keys)-1 ):
+            self.assertTrue( keys[j] < keys[j+1] and keys[j] <= keys[j+1] and keys[j] != keys[j+1] )
+            self.assertTrue( keys[j+1] > keys[j] and keys[j+1] >= keys[j] )
+            self.assertFalse( keys[j] > keys[j+1] or keys[j] >= keys[j+1] or keys[j] == keys[j+1] )
+        self.assertTrue( keys[0] <= keys[0] and keys[0] >= keys[0] )
+        self.assertRaises( TypeError, lambda: keys[0] < ('GEN','1','1','') )
+    # end of test_020_ordering
+
+    def test_030_interning( self ):
+        """ Test that the same reference gives the same object (but only while it's being used). """
+        vK = PackedVerseKey( 'JDE', '1', '25', 'e' )
+        self.assertIs( PackedVerseKey( 'JDE', 1, 25, 'e' ), vK )
+        self.assertIs( PackedVerseKey( 'JDE_1:25!e' ), vK )
+        self.assertIs( PackedVerseKey( 'JDE_1:25!e' ), vK ) # Already parsed
+        self.assertIs( PackedVerseKey( 'Jude_1.25!e', OSIS=True ), vK )
+        self.assertIs( SimpleVerseKey( 'JDE', '1', '25', 'e' ).getPackedVerseKey(), vK )
+        self.assertEqual( hash( vK ), vK.packedKey )
+        packedKey = vK.packedKey
+        self.assertIn( packedKey, PackedVerseKey._internedKeys )
+        self.assertIn( ('JDE_1:25!e',False), PackedVerseKey._parsedStrings )
+        del vK
+        gc.collect()
+        self.assertNotIn( packedKey, PackedVerseKey._internedKeys )
+        self.assertNotIn( ('JDE_1:25!e',False), PackedVerseKey._parsedStrings )
+        self.assertEqual( PackedVerseKey( 'JDE_1:25!e' ).packedKey, packedKey ) # Made again
+    # end of test_030_interning
+
+    def test_040_pickle( self ):
+        """ Test that unpickled keys are interned. """
+        keys = [PackedVerseKey( *reference ) for reference in SORTED_REFERENCES]
+        for protocol in range( pickle.HIGHEST_PROTOCOL+1 ):
+            unpickledKeys = pickle.loads( pickle.dumps( keys, protocol ) )
+            self.assertEqual( unpickledKeys, keys )
+            for vK, unpickledKey in zip( keys, unpickledKeys ): self.assertIs( unpickledKey, vK )
+            unpickledDict = pickle.loads( pickle.dumps( { vK:vK.getShortText() for vK in keys }, protocol ) )
+            self.assertEqual( [unpickledDict[vK] for vK in keys], [vK.getShortText() for vK in keys] )
+    # end of test_040_pickle
+
+    def test_050_errors( self ):
+        """ Test the references which can't be packed or parsed. """
+        for badReference in ( ('XYZ','1','1'), ('Gen','1','1'), ('GEN','0','-1'), ('GEN','a','1'), ('GEN','1',None), ('GEN','1','1','ab'),
+                                ('GEN','1','1','A'), ('GEN','1','1','1'), ('GEN','1024','1'), ('GEN','1','1024'), ):
+            self.assertRaises( ValueError, PackedVerseKey, *badReference )
+        self.assertEqual( PackedVerseKey( 'GEN', '1023', '1023' ).getCV(), ('1023','1023') ) # The biggest numbers that fit
+        self.assertRaises( ValueError, PackedVerseKey, 'XYZ_1:1' ) # Parses but can't be packed
+        self.assertRaises( TypeError, PackedVerseKey, 'Not a reference', ignoreParseErrors=True )
+        self.assertRaises( ValueError, SimpleVerseKey( 'GEN', '0', '-1' ).getPackedVerseKey ) # The end of the book introduction
+    # end of test_050_errors
+
+    def test_060_simpleVerseKey( self ):
+        """ Test converting to and from SimpleVerseKey (which never compares equal). """
+        for reference in SORTED_REFERENCES:
+            vK, svK = PackedVerseKey( *reference ), SimpleVerseKey( *reference )
+            self.assertEqual( vK.getBCVS(), svK.getBCVS() )
+            self.assertNotEqual( vK, svK )
+            self.assertNotEqual( svK, vK )
+            self.assertEqual( vK.getSimpleVerseKey(), svK )
+            self.assertIs( svK.getPackedVerseKey(), vK )
+            self.assertEqual( vK.makeHash(), svK.makeHash() )
+    # end of test_060_simpleVerseKey
+# end of PackedVerseKeyTests class
+
+
+if __name__ == '__main__':
+    # Configure basic set-up
+    parser = BibleOrgSysGlobals.setup( ProgName, ProgVersion )
+    BibleOrgSysGlobals.addStandardOptionsAndProcess( parser )
+
+    if BibleOrgSysGlobals.verbosityLevel > 1: print( ProgNameVersion )
+
+    unittest.main() # Automatically runs all of the above tests
+# end of VerseReferencesTests.py
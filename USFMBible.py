@@ -109,10 +109,9 @@ def USFMBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoL
     # Find all the files and folders in this folder
     if BibleOrgSysGlobals.verbosityLevel > 3: print( " USFMBibleFileCheck: Looking for files in given {}".format( givenFolderName ) )
     foundFolders, foundFiles = [], []
-    for something in os.listdir( givenFolderName ):
-        somepath = os.path.join( givenFolderName, something )
-        if os.path.isdir( somepath ): foundFolders.append( something )
-        elif os.path.isfile( somepath ):
+    for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( givenFolderName ):
+        if somethingIsFolder: foundFolders.append( something )
+        elif somethingIsFile:
             somethingUpper = something.upper()
             somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
             ignore = False
@@ -156,10 +155,9 @@ def USFMBibleFileCheck( givenFolderName, strictCheck=True, autoLoad=False, autoL
             continue
         if BibleOrgSysGlobals.verbosityLevel > 3: print( "    USFMBibleFileCheck: Looking for files in {}".format( tryFolderName ) )
         foundSubfolders, foundSubfiles = [], []
-        for something in os.listdir( tryFolderName ):
-            somepath = os.path.join( givenFolderName, thisFolderName, something )
-            if os.path.isdir( somepath ): foundSubfolders.append( something )
-            elif os.path.isfile( somepath ):
+        for something, somethingIsFolder, somethingIsFile in BibleOrgSysGlobals.scanFolder( tryFolderName ):
+            if somethingIsFolder: foundSubfolders.append( something )
+            elif somethingIsFile:
                 somethingUpper = something.upper()
                 somethingUpperProper, somethingUpperExt = os.path.splitext( somethingUpper )
                 ignore = False
@@ -441,6 +439,24 @@ class USFMBible( Bible ):
         #print( self.getBookList() )
         self.doPostLoadProcessing()
     # end of USFMBible.load
+
+
+    def loadLazily( self, maxLoadedBooks=None ):
+        """
+        Instead of loading all the books now,
+            each book is loaded (and processed and indexed) when it's first needed,
+            i.e., by indexing this object with a BBB, by getting verse data, or by iterating through the books.
+
+        If maxLoadedBooks is given, the least recently used books are unloaded
+            so that no more than that number of processed books are kept in memory.
+        """
+        if BibleOrgSysGlobals.verbosityLevel > 1:
+            print( t("Lazily loading {} books of {} from {}...").format( len(self.maximumPossibleFilenameTuples), self.name, self.sourceFolder ) )
+        if BibleOrgSysGlobals.debugFlag: assert( maxLoadedBooks is None or maxLoadedBooks > 0 )
+        self.availableBookList = [BBB for BBB,filename in self.maximumPossibleFilenameTuples]
+        self.maxLoadedBooks = maxLoadedBooks
+        self.lazyLoadingFlag = True
+    # end of USFMBible.loadLazily
 # end of class USFMBible
 
 
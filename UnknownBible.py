@@ -29,15 +29,18 @@ Given a folder name, analyses the files in it
     and tries to determine what type of Bible it probably contains (if any).
 
 Currently aware of the following Bible types:
-    USFM
+    USFM, and our own BCV export format
     Unbound Bible (table based), theWord (line based), MySword (SQLite based), e-Sword (SQLite based)
     OSIS, USX, USFX, OpenSong, Zefania, Haggai, VerseView (all XML)
     Sword modules (binary).
+
+The results of the format checks can be cached on disk for each folder
+    so that searching an unchanged folder again is fast.
 """
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-04-28' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "UnknownBible"
 ProgName = "Unknown Bible object handler"
 ProgVersion = '0.20'
@@ -47,7 +50,8 @@ ProgNameVersionDate = '{} {} {}'.format( ProgNameVersion, _("last modified"), La
 debuggingThisModule = False
 
 
-import logging, os.path
+import logging, os.path, json, hashlib
+from multiprocessing.pool import ThreadPool
 
 import BibleOrgSysGlobals
 from ESFMBible import ESFMBibleFileCheck, ESFMBible
@@ -66,13 +70,123 @@ from TheWordBible import TheWordBibleFileCheck, TheWordBible
 from MySwordBible import MySwordBibleFileCheck, MySwordBible
 from ESwordBible import ESwordBibleFileCheck, ESwordBible
 from PalmDBBible import PalmDBBibleFileCheck, PalmDBBible
-from OnlineBible import OnlineBibleFileCheck, OnlineBible
+try: from OnlineBible import OnlineBibleFileCheck, OnlineBible
+except ImportError: OnlineBibleFileCheck = OnlineBible = None # Then we just don't check for Online Bibles
 from SwordBible import SwordBibleFileCheck, SwordBible
 from CSVBible import CSVBibleFileCheck, CSVBible
 from VPLBible import VPLBibleFileCheck, VPLBible
+from BCVBible import BCVBibleFileCheck, BCVBible
 #from SwordResources import SwordInterface # What about these?
 
 
+# The FileCheck functions in the order that they are best searched (to avoid false detections)
+FILE_CHECKERS = ( ('theWord',TheWordBibleFileCheck), ('MySword',MySwordBibleFileCheck), ('e-Sword',ESwordBibleFileCheck),
+                ('PalmDB',PalmDBBibleFileCheck), ('Online',OnlineBibleFileCheck), ('Sword',SwordBibleFileCheck),
+                ('Unbound',UnboundBibleFileCheck), ('Drupal',DrupalBibleFileCheck), ('YET',YETBibleFileCheck),
+                ('ESFM',ESFMBibleFileCheck), ('USFM',USFMBibleFileCheck),
+                ('USX',USXXMLBibleFileCheck), ('USFX',USFXXMLBibleFileCheck), ('OSIS',OSISXMLBibleFileCheck),
+                ('OpenSong',OpenSongXMLBibleFileCheck), ('Zefania',ZefaniaXMLBibleFileCheck),
+                ('Haggai',HaggaiXMLBibleFileCheck), ('VerseView',VerseViewXMLBibleFileCheck),
+                ('CSV',CSVBibleFileCheck), ('VPL',VPLBibleFileCheck), ('BCV',BCVBibleFileCheck), )
+if OnlineBibleFileCheck is None: FILE_CHECKERS = tuple( entry for entry in FILE_CHECKERS if entry[0] != 'Online' )
+FILE_CHECKER_DICT = dict( FILE_CHECKERS )
+
+# The order to choose a Bible to autoload
+#   Puts the binary formats first here because they can be detected more reliably
+AUTOLOAD_ORDER = ( ('theWord',"theWord Bible"), ('MySword',"MySword Bible"), ('e-Sword',"e-Sword Bible"),
+                ('PalmDB',"PalmDB Bible"), ('Online',"Online Bible"), ('Sword',"Sword Bible"),
+                # And now plain text formats
+                ('Unbound',"Unbound Bible"), ('Drupal',"Drupal Bible"), ('YET',"YET Bible"),
+                ('ESFM',"ESFM Bible"), ('USFM',"USFM Bible"), ('CSV',"CSV Bible"), ('VPL',"VPL Bible"), ('BCV',"BCV Bible"),
+                # And now XML text formats
+                ('USX',"USX XML Bible"), ('USFX',"USFX XML Bible"), ('OSIS',"OSIS XML Bible"),
+                ('OpenSong',"OpenSong XML Bible"), ('Zefania',"Zefania XML Bible"),
+                ('Haggai',"Haggai XML Bible"), ('VerseView',"VerseView XML Bible"), )
+if OnlineBibleFileCheck is None: AUTOLOAD_ORDER = tuple( entry for entry in AUTOLOAD_ORDER if entry[0] != 'Online' )
+assert( len(AUTOLOAD_ORDER) == len(FILE_CHECKERS) )
+
+SEARCH_CACHE_FOLDER = os.path.join( BibleOrgSysGlobals.DEFAULT_CACHE_FOLDER, 'UnknownBibleSearches/' )
+
+
+
+def getFolderFingerprint( folderPath ):
+    """
+    Lists the given folder and the folders inside it in a single pass.
+
+    Returns a 2-tuple containing:
+        a dictionary of folder listings (in the form used by BibleOrgSysGlobals.scanFolder)
+            which can be shared by all of the FileCheck functions,
+        and a fingerprint string made from the names, sizes and modification times of everything found.
+
+    Note that the FileCheck functions only look one folder level down,
+        so deeper files only affect the fingerprint if they change their folder's modification time.
+    """
+    folderListings, fingerprintParts = {}, []
+    foldersToScan = [ (folderPath, '') ]
+    for thisFolderPath, relativePath in foldersToScan:
+        folderEntries = []
+        with os.scandir( thisFolderPath ) as scanner:
+            for dirEntry in scanner:
+                isFolder, isFile = dirEntry.is_dir(), dirEntry.is_file()
+                folderEntries.append( (dirEntry.name, isFolder, isFile) )
+                statInfo = dirEntry.stat()
+                fingerprintParts.append( (relativePath+dirEntry.name, isFolder, statInfo.st_size, statInfo.st_mtime_ns) )
+                if isFolder and not relativePath: # Only go one level down (with the same path the FileCheck functions use)
+                    foldersToScan.append( (os.path.join( folderPath, dirEntry.name+'/' ), dirEntry.name+'/') )
+        folderListings[thisFolderPath] = folderEntries
+    fingerprintParts.sort()
+    return folderListings, hashlib.sha1( repr(fingerprintParts).encode( 'utf-8' ) ).hexdigest()
+# end of getFolderFingerprint
+
+
+def getSearchCacheFilepath( folderPath ):
+    """
+    Returns the filepath of the search cache file for the given folder.
+    """
+    absoluteFolderPath = os.path.abspath( folderPath )
+    return os.path.join( SEARCH_CACHE_FOLDER, hashlib.sha1( absoluteFolderPath.encode( 'utf-8' ) ).hexdigest()+'.json' )
+# end of getSearchCacheFilepath
+
+
+def loadSearchCache( folderPath, fingerprint, strictCheck ):
+    """
+    Returns the dictionary of FileCheck results cached for this folder
+        or None if there's no cached result or if the folder has changed since.
+    """
+    try:
+        with open( getSearchCacheFilepath( folderPath ), 'rt', encoding='utf-8' ) as cacheFile:
+            cachedSearch = json.load( cacheFile )
+    except (OSError, ValueError): return None
+    if cachedSearch.get( 'folderPath' ) != os.path.abspath( folderPath ) \
+    or cachedSearch.get( 'fingerprint' ) != fingerprint \
+    or cachedSearch.get( 'strictCheck' ) != strictCheck \
+    or cachedSearch.get( 'progVersion' ) != ProgVersion:
+        return None
+    return cachedSearch.get( 'counts' )
+# end of loadSearchCache
+
+
+def saveSearchCache( folderPath, fingerprint, strictCheck, counts ):
+    """
+    Saves the dictionary of FileCheck results for this folder into the search cache.
+
+    The file is written to a temporary name and then renamed
+        so that concurrent jobs never see a partly written file.
+    """
+    cacheFilepath = getSearchCacheFilepath( folderPath )
+    cachedSearch = { 'folderPath':os.path.abspath( folderPath ), 'fingerprint':fingerprint,
+                    'strictCheck':strictCheck, 'progVersion':ProgVersion, 'counts':counts }
+    try:
+        if not os.access( SEARCH_CACHE_FOLDER, os.W_OK ): os.makedirs( SEARCH_CACHE_FOLDER, exist_ok=True )
+        temporaryFilepath = '{}.{}.tmp'.format( cacheFilepath, os.getpid() )
+        with open( temporaryFilepath, 'wt', encoding='utf-8' ) as cacheFile:
+            json.dump( cachedSearch, cacheFile )
+        os.replace( temporaryFilepath, cacheFilepath )
+    except OSError as err:
+        logging.warning( _("UnknownBible: Unable to save search cache for {!r}: {}").format( folderPath, err ) )
+# end of saveSearchCache
+
+
 
 class UnknownBible:
     """
@@ -111,7 +225,7 @@ class UnknownBible:
     # end of UnknownBible.__str__
 
 
-    def search( self, strictCheck=True, autoLoad=False, autoLoadAlways=False, autoLoadBooks=False ):
+    def search( self, strictCheck=True, autoLoad=False, autoLoadAlways=False, autoLoadBooks=False, useCache=True, concurrentChecks=False ):
         """
         Search our folder to found what if any Bible versions can be found.
             These searches are best done in a certain order to avoid false detections.
@@ -119,6 +233,11 @@ class UnknownBible:
         If autoLoad is set and exactly one Bible is found, it will load it.
         If autoLoadAlways is set and one or more Bibles are found, it will load one.
 
+        If useCache is set, the results of the FileCheck functions are saved to disk
+            and reused next time if the names, sizes and modification times
+            of the files and folders haven't changed.
+        If concurrentChecks is set, the FileCheck functions are run in a pool of threads.
+
         returns either a string:
             'None found'
             "Multiple found: {} Bibles"
@@ -131,170 +250,27 @@ class UnknownBible:
         if not self.folderReadable: return None
         if autoLoadAlways or autoLoadBooks: autoLoad = True
 
-        totalBibleCount, totalBibleTypes, typesFound = 0, 0, []
-
-        # Search for TheWord Bibles
-        theWordBibleCount = TheWordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if theWordBibleCount:
-            totalBibleCount += theWordBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'theWord:' + str(theWordBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "TheWordBible.search: theWordBibleCount", theWordBibleCount )
-
-        # Search for MySword Bibles
-        MySwordBibleCount = MySwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if MySwordBibleCount:
-            totalBibleCount += MySwordBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'MySword:' + str(MySwordBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "MySwordBible.search: MySwordBibleCount", MySwordBibleCount )
-
-        # Search for e-Sword Bibles
-        ESwordBibleCount = ESwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if ESwordBibleCount:
-            totalBibleCount += ESwordBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'e-Sword:' + str(ESwordBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "ESwordBible.search: ESwordBibleCount", ESwordBibleCount )
-
-        # Search for PalmDB Bibles
-        PDBBibleCount = PalmDBBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if PDBBibleCount:
-            totalBibleCount += PDBBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'PalmDB:' + str(PDBBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: PDBBibleCount", PDBBibleCount )
-
-        # Search for Online Bibles
-        OnlineBibleCount = OnlineBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if OnlineBibleCount:
-            totalBibleCount += OnlineBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Online:' + str(OnlineBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: OnlineBibleCount", OnlineBibleCount )
-
-        # Search for Sword Bibles
-        SwordBibleCount = SwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if SwordBibleCount:
-            totalBibleCount += SwordBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Sword:' + str(SwordBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: SwordBibleCount", SwordBibleCount )
-
-        # Search for Unbound Bibles
-        UnboundBibleCount = UnboundBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if UnboundBibleCount:
-            totalBibleCount += UnboundBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Unbound:' + str(UnboundBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: UnboundBibleCount", UnboundBibleCount )
-
-        # Search for Drupal Bibles
-        DrupalBibleCount = DrupalBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if DrupalBibleCount:
-            totalBibleCount += DrupalBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Drupal:' + str(DrupalBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: DrupalBibleCount", DrupalBibleCount )
-
-        # Search for YET Bibles
-        YETBibleCount = YETBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if YETBibleCount:
-            totalBibleCount += YETBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'YET:' + str(YETBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: YETBibleCount", YETBibleCount )
-
-        # Search for ESFM Bibles
-        ESFMBibleCount = ESFMBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if ESFMBibleCount:
-            totalBibleCount += ESFMBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'ESFM:' + str(ESFMBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: ESFMBibleCount", ESFMBibleCount )
-
-        # Search for USFM Bibles
-        USFMBibleCount = USFMBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if USFMBibleCount:
-            totalBibleCount += USFMBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'USFM:' + str(USFMBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: USFMBibleCount", USFMBibleCount )
-
-        # Search for USX XML Bibles
-        USXBibleCount = USXXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if USXBibleCount:
-            totalBibleCount += USXBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'USX:' + str(USXBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: USXBibleCount", USXBibleCount )
-
-        # Search for USFX XML Bibles
-        USFXBibleCount = USFXXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if USFXBibleCount:
-            totalBibleCount += USFXBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'USFX:' + str(USFXBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: USFXBibleCount", USFXBibleCount )
-
-        # Search for OSIS XML Bibles
-        OSISBibleCount = OSISXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if OSISBibleCount:
-            totalBibleCount += OSISBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'OSIS:' + str(OSISBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: OSISBibleCount", OSISBibleCount )
-
-        # Search for OpenSong XML Bibles
-        OpenSongBibleCount = OpenSongXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if OpenSongBibleCount:
-            totalBibleCount += OpenSongBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'OpenSong:' + str(OpenSongBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: OpenSongBibleCount", OpenSongBibleCount )
-
-        # Search for Zefania XML Bibles
-        ZefaniaBibleCount = ZefaniaXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if ZefaniaBibleCount:
-            totalBibleCount += ZefaniaBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Zefania:' + str(ZefaniaBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: ZefaniaBibleCount", ZefaniaBibleCount )
-
-        # Search for Haggai XML Bibles
-        HaggaiBibleCount = HaggaiXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if HaggaiBibleCount:
-            totalBibleCount += HaggaiBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'Haggai:' + str(HaggaiBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: HaggaiBibleCount", HaggaiBibleCount )
-
-        # Search for VerseView XML Bibles
-        VerseViewBibleCount = VerseViewXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if VerseViewBibleCount:
-            totalBibleCount += VerseViewBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'VerseView:' + str(VerseViewBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: VerseViewBibleCount", VerseViewBibleCount )
-
-        # Search for CSV text Bibles
-        CSVBibleCount = CSVBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if CSVBibleCount:
-            totalBibleCount += CSVBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'CSV:' + str(CSVBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: CSVBibleCount", CSVBibleCount )
-
-        # Search for VPL text Bibles
-        VPLBibleCount = VPLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck )
-        if VPLBibleCount:
-            totalBibleCount += VPLBibleCount
-            totalBibleTypes += 1
-            typesFound.append( 'VPL:' + str(VPLBibleCount) )
-            if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: VPLBibleCount", VPLBibleCount )
-
-
-        assert( len(typesFound) == totalBibleTypes )
+        # List everything once (the FileCheck functions only look one level down)
+        try: folderListings, fingerprint = getFolderFingerprint( self.givenFolderName )
+        except OSError as err:
+            logging.error( _("UnknownBible.search: Unable to list {!r}: {}").format( self.givenFolderName, err ) )
+            folderListings = fingerprint = None # Let the FileCheck functions do their own listings
+
+        counts = loadSearchCache( self.givenFolderName, fingerprint, strictCheck ) if useCache and fingerprint else None
+        if counts is None:
+            counts = self.__runFileChecks( strictCheck, folderListings, concurrentChecks )
+            if useCache and fingerprint: saveSearchCache( self.givenFolderName, fingerprint, strictCheck, counts )
+        elif BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: Using cached search results for {!r}".format( self.givenFolderName ) )
+
+        totalBibleCount, typesFound = 0, []
+        for typeName,fileChecker in FILE_CHECKERS:
+            typeCount = counts.get( typeName )
+            if typeCount:
+                totalBibleCount += typeCount
+                typesFound.append( '{}:{}'.format( typeName, typeCount ) )
+                if BibleOrgSysGlobals.verbosityLevel > 2: print( "UnknownBible.search: {}BibleCount".format( typeName ), typeCount )
+        totalBibleTypes = len( typesFound )
+
         if totalBibleCount == 0:
             if BibleOrgSysGlobals.verbosityLevel > 0: print( "UnknownBible.search: No Bibles found" )
             self.foundType = 'None found'
@@ -311,91 +287,37 @@ class UnknownBible:
                 print( "UnknownBible.search: Will try to find one Bible to autoload anyway!" )
 
         if autoLoadAlways or totalBibleCount == 1:
-            # Put the binary formats first here because they can be detected more reliably
-            if theWordBibleCount == 1:
-                self.foundType = "theWord Bible"
-                if autoLoad: return TheWordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif MySwordBibleCount == 1:
-                self.foundType = "MySword Bible"
-                if autoLoad: return MySwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif ESwordBibleCount == 1:
-                self.foundType = "e-Sword Bible"
-                if autoLoad: return ESwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif PDBBibleCount == 1:
-                self.foundType = "PalmDB Bible"
-                if autoLoad: return PalmDBBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif OnlineBibleCount == 1:
-                self.foundType = "Online Bible"
-                if autoLoad: return OnlineBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif SwordBibleCount == 1:
-                self.foundType = "Sword Bible"
-                if autoLoad: return SwordBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            # And now plain text formats
-            elif UnboundBibleCount == 1:
-                self.foundType = "Unbound Bible"
-                if autoLoad: return UnboundBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif DrupalBibleCount == 1:
-                self.foundType = "Drupal Bible"
-                if autoLoad: return DrupalBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif YETBibleCount == 1:
-                self.foundType = "YET Bible"
-                if autoLoad: return YETBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif ESFMBibleCount == 1:
-                self.foundType = "ESFM Bible"
-                if autoLoad: return ESFMBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif USFMBibleCount == 1:
-                self.foundType = "USFM Bible"
-                if autoLoad: return USFMBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif CSVBibleCount == 1:
-                self.foundType = "CSV Bible"
-                if autoLoad: return CSVBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif VPLBibleCount == 1:
-                self.foundType = "VPL Bible"
-                if autoLoad: return VPLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            # And now XML text formats
-            elif USXBibleCount == 1:
-                self.foundType = "USX XML Bible"
-                if autoLoad: return USXXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif USFXBibleCount == 1:
-                self.foundType = "USFX XML Bible"
-                if autoLoad: return USFXXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif OSISBibleCount == 1:
-                self.foundType = "OSIS XML Bible"
-                if autoLoad: return OSISXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif OpenSongBibleCount == 1:
-                self.foundType = "OpenSong XML Bible"
-                if autoLoad: return OpenSongXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif ZefaniaBibleCount == 1:
-                self.foundType = "Zefania XML Bible"
-                if autoLoad: return ZefaniaXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif HaggaiBibleCount == 1:
-                self.foundType = "Haggai XML Bible"
-                if autoLoad: return HaggaiXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
-            elif VerseViewBibleCount == 1:
-                self.foundType = "VerseView XML Bible"
-                if autoLoad: return VerseViewXMLBibleFileCheck( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
-                else: return self.foundType
+            for typeName,typeDescription in AUTOLOAD_ORDER:
+                if counts.get( typeName ) == 1:
+                    self.foundType = typeDescription
+                    if autoLoad: return FILE_CHECKER_DICT[typeName]( self.givenFolderName, strictCheck=strictCheck, autoLoad=autoLoad, autoLoadBooks=autoLoadBooks )
+                    break
         return self.foundType
     # end of UnknownBible.search
+
+
+    def __runFileChecks( self, strictCheck, folderListings, concurrentChecks ):
+        """
+        Runs all of the FileCheck functions on our folder
+            sharing the given folder listings between them (if any).
+
+        Returns a dictionary of the results (normally None, False, or a count) by type name.
+        """
+        def runFileCheck( fileChecker ):
+            # The shared listings are only seen by the thread running this check (and any previous ones are put back afterwards)
+            previousListings = getattr( BibleOrgSysGlobals.folderListingCache, 'listings', None )
+            BibleOrgSysGlobals.folderListingCache.listings = folderListings
+            try: return fileChecker( self.givenFolderName, strictCheck=strictCheck )
+            finally: BibleOrgSysGlobals.folderListingCache.listings = previousListings
+
+        fileCheckers = [fileChecker for typeName,fileChecker in FILE_CHECKERS]
+        if concurrentChecks: # The checks mostly wait on the filesystem so threads are enough here
+            numThreads = BibleOrgSysGlobals.maxProcesses if BibleOrgSysGlobals.maxProcesses > 1 else os.cpu_count()
+            with ThreadPool( min( numThreads, len(fileCheckers) ) ) as pool:
+                results = pool.map( runFileCheck, fileCheckers )
+        else: results = [runFileCheck( fileChecker ) for fileChecker in fileCheckers]
+        return { typeName:result for (typeName,fileChecker),result in zip( FILE_CHECKERS, results ) }
+    # end of UnknownBible.__runFileChecks
 # end of class UnknownBible
 
 
@@ -53,8 +53,9 @@ Our ranges are inclusive
     e.g., Gen_1:1-Gen_1:2 but Gen_1:1–Gen_2:3
     i.e., using a hyphen for a verse span but en-dash (–) for a span that crosses chapters or books.
 
-We have four classes here:
+We have five classes here:
     SimpleVerseKey (accepts 'GEN_1:1' or 'GEN','1','1')
+    PackedVerseKey (the same but packed into an integer -- faster as a dictionary key)
     SimpleVersesKey (accepts 'MAT_6:1,4')
     VerseRangeKey (accepts 'JNA_2:1-7')
     FlexibleVersesKey (accepts all of the above plus more)
@@ -66,7 +67,7 @@ Each class can return
 
 from gettext import gettext as _
 
-LastModifiedDate = '2015-02-11' # by RJH
+LastModifiedDate = '2015-05-08' # by RJH
 ShortProgName = "VerseReferences"
 ProgName = "Bible verse reference handler"
 ProgVersion = '0.34'
@@ -77,6 +78,7 @@ debuggingThisModule = False
 
 
 import re, logging
+from weakref import WeakValueDictionary
 
 
 import BibleOrgSysGlobals
@@ -162,6 +164,13 @@ OSIS_VERSE_RANGE_PLUS_RE = '^{}-{}\.{}$'.format( OSIS_BCVS_RE, OSIS_VS_RE, OSIS_
 OSIS_VERSE_PLUS_RANGE_RE = '^{}\.{}-{}$'.format( OSIS_BCVS_RE, OSIS_VS_RE, OSIS_VS_RE )
 OSIS_VERSE_PLUS_RANGE_PLUS_RE = '^{}\.{}-{}\.{}$'.format( OSIS_BCVS_RE, OSIS_VS_RE, OSIS_VS_RE, OSIS_VS_RE )
 
+# Compiled versions of the single verse patterns (used by PackedVerseKey)
+VERSE_PATTERN = re.compile( VERSE_RE )
+OSIS_VERSE_PATTERN = re.compile( OSIS_VERSE_RE )
+
+# The number of bits used for each field by PackedVerseKey (the book number uses the remaining high bits)
+PACKED_BOOK_BITS, PACKED_C_BITS, PACKED_V_BITS, PACKED_S_BITS = 10, 10, 10, 5
+
 
 
 def t( messageString ):
@@ -238,7 +247,7 @@ class SimpleVerseKey():
 
     def makeHash( self ): # return a short, unambiguous string suitable for use as a key in a dictionary
         return "{}_{}:{}!{}".format( self.BBB, self.C, self.V, self.S )
-    def __hash__( self ): return hash( self.makeHash() )
+    def __hash__( self ): return hash( (self.BBB, self.C, self.V, self.S) ) # Quicker than hashing makeHash()
 
     def __len__( self ): return 4
     def __getitem__( self, keyIndex ):
@@ -260,6 +269,8 @@ class SimpleVerseKey():
     def getCV( self ): return self.C, self.V
     def getCVS( self ): return self.C, self.V, self.S
 
+    def getPackedVerseKey( self ): return PackedVerseKey( self.BBB, self.C, self.V, self.S )
+
     def getChapterNumberInt( self ):
         try: return( int( self.C ) )
         except ValueError:
@@ -362,6 +373,149 @@ class SimpleVerseKey():
 
 
 
+class PackedVerseKey():
+    """
+    Handles individual verse references (like SimpleVerseKey)
+        but packs the book number, chapter number, verse number and suffix into a single integer
+        so that it's quick to hash and compare (e.g., as a key in a large dictionary).
+
+    These objects are immutable and interned,
+        i.e., asking for the same reference again returns the same object
+        (while that object is still in use -- the interning tables only hold weak references
+        so they don't keep every key that was ever made).
+
+    NOTE: A PackedVerseKey never compares equal to a SimpleVerseKey for the same reference
+        (because they hash differently, they can't be mixed as dictionary keys anyway),
+        so use getSimpleVerseKey() or getPackedVerseKey() to convert one before comparing them.
+
+    The chapter and verse must be numeric, and the suffix a single lowercase letter (or empty).
+        The book number is the BibleBooksCodes referenceNumber
+        so the keys sort into book, chapter, verse, suffix order.
+
+    Usage is:
+        vK = PackedVerseKey( 'SA2', '19', '12', 'b' ) # or PackedVerseKey( 'SA2_19:12!b' )
+        vK is PackedVerseKey( 'SA2_19:12!b' ) # True
+        vK.getBBB(), vK.getChapterNumberInt(), vK.packedKey
+    """
+    __slots__ = ('packedKey', '__weakref__',)
+    _internedKeys = WeakValueDictionary() # packedKey: PackedVerseKey object
+    _parsedStrings = WeakValueDictionary() # (referenceString, OSIS): PackedVerseKey object
+    _BBBNumberDict, _BBBList = {}, [None] * (1<<PACKED_BOOK_BITS) # Book number lookup tables (filled the first time they're needed)
+
+    def __new__( cls, BBB, C=None, V=None, S=None, OSIS=False, ignoreParseErrors=False ):
+        if C is None and V is None and S is None: # assume it's a string to be parsed
+            try: return cls._parsedStrings[(BBB,OSIS)]
+            except KeyError: pass
+            match = (OSIS_VERSE_PATTERN if OSIS else VERSE_PATTERN).match( BBB )
+            if not match:
+                if not ignoreParseErrors:
+                    logging.error( "PackedVerseKey was unable to parse {}{!r}".format( 'OSIS ' if OSIS else '', BBB ) )
+                raise TypeError
+            bk, C, V, S = match.groups()
+            self = cls( BibleOrgSysGlobals.BibleBooksCodes.getBBBFromOSIS( bk ) if OSIS else bk, C, V, S )
+            cls._parsedStrings[(BBB,OSIS)] = self
+            return self
+
+        # else assume it's a BBB/C/V/(S) call
+        if not cls._BBBNumberDict: cls._loadBookNumbers()
+        try: bookNumber, Cint, Vint = cls._BBBNumberDict[BBB], int(C), int(V)
+        except (KeyError, ValueError, TypeError): bookNumber = None
+        if bookNumber is None or not ( 0 <= Cint < (1<<PACKED_C_BITS) and 0 <= Vint < (1<<PACKED_V_BITS) ) \
+        or not ( not S or ( len(S)==1 and 'a'<=S<='z' ) ):
+            raise ValueError( "PackedVerseKey can't pack {!r} {!r} {!r} {!r}".format( BBB, C, V, S ) )
+        packedKey = ((((bookNumber << PACKED_C_BITS) | Cint) << PACKED_V_BITS | Vint) << PACKED_S_BITS) | (ord(S)-96 if S else 0)
+        try: return cls._internedKeys[packedKey]
+        except KeyError:
+            self = object.__new__( cls )
+            self.packedKey = packedKey
+            cls._internedKeys[packedKey] = self
+            return self
+    # end of PackedVerseKey.__new__
+
+    @classmethod
+    def _loadBookNumbers( cls ):
+        """
+        Fill the tables for converting between BBB codes and book numbers.
+        """
+        for BBB in BibleOrgSysGlobals.BibleBooksCodes.getAllReferenceAbbreviations():
+            bookNumber = BibleOrgSysGlobals.BibleBooksCodes.getReferenceNumber( BBB )
+            cls._BBBNumberDict[BBB] = bookNumber
+            cls._BBBList[bookNumber] = BBB
+    # end of PackedVerseKey._loadBookNumbers
+
+    def __reduce__( self ): return PackedVerseKey, self.getBCVS() # So that unpickled keys are interned also
+
+    def __eq__( self, other ):
+        if type( other ) is type( self ): return self.packedKey == other.packedKey
+        return False # Even for a SimpleVerseKey with the same reference (see the class docstring)
+    def __ne__( self, other ): return not self.__eq__(other)
+    def __lt__( self, other ):
+        if type( other ) is type( self ): return self.packedKey < other.packedKey
+        return NotImplemented
+    def __le__( self, other ):
+        if type( other ) is type( self ): return self.packedKey <= other.packedKey
+        return NotImplemented
+    def __gt__( self, other ):
+        if type( other ) is type( self ): return self.packedKey > other.packedKey
+        return NotImplemented
+    def __ge__( self, other ):
+        if type( other ) is type( self ): return self.packedKey >= other.packedKey
+        return NotImplemented
+    def __hash__( self ): return self.packedKey # An int is its own hash
+
+    def __repr__(self): return self.__str__()
+    def __str__( self ): return "PackedVerseKey object: {}".format( self.getShortText() )
+    def getShortText( self ):
+        return "{} {}:{}{}".format( *self.getBCVS() )
+    def getVerseKeyText( self ):
+        S = self.getVerseSuffix()
+        return "{}_{}:{}{}{}".format( self.getBBB(), self.getChapterNumberInt(), self.getVerseNumberInt(), '!' if S else '', S )
+    def makeHash( self ): # for compatibility with SimpleVerseKey
+        return "{}_{}:{}!{}".format( *self.getBCVS() )
+
+    def __len__( self ): return 4
+    def __getitem__( self, keyIndex ): return self.getBCVS()[keyIndex]
+
+    def getBBB( self ): return self._BBBList[self.packedKey >> (PACKED_C_BITS+PACKED_V_BITS+PACKED_S_BITS)]
+    def getChapterNumberInt( self ): return (self.packedKey >> (PACKED_V_BITS+PACKED_S_BITS)) & ((1<<PACKED_C_BITS)-1)
+    def getVerseNumberInt( self ): return (self.packedKey >> PACKED_S_BITS) & ((1<<PACKED_V_BITS)-1)
+    def getVerseSuffix( self ):
+        suffixNumber = self.packedKey & ((1<<PACKED_S_BITS)-1)
+        return chr( suffixNumber+96 ) if suffixNumber else ''
+    def getChapterNumber( self ): return str( self.getChapterNumberInt() )
+    getChapterNumberStr = getChapterNumber
+    def getVerseNumber( self ): return str( self.getVerseNumberInt() )
+    getVerseNumberStr = getVerseNumber
+
+    def getBCV( self ): return self.getBBB(), self.getChapterNumber(), self.getVerseNumber()
+    def getBCVS( self ): return self.getBBB(), self.getChapterNumber(), self.getVerseNumber(), self.getVerseSuffix()
+    def getCV( self ): return self.getChapterNumber(), self.getVerseNumber()
+    def getCVS( self ): return self.getChapterNumber(), self.getVerseNumber(), self.getVerseSuffix()
+
+    def getSimpleVerseKey( self ): return SimpleVerseKey( *self.getBCVS() )
+
+    def getOSISBookAbbreviation( self ):
+        return BibleOrgSysGlobals.BibleBooksCodes.getOSISAbbreviation( self.getBBB() )
+    def getOSISReference( self ):
+        return "{}.{}.{}".format( self.getOSISBookAbbreviation(), self.getChapterNumberInt(), self.getVerseNumberInt() )
+
+    def __iter__( self ):
+        """
+        Yields self (for compatibility with the more complex classes.
+        """
+        yield self
+    # end of PackedVerseKey.__iter__
+
+    def getIncludedVerses( self ):
+        """
+        Yields self (for compatibility with the more complex classes.
+        """
+        yield self
+    # end of PackedVerseKey.getIncludedVerses
+# end of class PackedVerseKey
+
+
+
 class SimpleVersesKey():
     """
     Handles individual verse references (no ranges, etc. allowed) in the internal BCVS form
@@ -1683,6 +1837,20 @@ def demo():
             try: print( '  ', repr(someBadString), SimpleVerseKey( someBadString ) )
             except TypeError: pass
 
+    if 1: # test PackedVerseKey
+        print( "\n\nTesting PackedVerseKey..." )
+        for someGoodString in goodVerseStrings:
+            print( "  Testing PackedVerseKey with good {!r}".format( someGoodString ) )
+            vK = PackedVerseKey( someGoodString )
+            print( '   ', vK, vK.packedKey, vK is PackedVerseKey( *vK.getBCVS() ) )
+            assert( vK.getVerseKeyText() == someGoodString )
+        print( '  ', sorted( [PackedVerseKey('REV','1','1'), PackedVerseKey('GEN','2','1'), PackedVerseKey('GEN','1','10')] ) )
+        print( '  BAD STUFF...' )
+        for someBadString in badVerseStrings:
+            print( "  Testing PackedVerseKey with bad {!r}".format( someBadString ) )
+            try: print( '  ', repr(someBadString), PackedVerseKey( someBadString ) )
+            except (TypeError, ValueError): pass
+
     goodVersesStrings = ( 'SA2_19:12,19', 'REV_11:2!b,6!a', )
     badVersesStrings = badStrings + ( 'GEN.1.1,3', 'EXO 2:2,4', 'LEV_3,9', 'NUM_1:1', '2SA_19:12,321', 'JNA_2:3b,6a', 'REV_11:12!a,!c', )
     if 1: # test SimpleVersesKey